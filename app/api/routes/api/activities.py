@@ -7,8 +7,8 @@ from app.models.activity_types import ActivityType
 from app.models.trial_activity_types import TrialActivityType
 from app.contracts.activity_type import TrialActivityTypeResponse, TrialActivityTypeCreate
 from app.dependencies.db import get_db
-from app.dependencies.trial_access import get_trial_with_access
-from app.models.trials import Trial
+from app.dependencies.trial_access import require_trial_access
+from app.services.trial_access_service import TrialAccessResolver
 
 router = APIRouter()
 
@@ -16,7 +16,7 @@ router = APIRouter()
 @router.get("/", response_model=List[TrialActivityTypeResponse])
 async def list_trial_activities(
     trial_id: UUID,
-    trial: Trial = Depends(get_trial_with_access),
+    access: TrialAccessResolver = Depends(require_trial_access),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -29,7 +29,7 @@ async def list_trial_activities(
 async def get_trial_activity(
     trial_id: UUID,
     activity_id: str,
-    trial: Trial = Depends(get_trial_with_access),
+    access: TrialAccessResolver = Depends(require_trial_access),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -48,7 +48,7 @@ async def get_trial_activity(
 async def create_trial_activity(
     trial_id: UUID,
     payload: TrialActivityTypeCreate,
-    trial: Trial = Depends(get_trial_with_access),
+    access: TrialAccessResolver = Depends(require_trial_access),
     db: AsyncSession = Depends(get_db),
 ):
     import uuid
@@ -64,7 +64,7 @@ async def update_trial_activity(
     trial_id: UUID,
     activity_id: str,
     payload: TrialActivityTypeCreate,
-    trial: Trial = Depends(get_trial_with_access),
+    access: TrialAccessResolver = Depends(require_trial_access),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -88,7 +88,7 @@ async def update_trial_activity(
 async def delete_trial_activity(
     trial_id: UUID,
     activity_id: str,
-    trial: Trial = Depends(get_trial_with_access),
+    access: TrialAccessResolver = Depends(require_trial_access),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -6,7 +6,7 @@ from datetime import datetime, timezone
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -19,8 +19,10 @@ from app.contracts.archive import (
 )
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.pagination import PageParams, get_page_params
 from app.models.archive_folder import ArchiveFolder
 from app.models.saved_response import SavedResponse
+from app.utils.pagination import apply_keyset
 
 
 from app.models.members import Member
@@ -35,17 +37,20 @@ router = APIRouter()
 @router.get("/folders/", response_model=List[ArchiveFolderResponse])
 async def list_folders(
     org_id: str,
+    response: Response,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
+    stmt = (
         select(ArchiveFolder)
         .where(ArchiveFolder.org_id == org_id)
         .where(ArchiveFolder.deleted_at.is_(None))
-        .order_by(ArchiveFolder.created_at.desc())
     )
-    folders = result.scalars().all()
-    return folders
+    stmt = apply_keyset(stmt, ArchiveFolder.created_at, ArchiveFolder.id, page.after, page.limit)
+    result = await db.execute(stmt)
+    folders = page.split(result.scalars().all(), key=lambda f: (f.created_at, f.id))
+    return page.respond(response, folders)
 
 
 @router.post("/folders/", response_model=ArchiveFolderResponse, status_code=201)
@@ -91,17 +96,21 @@ async def delete_folder(
 @router.get("/responses/", response_model=List[SavedResponseResponse])
 async def list_saved_responses(
     folder_id: UUID,
+    response: Response,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
+    stmt = (
         select(SavedResponse)
+        .options(*page.defer_unrequested(SavedResponse, "raw_data"))
         .where(SavedResponse.folder_id == folder_id)
         .where(SavedResponse.deleted_at.is_(None))
-        .order_by(SavedResponse.created_at.desc())
     )
-    responses = result.scalars().all()
-    return responses
+    stmt = apply_keyset(stmt, SavedResponse.created_at, SavedResponse.id, page.after, page.limit)
+    result = await db.execute(stmt)
+    responses = page.split(result.scalars().all(), key=lambda r: (r.created_at, r.id))
+    return page.respond(response, responses)
 
 
 @router.post("/responses/", response_model=SavedResponseResponse, status_code=201)
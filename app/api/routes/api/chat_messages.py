@@ -6,16 +6,18 @@ from datetime import datetime, timezone
 from typing import Dict, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.contracts.chat import ChatMessageCreate
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.pagination import PageParams, get_page_params
 from app.models.chat_messages import ChatMessage
 from app.models.chat_sessions import ChatSession
 from app.models.members import Member
+from app.utils.pagination import apply_keyset
 
 router = APIRouter()
 
@@ -23,16 +25,18 @@ router = APIRouter()
 @router.get("/", response_model=List[Dict])
 async def list_messages(
     session_id: UUID,
+    response: Response,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(ChatMessage)
-        .where(ChatMessage.session_id == session_id)
-        .order_by(ChatMessage.created_at.asc())
+    stmt = apply_keyset(
+        select(ChatMessage).where(ChatMessage.session_id == session_id),
+        ChatMessage.created_at, ChatMessage.id, page.after, page.limit, descending=False,
     )
-    messages = result.scalars().all()
-    return [
+    result = await db.execute(stmt)
+    messages = page.split(result.scalars().all(), key=lambda m: (m.created_at, m.id))
+    return page.respond(response, [
         {
             "id": str(m.id),
             "session_id": str(m.session_id),
@@ -41,7 +45,7 @@ async def list_messages(
             "created_at": m.created_at.isoformat() if m.created_at else None,
         }
         for m in messages
-    ]
+    ])
 
 
 @router.post("/", status_code=201)
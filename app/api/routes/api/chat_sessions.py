@@ -5,23 +5,27 @@ Chat session routes — GET /, POST /, PUT /{id}, DELETE /{id}
 from typing import Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.contracts.chat import ChatSessionCreate, ChatSessionResponse, ChatSessionUpdate
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.pagination import PageParams, get_page_params
 from app.models.chat_sessions import ChatSession
 from app.models.members import Member
 from app.services.crud import CRUDBase
+from app.utils.pagination import apply_keyset
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[Dict])
 async def list_chat_sessions(
+    response: Response,
     trial_id: Optional[UUID] = None,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
@@ -30,11 +34,11 @@ async def list_chat_sessions(
     )
     if trial_id:
         stmt = stmt.where(ChatSession.trial_id == trial_id)
-    stmt = stmt.order_by(ChatSession.updated_at.desc())
+    stmt = apply_keyset(stmt, ChatSession.updated_at, ChatSession.id, page.after, page.limit)
 
     result = await db.execute(stmt)
-    sessions = result.scalars().all()
-    return [
+    sessions = page.split(result.scalars().all(), key=lambda s: (s.updated_at, s.id))
+    return page.respond(response, [
         {
             "id": str(s.id),
             "title": s.title,
@@ -45,7 +49,7 @@ async def list_chat_sessions(
             "updated_at": s.updated_at.isoformat() if s.updated_at else None,
         }
         for s in sessions
-    ]
+    ])
 
 
 @router.post("/", status_code=201)
@@ -12,10 +12,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.trial_access import get_trial_access
 from app.contracts.patient_visit import PatientVisitResponse
 from app.models.members import Member
 from app.models.patient_visits import PatientVisit
 from app.models.visit_activities import VisitActivity
+from app.services.trial_access_service import TrialAccessResolver
 from app.utils.permissions import is_critical_trial_role  # PI/CRC roles checker
 
 router = APIRouter()
@@ -31,26 +33,15 @@ async def complete_visit(
     visit_id: str,
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
+    access: TrialAccessResolver = Depends(get_trial_access),
 ):
     """
     Complete a patient visit
     - Only PI/CRC can complete
     - All activities must be completed or not_applicable
     """
-    from app.models.trial_members import TrialMember
-    from app.models.roles import Role
-
     # Check permission
-    role_stmt = (
-        select(Role.name)
-        .join(TrialMember, TrialMember.role_id == Role.id)
-        .where(
-            TrialMember.member_id == member.id,
-            TrialMember.trial_id == trial_id
-        )
-    )
-    role_result = await db.execute(role_stmt)
-    trial_role = role_result.scalars().first()
+    trial_role = await access.role_for(trial_id)
 
     if not is_critical_trial_role(trial_role):
         raise HTTPException(
@@ -6,7 +6,7 @@ Invitation token validation — GET /invitations/validate/{token}
 
 from typing import List
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
@@ -19,10 +19,12 @@ from app.contracts.invitation import (
 )
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.pagination import PageParams, get_page_params
 from app.models.invitations import Invitation
 from app.models.members import Member
 from app.models.organizations import Organization
 from app.services.email_service import email_service
+from app.utils.pagination import apply_keyset
 
 import logging
 
@@ -33,7 +35,9 @@ router = APIRouter()
 
 @router.get("/", response_model=List[InvitationResponse])
 async def list_invitations(
+    response: Response,
     status: str = None,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
@@ -43,11 +47,11 @@ async def list_invitations(
     if status:
         query = query.where(Invitation.status == status)
 
-    query = query.order_by(Invitation.invited_at.desc())
+    query = apply_keyset(query, Invitation.invited_at, Invitation.id, page.after, page.limit)
 
     result = await db.execute(query)
-    invitations = result.scalars().all()
-    return [
+    invitations = page.split(result.scalars().all(), key=lambda inv: (inv.invited_at, inv.id))
+    return page.respond(response, [
         {
             "id": inv.id,
             "email": inv.email,
@@ -61,7 +65,7 @@ async def list_invitations(
             "accepted_at": inv.accepted_at,
         }
         for inv in invitations
-    ]
+    ])
 
 
 @router.get("/validate/{token}")
@@ -5,19 +5,22 @@ Member routes — GET /me, GET /me/trial-assignments, GET /, PUT /{id}, DELETE /
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.contracts.member import MemberResponse, MemberTrialAssignment, MemberUpdate
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.pagination import PageParams, get_page_params
 from app.models.members import Member
 from app.models.profiles import Profile
 from app.models.roles import Role
 from app.models.trial_members import TrialMember
 from app.models.trials import Trial
+from app.services.cache.member_cache_service import get_member_cache
 from app.services.crud import CRUDBase
+from app.services.organization_metrics_service import invalidate_organization_metrics
 
 router = APIRouter()
 
@@ -75,18 +78,24 @@ async def get_my_trial_assignments(
 
 @router.get("/", response_model=List[MemberResponse])
 async def list_members(
+    response: Response,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
     crud = CRUDBase(Member, db)
-    members = await crud.get_multi(filters={"organization_id": member.organization_id})
-    return members
+    members, page.next_cursor = await crud.get_page(
+        filters={"organization_id": member.organization_id},
+        limit=page.limit, after=page.after, fields=page.fields,
+    )
+    return page.respond(response, members)
 
 
 @router.put("/{member_id}", response_model=MemberResponse)
 async def update_member(
     member_id: UUID,
     payload: MemberUpdate,
+    request: Request,
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
@@ -96,12 +105,16 @@ async def update_member(
         raise HTTPException(status_code=404, detail="Member not found")
 
     updated = await crud.update(member_id, payload.model_dump(exclude_unset=True))
+    await get_member_cache().invalidate_member(
+        member_id, getattr(request.app.state, "redis_client", None)
+    )
     return updated
 
 
 @router.delete("/{member_id}", status_code=204)
 async def delete_member(
     member_id: UUID,
+    request: Request,
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
@@ -111,3 +124,6 @@ async def delete_member(
         raise HTTPException(status_code=404, detail="Member not found")
 
     await crud.delete(member_id)
+    redis = getattr(request.app.state, "redis_client", None)
+    await get_member_cache().invalidate_member(member_id, redis)
+    await invalidate_organization_metrics(member.organization_id, redis)
@@ -2,7 +2,7 @@
 Organization routes — GET/PUT /me, GET /me/metrics
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -20,9 +20,8 @@ from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
 from app.models.members import Member
 from app.models.organizations import Organization
-from app.models.patients import Patient
-from app.models.trials import Trial
-from app.models.documents import Document
+from app.services.organization_metrics_service import fetch_organization_metrics
+from app.services.cache.member_cache_service import get_member_cache
 
 router = APIRouter()
 
@@ -69,61 +68,12 @@ async def update_my_organization(
 
 @router.get("/me/metrics", response_model=OrganizationMetrics)
 async def get_organization_metrics(
+    request: Request,
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
-    org_id = member.organization_id
-
-    members_count = (
-        await db.execute(
-            select(func.count())
-            .select_from(Member)
-            .where(Member.organization_id == org_id)
-        )
-    ).scalar_one()
-
-    trials_count = (
-        await db.execute(
-            select(func.count())
-            .select_from(Trial)
-            .where(Trial.organization_id == org_id)
-        )
-    ).scalar_one()
-
-    active_trials = (
-        await db.execute(
-            select(func.count())
-            .select_from(Trial)
-            .where(Trial.organization_id == org_id, Trial.status == "active")
-        )
-    ).scalar_one()
-
-    patients_count = (
-        await db.execute(
-            select(func.count())
-            .select_from(Patient)
-            .where(Patient.organization_id == org_id)
-        )
-    ).scalar_one()
-
-    documents_count = (
-        await db.execute(
-            select(func.count())
-            .select_from(Document)
-            .where(
-                Document.trial_id.in_(
-                    select(Trial.id).where(Trial.organization_id == org_id)
-                )
-            )
-        )
-    ).scalar_one()
-
-    return OrganizationMetrics(
-        total_members=members_count,
-        total_trials=trials_count,
-        total_patients=patients_count,
-        total_documents=documents_count,
-        active_trials=active_trials,
+    return await fetch_organization_metrics(
+        member.organization_id, db, getattr(request.app.state, "redis_client", None)
     )
 
 
@@ -313,6 +263,7 @@ async def patch_update_organization(
 @router.delete("/members/{member_id}", status_code=200)
 async def delete_organization_member(
     member_id: str,
+    request: Request,
     current_user: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
@@ -361,6 +312,9 @@ async def delete_organization_member(
     member_to_delete.deleted_at = func.now()
     await db.commit()
     await db.refresh(member_to_delete)
+    await get_member_cache().invalidate_member(
+        member_to_delete.id, getattr(request.app.state, "redis_client", None)
+    )
 
     return {"message": "Member deleted successfully", "snapshot": user_snapshot}
 
@@ -369,6 +323,7 @@ async def delete_organization_member(
 async def remove_member_from_org(
     org_id: str,
     member_id: str,
+    request: Request,
     current_user: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
@@ -389,5 +344,8 @@ async def remove_member_from_org(
 
     member.deleted_at = func.now()
     await db.commit()
+    await get_member_cache().invalidate_member(
+        member.id, getattr(request.app.state, "redis_client", None)
+    )
 
     return {"message": "Member removed successfully"}
@@ -5,13 +5,14 @@ Patient document routes — GET /, POST /, PUT /{id}, DELETE /{id}
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.contracts.patient_document import PatientDocumentResponse, PatientDocumentUpdate
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.pagination import PageParams, get_page_params
 from app.dependencies.storage import get_storage_service
 from app.models.members import Member
 from app.models.patient_documents import PatientDocument
@@ -23,7 +24,9 @@ router = APIRouter()
 
 @router.get("/", response_model=List[PatientDocumentResponse])
 async def list_patient_documents(
+    response: Response,
     patient_id: Optional[UUID] = None,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
@@ -31,7 +34,10 @@ async def list_patient_documents(
     filters = {}
     if patient_id:
         filters["patient_id"] = patient_id
-    return await crud.get_multi(filters=filters)
+    documents, page.next_cursor = await crud.get_page(
+        filters=filters, limit=page.limit, after=page.after, fields=page.fields,
+    )
+    return page.respond(response, documents)
 
 
 @router.post("/", response_model=PatientDocumentResponse, status_code=201)
@@ -48,14 +54,12 @@ async def upload_patient_document(
     settings = get_settings()
     bucket = settings.gcs_bucket_patient_documents
 
-    file_data = await file.read()
     folder = f"patients/{patient_id}"
 
-    upload_result = storage.upload_file(
+    upload_result = await storage.save_upload(
         bucket_name=bucket,
-        file_data=file_data,
+        file=file,
         filename=file.filename or "document",
-        content_type=file.content_type or "application/octet-stream",
         folder=folder,
     )
 
@@ -104,6 +108,6 @@ async def delete_patient_document(
 
     settings = get_settings()
     if doc.document_url:
-        storage.delete_file(settings.gcs_bucket_patient_documents, doc.document_url)
+        await storage.delete_file_async(settings.gcs_bucket_patient_documents, doc.document_url)
 
     await crud.delete(document_id)
@@ -5,40 +5,45 @@ Patient visit routes — GET /, POST /
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.contracts.patient_visit import PatientVisitCreate, PatientVisitResponse
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.pagination import PageParams, get_page_params, loaded
 from app.models.members import Member
 from app.models.patient_visits import PatientVisit
 from app.models.trial_patients import TrialPatient
+from app.utils.pagination import apply_keyset
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[PatientVisitResponse])
 async def list_visits(
+    response: Response,
     patient_id: Optional[UUID] = None,
     trial_id: Optional[UUID] = None,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
     stmt = (
         select(PatientVisit, Member)
         .outerjoin(Member, PatientVisit.doctor_id == Member.id)
+        .options(*page.defer_unrequested(PatientVisit, "cost_data"))
     )
     if patient_id:
         stmt = stmt.where(PatientVisit.patient_id == patient_id)
     if trial_id:
         stmt = stmt.where(PatientVisit.trial_id == trial_id)
-    stmt = stmt.order_by(PatientVisit.visit_date.desc())
+    stmt = apply_keyset(stmt, PatientVisit.visit_date, PatientVisit.id, page.after, page.limit)
 
     result = await db.execute(stmt)
-    rows = result.all()
-    return [
+    rows = page.split(result.all(), key=lambda row: (row[0].visit_date, row[0].id))
+    return page.respond(response, [
         PatientVisitResponse(
             id=v.id,
             patient_id=v.patient_id,
@@ -57,11 +62,11 @@ async def list_visits(
             created_at=v.created_at,
             updated_at=v.updated_at,
             created_by=v.created_by,
-            cost_data=v.cost_data,
+            cost_data=loaded(v, "cost_data"),
             doctor_name=doc.name if doc else None,
         )
         for v, doc in rows
-    ]
+    ])
 
 
 @router.post("/", response_model=PatientVisitResponse, status_code=201)
@@ -2,21 +2,21 @@
 Patient routes — GET /, GET /{id}, POST /, PUT /{id}, DELETE /{id}, GET /generate-code
 """
 
-import random
-import string
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.contracts.patient import PatientCreate, PatientResponse, PatientUpdate
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.pagination import PageParams, get_page_params
 from app.models.members import Member
 from app.models.patients import Patient
 from app.services.crud import CRUDBase
+from app.services.organization_metrics_service import invalidate_organization_metrics
+from app.services.patient_code_service import PatientCodeSpaceExhausted, get_patient_code_allocator
 
 router = APIRouter()
 
@@ -27,23 +27,26 @@ async def generate_patient_code(
     db: AsyncSession = Depends(get_db),
 ):
     """Generate a unique patient code in format PAT-XXXXX."""
-    while True:
-        suffix = "".join(random.choices(string.digits, k=5))
-        code = f"PAT-{suffix}"
-        existing = (await db.execute(
-            select(func.count()).select_from(Patient).where(Patient.patient_code == code)
-        )).scalar_one()
-        if existing == 0:
-            return {"patient_code": code}
+    try:
+        code = await get_patient_code_allocator().allocate(db, member.organization_id)
+    except PatientCodeSpaceExhausted as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"patient_code": code}
 
 
 @router.get("/", response_model=List[PatientResponse])
 async def list_patients(
+    response: Response,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
     crud = CRUDBase(Patient, db)
-    return await crud.get_multi(filters={"organization_id": member.organization_id})
+    patients, page.next_cursor = await crud.get_page(
+        filters={"organization_id": member.organization_id},
+        limit=page.limit, after=page.after, fields=page.fields,
+    )
+    return page.respond(response, patients)
 
 
 @router.get("/{patient_id}", response_model=PatientResponse)
@@ -62,13 +65,16 @@ async def get_patient(
 @router.post("/", response_model=PatientResponse, status_code=201)
 async def create_patient(
     payload: PatientCreate,
+    request: Request,
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
     crud = CRUDBase(Patient, db)
     data = payload.model_dump()
     data["organization_id"] = member.organization_id
-    return await crud.create(data)
+    patient = await crud.create(data)
+    await invalidate_organization_metrics(member.organization_id, getattr(request.app.state, "redis_client", None))
+    return patient
 
 
 @router.put("/{patient_id}", response_model=PatientResponse)
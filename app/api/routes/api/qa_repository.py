@@ -5,17 +5,19 @@ QA repository routes — GET /, POST /, PUT /{id}/verify, DELETE /{id}
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.contracts.qa_repository import QAItemCreate, QAItemResponse, QAItemUpdate
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.pagination import PageParams, get_page_params
 from app.models.members import Member
 from app.models.profiles import Profile
 from app.models.qa_repository import QARepositoryItem
 from app.services.crud import CRUDBase
+from app.utils.pagination import apply_keyset
 
 router = APIRouter()
 
@@ -23,18 +25,21 @@ router = APIRouter()
 @router.get("/", response_model=List[QAItemResponse])
 async def list_qa_items(
     trial_id: UUID,
+    response: Response,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
+    stmt = (
         select(QARepositoryItem, Member, Profile)
         .outerjoin(Member, QARepositoryItem.created_by == Member.id)
         .outerjoin(Profile, Member.profile_id == Profile.id)
         .where(QARepositoryItem.trial_id == trial_id)
-        .order_by(QARepositoryItem.created_at.desc())
     )
-    rows = result.all()
-    return [
+    stmt = apply_keyset(stmt, QARepositoryItem.created_at, QARepositoryItem.id, page.after, page.limit)
+    result = await db.execute(stmt)
+    rows = page.split(result.all(), key=lambda row: (row[0].created_at, row[0].id))
+    return page.respond(response, [
         QAItemResponse(
             id=qa.id,
             trial_id=qa.trial_id,
@@ -51,7 +56,7 @@ async def list_qa_items(
             creator_email=m.email if m else None,
         )
         for qa, m, p in rows
-    ]
+    ])
 
 
 @router.post("/", response_model=QAItemResponse, status_code=201)
@@ -5,13 +5,14 @@ Role routes — GET /, POST /, DELETE /{id}
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.contracts.role import RoleCreate, RoleResponse
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.pagination import PageParams, get_page_params
 from app.models.members import Member
 from app.models.roles import Role
 from app.models.trial_members import TrialMember
@@ -22,11 +23,17 @@ router = APIRouter()
 
 @router.get("/", response_model=List[RoleResponse])
 async def list_roles(
+    response: Response,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
     crud = CRUDBase(Role, db)
-    return await crud.get_multi(filters={"organization_id": member.organization_id})
+    roles, page.next_cursor = await crud.get_page(
+        filters={"organization_id": member.organization_id},
+        limit=page.limit, after=page.after, fields=page.fields,
+    )
+    return page.respond(response, roles)
 
 
 @router.post("/", response_model=RoleResponse, status_code=201)
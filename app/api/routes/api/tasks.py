@@ -1,34 +1,75 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import List, Optional
 from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 
 from app.models.tasks import Task
 from app.models.members import Member
+from app.models.trials import Trial
 from app.dependencies.db import get_db
 from app.dependencies.auth import get_current_member
+from app.dependencies.pagination import PageParams, get_page_params
 from app.contracts.tasks import TaskResponse, TaskCreate, TaskUpdate, AssignedUser
+from app.utils.pagination import apply_keyset
 
 router = APIRouter(tags=["tasks"])
 
 
+def _to_response(task: Task, assigned: Optional[Member]) -> TaskResponse:
+    return TaskResponse(
+        id=task.id,
+        trial_id=task.trial_id,
+        title=task.title,
+        description=task.description,
+        status=task.status,
+        priority=task.priority,
+        category=task.category,
+        due_date=task.due_date,
+        assigned_to=task.assigned_to,
+        assigned_user=AssignedUser(id=assigned.id, full_name=assigned.name) if assigned else None,
+        patient_id=task.patient_id,
+        visit_id=task.visit_id,
+        activity_type_id=task.activity_type_id,
+        created_at=task.created_at,
+        updated_at=task.updated_at,
+    )
+
+
 # -----------------------
 # GET - List Tasks
 # -----------------------
 @router.get("/", response_model=List[TaskResponse])
 async def list_tasks(
+    response: Response,
     trial_id: Optional[UUID] = None,
     patient_id: Optional[UUID] = None,
     assigned_to: Optional[UUID] = None,
     status: Optional[str] = None,
     priority: Optional[str] = None,
     category: Optional[str] = None,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
-    stmt = select(Task).where(Task.deleted_at.is_(None))
+    """
+    List tasks for the member's organization, newest first.
+
+    Assignees are joined in the same query. Pages are keyset-paginated on
+    (created_at, id): when more rows exist the ``X-Next-Cursor`` response
+    header carries the cursor for the next page.
+    """
+    stmt = (
+        select(Task)
+        .join(Trial, Task.trial_id == Trial.id)
+        .options(joinedload(Task.assigned_user))
+        .where(
+            Task.deleted_at.is_(None),
+            Trial.organization_id == member.organization_id,
+        )
+    )
 
     if trial_id:
         stmt = stmt.where(Task.trial_id == trial_id)
@@ -48,40 +89,12 @@ async def list_tasks(
     if category:
         stmt = stmt.where(Task.category == category)
 
+    stmt = apply_keyset(stmt, Task.created_at, Task.id, page.after, page.limit)
+
     result = await db.execute(stmt)
-    tasks = result.scalars().all()
-
-    tasks_with_user = []
-
-    for task in tasks:
-        assigned_user = None
-
-        if task.assigned_to:
-            user = await db.get(Member, task.assigned_to)
-            if user:
-                assigned_user = AssignedUser(id=user.id, full_name=user.full_name)
-
-        tasks_with_user.append(
-            TaskResponse(
-                id=task.id,
-                trial_id=task.trial_id,
-                title=task.title,
-                description=task.description,
-                status=task.status,
-                priority=task.priority,
-                category=task.category,
-                due_date=task.due_date,
-                assigned_to=task.assigned_to,
-                assigned_user=assigned_user,
-                patient_id=task.patient_id,
-                visit_id=task.visit_id,
-                activity_type_id=task.activity_type_id,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-            )
-        )
+    tasks = page.split(result.scalars().all(), key=lambda t: (t.created_at, t.id))
 
-    return tasks_with_user
+    return page.respond(response, [_to_response(task, task.assigned_user) for task in tasks])
 
 
 # -----------------------
@@ -99,30 +112,8 @@ async def create_task(
     await db.commit()
     await db.refresh(task)
 
-    assigned_user = None
-
-    if task.assigned_to:
-        user = await db.get(Member, task.assigned_to)
-        if user:
-            assigned_user = AssignedUser(id=user.id, full_name=user.full_name)
-
-    return TaskResponse(
-        id=task.id,
-        trial_id=task.trial_id,
-        title=task.title,
-        description=task.description,
-        status=task.status,
-        priority=task.priority,
-        category=task.category,
-        due_date=task.due_date,
-        assigned_to=task.assigned_to,
-        assigned_user=assigned_user,
-        patient_id=task.patient_id,
-        visit_id=task.visit_id,
-        activity_type_id=task.activity_type_id,
-        created_at=task.created_at,
-        updated_at=task.updated_at,
-    )
+    assigned_user = await db.get(Member, task.assigned_to) if task.assigned_to else None
+    return _to_response(task, assigned_user)
 
 
 # -----------------------
@@ -149,30 +140,8 @@ async def update_task(
     await db.commit()
     await db.refresh(task)
 
-    assigned_user = None
-
-    if task.assigned_to:
-        user = await db.get(Member, task.assigned_to)
-        if user:
-            assigned_user = AssignedUser(id=user.id, full_name=user.full_name)
-
-    return TaskResponse(
-        id=task.id,
-        trial_id=task.trial_id,
-        title=task.title,
-        description=task.description,
-        status=task.status,
-        priority=task.priority,
-        category=task.category,
-        due_date=task.due_date,
-        assigned_to=task.assigned_to,
-        assigned_user=assigned_user,
-        patient_id=task.patient_id,
-        visit_id=task.visit_id,
-        activity_type_id=task.activity_type_id,
-        created_at=task.created_at,
-        updated_at=task.updated_at,
-    )
+    assigned_user = await db.get(Member, task.assigned_to) if task.assigned_to else None
+    return _to_response(task, assigned_user)
 
 
 # -----------------------
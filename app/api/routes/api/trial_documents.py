@@ -3,10 +3,11 @@ Trial document routes — GET /, GET /{id}, POST /upload, PUT /{id}, DELETE /{id
 """
 
 import logging
+import time
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, Response, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
@@ -14,13 +15,16 @@ from app.contracts.document import DocumentResponse, DocumentUpdate
 from app.contracts.storage import DocumentDownloadUrlResponse
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.pagination import PageParams, get_page_params
 from app.dependencies.storage import get_storage_service
-from app.dependencies.trial_access import get_trial_with_access
+from app.dependencies.trial_access import get_trial_access
 from app.models.documents import Document
 from app.models.members import Member
 from app.models.trials import Trial
 from app.services.crud import CRUDBase
+from app.services.organization_metrics_service import invalidate_organization_metrics
 from app.services.storage.base import StorageService
+from app.services.trial_access_service import TrialAccessResolver
 
 logger = logging.getLogger(__name__)
 
@@ -34,8 +38,10 @@ DOWNLOAD_URL_TTL_SECONDS = DOWNLOAD_URL_TTL_HOURS * 3600
 @router.get("/", response_model=List[DocumentResponse])
 async def list_trial_documents(
     trial_id: UUID,
-    member: Member = Depends(get_current_member),
+    response: Response,
+    page: PageParams = Depends(get_page_params),
     db: AsyncSession = Depends(get_db),
+    access: TrialAccessResolver = Depends(get_trial_access),
 ):
     """
     List documents for a trial. Returns metadata only.
@@ -45,18 +51,22 @@ async def list_trial_documents(
 
     Authorization: caller must be a member of the trial's organization
     (admins) or a TrialMember of this trial — enforced by
-    `get_trial_with_access`.
+    the request's `TrialAccessResolver`.
     """
-    await get_trial_with_access(trial_id, member, db)
+    await access.require(trial_id)
     crud = CRUDBase(Document, db)
-    return await crud.get_multi(filters={"trial_id": trial_id})
+    documents, page.next_cursor = await crud.get_page(
+        filters={"trial_id": trial_id},
+        limit=page.limit, after=page.after, fields=page.fields,
+    )
+    return page.respond(response, documents)
 
 
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_trial_document(
     document_id: UUID,
-    member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
+    access: TrialAccessResolver = Depends(get_trial_access),
 ):
     """
     Get a single document's metadata. `document_url` is a raw GCS blob path —
@@ -69,7 +79,7 @@ async def get_trial_document(
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     # 404 on cross-org access too — don't leak existence
-    await get_trial_with_access(doc.trial_id, member, db)
+    await access.require(doc.trial_id)
     return doc
 
 
@@ -79,9 +89,9 @@ async def get_trial_document(
 )
 async def get_document_download_url(
     document_id: UUID,
-    member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
     storage: StorageService = Depends(get_storage_service),
+    access: TrialAccessResolver = Depends(get_trial_access),
 ):
     """
     Return a fresh, short-lived HTTPS URL the FE can pass to a PDF viewer.
@@ -92,7 +102,7 @@ async def get_document_download_url(
     URL 401/403s, refetch.
 
     Authorization: caller must have access to the document's parent trial
-    (`get_trial_with_access`). Without this check the endpoint would mint
+    (`TrialAccessResolver.require`). Without this check the endpoint would mint
     download links for any document UUID across the whole tenant.
     """
     crud = CRUDBase(Document, db)
@@ -103,14 +113,15 @@ async def get_document_download_url(
         raise HTTPException(status_code=404, detail="Document has no file attached")
 
     # Enforce trial-access (raises 403/404 on no access — don't sign anything yet)
-    await get_trial_with_access(doc.trial_id, member, db)
+    await access.require(doc.trial_id)
 
     if doc.document_url.startswith(("http://", "https://")):
         # Already an absolute URL (e.g., LocalStorageService in dev)
         url = doc.document_url
+        expires_in_seconds = DOWNLOAD_URL_TTL_SECONDS
     else:
         try:
-            url = storage.get_signed_url(
+            signed = await storage.sign_url(
                 get_settings().gcs_bucket_trial_documents,
                 doc.document_url,
                 expiration_hours=DOWNLOAD_URL_TTL_HOURS,
@@ -118,15 +129,19 @@ async def get_document_download_url(
         except Exception as e:
             logger.exception(f"Failed to sign URL for document {document_id}: {e}")
             raise HTTPException(status_code=500, detail="Failed to generate download URL")
+        # May be a cached URL signed earlier — report its actual remaining lifetime
+        url = signed.url
+        expires_in_seconds = max(0, int(signed.expires_at - time.time()))
 
     return DocumentDownloadUrlResponse(
         url=url,
-        expires_in_seconds=DOWNLOAD_URL_TTL_SECONDS,
+        expires_in_seconds=expires_in_seconds,
     )
 
 
 @router.post("/upload", response_model=DocumentResponse, status_code=201)
 async def upload_trial_document(
+    request: Request,
     file: UploadFile = File(...),
     trial_id: UUID = Form(...),
     document_name: str = Form(...),
@@ -145,7 +160,6 @@ async def upload_trial_document(
     bucket = settings.gcs_bucket_trial_documents
 
     import uuid
-    file_data = await file.read()
     folder = f"trials/{trial_id}"
     # Ensure a unique filename to avoid duplicate URL constraint
     unique_suffix = uuid.uuid4().hex[:8]
@@ -156,11 +170,10 @@ async def upload_trial_document(
         unique_filename = f"{name_part}_{unique_suffix}.{ext}"
     else:
         unique_filename = f"{base_name}_{unique_suffix}"
-    upload_result = storage.upload_file(
+    upload_result = await storage.save_upload(
         bucket_name=bucket,
-        file_data=file_data,
+        file=file,
         filename=unique_filename,
-        content_type=file.content_type or "application/octet-stream",
         folder=folder,
     )
 
@@ -178,6 +191,7 @@ async def upload_trial_document(
     db.add(doc)
     await db.commit()
     await db.refresh(doc)
+    await invalidate_organization_metrics(trial.organization_id, getattr(request.app.state, "redis_client", None))
     return doc
 
 
@@ -199,6 +213,7 @@ async def update_trial_document(
 @router.delete("/{document_id}", status_code=204)
 async def delete_trial_document(
     document_id: UUID,
+    request: Request,
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
     storage: StorageService = Depends(get_storage_service),
@@ -211,6 +226,7 @@ async def delete_trial_document(
     # Delete from storage
     settings = get_settings()
     if doc.document_url:
-        storage.delete_file(settings.gcs_bucket_trial_documents, doc.document_url)
+        await storage.delete_file_async(settings.gcs_bucket_trial_documents, doc.document_url)
 
     await crud.delete(document_id)
+    await invalidate_organization_metrics(member.organization_id, getattr(request.app.state, "redis_client", None))
@@ -5,7 +5,7 @@ Trial member routes — GET /team/{trial_id}, GET /pending/{trial_id}, POST /, P
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -16,7 +16,7 @@ from app.contracts.trial_member import (
     TrialMemberResponse,
 )
 from app.dependencies.auth import get_current_member
-from app.dependencies.trial_access import get_trial_with_access
+from app.dependencies.trial_access import get_trial_with_access, require_trial_access
 from app.dependencies.db import get_db
 from app.models.invitations import Invitation
 from app.models.members import Member
@@ -24,6 +24,7 @@ from app.models.profiles import Profile
 from app.models.roles import Role
 from app.models.trial_members import TrialMember
 from app.models.trial_members_pending import TrialMemberPending
+from app.services.trial_access_service import TrialAccessResolver, invalidate_trial_access
 
 router = APIRouter()
 
@@ -31,7 +32,7 @@ router = APIRouter()
 @router.get("/team/{trial_id}", response_model=List[TrialMemberResponse])
 async def get_trial_team(
     trial_id: UUID,
-    member: Member = Depends(get_trial_with_access),
+    access: TrialAccessResolver = Depends(require_trial_access),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -66,7 +67,7 @@ async def get_trial_team(
 @router.get("/pending/{trial_id}", response_model=List[PendingMemberResponse])
 async def get_pending_members(
     trial_id: UUID,
-    member: Member = Depends(get_trial_with_access),
+    access: TrialAccessResolver = Depends(require_trial_access),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -98,6 +99,7 @@ async def get_pending_members(
 @router.post("/", response_model=TrialMemberResponse, status_code=201)
 async def add_trial_member(
     payload: TrialMemberCreate,
+    request: Request,
     trial=Depends(get_trial_with_access),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
@@ -110,6 +112,7 @@ async def add_trial_member(
     db.add(tm)
     await db.commit()
     await db.refresh(tm)
+    await invalidate_trial_access(tm.member_id, getattr(request.app.state, "redis_client", None))
 
     m = (
         (await db.execute(select(Member).where(Member.id == tm.member_id)))
@@ -176,6 +179,7 @@ async def add_pending_member(
 async def update_trial_member(
     member_id: UUID,
     payload: dict,
+    request: Request,
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
@@ -201,6 +205,7 @@ async def update_trial_member(
 
     await db.commit()
     await db.refresh(tm)
+    await invalidate_trial_access(tm.member_id, getattr(request.app.state, "redis_client", None))
 
     m = (
         (await db.execute(select(Member).where(Member.id == tm.member_id)))
@@ -237,6 +242,7 @@ async def update_trial_member(
 @router.delete("/{member_id}", status_code=204)
 async def remove_trial_member(
     member_id: UUID,
+    request: Request,
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
@@ -251,3 +257,4 @@ async def remove_trial_member(
         raise HTTPException(status_code=403, detail="Not authorized")
     await db.delete(tm)
     await db.commit()
+    await invalidate_trial_access(tm.member_id, getattr(request.app.state, "redis_client", None))
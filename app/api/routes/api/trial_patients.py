@@ -5,17 +5,19 @@ Trial patient routes — GET /, POST /, PUT /{id}
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.contracts.trial_patient import TrialPatientCreate, TrialPatientResponse, TrialPatientUpdate
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.pagination import PageParams, get_page_params, loaded
 from app.models.members import Member
 from app.models.patients import Patient
 from app.models.trial_patients import TrialPatient
 from app.services.crud import CRUDBase
+from app.utils.pagination import apply_keyset
 
 router = APIRouter()
 
@@ -23,17 +25,21 @@ router = APIRouter()
 @router.get("/", response_model=List[TrialPatientResponse])
 async def list_trial_patients(
     trial_id: UUID,
+    response: Response,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
+    stmt = (
         select(TrialPatient, Patient)
         .join(Patient, TrialPatient.patient_id == Patient.id)
+        .options(*page.defer_unrequested(TrialPatient, "cost_data", "patient_data"))
         .where(TrialPatient.trial_id == trial_id)
-        .order_by(TrialPatient.created_at.desc())
     )
-    rows = result.all()
-    return [
+    stmt = apply_keyset(stmt, TrialPatient.created_at, TrialPatient.id, page.after, page.limit)
+    result = await db.execute(stmt)
+    rows = page.split(result.all(), key=lambda row: (row[0].created_at, row[0].id))
+    return page.respond(response, [
         TrialPatientResponse(
             id=tp.id,
             trial_id=tp.trial_id,
@@ -45,14 +51,14 @@ async def list_trial_patients(
             created_at=tp.created_at,
             updated_at=tp.updated_at,
             assigned_by=tp.assigned_by,
-            cost_data=tp.cost_data,
-            patient_data=tp.patient_data,
+            cost_data=loaded(tp, "cost_data"),
+            patient_data=loaded(tp, "patient_data"),
             patient_code=p.patient_code,
             patient_first_name=p.first_name,
             patient_last_name=p.last_name,
         )
         for tp, p in rows
-    ]
+    ])
 
 
 @router.post("/", response_model=TrialPatientResponse, status_code=201)
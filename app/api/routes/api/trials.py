@@ -5,7 +5,7 @@ Trial routes — GET /, GET /{id}, POST /with-assignments, PUT /{id}
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.contracts.trial_template import VisitScheduleTemplate
@@ -14,6 +14,7 @@ from datetime import datetime, timezone
 from app.contracts.trial import TrialResponse, TrialUpdate, TrialWithAssignmentsCreate
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
+from app.dependencies.pagination import PageParams, get_page_params
 from app.models.members import Member
 from app.models.trial_members import TrialMember
 from app.models.trial_members_pending import TrialMemberPending
@@ -21,6 +22,7 @@ from app.models.activity_types import ActivityType
 from app.models.trial_activity_types import TrialActivityType
 from app.models.trials import Trial
 from app.services.crud import CRUDBase
+from app.services.organization_metrics_service import invalidate_organization_metrics
 from app.dependencies.trial_access import get_trial_with_access
 
 router = APIRouter()
@@ -28,11 +30,17 @@ router = APIRouter()
 
 @router.get("/", response_model=List[TrialResponse])
 async def list_trials(
+    response: Response,
+    page: PageParams = Depends(get_page_params),
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
     crud = CRUDBase(Trial, db)
-    return await crud.get_multi(filters={"organization_id": member.organization_id})
+    trials, page.next_cursor = await crud.get_page(
+        filters={"organization_id": member.organization_id},
+        limit=page.limit, after=page.after, fields=page.fields,
+    )
+    return page.respond(response, trials)
 
 
 @router.get("/{trial_id}", response_model=TrialResponse)
@@ -51,6 +59,7 @@ async def get_trial(
 @router.post("/with-assignments", response_model=TrialResponse, status_code=201)
 async def create_trial_with_assignments(
     payload: TrialWithAssignmentsCreate,
+    request: Request,
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
@@ -86,6 +95,7 @@ async def create_trial_with_assignments(
 
     await db.commit()
     await db.refresh(trial)
+    await invalidate_organization_metrics(member.organization_id, getattr(request.app.state, "redis_client", None))
     return trial
 
 
@@ -93,6 +103,7 @@ async def create_trial_with_assignments(
 async def update_trial(
     trial_id: UUID,
     payload: TrialUpdate,
+    request: Request,
     member: Member = Depends(get_current_member),
     db: AsyncSession = Depends(get_db),
 ):
@@ -101,7 +112,10 @@ async def update_trial(
     if not trial or trial.organization_id != member.organization_id:
         raise HTTPException(status_code=404, detail="Trial not found")
 
-    updated = await crud.update(trial_id, payload.model_dump(exclude_unset=True))
+    changes = payload.model_dump(exclude_unset=True)
+    updated = await crud.update(trial_id, changes)
+    if "status" in changes:
+        await invalidate_organization_metrics(member.organization_id, getattr(request.app.state, "redis_client", None))
     return updated
 
 
@@ -2,7 +2,7 @@
 Authentication routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.themison_admins import ThemisonAdmin
@@ -14,6 +14,7 @@ from app.models.profiles import Profile
 from app.models.invitations import Invitation
 from app.contracts.auth import SignupCompleteRequest, SignupCompleteResponse
 from app.core.auth0_management import auth0_mgmt
+from app.services.organization_metrics_service import invalidate_organization_metrics
 import uuid
 from datetime import datetime
 
@@ -87,7 +88,9 @@ async def get_me(
 
 @router.post("/signup/complete", response_model=SignupCompleteResponse)
 async def signup_complete(
-    payload: SignupCompleteRequest, db: AsyncSession = Depends(get_db)
+    payload: SignupCompleteRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Finalize signup for an invited user.
@@ -201,6 +204,9 @@ async def signup_complete(
         invitation.accepted_at = datetime.now(timezone.utc)
 
         await db.commit()
+        await invalidate_organization_metrics(
+            invitation.organization_id, getattr(request.app.state, "redis_client", None)
+        )
 
         return SignupCompleteResponse(
             success=True,
@@ -4,27 +4,102 @@ Serves files stored by ``LocalStorageService`` from the ``./uploads/`` directory
 Mounted at ``/local-files`` so that URLs returned by the local storage backend
 (e.g. ``http://localhost:8000/local-files/trials/<id>/file.pdf``) resolve to
 actual file responses — the same way GCS signed URLs would.
+
+``FileResponse`` handles ``Range``/``If-Range`` and sets ``ETag`` and
+``Last-Modified``; the other conditional headers are evaluated here so PDF
+viewers and caches can revalidate without downloading the file again.
 """
 
+import os
+import stat
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import FileResponse
 
 router = APIRouter()
 
 UPLOADS_ROOT = Path("uploads").resolve()
 
+# Revalidate on every use; the ETag makes that a 304 when nothing changed
+CACHE_CONTROL = "no-cache"
+
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    """True if any entity tag in an If-Match/If-None-Match header matches etag."""
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            if not weak:
+                continue  # Weak tags never match strongly
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None  # Invalid dates are ignored (RFC 9110 §13.1.3)
+
+
+def _precondition_status(request: Request, etag: str, mtime: float) -> Optional[int]:
+    """
+    Evaluate conditional request headers in RFC 9110 §13.2.2 order.
+    Returns 412 or 304 when the request should short-circuit, else None.
+    """
+    headers = request.headers
+    modified = int(mtime)  # HTTP dates have one-second resolution
+
+    if_match = headers.get("if-match")
+    if if_match is not None:
+        if not _etag_matches(if_match, etag, weak=False):
+            return 412
+    else:
+        since = _http_date(headers.get("if-unmodified-since"))
+        if since is not None and modified > since:
+            return 412
+
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag, weak=True):
+            return 304
+    else:
+        since = _http_date(headers.get("if-modified-since"))
+        if since is not None and modified <= since:
+            return 304
+    return None
+
 
 @router.get("/{file_path:path}")
-async def serve_local_file(file_path: str):
+@router.head("/{file_path:path}", include_in_schema=False)
+async def serve_local_file(file_path: str, request: Request):
     target = (UPLOADS_ROOT / file_path).resolve()
 
     # Path-traversal protection
     if not str(target).startswith(str(UPLOADS_ROOT)):
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    if not target.is_file():
+    try:
+        stat_result = os.stat(target)
+    except OSError:
+        stat_result = None
+    if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
         raise HTTPException(status_code=404, detail="File not found")
 
-    return FileResponse(target)
+    response = FileResponse(target, stat_result=stat_result, headers={"Cache-Control": CACHE_CONTROL})
+    status = _precondition_status(request, response.headers["etag"], stat_result.st_mtime)
+    if status == 304:
+        validators = ("etag", "last-modified", "cache-control")
+        return Response(status_code=304, headers={k: response.headers[k] for k in validators})
+    if status == 412:
+        return Response(status_code=412)
+    return response
@@ -3,24 +3,33 @@ Query routes - RAG query via local service or gRPC.
 """
 import json
 import logging
+import math
 import time
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Response, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Response, Query
 from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies.db import get_db
-from app.core.openai import embedding_client
+from app.core.openai import get_embedding_client
 from app.config import get_settings
+from app.core.tracing import KIND_SERVER, start_span
+from app.models.documents import Document
 from app.services.doclingRag.rag_generation_service import RagGenerationService
 from app.services.doclingRag.rag_retrieval_service import RagRetrievalService
 from app.services.highlighting.interfaces.pdf_highlight_service import IPDFHightlightService
 from app.services.highlighting.pdf_highlight_service import PDFHighlightService
+from app.services.highlighting.highlight_prerender_service import HighlightPrerenderService
 from app.services.cache.rag_cache_service import RagCacheService
 from app.services.cache.semantic_cache_service import SemanticCacheService
+from app.services.query_admission_service import AdmissionRejected, get_query_admission, resolve_query_tenant
 from app.dependencies.redis_client import get_redis_client
 from app.dependencies.cache import get_rag_cache_service, get_semantic_cache_service
+from app.dependencies.storage import get_storage_service
+from app.db.session import async_session
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -28,8 +37,15 @@ router = APIRouter()
 
 class QueryRequest(BaseModel):
     query: str
-    document_id: UUID
-    document_name: str
+    document_id: Optional[UUID] = None
+    document_name: Optional[str] = None
+    # Trial-wide mode: query several documents at once
+    document_ids: Optional[List[UUID]] = None
+    trial_id: Optional[UUID] = None
+
+    @property
+    def is_multi_document(self) -> bool:
+        return bool(self.document_ids) or self.trial_id is not None
 
 
 async def _query_via_grpc(request: QueryRequest) -> dict:
@@ -63,7 +79,7 @@ async def _query_via_local(
     """
     retrieval_service = RagRetrievalService(
         db=db,
-        embedding_client=embedding_client,
+        embedding_client=get_embedding_client(),
         cache_service=cache_service,
     )
     generation_service = RagGenerationService(
@@ -79,6 +95,82 @@ async def _query_via_local(
     )
 
 
+async def _resolve_query_documents(
+    request: QueryRequest,
+    db: AsyncSession,
+) -> list[tuple[UUID, str]]:
+    """
+    Resolve (document_id, document_name) pairs for a multi-document query.
+    A trial_id selects the trial's ingested, latest documents; document_ids
+    narrows that set (or is used alone).
+    """
+    stmt = select(Document.id, Document.document_name)
+    if request.trial_id is not None:
+        stmt = stmt.where(
+            Document.trial_id == request.trial_id,
+            Document.ingestion_status == "ready",
+            Document.is_latest.isnot(False),
+        )
+    if request.document_ids:
+        stmt = stmt.where(Document.id.in_(request.document_ids))
+
+    result = await db.execute(stmt)
+    return [(row.id, row.document_name) for row in result.all()]
+
+
+async def _query_multi_via_local(
+    request: QueryRequest,
+    documents: list[tuple[UUID, str]],
+    db: AsyncSession,
+    cache_service: RagCacheService,
+) -> dict:
+    """
+    Execute a multi-document RAG query using the local service.
+    """
+    retrieval_service = RagRetrievalService(
+        db=db,
+        embedding_client=get_embedding_client(),
+        cache_service=cache_service,
+    )
+    generation_service = RagGenerationService(
+        retrieval_service=retrieval_service,
+        cache_service=cache_service,
+    )
+
+    return await generation_service.generate_answer_multi(
+        query_text=request.query,
+        documents=documents,
+    )
+
+
+def _schedule_highlight_prerender(
+    background_tasks: BackgroundTasks,
+    redis,
+    documents: list[tuple[UUID, str]],
+    result,
+) -> None:
+    """
+    Queue background rendering of the cited pages so the first
+    /highlighted-pdf call for each citation is a Redis hit.
+    """
+    settings = get_settings()
+    if not settings.highlight_prerender_enabled or settings.use_grpc_rag or redis is None:
+        return
+
+    sources = getattr(result, "sources", None)
+    if sources is None and isinstance(result, dict):
+        sources = result.get("sources")
+    if not sources:
+        return
+
+    service = HighlightPrerenderService(
+        highlight_service=PDFHighlightService(redis),
+        storage=get_storage_service(),
+        session_factory=async_session,
+    )
+    background_tasks.add_task(service.prerender_for_answer, documents, sources)
+
+
 def _log_timing(timing: dict, total_time: float):
     """Log comprehensive timing and cache performance summary."""
     retrieval = timing.get("retrieval", {})
@@ -93,6 +185,7 @@ def _log_timing(timing: dict, total_time: float):
     embedding_ms = timing.get('embedding_ms', retrieval.get('embedding_ms', 0))
     semantic_ms = timing.get('semantic_cache_search_ms', 0)
     llm_ms = timing.get('llm_call_ms', 0)
+    queue_ms = timing.get('admission_queue_ms', 0)
 
     TYPICAL_EMBEDDING_TIME = 500
     TYPICAL_LLM_TIME = 15000
@@ -126,6 +219,8 @@ def _log_timing(timing: dict, total_time: float):
     logger.info("")
 
     logger.info("[TIMING] ============ TIMING BREAKDOWN ============")
+    if queue_ms > 0:
+        logger.info(f"[TIMING] Admission queue:{queue_ms:>8.2f}ms")
     logger.info(f"[TIMING] Embedding:      {embedding_ms:>8.2f}ms {'(cached)' if embedding_hit else '(computed)'}")
     if semantic_ms > 0:
         logger.info(f"[TIMING] Semantic Search:{semantic_ms:>8.2f}ms {'(HIT - skipped LLM!)' if semantic_hit else ''}")
@@ -138,23 +233,46 @@ def _log_timing(timing: dict, total_time: float):
     logger.info("[TIMING] =============================================")
 
 
+def _trace_attributes(timing: dict) -> dict:
+    """Cache outcomes and chunk counts from timing_info, for the root span."""
+    retrieval = timing.get("retrieval", {})
+    return {
+        "cache.embedding_hit": timing.get("embedding_cache_hit", retrieval.get("cache_hit")),
+        "cache.semantic_hit": timing.get("semantic_cache_hit"),
+        "cache.chunks_hit": retrieval.get("chunk_cache_hit"),
+        "cache.response_hit": timing.get("response_cache_hit"),
+        "rag.original_chunk_count": timing.get("original_chunk_count"),
+        "rag.compressed_chunk_count": timing.get("compressed_chunk_count"),
+        "rag.admission_queue_ms": timing.get("admission_queue_ms"),
+        "rag.error": timing.get("error"),
+    }
+
+
 @router.post("")
 async def process_query(
     request: QueryRequest,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     cache_service: RagCacheService = Depends(get_rag_cache_service),
     semantic_cache_service: SemanticCacheService = Depends(get_semantic_cache_service),
+    redis=Depends(get_redis_client),
     x_api_key: str = Header(...),
 ):
     """
     Main RAG endpoint: runs retrieval + generation.
 
     Uses gRPC RAG Service if USE_GRPC_RAG=true, otherwise uses local service.
+    Passing `document_ids` and/or `trial_id` instead of `document_id` runs a
+    trial-wide query across several documents (always served locally).
 
     Cache hierarchy:
     1. Semantic cache (similarity >= 0.90) - for similar queries
     2. Redis response cache (exact match)
     3. Claude API call (slowest)
+
+    Executions are admitted per organization (see query_admission_service);
+    over the rate limit or with the wait queue full the response is 429 with
+    Retry-After. Time spent queued is reported as timing["admission_queue_ms"].
     """
     total_start = time.perf_counter()
     settings = get_settings()
@@ -163,35 +281,85 @@ async def process_query(
     if not settings.upload_api_key or x_api_key != settings.upload_api_key:
         raise HTTPException(status_code=401, detail="Invalid API key")
 
+    if not request.is_multi_document and (request.document_id is None or not request.document_name):
+        raise HTTPException(
+            status_code=422,
+            detail="Provide document_id and document_name, or document_ids/trial_id",
+        )
+
     logger.info("========== QUERY START ==========")
-    logger.info(f"Document ID: {request.document_id}")
+    if request.is_multi_document:
+        logger.info(f"Trial ID: {request.trial_id}, Document IDs: {request.document_ids}")
+    else:
+        logger.info(f"Document ID: {request.document_id}")
     logger.info(f"Query: {request.query[:100]}{'...' if len(request.query) > 100 else ''}")
 
-    try:
-        # Route to gRPC or local service
-        if settings.use_grpc_rag:
-            logger.info(f"Using gRPC RAG Service at {settings.rag_service_address}")
-            response = await _query_via_grpc(request)
-        else:
-            logger.info("Using local RAG service")
-            init_start = time.perf_counter()
-            response = await _query_via_local(
-                request, db, cache_service, semantic_cache_service
+    # Tenant is resolved before queueing, so no connection is held while waiting for a slot
+    tenant = await resolve_query_tenant(
+        db,
+        trial_id=request.trial_id,
+        document_id=request.document_id or (request.document_ids[0] if request.document_ids else None),
+    )
+    admission = get_query_admission()
+
+    mode = "multi" if request.is_multi_document else ("grpc" if settings.use_grpc_rag else "local")
+    with start_span("rag.query", {"rag.mode": mode, "rag.query_chars": len(request.query)}, kind=KIND_SERVER) as span:
+        if span.trace_id:
+            logger.info(f"Trace ID: {span.trace_id}")
+        try:
+            async with admission.admit(tenant, redis) as queue_ms:
+                documents = None
+                if request.is_multi_document:
+                    documents = await _resolve_query_documents(request, db)
+                    if not documents:
+                        raise HTTPException(status_code=404, detail="No ingested documents found for query")
+                    span.set_attribute("rag.document_count", len(documents))
+
+                try:
+                    # Route to gRPC or local service
+                    if documents is not None:
+                        logger.info(f"Using local RAG service for {len(documents)} documents")
+                        response = await _query_multi_via_local(request, documents, db, cache_service)
+                    elif settings.use_grpc_rag:
+                        logger.info(f"Using gRPC RAG Service at {settings.rag_service_address}")
+                        response = await _query_via_grpc(request)
+                    else:
+                        logger.info("Using local RAG service")
+                        init_start = time.perf_counter()
+                        response = await _query_via_local(
+                            request, db, cache_service, semantic_cache_service
+                        )
+                        init_time = (time.perf_counter() - init_start) * 1000
+                        logger.info(f"[TIMING] Service initialization: {init_time:.2f}ms")
+
+                    total_time = (time.perf_counter() - total_start) * 1000
+
+                    # Log timing
+                    timing = response.get("timing", {})
+                    timing["admission_queue_ms"] = queue_ms
+                    _log_timing(timing, total_time)
+                    span.set_attributes(_trace_attributes(timing))
+
+                    result = response.get("result")
+                    _schedule_highlight_prerender(
+                        background_tasks,
+                        redis,
+                        documents or [(request.document_id, request.document_name)],
+                        result,
+                    )
+
+                    return result
+
+                except Exception as e:
+                    logger.error(f"Query error: {str(e)}")
+                    raise HTTPException(status_code=500, detail=str(e))
+
+        except AdmissionRejected as e:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many queries ({e.reason}), retry later",
+                headers={"Retry-After": str(math.ceil(e.retry_after))},
             )
-            init_time = (time.perf_counter() - init_start) * 1000
-            logger.info(f"[TIMING] Service initialization: {init_time:.2f}ms")
-
-        total_time = (time.perf_counter() - total_start) * 1000
-
-        # Log timing
-        timing = response.get("timing", {})
-        _log_timing(timing, total_time)
-
-        return response.get("result")
-
-    except Exception as e:
-        logger.error(f"Query error: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
 
 
 def get_pdf_highlight_service(
@@ -239,6 +407,8 @@ async def get_highlighted_pdf(
 
         return Response(content=content, media_type="application/pdf")
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Highlighted PDF error: {str(e)}")
         raise HTTPException(500, f"Error generating highlighted PDF: {str(e)}")
@@ -29,15 +29,7 @@ async def upload_file(
     if not bucket_name:
         raise HTTPException(status_code=500, detail="No GCS bucket configured")
 
-    data = await file.read()
-    result = storage.upload_file(
-        bucket_name=bucket_name,
-        file_data=data,
-        filename=file.filename or "upload",
-        content_type=file.content_type or "application/octet-stream",
-        folder=folder,
-    )
-    return result
+    return await storage.save_upload(bucket_name=bucket_name, file=file, folder=folder)
 
 
 # Removed: GET /storage/download/{document_id} stub — superseded by
@@ -58,4 +50,4 @@ async def delete_file(
     if not bucket_name:
         raise HTTPException(status_code=500, detail="No GCS bucket configured")
 
-    storage.delete_file(bucket_name, path)
+    await storage.delete_file_async(bucket_name, path)
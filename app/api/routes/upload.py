@@ -1,19 +1,32 @@
 """
 Upload routes - PDF ingestion via background task.
-Returns immediately with job ID, client polls for status.
+Returns immediately with job ID; progress is streamed over SSE
+(/upload/events/{job_id}) or polled (/upload/status/{job_id}).
 """
 import asyncio
+import json
 import logging
-from typing import Optional
+import time
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 from uuid import UUID
 
 from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
 from app.config import get_settings
-from app.contracts.document import UploadJobResponse, JobStatusResponse
+from app.contracts.document import (
+    BatchStatusResponse,
+    BatchUploadJobResponse,
+    JobStatusResponse,
+    UploadJobResponse,
+)
+from app.core.metrics import UPLOADS
 from app.dependencies.jobs import get_job_status_service
-from app.services.jobs.job_status_service import JobStatusService, JobStatus
+from app.services.jobs.batch_job_service import BatchJobService
+from app.services.jobs.ingestion_scheduler import EmbeddingBatcher, get_ingestion_scheduler
+from app.services.jobs.job_status_service import JobStatusService, JobStatus, TERMINAL_STATUSES
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -26,12 +39,22 @@ class UploadDocumentRequest(BaseModel):
     chunk_size: Optional[int] = 750
 
 
+class BatchUploadRequest(BaseModel):
+    """Batch upload request: one entry per document."""
+    documents: List[UploadDocumentRequest] = Field(..., min_length=1)
+
+
 async def _set_ingestion_status(document_id: UUID, status: str) -> None:
     """
     Persist the document's RAG ingestion state to trial_documents.ingestion_status.
     Failures are logged but never break the ingestion job — the Redis job state
     remains the source of truth for live progress.
     """
+    await _set_ingestion_statuses([document_id], status)
+
+
+async def _set_ingestion_statuses(document_ids: List[UUID], status: str) -> None:
+    """_set_ingestion_status for many documents in one UPDATE."""
     from sqlalchemy import update
     from app.db.session import async_session
     from app.models.documents import Document
@@ -40,13 +63,14 @@ async def _set_ingestion_status(document_id: UUID, status: str) -> None:
         async with async_session() as db:
             await db.execute(
                 update(Document)
-                .where(Document.id == document_id)
+                .where(Document.id.in_(document_ids))
                 .values(ingestion_status=status)
             )
             await db.commit()
     except Exception as e:
+        ids = ", ".join(str(document_id) for document_id in document_ids)
         logger.warning(
-            f"Failed to set ingestion_status={status} for document {document_id}: {e}"
+            f"Failed to set ingestion_status={status} for document {ids}: {e}"
         )
 
 
@@ -58,10 +82,12 @@ async def _run_ingestion_task(
     redis_client,
     use_grpc: bool,
     grpc_address: str,
+    embed: Optional[Callable[[List[str]], Awaitable[List[List[float]]]]] = None,
 ):
     """
     Background task for PDF ingestion.
     Creates its own database session since request session is closed.
+    embed overrides the embedding call on the local path (batch uploads share an EmbeddingBatcher).
     """
     from app.services.jobs.job_status_service import JobStatusService
     from app.services.cache.rag_cache_service import RagCacheService
@@ -80,11 +106,12 @@ async def _run_ingestion_task(
             from app.dependencies.storage import get_storage_service
             settings = get_settings()
             storage = get_storage_service()
-            document_url = storage.get_signed_url(
+            signed = await storage.sign_url(
                 settings.gcs_bucket_trial_documents,
                 document_url,
                 expiration_hours=2,
             )
+            document_url = signed.url
             logger.info(f"Resolved GCS blob path to signed URL for job {job_id}")
 
         if use_grpc:
@@ -111,6 +138,7 @@ async def _run_ingestion_task(
                 chunk_size=chunk_size,
                 job_service=job_service,
                 redis_client=redis_client,
+                embed=embed,
             )
 
     except Exception as e:
@@ -128,51 +156,60 @@ async def _ingest_via_grpc(
     grpc_address: str,
 ):
     """Ingest PDF using gRPC RAG Service with progress streaming."""
-    from app.clients.rag_client import RagClient
-
-    client = RagClient(grpc_address)
-    result = None
-
-    # Map protobuf IngestStage enum ints to string names
-    _STAGE_NAMES = {
-        0: "unspecified", 1: "downloading", 2: "parsing",
-        3: "chunking", 4: "embedding", 5: "storing",
-        6: "complete", 7: "error",
-    }
-
-    status_set = False
-    async for progress in client.ingest_pdf(
-        document_url=document_url,
-        document_id=document_id,
-        chunk_size=chunk_size,
-    ):
-        if not status_set:
-            await _set_ingestion_status(document_id, "processing")
-            status_set = True
-        # Map gRPC progress to job status
-        raw_stage = progress.get("stage", 0)
-        stage = _STAGE_NAMES.get(raw_stage, str(raw_stage))
-        percent = progress.get("progress_percent", 0)
-        message = progress.get("message", "")
+    from app.clients.rag_client import RagClient, get_rag_client
 
-        await job_service.update_progress(
-            job_id=job_id,
-            stage=stage,
-            progress_percent=percent,
-            message=message,
-        )
+    # Reuse the pooled singleton; only build a dedicated client for a non-default address
+    client = get_rag_client()
+    owns_client = bool(grpc_address) and grpc_address != client.address
+    if owns_client:
+        client = RagClient(grpc_address)
 
-        if progress.get("result"):
-            result = progress["result"]
+    try:
+        result = None
+
+        # Map protobuf IngestStage enum ints to string names
+        _STAGE_NAMES = {
+            0: "unspecified", 1: "downloading", 2: "parsing",
+            3: "chunking", 4: "embedding", 5: "storing",
+            6: "complete", 7: "error",
+        }
 
-    if not result:
-        raise RuntimeError("gRPC ingestion did not return a result")
+        status_set = False
+        async for progress in client.ingest_pdf(
+            document_url=document_url,
+            document_id=document_id,
+            chunk_size=chunk_size,
+        ):
+            if not status_set:
+                await _set_ingestion_status(document_id, "processing")
+                status_set = True
+            # Map gRPC progress to job status
+            raw_stage = progress.get("stage", 0)
+            stage = _STAGE_NAMES.get(raw_stage, str(raw_stage))
+            percent = progress.get("progress_percent", 0)
+            message = progress.get("message", "")
+
+            await job_service.update_progress(
+                job_id=job_id,
+                stage=stage,
+                progress_percent=percent,
+                message=message,
+            )
 
-    if not result.get("success"):
-        raise RuntimeError(result.get("error", "Unknown error"))
+            if progress.get("result"):
+                result = progress["result"]
 
-    await job_service.complete_job(job_id, result)
-    await _set_ingestion_status(document_id, "ready")
+        if not result:
+            raise RuntimeError("gRPC ingestion did not return a result")
+
+        if not result.get("success"):
+            raise RuntimeError(result.get("error", "Unknown error"))
+
+        await job_service.complete_job(job_id, result)
+        await _set_ingestion_status(document_id, "ready")
+    finally:
+        if owns_client:
+            await client.close()
 
 
 async def _ingest_via_local(
@@ -182,6 +219,7 @@ async def _ingest_via_local(
     chunk_size: int,
     job_service: JobStatusService,
     redis_client,
+    embed: Optional[Callable[[List[str]], Awaitable[List[List[float]]]]] = None,
 ):
     """Ingest PDF using local RAG service with progress updates."""
     from app.db.session import async_session
@@ -246,20 +284,22 @@ async def _ingest_via_local(
 
         tokenizer = get_tokenizer()
 
-        await job_service.update_progress(
-            job_id=job_id,
-            stage="parsing",
-            progress_percent=25,
-            message="Parsing PDF with Docling...",
-        )
+        # Fetch into (or reuse from) the shared document cache, then parse the local copy
+        async with rag_service.document_cache.local_copy(document_url) as source_path:
+            await job_service.update_progress(
+                job_id=job_id,
+                stage="parsing",
+                progress_percent=25,
+                message="Parsing PDF with Docling...",
+            )
 
-        # Run blocking DoclingLoader.load() in thread pool
-        loader = DoclingLoader(
-            file_path=document_url,
-            export_type=ExportType.DOC_CHUNKS,
-            chunker=HybridChunker(tokenizer=tokenizer, chunk_size=chunk_size),
-        )
-        docs = await asyncio.to_thread(loader.load)
+            # Run blocking DoclingLoader.load() in thread pool
+            loader = DoclingLoader(
+                file_path=source_path,
+                export_type=ExportType.DOC_CHUNKS,
+                chunker=HybridChunker(tokenizer=tokenizer, chunk_size=chunk_size),
+            )
+            docs = await asyncio.to_thread(loader.load)
 
         await job_service.update_progress(
             job_id=job_id,
@@ -278,8 +318,10 @@ async def _ingest_via_local(
         )
 
         # Generate embeddings
-        from app.core.openai import embedding_client
-        chunk_embeddings = await embedding_client.aembed_documents(texts)
+        if embed is None:
+            from app.core.openai import get_embedding_client
+            embed = get_embedding_client().aembed_documents
+        chunk_embeddings = await embed(texts)
 
         await job_service.update_progress(
             job_id=job_id,
@@ -311,6 +353,56 @@ async def _ingest_via_local(
         logger.info(f"Ingestion complete for document {document_id}")
 
 
+async def _run_batch_ingestion_task(
+    batch_id: str,
+    items: List[Tuple[str, UploadDocumentRequest]],
+    redis_client,
+    use_grpc: bool,
+    grpc_address: str,
+):
+    """
+    Background task for a batch upload: ingests each (job_id, UploadDocumentRequest)
+    through the shared scheduler. On the local path the documents' chunks are
+    embedded together through one EmbeddingBatcher.
+    """
+    settings = get_settings()
+    batch_service = BatchJobService(redis_client)
+
+    embed = None
+    if not use_grpc:
+        from app.core.openai import get_embedding_client
+
+        embed = EmbeddingBatcher(
+            lambda texts: get_embedding_client().aembed_documents(texts),
+            max_batch_size=settings.ingestion_embedding_batch_size,
+            max_wait=settings.ingestion_embedding_batch_wait_ms / 1000,
+            max_concurrency=settings.ingestion_embedding_concurrency,
+        ).embed
+
+    async def ingest(job_id: str, doc: UploadDocumentRequest) -> None:
+        try:
+            await _run_ingestion_task(
+                job_id=job_id,
+                document_url=doc.document_url,
+                document_id=doc.document_id,
+                chunk_size=doc.chunk_size or 750,
+                redis_client=redis_client,
+                use_grpc=use_grpc,
+                grpc_address=grpc_address,
+                embed=embed,
+            )
+        finally:
+            await batch_service.refresh(batch_id)
+
+    try:
+        await get_ingestion_scheduler().run(
+            batch_id, [partial(ingest, job_id, doc) for job_id, doc in items]
+        )
+    finally:
+        await batch_service.finish(batch_id)
+    logger.info(f"Batch {batch_id} finished ({len(items)} documents)")
+
+
 @router.post("/upload-pdf", response_model=UploadJobResponse)
 async def upload_pdf_document(
     request: Request,
@@ -322,7 +414,8 @@ async def upload_pdf_document(
     """
     Upload a PDF document for processing.
 
-    Returns immediately with a job ID. Use GET /upload/status/{job_id} to poll for progress.
+    Returns immediately with a job ID. Subscribe to GET /upload/events/{job_id}
+    for progress, or poll GET /upload/status/{job_id}.
     """
     settings = get_settings()
 
@@ -343,25 +436,33 @@ async def upload_pdf_document(
     # Get redis client for background task
     redis_client = request.app.state.redis_client
 
-    # Queue background task
+    # Queue background task; it waits for a slot shared with batch uploads
     background_tasks.add_task(
-        _run_ingestion_task,
-        job_id=job_id,
-        document_url=body.document_url,
-        document_id=body.document_id,
-        chunk_size=body.chunk_size or 750,
-        redis_client=redis_client,
-        use_grpc=settings.use_grpc_rag,
-        grpc_address=settings.rag_service_address,
+        get_ingestion_scheduler().run,
+        job_id,
+        [partial(
+            _run_ingestion_task,
+            job_id=job_id,
+            document_url=body.document_url,
+            document_id=body.document_id,
+            chunk_size=body.chunk_size or 750,
+            redis_client=redis_client,
+            use_grpc=settings.use_grpc_rag,
+            grpc_address=settings.rag_service_address,
+        )],
     )
 
+    UPLOADS.labels("grpc" if settings.use_grpc_rag else "local").inc()
     logger.info(f"Queued ingestion job {job_id} for document {body.document_id}")
 
     return UploadJobResponse(
         job_id=job_id,
         document_id=str(body.document_id),
         status="queued",
-        message="Upload job queued for processing. Poll /upload/status/{job_id} for progress.",
+        message=(
+            "Upload job queued for processing. Stream /upload/events/{job_id} "
+            "or poll /upload/status/{job_id} for progress."
+        ),
     )
 
 
@@ -390,3 +491,171 @@ async def get_upload_status(
         result=job.result,
         error=job.error,
     )
+
+
+@router.post("/upload-batch", response_model=BatchUploadJobResponse)
+async def upload_pdf_batch(
+    request: Request,
+    body: BatchUploadRequest,
+    background_tasks: BackgroundTasks,
+    x_api_key: str = Header(...),
+):
+    """
+    Upload many PDF documents as one batch (e.g. onboarding a trial).
+
+    Creates a batch with one job per document and returns immediately. Documents
+    are ingested with bounded concurrency, fairly shared with other uploads.
+    Track the batch with GET /upload/batch/{batch_id}, or each document's job
+    with the usual /upload/status and /upload/events endpoints.
+    """
+    settings = get_settings()
+
+    if not settings.upload_api_key or x_api_key != settings.upload_api_key:
+        raise HTTPException(status_code=401, detail="Invalid API key")
+
+    documents = body.documents
+    if len(documents) > settings.batch_upload_max_documents:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.batch_upload_max_documents} documents per batch",
+        )
+
+    from urllib.parse import urlparse
+    not_pdf = [d.document_url for d in documents if not urlparse(d.document_url).path.lower().endswith(".pdf")]
+    if not_pdf:
+        raise HTTPException(status_code=400, detail=f"Only PDF files are supported: {', '.join(not_pdf)}")
+
+    document_ids = [d.document_id for d in documents]
+    if len(set(document_ids)) != len(document_ids):
+        raise HTTPException(status_code=400, detail="Each document may appear only once per batch")
+
+    redis_client = request.app.state.redis_client
+    batch_id, job_ids = await BatchJobService(redis_client).create_batch(document_ids)
+    await _set_ingestion_statuses(document_ids, "queued")
+
+    background_tasks.add_task(
+        _run_batch_ingestion_task,
+        batch_id=batch_id,
+        items=list(zip(job_ids, documents)),
+        redis_client=redis_client,
+        use_grpc=settings.use_grpc_rag,
+        grpc_address=settings.rag_service_address,
+    )
+
+    UPLOADS.labels("grpc" if settings.use_grpc_rag else "local").inc(len(documents))
+    logger.info(f"Queued batch {batch_id} with {len(documents)} documents")
+
+    return BatchUploadJobResponse(
+        batch_id=batch_id,
+        status="queued",
+        message=f"{len(documents)} documents queued for processing. Poll /upload/batch/{{batch_id}} for progress.",
+        jobs=[
+            UploadJobResponse(
+                job_id=job_id,
+                document_id=str(doc.document_id),
+                status="queued",
+                message="Upload job queued for processing.",
+            )
+            for job_id, doc in zip(job_ids, documents)
+        ],
+    )
+
+
+@router.get("/batch/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch_status(
+    batch_id: str,
+    job_service: JobStatusService = Depends(get_job_status_service),
+):
+    """
+    Get the aggregate status of a batch upload and each of its jobs.
+    """
+    batch = await BatchJobService(job_service.redis).get_batch(batch_id)
+
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return BatchStatusResponse(
+        batch_id=batch.batch_id,
+        status=batch.status,
+        total=batch.total,
+        queued=batch.queued,
+        processing=batch.processing,
+        complete=batch.complete,
+        failed=batch.failed,
+        progress_percent=batch.progress_percent,
+        jobs=[
+            JobStatusResponse(
+                job_id=job.job_id,
+                document_id=job.document_id,
+                status=job.status.value,
+                progress_percent=job.progress_percent,
+                current_stage=job.current_stage,
+                message=job.message,
+                result=job.result,
+                error=job.error,
+            )
+            for job in batch.jobs
+        ],
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _job_event_stream(job_service: JobStatusService, pubsub, snapshot: dict) -> AsyncIterator[str]:
+    """
+    Snapshot first, then every published change until the job finishes.
+
+    The subscription is opened before the snapshot is read, so no update
+    can fall between the two; a change already in the snapshot may repeat.
+    """
+    settings = get_settings()
+    deadline = time.monotonic() + settings.job_events_max_seconds
+    try:
+        yield _sse("progress", snapshot)
+        status = snapshot["status"]
+        while status not in TERMINAL_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=min(settings.job_events_keepalive_seconds, remaining),
+            )
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            event = json.loads(message["data"])
+            status = event.get("status", status)
+            yield _sse("progress", event)
+    finally:
+        await pubsub.unsubscribe(job_service.channel(snapshot["job_id"]))
+        await pubsub.aclose()
+
+
+@router.get("/events/{job_id}")
+async def stream_upload_events(
+    job_id: str,
+    job_service: JobStatusService = Depends(get_job_status_service),
+):
+    """
+    Stream progress of an upload job as Server-Sent Events.
+
+    The first `progress` event is the full job state; later ones carry only
+    the fields that changed. The stream ends once the job completes or fails.
+    """
+    pubsub = job_service.redis.pubsub()
+    await pubsub.subscribe(job_service.channel(job_id))
+
+    job = await job_service.get_job(job_id)
+    if not job:
+        await pubsub.unsubscribe(job_service.channel(job_id))
+        await pubsub.aclose()
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return StreamingResponse(
+        _job_event_stream(job_service, pubsub, job.model_dump(mode="json")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
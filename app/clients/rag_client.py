@@ -1,7 +1,11 @@
 """
 gRPC client for RAG Service.
 """
+import itertools
+import json
 import logging
+import time
+from contextlib import contextmanager
 from typing import AsyncIterator, Dict, List, Optional
 from uuid import UUID
 
@@ -9,6 +13,7 @@ import grpc
 from grpc import aio
 
 from app.config import get_settings
+from app.services.utils.latency import LatencyTracker
 
 # Import generated protobuf code (generated from rag-service protos via grpcio-tools)
 from app.clients.generated.rag.v1.rag_service_pb2 import (
@@ -41,50 +46,162 @@ RELEVANCE_STR_MAP = {
 }
 
 
+SERVICE_NAME = "themison.rag.v1.RagService"
+
+# Unary RPCs without side effects that gRPC may transparently retry
+_RETRYABLE_METHODS = ("Query", "GetHighlightedPdf", "InvalidateDocument", "HealthCheck")
+
+_MAX_MESSAGE_LENGTH = 100 * 1024 * 1024
+
+
+def _service_config() -> str:
+    """Channel service config: round-robin over resolved addresses plus retries."""
+    return json.dumps({
+        "loadBalancingConfig": [{"round_robin": {}}],
+        "methodConfig": [{
+            "name": [{"service": SERVICE_NAME, "method": m} for m in _RETRYABLE_METHODS],
+            "retryPolicy": {
+                "maxAttempts": 3,
+                "initialBackoff": "0.2s",
+                "maxBackoff": "2s",
+                "backoffMultiplier": 2,
+                "retryableStatusCodes": ["UNAVAILABLE", "RESOURCE_EXHAUSTED"],
+            },
+        }],
+    })
+
+
+class _RpcStats:
+    """Per-method call counters and latency window."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latency = LatencyTracker()
+
+    def snapshot(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            **self.latency.snapshot(),
+        }
+
+
 class RagClient:
     """
     Async gRPC client for the RAG Service.
+
+    Holds a small pool of long-lived channels (keepalive, retry service
+    config, round-robin over DNS-resolved addresses). RPCs are spread over
+    the pool and each operation gets its own deadline.
     """
 
-    def __init__(self, address: str = None, timeout: float = None):
+    def __init__(self, address: str = None, timeout: float = None, pool_size: int = None):
         settings = get_settings()
         self.address = address or settings.rag_service_address
         self.timeout = timeout or settings.rag_service_timeout
-        self._channel: Optional[aio.Channel] = None
-        self._stub: Optional[RagServiceStub] = None
+        self.pool_size = max(1, int(pool_size or settings.rag_service_channel_pool_size))
+        self.deadlines = {
+            "IngestPdf": self.timeout,
+            "Query": timeout or settings.rag_service_query_timeout,
+            "GetHighlightedPdf": timeout or settings.rag_service_highlight_timeout,
+            "InvalidateDocument": timeout or settings.rag_service_admin_timeout,
+            "HealthCheck": timeout or settings.rag_service_admin_timeout,
+        }
+        self._channels: List[aio.Channel] = []
+        self._stubs: List[RagServiceStub] = []
+        self._next = itertools.count()
+        self._stats: Dict[str, _RpcStats] = {}
+
+    def _target(self) -> str:
+        """Use the DNS resolver so round_robin sees every backend address."""
+        if "://" in self.address or self.address.startswith("unix:"):
+            return self.address
+        return f"dns:///{self.address}"
+
+    def _channel_options(self) -> list:
+        settings = get_settings()
+        return [
+            ("grpc.max_send_message_length", _MAX_MESSAGE_LENGTH),
+            ("grpc.max_receive_message_length", _MAX_MESSAGE_LENGTH),
+            ("grpc.keepalive_time_ms", int(settings.rag_service_keepalive_time_ms)),
+            ("grpc.keepalive_timeout_ms", int(settings.rag_service_keepalive_timeout_ms)),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0),
+            ("grpc.enable_retries", 1),
+            ("grpc.service_config", _service_config()),
+            # Distinct channel args keep gRPC from sharing one subchannel across the pool
+            ("grpc.channel_pool_index", len(self._channels)),
+        ]
 
     async def _ensure_connected(self):
-        """Ensure gRPC channel is connected."""
-        if self._channel is None:
+        """Ensure the channel pool is connected."""
+        if self._channels:
+            return
+
+        for _ in range(self.pool_size):
             # Use secure channel for port 443 (production/cloud)
             if self.address.endswith(":443"):
-                self._channel = aio.secure_channel(
-                    self.address,
+                channel = aio.secure_channel(
+                    self._target(),
                     grpc.ssl_channel_credentials(),
-                    options=[
-                        ("grpc.max_send_message_length", 100 * 1024 * 1024),
-                        ("grpc.max_receive_message_length", 100 * 1024 * 1024),
-                    ],
+                    options=self._channel_options(),
                 )
-                logger.info(f"Connected to secure RAG Service at {self.address}")
             else:
-                self._channel = aio.insecure_channel(
-                    self.address,
-                    options=[
-                        ("grpc.max_send_message_length", 100 * 1024 * 1024),
-                        ("grpc.max_receive_message_length", 100 * 1024 * 1024),
-                    ],
+                channel = aio.insecure_channel(
+                    self._target(),
+                    options=self._channel_options(),
                 )
-                logger.info(f"Connected to insecure RAG Service at {self.address}")
-            self._stub = RagServiceStub(self._channel)
-
+            self._channels.append(channel)
+            self._stubs.append(RagServiceStub(channel))
+
+        secure = "secure" if self.address.endswith(":443") else "insecure"
+        logger.info(f"Connected {self.pool_size} {secure} channel(s) to RAG Service at {self.address}")
+
+    def _stub(self) -> RagServiceStub:
+        """Pick the next stub round-robin across the channel pool."""
+        return self._stubs[next(self._next) % len(self._stubs)]
+
+    @contextmanager
+    def _track(self, method: str):
+        """Record call count, errors, in-flight and latency for an RPC."""
+        stats = self._stats.setdefault(method, _RpcStats())
+        stats.calls += 1
+        stats.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            stats.latency.record((time.perf_counter() - start) * 1000)
+
+    def get_metrics(self) -> Dict:
+        """Channel-level metrics: connectivity state per channel and per-RPC stats."""
+        states = []
+        for channel in self._channels:
+            try:
+                states.append(channel.get_state(try_to_connect=False).name)
+            except Exception:
+                states.append("UNKNOWN")
+        return {
+            "address": self.address,
+            "pool_size": self.pool_size,
+            "channel_states": states,
+            "rpcs": {method: stats.snapshot() for method, stats in self._stats.items()},
+        }
 
     async def close(self):
-        """Close the gRPC channel."""
-        if self._channel:
-            await self._channel.close()
-            self._channel = None
-            self._stub = None
+        """Close every channel in the pool."""
+        if self._channels:
+            for channel in self._channels:
+                await channel.close()
+            self._channels = []
+            self._stubs = []
             logger.info("Disconnected from RAG Service")
 
     async def ingest_pdf(
@@ -108,15 +225,16 @@ class RagClient:
         )
 
         try:
-            async for progress in self._stub.IngestPdf(request, timeout=self.timeout):
-                yield {
-                    "stage": progress.stage,
-                    "progress_percent": progress.progress_percent,
-                    "message": progress.message,
-                    "result": self._parse_ingest_result(progress.result)
-                    if progress.stage in (INGEST_STAGE_COMPLETE, INGEST_STAGE_ERROR)
-                    else None,
-                }
+            with self._track("IngestPdf"):
+                async for progress in self._stub().IngestPdf(request, timeout=self.deadlines["IngestPdf"]):
+                    yield {
+                        "stage": progress.stage,
+                        "progress_percent": progress.progress_percent,
+                        "message": progress.message,
+                        "result": self._parse_ingest_result(progress.result)
+                        if progress.stage in (INGEST_STAGE_COMPLETE, INGEST_STAGE_ERROR)
+                        else None,
+                    }
         except grpc.RpcError as e:
             logger.error(f"IngestPdf RPC error: {e}")
             raise RuntimeError(f"RAG Service error: {e.details()}")
@@ -157,7 +275,8 @@ class RagClient:
         )
 
         try:
-            response: QueryResponse = await self._stub.Query(request, timeout=self.timeout)
+            with self._track("Query"):
+                response: QueryResponse = await self._stub().Query(request, timeout=self.deadlines["Query"])
             return self._parse_query_response(response)
         except grpc.RpcError as e:
             logger.error(f"Query RPC error: {e}")
@@ -228,7 +347,8 @@ class RagClient:
         )
 
         try:
-            response: HighlightedPdfResponse = await self._stub.GetHighlightedPdf(request, timeout=self.timeout)
+            with self._track("GetHighlightedPdf"):
+                response: HighlightedPdfResponse = await self._stub().GetHighlightedPdf(request, timeout=self.deadlines["GetHighlightedPdf"])
             return response.pdf_content
         except grpc.RpcError as e:
             logger.error(f"GetHighlightedPdf RPC error: {e}")
@@ -246,7 +366,8 @@ class RagClient:
         request = InvalidateDocumentRequest(document_id=str(document_id))
 
         try:
-            response: InvalidateDocumentResponse = await self._stub.InvalidateDocument(request, timeout=self.timeout)
+            with self._track("InvalidateDocument"):
+                response: InvalidateDocumentResponse = await self._stub().InvalidateDocument(request, timeout=self.deadlines["InvalidateDocument"])
             return {
                 "success": response.success,
                 "chunks_deleted": response.chunks_deleted,
@@ -268,7 +389,8 @@ class RagClient:
         request = HealthCheckRequest()
 
         try:
-            response: HealthCheckResponse = await self._stub.HealthCheck(request, timeout=self.timeout)
+            with self._track("HealthCheck"):
+                response: HealthCheckResponse = await self._stub().HealthCheck(request, timeout=self.deadlines["HealthCheck"])
             return {
                 "status": response.status,
                 "version": response.version,
@@ -303,6 +425,11 @@ def get_rag_client() -> RagClient:
     return _rag_client
 
 
+def get_rag_client_metrics() -> Optional[Dict]:
+    """Metrics for the singleton client, or None if it was never created."""
+    return _rag_client.get_metrics() if _rag_client else None
+
+
 async def close_rag_client():
     """Close the RAG client connection."""
     global _rag_client
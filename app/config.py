@@ -15,6 +15,8 @@ class Settings(BaseSettings):
 
     openai_api_key: str = ""
     anthropic_api_key: str = ""  # Required for Claude Opus 4.5
+    openai_base_url: str = ""  # Override the OpenAI API endpoint (e.g. benchmarks/ fake providers)
+    anthropic_base_url: str = ""  # Override the Anthropic API endpoint
     database_url: str = ""  # PostgreSQL connection (asyncpg format)
     redis_url: str = ""
     frontend_url: str = "http://localhost:3000"  # Optional with default
@@ -26,12 +28,41 @@ class Settings(BaseSettings):
     auth0_client_id: str = ""
     auth0_client_secret: str = ""
     auth_disabled: bool = False  # Set to True to bypass Auth0 for testing
+    auth0_token_cache_max_entries: int = 10000  # Verified tokens cached until exp (0 = off)
+    member_cache_local_ttl_seconds: float = 15.0  # In-process member resolution cache (0 = off)
+    member_cache_local_max_entries: int = 2048
+    member_cache_redis_ttl_seconds: int = 120  # Shared member resolution cache (0 = off)
+    trial_access_cache_ttl_seconds: int = 30  # Shared trial permission snapshots (0 = off)
+    org_metrics_cache_ttl_seconds: int = 60  # Shared dashboard counters (0 = off)
+    patient_code_digits: int = 5  # PAT-XXXXX
+    patient_code_block_size: int = 20  # Max candidates reserved per round-trip when skipping taken codes
+    patient_code_scramble_key: int = 0x7E15_0A11  # Changing it only reorders unissued codes
+
+    # Database connection pool
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: float = 30.0  # Max wait for a free connection before erroring
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = False  # Extra round-trip per checkout; recycle covers stale connections
+    db_pool_warmup_connections: int = 0  # Connections opened at startup (capped at db_pool_size)
+    db_pgbouncer_mode: bool = False  # Transaction pooler: no statement cache, unique statement names
+    db_command_timeout_seconds: float = 60.0
+    db_statement_timeout_ms: int = 60000
+    rag_warmup_on_startup: bool = True  # Import RAG/ML modules in the background once serving
+    db_migrations_on_startup: bool = True  # Apply pending app/db/migrations at startup (python -m app.db.migrate otherwise)
 
     # Google Cloud Storage configuration
     gcs_project_id: str = ""
     gcs_bucket_trial_documents: str = ""
     gcs_bucket_patient_documents: str = ""
     gcs_credentials_path: str = ""
+    gcs_resumable_threshold_mb: int = 8  # Larger uploads use chunked resumable uploads
+    gcs_upload_chunk_mb: int = 8  # Resumable upload chunk size (memory held per upload)
+    gcs_signed_url_cache_size: int = 10000  # Signed URLs reused per (bucket, blob, TTL); 0 disables the cache
+    gcs_signed_url_reuse_seconds: int = 600  # Max age of a reused URL; callers get at least their TTL minus this
+    gcs_credentials_refresh_ahead_seconds: int = 600  # Refresh IAM signing credentials in the background this early
+    document_cache_dir: str = ""  # Shared on-disk cache of source documents (empty = <tmpdir>/themison-documents)
+    document_cache_max_mb: int = 128  # LRU size bound (0 = off); on Cloud Run <tmpdir> is RAM, so it counts against --memory
 
     # Semantic cache configuration
     semantic_cache_similarity_threshold: float = 0.90  # Cosine similarity threshold for cache hits
@@ -49,6 +80,9 @@ class Settings(BaseSettings):
     reranker_provider: str = "cohere"  # Options: "cohere", "jina", "bge"
     reranker_model: str = "rerank-english-v3.0"
     reranker_top_k: int = 5  # Return top N after reranking
+    reranker_timeout_ms: int = 1500  # Latency budget; fall back to RRF order when exceeded
+    reranker_circuit_failure_threshold: int = 5  # Consecutive failures before the breaker opens
+    reranker_circuit_reset_seconds: float = 30.0  # How long the breaker stays open
     cohere_api_key: str = ""
 
     # Embedding model configuration (Phase 3)
@@ -59,9 +93,54 @@ class Settings(BaseSettings):
     contextual_retrieval_enabled: bool = False
     contextual_context_window: int = 3  # Include N surrounding chunks for context
 
+    # PDF highlighting configuration
+    pdf_source_cache_memory_mb: int = 32  # In-memory LRU of source PDF bytes, on top of the document cache
+    highlight_prerender_enabled: bool = False  # Pre-render cited pages after each answer
+    highlight_prerender_max_sources: int = 8  # Cap on pages rendered per answer
+    highlight_prerender_concurrency: int = 2  # Parallel renders per answer
+
+    # RAG pipeline tracing (OTLP/JSON spans, see app/core/tracing.py)
+    tracing_exporter: str = "none"  # Options: "none", "json", "otlp"
+    tracing_json_path: str = "rag_traces.jsonl"  # One OTLP/JSON request per trace
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"  # OTLP/HTTP collector
+    tracing_otlp_headers: str = ""  # "key=value,key2=value2" (e.g. collector auth)
+    tracing_sample_rate: float = 1.0  # Fraction of queries traced
+    tracing_service_name: str = "themison-backend"
+
+    # Prometheus metrics (GET /metrics, see app/core/metrics.py)
+    metrics_enabled: bool = True
+    metrics_document_labels: bool = False  # Per-document label values; keep off for large corpora
+
+    # Ingestion scheduling (see app/services/jobs/ingestion_scheduler.py)
+    ingestion_max_concurrent_documents: int = 4  # Documents ingested at once per process, shared fairly by uploads
+    ingestion_embedding_batch_size: int = 512  # Max chunks per embedding request (OpenAI allows 2048)
+    ingestion_embedding_batch_wait_ms: int = 50  # Wait for other documents' chunks before sending a partial batch
+    ingestion_embedding_concurrency: int = 4  # Embedding requests in flight per batch upload
+    batch_upload_max_documents: int = 200  # Documents accepted by one POST /upload/upload-batch
+
+    # /query admission control (see app/services/query_admission_service.py)
+    query_max_concurrent: int = 8  # Queries executing at once per process; keep below db_pool_size
+    query_max_concurrent_per_tenant: int = 4  # Per organization, so one tenant can't take every slot
+    query_max_queue: int = 32  # Queries waiting for a slot; beyond this new ones get 429 at once
+    query_max_queue_wait_seconds: float = 10.0  # Queued longer than this -> 429
+    query_rate_limit_per_second: float = 0.0  # Per-organization token refill, shared across instances via Redis (0 = off)
+    query_rate_limit_burst: int = 20
+    query_global_rate_limit_per_second: float = 0.0  # All organizations together, e.g. to stay under LLM rate limits (0 = off)
+    query_global_rate_limit_burst: int = 50
+
+    # Upload job progress stream (GET /upload/events/{job_id})
+    job_events_keepalive_seconds: float = 15.0  # SSE comment sent when no event arrives in time
+    job_events_max_seconds: float = 3600.0  # Stream closed after this; clients reconnect
+
     # gRPC RAG Service configuration
     rag_service_address: str = "localhost:50051"  # Address of RAG gRPC service
-    rag_service_timeout: float = 600.0  # gRPC timeout in seconds for RAG service calls
+    rag_service_timeout: float = 600.0  # gRPC deadline in seconds for ingestion streams
+    rag_service_query_timeout: float = 120.0  # Deadline for Query RPCs
+    rag_service_highlight_timeout: float = 30.0  # Deadline for GetHighlightedPdf RPCs
+    rag_service_admin_timeout: float = 10.0  # Deadline for InvalidateDocument/HealthCheck
+    rag_service_channel_pool_size: int = 2  # Long-lived channels shared by all requests
+    rag_service_keepalive_time_ms: int = 30000  # HTTP/2 keepalive ping interval
+    rag_service_keepalive_timeout_ms: int = 10000  # Keepalive ack timeout
     use_grpc_rag: bool = False  # Feature flag for gradual rollout
     
     # Email Configuration
@@ -100,6 +100,31 @@ class JobStatusResponse(BaseContract):
     result: Optional[Dict] = None
     error: Optional[str] = None
 
+
+class BatchUploadJobResponse(BaseContract):
+    """
+    Response when a batch upload is queued: the parent batch and one job per document.
+    """
+    batch_id: str
+    status: str
+    message: str
+    jobs: List[UploadJobResponse]
+
+
+class BatchStatusResponse(BaseContract):
+    """
+    Aggregate status of a batch upload, with each document's job status.
+    """
+    batch_id: str
+    status: str
+    total: int
+    queued: int
+    processing: int
+    complete: int
+    failed: int
+    progress_percent: int
+    jobs: List[JobStatusResponse]
+
 class DocumentUpload(BaseContract):
     """
     A contract for uploading a document.
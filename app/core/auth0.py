@@ -3,22 +3,35 @@ Auth0 JWKS client for RS256 JWT verification.
 
 Fetches public keys from Auth0's JWKS endpoint, caches them in memory
 with a 6-hour TTL, and refreshes on verification failure to handle key rotation.
+
+Keys are constructed once per JWKS fetch into a kid -> key map, refreshes are
+single-flight, and verified tokens are cached by hash until their ``exp`` so
+repeat requests with the same bearer token skip signature verification.
 """
 
+import asyncio
+import hashlib
 import logging
 import time
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 
 import httpx
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
 
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
-_jwks_cache: Optional[Dict[str, Any]] = None
+_jwks_keys: Dict[str, Key] = {}
 _jwks_cache_time: float = 0.0
+_jwks_lock = asyncio.Lock()
 _JWKS_CACHE_TTL = 6 * 60 * 60  # 6 hours
+_JWKS_MIN_REFRESH_INTERVAL = 30  # Seconds between forced refreshes for unknown kids
+
+# sha256(token) -> (exp, claims), in LRU order
+_verified_tokens: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
 
 
 async def _fetch_jwks(domain: str) -> Dict[str, Any]:
@@ -30,32 +43,74 @@ async def _fetch_jwks(domain: str) -> Dict[str, Any]:
         return resp.json()
 
 
-async def _get_jwks(domain: str, force_refresh: bool = False) -> Dict[str, Any]:
-    """Return cached JWKS, refreshing if stale or forced."""
-    global _jwks_cache, _jwks_cache_time
+def _build_keys(jwks: Dict[str, Any]) -> Dict[str, Key]:
+    """Construct an RS256 verification key for every RSA entry in the JWKS."""
+    keys = {}
+    for key in jwks.get("keys", []):
+        if key.get("kty") != "RSA" or not key.get("kid"):
+            continue
+        try:
+            keys[key["kid"]] = jwk.construct(
+                {"kty": key["kty"], "kid": key["kid"], "n": key["n"], "e": key["e"]},
+                algorithm="RS256",
+            )
+        except Exception as e:
+            logger.warning("Skipping unusable JWKS key kid=%s: %s", key.get("kid"), e)
+    return keys
+
+
+async def _get_jwks_keys(domain: str, force_refresh: bool = False) -> Dict[str, Key]:
+    """
+    Return the cached kid -> key map, refreshing if stale or forced.
 
-    now = time.time()
-    if not force_refresh and _jwks_cache and (now - _jwks_cache_time) < _JWKS_CACHE_TTL:
-        return _jwks_cache
+    Refreshes are single-flight: concurrent callers wait for the one fetch in
+    progress instead of each hitting Auth0.
+    """
+    global _jwks_keys, _jwks_cache_time
 
-    logger.info("Refreshing Auth0 JWKS from %s", domain)
-    _jwks_cache = await _fetch_jwks(domain)
-    _jwks_cache_time = now
-    return _jwks_cache
+    if not force_refresh and _jwks_keys and (time.time() - _jwks_cache_time) < _JWKS_CACHE_TTL:
+        return _jwks_keys
 
+    seen_cache_time = _jwks_cache_time
+    async with _jwks_lock:
+        now = time.time()
+        if _jwks_cache_time != seen_cache_time:
+            # Another request refreshed while we waited
+            return _jwks_keys
+        if force_refresh and _jwks_keys and (now - _jwks_cache_time) < _JWKS_MIN_REFRESH_INTERVAL:
+            # Unknown kid right after a refresh — don't hammer Auth0
+            return _jwks_keys
+
+        logger.info("Refreshing Auth0 JWKS from %s", domain)
+        _jwks_keys = _build_keys(await _fetch_jwks(domain))
+        _jwks_cache_time = now
+        return _jwks_keys
 
-def _find_rsa_key(jwks: Dict[str, Any], kid: str) -> Optional[Dict[str, str]]:
-    """Find the RSA key matching the given kid in the JWKS."""
-    for key in jwks.get("keys", []):
-        if key.get("kid") == kid:
-            return {
-                "kty": key["kty"],
-                "kid": key["kid"],
-                "use": key["use"],
-                "n": key["n"],
-                "e": key["e"],
-            }
-    return None
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _get_verified(digest: str) -> Optional[Dict[str, Any]]:
+    entry = _verified_tokens.get(digest)
+    if entry is None:
+        return None
+    exp, claims = entry
+    if exp <= time.time():
+        del _verified_tokens[digest]
+        return None
+    _verified_tokens.move_to_end(digest)
+    return claims
+
+
+def _put_verified(digest: str, claims: Dict[str, Any], max_entries: int) -> None:
+    exp = claims.get("exp")
+    if max_entries <= 0 or not isinstance(exp, (int, float)):
+        return
+    _verified_tokens[digest] = (float(exp), claims)
+    _verified_tokens.move_to_end(digest)
+    while len(_verified_tokens) > max_entries:
+        _verified_tokens.popitem(last=False)
 
 
 async def verify_auth0_token(token: str) -> Dict[str, Any]:
@@ -64,6 +119,7 @@ async def verify_auth0_token(token: str) -> Dict[str, Any]:
 
     Validates issuer, audience, and expiration claims.
     On key-not-found, refreshes JWKS once to handle rotation.
+    Tokens verified earlier are served from cache until they expire.
 
     Returns:
         Decoded JWT payload dict with ``sub``, ``email``, etc.
@@ -78,6 +134,11 @@ async def verify_auth0_token(token: str) -> Dict[str, Any]:
     if not domain or not audience:
         raise ValueError("Auth0 domain and audience must be configured")
 
+    digest = _token_digest(token)
+    claims = _get_verified(digest)
+    if claims is not None:
+        return claims
+
     try:
         unverified_header = jwt.get_unverified_header(token)
     except JWTError as e:
@@ -88,14 +149,12 @@ async def verify_auth0_token(token: str) -> Dict[str, Any]:
         raise ValueError("Token header missing 'kid'")
 
     # Try with cached keys first
-    jwks = await _get_jwks(domain)
-    rsa_key = _find_rsa_key(jwks, kid)
+    rsa_key = (await _get_jwks_keys(domain)).get(kid)
 
     if not rsa_key:
         # Key rotation — refresh and retry once
         logger.info("Key kid=%s not found in cache, refreshing JWKS", kid)
-        jwks = await _get_jwks(domain, force_refresh=True)
-        rsa_key = _find_rsa_key(jwks, kid)
+        rsa_key = (await _get_jwks_keys(domain, force_refresh=True)).get(kid)
 
     if not rsa_key:
         raise ValueError(f"Unable to find matching key for kid={kid}")
@@ -108,6 +167,8 @@ async def verify_auth0_token(token: str) -> Dict[str, Any]:
             audience=audience,
             issuer=f"https://{domain}/",
         )
-        return payload
     except JWTError as e:
         raise ValueError(f"Token verification failed: {e}")
+
+    _put_verified(digest, payload, settings.auth0_token_cache_max_entries)
+    return payload
@@ -0,0 +1,386 @@
+"""
+Prometheus metrics for the RAG pipeline, ingestion and the DB pool.
+
+A minimal in-process registry speaking the Prometheus text exposition format
+(0.0.4), served at GET /metrics. Updating a metric is a dict lookup and an
+addition under a lock, cheap enough for the query hot path.
+
+    CACHE_REQUESTS.labels("embedding", "hit").inc()
+    LLM_SECONDS.labels(model, "ok").observe(seconds)
+
+Label values must come from small, fixed sets. Per-document labels are only
+emitted when METRICS_DOCUMENT_LABELS is enabled (see document_label()).
+"""
+import logging
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.5, 1.0, 2.5, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 45.0, 60.0, 120.0)
+INGESTION_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0)
+SIMILARITY_BUCKETS = (0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.88, 0.9, 0.92, 0.94, 0.96, 0.98, 0.99, 1.0)
+
+# (sample name suffix, label pairs, value)
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels) + "}"
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: "Registry" = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+        if not self.labelnames:
+            self.labels()  # unlabelled metrics are exported from the start
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[Sample]:
+        for key, child in list(self._children.items()):
+            labels = tuple(zip(self.labelnames, key))
+            yield from child.samples(labels)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._children.clear()
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def samples(self, labels):
+        yield "_total", labels, self.value
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+
+class _GaugeChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def samples(self, labels):
+        yield "", labels, self.value
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def samples(self, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            yield "_bucket", labels + (("le", _format_value(bound)),), cumulative
+        yield "_sum", labels, self.sum
+        yield "_count", labels, cumulative
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+
+# Callback run at scrape time: returns (name, type, help, samples)
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+
+class Registry:
+    """Holds metrics and scrape-time collectors; renders the exposition text."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def _families(self):
+        for metric in self._metrics:
+            yield metric.name, metric.type_name, metric.documentation, metric.samples()
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                logger.warning(f"[METRICS] Collector {collector.__name__} failed: {e}")
+                continue
+            yield from families
+
+    def generate_latest(self) -> str:
+        lines: List[str] = []
+        for name, type_name, documentation, samples in self._families():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {type_name}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def document_label(document_id) -> str:
+    """Document id as a label value, or "all" unless METRICS_DOCUMENT_LABELS is on."""
+    from app.config import get_settings
+
+    return str(document_id) if get_settings().metrics_document_labels else "all"
+
+
+# --------------------------
+# RAG query path
+# --------------------------
+CACHE_REQUESTS = Counter(
+    "rag_cache_requests",
+    "RAG cache lookups by tier (embedding, chunks, response, rerank, semantic, document) and result.",
+    ("tier", "result"),
+)
+CACHE_LOOKUP_SECONDS = Histogram(
+    "rag_cache_lookup_seconds",
+    "RAG cache lookup latency by tier.",
+    ("tier",),
+)
+SEMANTIC_SIMILARITY = Histogram(
+    "rag_semantic_cache_best_similarity",
+    "Cosine similarity of the closest cached query, observed on every semantic lookup.",
+    buckets=SIMILARITY_BUCKETS,
+)
+QUERIES = Counter(
+    "rag_queries",
+    "Answered RAG queries by how the answer was produced.",
+    ("document", "outcome"),
+)
+GENERATION_SECONDS = Histogram(
+    "rag_generation_seconds",
+    "End-to-end answer generation time by outcome (semantic_cache, response_cache, llm, no_chunks, error).",
+    ("outcome",),
+    buckets=LLM_BUCKETS,
+)
+LLM_SECONDS = Histogram(
+    "rag_llm_request_seconds",
+    "LLM call latency.",
+    ("model", "status"),
+    buckets=LLM_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "rag_llm_tokens",
+    "LLM tokens by type (input, output, cache_read).",
+    ("model", "type"),
+)
+QUERY_ADMISSIONS = Counter(
+    "rag_query_admissions",
+    "/query admission decisions by result (admitted, rate_limited, queue_full, timeout).",
+    ("result",),
+)
+QUERY_QUEUE_SECONDS = Histogram(
+    "rag_query_queue_seconds",
+    "Time admitted queries waited for a slot (see QueryAdmission).",
+)
+QUERIES_IN_FLIGHT = Gauge(
+    "rag_queries_in_flight",
+    "Queries executing in this process.",
+)
+QUERIES_WAITING = Gauge(
+    "rag_queries_waiting",
+    "Queries queued in this process for a slot.",
+)
+
+# --------------------------
+# Ingestion
+# --------------------------
+UPLOADS = Counter(
+    "rag_upload_requests",
+    "Ingestion requests accepted by /upload, by backend (local, grpc).",
+    ("backend",),
+)
+INGESTION_JOBS_IN_PROGRESS = Gauge(
+    "rag_ingestion_jobs_in_progress",
+    "Ingestion jobs created by this process and not yet complete or failed.",
+)
+INGESTION_JOBS = Counter(
+    "rag_ingestion_jobs",
+    "Finished ingestion jobs by status (complete, error).",
+    ("status",),
+)
+INGESTION_JOB_SECONDS = Histogram(
+    "rag_ingestion_job_seconds",
+    "Ingestion job duration from creation to completion or failure.",
+    ("status",),
+    buckets=INGESTION_BUCKETS,
+)
+INGESTION_STAGE_SECONDS = Histogram(
+    "rag_ingestion_stage_seconds",
+    "Time spent in each ingestion stage (queued, downloading, parsing, chunking, embedding, storing, ...).",
+    ("stage",),
+    buckets=INGESTION_BUCKETS,
+)
+INGESTION_SLOTS_WAITING = Gauge(
+    "rag_ingestion_slots_waiting",
+    "Documents queued in this process for an ingestion slot (see IngestionScheduler).",
+)
+INGESTION_EMBEDDING_BATCH_INPUTS = Histogram(
+    "rag_ingestion_embedding_batch_inputs",
+    "Chunks per embedding request during ingestion; batches can span documents.",
+    buckets=(1, 8, 32, 64, 128, 256, 512, 1024, 2048),
+)
+
+# --------------------------
+# Storage
+# --------------------------
+STORAGE_SIGNED_URLS = Counter(
+    "storage_signed_urls",
+    "Signed download URLs by result (cached, signed, error).",
+    ("result",),
+)
+STORAGE_SIGN_SECONDS = Histogram(
+    "storage_sign_seconds",
+    "Time to sign a download URL on a cache miss, including any credential refresh.",
+)
+
+# --------------------------
+# DB pool
+# --------------------------
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled DB connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+def _db_pool_collector():
+    from app.db.pool import get_pool_metrics
+    from app.db.session import engine
+
+    stats = get_pool_metrics(engine)
+    gauges = (
+        ("db_pool_size", "Configured pool size.", "size"),
+        ("db_pool_checked_out", "Connections currently checked out.", "checked_out"),
+        ("db_pool_overflow", "Connections open beyond the pool size.", "overflow"),
+    )
+    for name, documentation, key in gauges:
+        if stats.get(key) is not None:
+            yield name, "gauge", documentation, [("", (), stats[key])]
+    if "checkout_timeouts" in stats:
+        yield "db_pool_checkout_timeouts", "counter", "Checkouts that hit the pool timeout.", [
+            ("_total", (), stats["checkout_timeouts"])
+        ]
+
+
+REGISTRY.register_collector(_db_pool_collector)
+
+
+def record_cache_lookup(tier: str, hit: bool, seconds: float) -> None:
+    CACHE_REQUESTS.labels(tier, "hit" if hit else "miss").inc()
+    CACHE_LOOKUP_SECONDS.labels(tier).observe(seconds)
+
+
+def generate_latest(registry: Optional[Registry] = None) -> str:
+    return (registry or REGISTRY).generate_latest()
@@ -4,51 +4,105 @@ AI client - Using OpenAI for both LLM and embeddings
 Supports configurable embedding models:
 - text-embedding-3-small (1536 dims) - Default, cost-effective
 - text-embedding-3-large (3072 dims) - Higher quality, 6.5x cost
+
+Clients are built on first use (langchain_openai alone takes over a second
+to import), so CRUD-only cold starts never pay for them. The module-level
+names (embedding_client, structured_llm, llm, ...) still resolve lazily.
 """
 
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
 from app.config import get_settings
-from app.schemas.rag_docling_schema import DoclingRagStructuredResponse
 
-settings = get_settings()
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+
+@lru_cache(maxsize=None)
+def get_embedding_client() -> "OpenAIEmbeddings":
+    """OpenAI embeddings - configurable model and dimensions."""
+    from langchain_openai import OpenAIEmbeddings
+
+    settings = get_settings()
+    return OpenAIEmbeddings(
+        model=settings.embedding_model,
+        dimensions=settings.embedding_dimensions,
+        api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url or None,
+    )
 
-# OpenAI for embeddings - configurable model and dimensions
-embedding_client = OpenAIEmbeddings(
-    model=settings.embedding_model,
-    dimensions=settings.embedding_dimensions,
-    api_key=settings.openai_api_key
-)
 
 # For migration period: separate clients for small and large embeddings
 # Use these when backfilling or during dual-write migration
-embedding_client_small = OpenAIEmbeddings(
-    model="text-embedding-3-small",
-    dimensions=1536,
-    api_key=settings.openai_api_key
-)
-
-embedding_client_large = OpenAIEmbeddings(
-    model="text-embedding-3-large",
-    dimensions=2000,  # Reduced from 3072 due to HNSW index limit
-    api_key=settings.openai_api_key
-)
-
-# Singleton ChatOpenAI for structured RAG generation
-# Pre-configured to avoid per-request instantiation overhead (~100-200ms savings)
-_chat_openai = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0.0,
-    max_tokens=2000,  # Limit response size to prevent slow generation
-    api_key=settings.openai_api_key,
-)
-
-# Pre-bind structured output schema (avoids per-request binding)
-structured_llm = _chat_openai.with_structured_output(DoclingRagStructuredResponse)
-
-# LLM for general use (agentic RAG, etc.)
-llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0,
-    api_key=settings.openai_api_key,
-)
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_embedding_client_small() -> "OpenAIEmbeddings":
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(
+        model="text-embedding-3-small",
+        dimensions=1536,
+        api_key=get_settings().openai_api_key,
+        base_url=get_settings().openai_base_url or None,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_embedding_client_large() -> "OpenAIEmbeddings":
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(
+        model="text-embedding-3-large",
+        dimensions=2000,  # Reduced from 3072 due to HNSW index limit
+        api_key=get_settings().openai_api_key,
+        base_url=get_settings().openai_base_url or None,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_structured_llm() -> Any:
+    """
+    Singleton ChatOpenAI for structured RAG generation, with the structured
+    output schema pre-bound (avoids per-request instantiation and binding).
+    """
+    from langchain_openai import ChatOpenAI
+
+    from app.schemas.rag_docling_schema import DoclingRagStructuredResponse
+
+    chat = ChatOpenAI(
+        model="gpt-4o-mini",
+        temperature=0.0,
+        max_tokens=2000,  # Limit response size to prevent slow generation
+        api_key=get_settings().openai_api_key,
+        base_url=get_settings().openai_base_url or None,
+    )
+    return chat.with_structured_output(DoclingRagStructuredResponse)
+
+
+@lru_cache(maxsize=None)
+def get_llm() -> "ChatOpenAI":
+    """LLM for general use (agentic RAG, etc.)."""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model="gpt-4o-mini",
+        temperature=0,
+        api_key=get_settings().openai_api_key,
+        base_url=get_settings().openai_base_url or None,
+    )
+
+
+_LAZY_CLIENTS = {
+    "embedding_client": get_embedding_client,
+    "embedding_client_small": get_embedding_client_small,
+    "embedding_client_large": get_embedding_client_large,
+    "structured_llm": get_structured_llm,
+    "llm": get_llm,
+}
+
+
+def __getattr__(name: str) -> Any:
+    factory = _LAZY_CLIENTS.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
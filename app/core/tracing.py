@@ -0,0 +1,380 @@
+"""
+Per-stage tracing for the RAG pipeline.
+
+Spans follow the OpenTelemetry data model (trace/span ids, parent, start and
+end in unix nanoseconds, typed attributes, status) and are exported as
+OTLP/JSON, so any OTLP collector or the JSON files can be used to build
+latency breakdowns. They are produced without the OTel SDK to keep the query
+path and cold start light.
+
+    with start_span("rag.vector_search", {"rag.top_k": 20}) as span:
+        rows = ...
+        span.set_attribute("rag.chunk_count", len(rows))
+
+Nothing is recorded while TRACING_EXPORTER is "none" (the default):
+start_span() then yields a shared no-op span. Otherwise each finished trace
+is queued for a background thread which appends it to TRACING_JSON_PATH
+("json") or POSTs it to TRACING_OTLP_ENDPOINT ("otlp").
+"""
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Union
+
+logger = logging.getLogger(__name__)
+
+INSTRUMENTATION_SCOPE = "app.rag"
+
+# OTLP status codes
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+# OTLP span kinds
+KIND_INTERNAL, KIND_SERVER = 1, 2
+
+AttributeValue = Union[str, bool, int, float, List[Any]]
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "name", "kind", "trace_id", "span_id", "parent_span_id",
+        "start_ns", "end_ns", "attributes", "status_code", "status_message", "_trace",
+    )
+
+    def __init__(self, name: str, trace: "_Trace", parent: Optional["Span"], kind: int):
+        self.name = name
+        self.kind = kind
+        self._trace = trace
+        self.trace_id = trace.trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, AttributeValue] = {}
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+
+    @property
+    def is_recording(self) -> bool:
+        return True
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Optional[AttributeValue]) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Optional[AttributeValue]]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = str(exc)[:500]
+        self.attributes["exception.type"] = type(exc).__name__
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """Stand-in yielded when tracing is off or the trace was not sampled."""
+
+    __slots__ = ()
+    is_recording = False
+    duration_ms = 0.0
+    trace_id = None
+
+    def set_attribute(self, key: str, value: Optional[AttributeValue]) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Optional[AttributeValue]]) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Trace:
+    """Spans of one trace; handed to the exporter when the root span ends."""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+
+
+_current_span: ContextVar[Optional[Union[Span, _NoopSpan]]] = ContextVar("rag_current_span", default=None)
+
+
+def _otlp_value(value: AttributeValue) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attribute(key: str, value: AttributeValue) -> dict:
+    return {"key": key, "value": _otlp_value(value)}
+
+
+def to_otlp_json(spans: List[Span], service_name: str) -> dict:
+    """Wrap spans in an OTLP/JSON ExportTraceServiceRequest."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+            "scopeSpans": [{
+                "scope": {"name": INSTRUMENTATION_SCOPE},
+                "spans": [span.to_otlp() for span in spans],
+            }],
+        }]
+    }
+
+
+# --------------------------
+# Exporters
+# --------------------------
+class SpanExporter(Protocol):
+    def export(self, spans: List[Span]) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class JsonFileExporter:
+    """Appends one OTLP/JSON request per trace (JSON lines)."""
+
+    def __init__(self, path: str, service_name: str):
+        self.path = path
+        self.service_name = service_name
+
+    def export(self, spans: List[Span]) -> None:
+        line = json.dumps(to_otlp_json(spans, self.service_name), separators=(",", ":"))
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def shutdown(self) -> None:
+        pass
+
+
+class OtlpHttpExporter:
+    """POSTs OTLP/JSON to a collector's /v1/traces endpoint."""
+
+    def __init__(self, endpoint: str, service_name: str, headers: Optional[Dict[str, str]] = None, timeout: float = 5.0):
+        import httpx
+
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._client = httpx.Client(
+            timeout=timeout,
+            headers={"Content-Type": "application/json", **(headers or {})},
+        )
+
+    def export(self, spans: List[Span]) -> None:
+        response = self._client.post(self.endpoint, json=to_otlp_json(spans, self.service_name))
+        response.raise_for_status()
+
+    def shutdown(self) -> None:
+        self._client.close()
+
+
+class BackgroundExportProcessor:
+    """
+    Bounded queue drained by a daemon thread, so exporting never blocks the
+    event loop. Traces are dropped (and counted) when the queue is full.
+    """
+
+    def __init__(self, exporter: SpanExporter, max_queue_size: int = 2048):
+        self.exporter = exporter
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue(maxsize=max_queue_size)
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, spans: List[Span]) -> None:
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            spans = self._queue.get()
+            try:
+                if spans is None:
+                    return
+                self.exporter.export(spans)
+            except Exception as e:
+                logger.warning(f"[TRACING] Export failed, dropping {len(spans)} span(s): {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self.exporter.shutdown()
+
+
+# --------------------------
+# Tracer
+# --------------------------
+class Tracer:
+    """Creates spans and forwards finished traces to the export processor."""
+
+    def __init__(self, processor: Optional[BackgroundExportProcessor] = None, sample_rate: float = 1.0):
+        self.processor = processor
+        self.sample_rate = sample_rate
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Optional[AttributeValue]]] = None,
+        kind: int = KIND_INTERNAL,
+    ) -> Iterator[Union[Span, _NoopSpan]]:
+        parent = _current_span.get()
+        if not self.enabled or parent is NOOP_SPAN or (
+            parent is None and random.random() >= self.sample_rate
+        ):
+            token = _current_span.set(NOOP_SPAN)
+            try:
+                yield NOOP_SPAN
+            finally:
+                _current_span.reset(token)
+            return
+
+        trace = parent._trace if parent is not None else _Trace()
+        span = Span(name, trace, parent, kind)
+        if attributes:
+            span.set_attributes(attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            trace.spans.append(span)
+            if parent is None:
+                self.processor.submit(list(trace.spans))
+
+    def shutdown(self) -> None:
+        if self.processor is not None:
+            self.processor.shutdown()
+
+
+def _parse_headers(raw: str) -> Dict[str, str]:
+    """Parse "k1=v1,k2=v2" (OTEL_EXPORTER_OTLP_HEADERS format)."""
+    headers = {}
+    for item in raw.split(","):
+        if "=" in item:
+            key, value = item.split("=", 1)
+            headers[key.strip()] = value.strip()
+    return headers
+
+
+def build_tracer(settings) -> Tracer:
+    """Build a Tracer from the tracing_* settings."""
+    exporter_name = settings.tracing_exporter.lower()
+    service = settings.tracing_service_name
+    if exporter_name == "json":
+        exporter = JsonFileExporter(settings.tracing_json_path, service)
+    elif exporter_name == "otlp":
+        exporter = OtlpHttpExporter(
+            settings.tracing_otlp_endpoint,
+            service,
+            headers=_parse_headers(settings.tracing_otlp_headers),
+        )
+    else:
+        if exporter_name != "none":
+            logger.warning(f"[TRACING] Unknown exporter '{settings.tracing_exporter}', tracing disabled")
+        return Tracer()
+    logger.info(f"[TRACING] Exporting RAG traces via {exporter_name}")
+    return Tracer(BackgroundExportProcessor(exporter), sample_rate=settings.tracing_sample_rate)
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer, built from settings on first use."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                from app.config import get_settings
+
+                _tracer = build_tracer(get_settings())
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """Replace the process-wide tracer (None rebuilds it from settings)."""
+    global _tracer
+    _tracer = tracer
+
+
+def shutdown_tracing() -> None:
+    """Flush queued traces and stop the exporter thread."""
+    global _tracer
+    if _tracer is not None:
+        _tracer.shutdown()
+        _tracer = None
+
+
+def start_span(
+    name: str,
+    attributes: Optional[Dict[str, Optional[AttributeValue]]] = None,
+    kind: int = KIND_INTERNAL,
+):
+    """Context manager for a child of the current span (or a new trace)."""
+    return get_tracer().start_span(name, attributes, kind)
+
+
+def current_span() -> Union[Span, _NoopSpan]:
+    """The active span, or the no-op span outside a recorded trace."""
+    return _current_span.get() or NOOP_SPAN
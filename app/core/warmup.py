@@ -0,0 +1,56 @@
+"""
+Background warm-up of the RAG/ML stack.
+
+app.main imports none of these modules, so an instance becomes ready
+without them. Once it is serving, warm_up_rag_stack() imports them in a
+worker thread and builds the shared clients, so the first /query after a
+cold start does not pay the import cost either.
+"""
+import asyncio
+import importlib
+import logging
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Loaded lazily by the RAG routes/services; kept out of the startup import path
+HEAVY_MODULES = (
+    "langchain_openai",
+    "anthropic",
+    "fitz",
+    "docling",
+    "transformers",
+    "torch",
+)
+
+
+def import_heavy_modules() -> Dict[str, float]:
+    """Import HEAVY_MODULES and the shared clients; returns seconds per step."""
+    timings: Dict[str, float] = {}
+    for name in HEAVY_MODULES:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue  # optional in this deployment (e.g. gRPC-only RAG)
+        timings[name] = round(time.perf_counter() - start, 3)
+
+    from app.core.openai import get_embedding_client, get_structured_llm
+
+    start = time.perf_counter()
+    get_embedding_client()
+    get_structured_llm()
+    timings["openai_clients"] = round(time.perf_counter() - start, 3)
+    return timings
+
+
+async def warm_up_rag_stack() -> Dict[str, float]:
+    """Run import_heavy_modules off the event loop."""
+    try:
+        timings = await asyncio.to_thread(import_heavy_modules)
+        logger.info(f"RAG warm-up complete: {timings}")
+        return timings
+    except Exception as e:
+        logger.warning(f"RAG warm-up failed: {e}")
+        return {}
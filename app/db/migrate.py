@@ -0,0 +1,236 @@
+"""
+Versioned schema migrations.
+
+Migrations are the numbered SQL files in app/db/migrations
+(``0001_baseline.sql``, ``0002_...``). Applied versions are recorded in the
+``schema_migrations`` table. Startup runs a single version query; only when
+the database is behind does one instance take a Postgres advisory lock and
+apply the pending files in order. Other instances skip the lock and serve
+traffic without touching DDL.
+
+A file whose first line is ``-- migrate:no-transaction`` runs statement by
+statement outside a transaction (needed for CREATE INDEX CONCURRENTLY); such
+files must not contain dollar-quoted bodies. All other files run as one
+transaction. A concurrent index build that fails leaves an INVALID index
+behind, which IF NOT EXISTS would then skip; the runner drops and rebuilds
+any invalid index the file creates before recording the version.
+
+Migrations run without statement_timeout or the driver's command timeout, so
+long index builds aren't cancelled. Recorded checksums are compared with the
+files on every start; an applied migration that has since been edited is an
+error, not something to silently skip.
+
+Run manually (e.g. as a deploy step, or against a direct connection when the
+app goes through a transaction pooler):
+
+    python -m app.db.migrate
+"""
+import asyncio
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+NO_TRANSACTION_MARKER = "-- migrate:no-transaction"
+# Arbitrary constant shared by every instance: pg_try_advisory_lock key
+MIGRATION_LOCK_KEY = 7_311_020_417
+
+# asyncpg applies command_timeout when timeout=None; a day is "no limit" for DDL
+MIGRATION_COMMAND_TIMEOUT_SECONDS = 24 * 3600
+
+_FILENAME_RE = re.compile(r"^(\d+)_([\w-]+)\.sql$")
+_CREATE_INDEX_RE = re.compile(
+    r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?\"?(\w+)\"?",
+    re.IGNORECASE,
+)
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+INVALID_INDEXES_SQL = """
+SELECT c.relname FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE NOT i.indisvalid AND n.nspname = current_schema()
+"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode()).hexdigest()
+
+    @property
+    def transactional(self) -> bool:
+        return not self.sql.lstrip().startswith(NO_TRANSACTION_MARKER)
+
+    def statements(self) -> List[str]:
+        """Split a no-transaction file into statements (comment lines dropped)."""
+        body = "\n".join(
+            line for line in self.sql.splitlines() if not line.strip().startswith("--")
+        )
+        return [s.strip() for s in body.split(";") if s.strip()]
+
+    def concurrent_indexes(self) -> Dict[str, str]:
+        """Index name -> CREATE INDEX CONCURRENTLY statement, for no-transaction files."""
+        indexes = {}
+        for statement in self.statements():
+            match = _CREATE_INDEX_RE.match(statement)
+            if match:
+                indexes[match.group(1)] = statement
+        return indexes
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """Read and order migration files; duplicate versions are an error."""
+    migrations = {}
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILENAME_RE.match(path.name)
+        if not match:
+            logger.warning(f"[MIGRATE] Ignoring {path.name}: expected NNNN_name.sql")
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {path.name}")
+        migrations[version] = Migration(version, match.group(2), path.read_text())
+    return [migrations[v] for v in sorted(migrations)]
+
+
+async def applied_checksums(conn: AsyncConnection) -> Dict[int, str]:
+    """Applied version -> recorded checksum, empty when the migrations table does not exist yet."""
+    exists = (await conn.execute(text("SELECT to_regclass('schema_migrations')"))).scalar()
+    if exists is None:
+        return {}
+    result = await conn.execute(text("SELECT version, checksum FROM schema_migrations"))
+    return {row[0]: row[1] for row in result.all()}
+
+
+def verify_checksums(migrations: List[Migration], applied: Dict[int, str]) -> None:
+    """Raise if a migration file changed after it was applied."""
+    changed = [
+        f"{m.version:04d}_{m.name}" for m in migrations
+        if m.version in applied and applied[m.version] != m.checksum
+    ]
+    if changed:
+        raise RuntimeError(
+            f"Applied migrations were modified: {', '.join(changed)}. "
+            "Restore the original files and put schema changes in a new migration."
+        )
+
+
+async def _rebuild_invalid_indexes(driver, migration: Migration) -> None:
+    """Drop and recreate INVALID indexes left by a failed concurrent build of this migration."""
+    indexes = migration.concurrent_indexes()
+    if not indexes:
+        return
+    invalid = {row[0] for row in await driver.fetch(INVALID_INDEXES_SQL)}
+    for name in sorted(invalid & indexes.keys()):
+        logger.warning(f"[MIGRATE] Index {name} is invalid; rebuilding.")
+        await driver.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"',
+                             timeout=MIGRATION_COMMAND_TIMEOUT_SECONDS)
+        await driver.execute(indexes[name], timeout=MIGRATION_COMMAND_TIMEOUT_SECONDS)
+
+    still_invalid = {row[0] for row in await driver.fetch(INVALID_INDEXES_SQL)} & indexes.keys()
+    if still_invalid:
+        raise RuntimeError(f"Indexes still invalid after rebuild: {', '.join(sorted(still_invalid))}")
+
+
+async def _apply(conn: AsyncConnection, migration: Migration) -> None:
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection  # asyncpg connection: multi-statement simple query
+    timeout = MIGRATION_COMMAND_TIMEOUT_SECONDS
+    if migration.transactional:
+        async with driver.transaction():
+            await driver.execute(migration.sql, timeout=timeout)
+            await driver.execute(
+                "INSERT INTO schema_migrations (version, name, checksum) VALUES ($1, $2, $3)",
+                migration.version, migration.name, migration.checksum,
+            )
+    else:
+        for statement in migration.statements():
+            await driver.execute(statement, timeout=timeout)
+        await _rebuild_invalid_indexes(driver, migration)
+        await driver.execute(
+            "INSERT INTO schema_migrations (version, name, checksum) VALUES ($1, $2, $3)",
+            migration.version, migration.name, migration.checksum,
+        )
+
+
+async def run_migrations(
+    engine: Optional[AsyncEngine],
+    migrations: Optional[List[Migration]] = None,
+) -> List[int]:
+    """
+    Apply pending migrations under an advisory lock.
+
+    Returns the versions applied by this call. Returns immediately when the
+    schema is current or another instance already holds the lock. Raises if
+    an applied migration's file no longer matches its recorded checksum.
+    """
+    if engine is None:
+        return []
+    migrations = load_migrations() if migrations is None else migrations
+    if not migrations:
+        return []
+    latest = migrations[-1].version
+
+    # Autocommit: each migration manages its own transaction on the raw connection
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        applied = await applied_checksums(conn)
+        verify_checksums(migrations, applied)
+        if max(applied, default=0) >= latest:
+            logger.info(f"[MIGRATE] Schema is current (version {latest}).")
+            return []
+
+        locked = (await conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": MIGRATION_LOCK_KEY})).scalar()
+        if not locked:
+            logger.info("[MIGRATE] Another instance is migrating; continuing startup.")
+            return []
+
+        applied_now: List[int] = []
+        try:
+            # Session-level, so it covers the raw driver connection too; reset before
+            # the connection goes back to the pool
+            await conn.execute(text("SET statement_timeout = 0"))
+            await conn.execute(text(CREATE_TABLE_SQL))
+            # Re-read under the lock: another instance may have migrated meanwhile
+            applied = await applied_checksums(conn)
+            verify_checksums(migrations, applied)
+            for migration in migrations:
+                if migration.version in applied:
+                    continue
+                logger.info(f"[MIGRATE] Applying {migration.version:04d}_{migration.name}...")
+                await _apply(conn, migration)
+                applied_now.append(migration.version)
+            logger.info(f"[MIGRATE] Applied {len(applied_now)} migration(s); schema at version {latest}.")
+        finally:
+            await conn.execute(text("RESET statement_timeout"))
+            await conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": MIGRATION_LOCK_KEY})
+        return applied_now
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_migrations(engine))
@@ -0,0 +1,52 @@
+-- =====================================================
+-- 0001: baseline schema fixes previously applied by the startup
+-- "self-healing" block in app/main.py.
+-- Idempotent, so it is safe on databases that already have them.
+-- =====================================================
+
+CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+
+-- Required for JIT provisioning
+CREATE TABLE IF NOT EXISTS themison_admins (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    email TEXT NOT NULL UNIQUE,
+    name TEXT,
+    active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    created_by UUID
+);
+
+DO $$
+BEGIN
+    CREATE TYPE organization_member_type AS ENUM ('admin', 'staff');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+ALTER TYPE organization_member_type ADD VALUE IF NOT EXISTS 'superadmin';
+ALTER TYPE organization_member_type ADD VALUE IF NOT EXISTS 'editor';
+ALTER TYPE organization_member_type ADD VALUE IF NOT EXISTS 'viewer';
+ALTER TYPE organization_member_type ADD VALUE IF NOT EXISTS 'reader';
+
+-- Profiles / Members
+ALTER TABLE profiles ADD COLUMN IF NOT EXISTS is_active BOOLEAN DEFAULT TRUE;
+ALTER TABLE members ADD COLUMN IF NOT EXISTS is_active BOOLEAN DEFAULT TRUE;
+
+-- Invitations
+ALTER TABLE invitations ADD COLUMN IF NOT EXISTS token TEXT;
+UPDATE invitations SET token = MD5(random()::text) WHERE token IS NULL;
+ALTER TABLE invitations ALTER COLUMN token SET NOT NULL;
+ALTER TABLE invitations ADD COLUMN IF NOT EXISTS status TEXT DEFAULT 'pending';
+ALTER TABLE invitations ADD COLUMN IF NOT EXISTS invited_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE invitations ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE invitations ADD COLUMN IF NOT EXISTS accepted_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE invitations ALTER COLUMN name DROP NOT NULL;
+
+-- Trials
+ALTER TABLE trials ADD COLUMN IF NOT EXISTS visit_schedule_template JSONB DEFAULT '{}';
+ALTER TABLE trials ADD COLUMN IF NOT EXISTS budget_data JSONB DEFAULT '{}';
+
+-- Patient Visits
+ALTER TABLE patient_visits ADD COLUMN IF NOT EXISTS cost_data JSONB DEFAULT '{}';
+
+-- Trial Members
+ALTER TABLE trial_members ADD COLUMN IF NOT EXISTS settings JSONB DEFAULT '{}';
@@ -1,5 +1,5 @@
 -- =====================================================
--- Migration: add tasks, activity_types, trial_activity_types
+-- 0002: add tasks, activity_types, trial_activity_types
 -- Safe to run against an existing database.
 -- Uses CREATE TABLE IF NOT EXISTS so reruns are no-ops.
 -- =====================================================
@@ -46,8 +46,4 @@ CREATE TABLE IF NOT EXISTS tasks (
     deleted_at TIMESTAMP
 );
 
--- Verification
-SELECT
-    (SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 'activity_types')      AS activity_types_exists,
-    (SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 'trial_activity_types') AS trial_activity_types_exists,
-    (SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 'tasks')                AS tasks_exists;
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS category TEXT;
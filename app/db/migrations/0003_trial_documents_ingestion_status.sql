@@ -1,5 +1,5 @@
 -- =====================================================
--- Migration: add ingestion_status to trial_documents
+-- 0003: add ingestion_status to trial_documents
 -- Plus a one-shot backfill: any document that already has
 -- chunks in document_chunks_docling is marked 'ready'.
 -- Safe to run multiple times (uses IF NOT EXISTS + guarded UPDATE).
@@ -16,8 +16,3 @@ UPDATE trial_documents td
         WHERE dcd.document_id = td.id
    );
 
--- Verification
-SELECT ingestion_status, COUNT(*) AS docs
-  FROM trial_documents
- GROUP BY ingestion_status
- ORDER BY ingestion_status NULLS FIRST;
@@ -0,0 +1,21 @@
+-- =====================================================
+-- 0004: trial_id, document_id + document_name on chat_sessions
+-- Note: the document table is trial_documents, NOT documents.
+-- =====================================================
+
+ALTER TABLE chat_sessions
+  ADD COLUMN IF NOT EXISTS trial_id UUID REFERENCES trials(id) ON DELETE SET NULL;
+
+ALTER TABLE chat_sessions
+  ADD COLUMN IF NOT EXISTS document_id UUID;
+
+DO $$
+BEGIN
+    ALTER TABLE chat_sessions
+      ADD CONSTRAINT fk_chat_sessions_document
+      FOREIGN KEY (document_id) REFERENCES trial_documents(id) ON DELETE SET NULL;
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+ALTER TABLE chat_sessions
+  ADD COLUMN IF NOT EXISTS document_name TEXT;
@@ -0,0 +1,16 @@
+-- migrate:no-transaction
+-- =====================================================
+-- 0005: composite indexes for task listing
+-- Safe to run against an existing database.
+-- CONCURRENTLY avoids locking writes on large tables; run outside a transaction.
+-- =====================================================
+
+-- Trial task boards: filter by trial/status, always excluding soft-deleted rows
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_trial_status_deleted
+    ON tasks (trial_id, status, deleted_at);
+
+-- Keyset pagination order used by GET /api/tasks
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_trial_created_id
+    ON tasks (trial_id, created_at DESC, id DESC)
+    WHERE deleted_at IS NULL;
+
@@ -0,0 +1,14 @@
+-- migrate:no-transaction
+-- =====================================================
+-- 0006: sequence-backed patient code allocation
+-- Safe to run against an existing database.
+-- CONCURRENTLY avoids locking writes on large tables; run outside a transaction.
+-- =====================================================
+
+-- Ordinals for GET /api/patients/generate-code (scrambled into PAT-XXXXX codes)
+CREATE SEQUENCE IF NOT EXISTS patient_code_seq MINVALUE 0 START WITH 0;
+
+-- Org-scoped lookup used to skip codes that are already taken
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_patients_org_code
+    ON patients (organization_id, patient_code);
+
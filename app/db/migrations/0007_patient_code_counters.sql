@@ -0,0 +1,20 @@
+-- migrate:no-transaction
+-- =====================================================
+-- 0007: per-organization patient code counters
+-- Codes only need to be unique within an organization
+-- (UNIQUE(patient_code, organization_id)), so each organization draws
+-- ordinals from its own counter instead of the shared patient_code_seq.
+-- CONCURRENTLY avoids locking writes on large tables; run outside a transaction.
+-- =====================================================
+
+-- Next unissued ordinal per organization (scrambled into PAT-XXXXX codes)
+CREATE TABLE IF NOT EXISTS patient_code_counters (
+    organization_id UUID PRIMARY KEY REFERENCES organizations(id) ON DELETE CASCADE,
+    next_ordinal BIGINT NOT NULL DEFAULT 0
+);
+
+-- Duplicated the unique (patient_code, organization_id) index
+DROP INDEX CONCURRENTLY IF EXISTS ix_patients_org_code;
+
+-- patient_code_seq is left in place for instances still running the
+-- previous release during a rolling deploy; nothing reads it any more.
@@ -0,0 +1,172 @@
+"""
+Connection-pool instrumentation and warm-up for the async engine.
+
+InstrumentedQueuePool times every checkout (the wait for a free connection
+when the pool is saturated) so burst behaviour shows up in get_pool_metrics()
+instead of only as slow requests. Opening a new connection (TCP, TLS, auth)
+is not waiting for one and is excluded from the wait time.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from greenlet import getcurrent
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import DB_POOL_CHECKOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Checkouts slower than this are counted as having waited for a connection
+WAIT_THRESHOLD_MS = 1.0
+RECENT_WINDOW = 1024
+
+
+class PoolMetrics:
+    """Process-wide checkout counters; survives pool re-creation on dispose()."""
+
+    def __init__(self, window: int = RECENT_WINDOW):
+        self._lock = threading.Lock()
+        self._recent: Deque[float] = deque(maxlen=window)
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.waits = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self._recent.clear()
+
+    def record_checkout(self, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            if wait_ms >= WAIT_THRESHOLD_MS:
+                self.waits += 1
+            self._recent.append(wait_ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+            p95 = recent[int(0.95 * (len(recent) - 1))] if recent else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "checkouts_waited": self.waits,
+                "checkout_timeouts": self.timeouts,
+                "connections_opened": self.connects,
+                "wait_ms_avg": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_ms_p95_recent": round(p95, 3),
+                "wait_ms_max": round(self.max_wait_ms, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Connection setup time per in-progress checkout; keyed by greenlet because
+        # async checkouts interleave on one thread while a connection is opened
+        self._connect_seconds: Dict[Any, float] = {}
+
+    def _do_get(self):
+        checkout = getcurrent()
+        self._connect_seconds[checkout] = 0.0
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        finally:
+            connect = self._connect_seconds.pop(checkout, 0.0)
+        wait = max(0.0, time.perf_counter() - start - connect)
+        pool_metrics.record_checkout(wait * 1000)
+        DB_POOL_CHECKOUT_SECONDS.observe(wait)
+        return record
+
+    def _create_connection(self):
+        pool_metrics.record_connect()
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            checkout = getcurrent()
+            if checkout in self._connect_seconds:
+                self._connect_seconds[checkout] += time.perf_counter() - start
+
+
+def get_pool_metrics(engine: Optional[AsyncEngine]) -> Dict[str, Any]:
+    """Current pool occupancy plus cumulative checkout statistics."""
+    if engine is None:
+        return {"status": "unavailable"}
+    pool = engine.sync_engine.pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if hasattr(pool, "size"):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            # QueuePool.overflow() starts at -pool_size; report connections beyond pool_size
+            overflow=max(0, pool.overflow()),
+            max_overflow=getattr(pool, "_max_overflow", None),
+            timeout_seconds=pool.timeout() if hasattr(pool, "timeout") else None,
+        )
+    stats.update(pool_metrics.snapshot())
+    return stats
+
+
+async def warm_up_pool(engine: Optional[AsyncEngine], connections: int, timeout: float = 30.0) -> int:
+    """
+    Open up to ``connections`` pooled connections concurrently at startup so
+    the first requests after a deploy do not pay connection setup.
+
+    Returns the number of connections successfully opened.
+    """
+    if engine is None or connections <= 0:
+        return 0
+    pool = engine.sync_engine.pool
+    if hasattr(pool, "size"):
+        connections = min(connections, pool.size())
+
+    release = asyncio.Event()
+    opened = 0
+
+    async def hold_one() -> None:
+        nonlocal opened
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            opened += 1
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold_one()) for _ in range(connections)]
+    # Hold every connection open (or failed) before returning them to the pool
+    deadline = time.monotonic() + timeout
+    while opened + sum(t.done() for t in tasks) < connections and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    failures = [r for r in results if isinstance(r, Exception)]
+    if failures:
+        logger.warning(f"DB pool warm-up: {len(failures)} connection(s) failed: {failures[0]}")
+    return opened
@@ -3,8 +3,11 @@ This module contains the database session.
 """
 import sys
 import logging
+from uuid import uuid4
+
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.config import get_settings
+from app.db.pool import InstrumentedQueuePool
 
 try:
     settings = get_settings()
@@ -17,26 +20,47 @@ except Exception as e:
 async_session = None
 engine = None
 
+
+def engine_options(settings) -> dict:
+    """
+    Keyword arguments for create_async_engine, driven by Settings.
+
+    With db_pgbouncer_mode (Supabase transaction pooler / PgBouncer in
+    transaction mode) asyncpg's statement caches are disabled and prepared
+    statements get unique names, since consecutive statements may run on
+    different server connections.
+    """
+    connect_args = {
+        "command_timeout": settings.db_command_timeout_seconds,
+        "server_settings": {
+            "statement_timeout": str(settings.db_statement_timeout_ms),
+            "idle_in_transaction_session_timeout": str(settings.db_statement_timeout_ms),
+            "search_path": "public,extensions",
+        },
+    }
+    if settings.db_pgbouncer_mode:
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_use_lifo": True,
+        "connect_args": connect_args,
+    }
+
+
 """
 Create an async engine for the database.
 """
 if settings:
     try:
-        engine = create_async_engine(
-            settings.database_url,
-            pool_size=10,
-            max_overflow=20,
-            pool_pre_ping=True,
-            pool_recycle=1800,
-            connect_args={
-                "command_timeout": 60,
-                "server_settings": {
-                    "statement_timeout": "60000",  # 60 seconds
-                    "idle_in_transaction_session_timeout": "60000",
-                    "search_path": "public,extensions",
-                }
-            }
-        )
+        engine = create_async_engine(settings.database_url, **engine_options(settings))
         async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
     except Exception as e:
         print("Failed to create database engine:", e, file=sys.stderr)
@@ -6,7 +6,7 @@ import logging
 import uuid
 from typing import Any, Dict, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,6 +16,8 @@ from app.core.auth0 import verify_auth0_token
 from app.dependencies.db import get_db
 from app.models.members import Member
 from app.models.profiles import Profile
+from app.services.cache.member_cache_service import get_member_cache
+from app.services.organization_metrics_service import invalidate_organization_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -73,13 +75,16 @@ async def get_current_user(
 
 
 async def get_current_member(
+    request: Request,
     user: Dict[str, Any] = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> Member:
     """
     Resolve the Auth0 user to a Member record (carries organization_id for scoping).
 
-    Looks up profiles by email, then members by profile_id.
+    Looks up profiles by email, then members by profile_id. Resolved members
+    are cached (in-process + Redis) by Auth0 sub/email, so provisioned users
+    skip both lookups and the JIT checks on subsequent requests.
     Raises 403 if no member record exists.
 
     If AUTH_DISABLED=true, returns first member in database (for testing).
@@ -100,6 +105,15 @@ async def get_current_member(
 
     email = user.get("email", "")
 
+    member_cache = get_member_cache()
+    redis = getattr(request.app.state, "redis_client", None)
+    cache_key = member_cache.cache_key(user.get("auth0_sub", ""), email)
+
+    cached = await member_cache.get(cache_key, redis)
+    if cached is not None:
+        # Attach to this session without a SELECT so routes can still modify it
+        return await db.merge(cached, load=False)
+
     # Find profile by email
     result = await db.execute(
         select(Profile).where(Profile.email == email)
@@ -173,8 +187,10 @@ async def get_current_member(
         db.add(member)
         await db.commit()
         await db.refresh(member)
+        await invalidate_organization_metrics(org.id, redis)
     # --- JIT PROVISIONING END ---
 
+    await member_cache.set(cache_key, member, redis)
     return member
 
 
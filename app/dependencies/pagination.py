@@ -0,0 +1,86 @@
+"""
+Pagination dependency — keyset cursor, page size and sparse fieldsets for list routes.
+
+List routes return a plain JSON array (as before). When more rows exist,
+the ``X-Next-Cursor`` response header carries the cursor for the next page.
+``?fields=id,name`` restricts each item to the named fields and skips
+loading unrequested heavy columns.
+"""
+
+from typing import Any, Callable, List, Optional, Sequence, Set
+from uuid import UUID
+
+from fastapi import HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import defer
+
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    split_page,
+)
+
+
+def loaded(obj: Any, attr: str) -> Any:
+    """Read an ORM attribute only if it was loaded (deferred columns read as None)."""
+    return obj.__dict__.get(attr)
+
+
+class PageParams:
+    """Request-scoped page request; remembers the next cursor for the response."""
+
+    def __init__(self, limit: int, after: Optional[List[Any]], fields: Optional[Set[str]]):
+        self.limit = limit
+        self.after = after
+        self.fields = fields
+        self.next_cursor: Optional[str] = None
+
+    def wants(self, field: str) -> bool:
+        return self.fields is None or field in self.fields
+
+    def defer_unrequested(self, model: Any, *heavy_columns: str) -> list:
+        """Loader options that skip heavy columns the client did not ask for."""
+        return [defer(getattr(model, c)) for c in heavy_columns if not self.wants(c)]
+
+    def split(self, rows: Sequence[Any], key: Callable[[Any], tuple]) -> List[Any]:
+        rows, self.next_cursor = split_page(rows, self.limit, key)
+        return rows
+
+    def respond(self, response: Response, items: List[Any]) -> Any:
+        """Return items, projected to the requested fields, with the cursor header set."""
+        headers = {NEXT_CURSOR_HEADER: self.next_cursor} if self.next_cursor else {}
+        if self.fields is None:
+            response.headers.update(headers)
+            return items
+
+        projected = []
+        for item in items:
+            if isinstance(item, BaseModel):
+                data = item.model_dump(include=self.fields)
+            elif isinstance(item, dict):
+                data = {k: v for k, v in item.items() if k in self.fields}
+            else:
+                data = {f: loaded(item, f) for f in self.fields if f in item.__dict__}
+            projected.append(data)
+        return JSONResponse(content=jsonable_encoder(projected), headers=headers)
+
+
+def get_page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Comma-separated sparse fieldset"),
+) -> PageParams:
+    try:
+        # (sort key, id) of the last row; ids are UUIDs on every paginated model
+        after = decode_cursor(cursor, arity=2)
+        if after is not None and not isinstance(after[1], UUID):
+            raise ValueError("Invalid cursor: id must be a UUID")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    field_set = {f.strip() for f in fields.split(",") if f.strip()} if fields else None
+    return PageParams(limit, after, field_set or None)
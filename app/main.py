@@ -2,6 +2,7 @@
 Main application file
 """
 
+import asyncio
 import os
 import sys
 from dotenv import load_dotenv
@@ -39,6 +40,7 @@ from app.api.routes.api.tasks import router as tasks_router
 from app.api.routes.api.activities import router as trial_activities_router
 from app.api.routes.api.complete_visit import router as complete_visit_router
 from app.api.routes.api.visit_activities import router as visit_activities_router
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 from contextlib import asynccontextmanager
 from redis.asyncio import Redis
@@ -57,6 +59,7 @@ app_state = {}
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     redis_client = None
+    warmup_task = None
 
     try:
         logging.info("Initializing Redis…")
@@ -76,187 +79,62 @@ async def lifespan(app: FastAPI):
             logging.error(f"Redis connection failed: {e}")
             app.state.redis_client = None
 
-        # --- 2) Self-Healing: Run missing migrations ---
+        # --- 2) Warm the DB connection pool ---
         try:
-            from sqlalchemy import text
+            from app.config import get_settings
+            from app.db.pool import warm_up_pool
             from app.db.session import engine
-            
-            async with engine.connect() as conn:
-                # Helper to check if column exists
-                async def column_exists(table, column):
-                    # Check in public schema explicitly to be safe
-                    res = await conn.execute(text(
-                        "SELECT 1 FROM information_schema.columns "
-                        "WHERE table_name = :t AND column_name = :c"
-                    ), {"t": table, "c": column})
-                    return res.scalar() is not None
-
-                # Ensure uuid-ossp extension exists for UUID generation
-                try:
-                    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS \"uuid-ossp\";"))
-                    await conn.commit()
-                except Exception as e:
-                    logging.warning(f"Could not create uuid-ossp extension: {e}")
-
-                # Ensure themison_admins table exists for JIT provisioning
-                try:
-                    await conn.execute(text(
-                        "CREATE TABLE IF NOT EXISTS themison_admins ("
-                        "id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),"
-                        "email TEXT NOT NULL UNIQUE,"
-                        "name TEXT,"
-                        "active BOOLEAN DEFAULT TRUE,"
-                        "created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,"
-                        "created_by UUID"
-                        ");"
-                    ))
-                    await conn.commit()
-                except Exception as e:
-                    logging.warning(f"Could not ensure themison_admins table: {e}")
-
-                # Ensure organization_member_type ENUM exists
-                try:
-                    await conn.execute(text("SELECT 'admin'::organization_member_type;"))
-                except Exception:
-                    logging.info("Creating ENUM organization_member_type...")
-                    await conn.execute(text("CREATE TYPE organization_member_type AS ENUM ('admin', 'staff');"))
-                    await conn.commit()
-
-                # Profiles
-                if not await column_exists('profiles', 'is_active'):
-                    logging.info("Adding profiles.is_active...")
-                    await conn.execute(text("ALTER TABLE profiles ADD COLUMN is_active BOOLEAN DEFAULT TRUE;"))
-                    await conn.commit()
-
-                # Members
-                if not await column_exists('members', 'is_active'):
-                    logging.info("Adding members.is_active...")
-                    await conn.execute(text("ALTER TABLE members ADD COLUMN is_active BOOLEAN DEFAULT TRUE;"))
-                    await conn.commit()
-
-                # Invitations
-                if not await column_exists('invitations', 'token'):
-                    logging.info("Adding and populating invitations.token...")
-                    await conn.execute(text("ALTER TABLE invitations ADD COLUMN token TEXT;"))
-                    # Populate NULL tokens with unique values
-                    await conn.execute(text("UPDATE invitations SET token = MD5(random()::text) WHERE token IS NULL;"))
-                    await conn.execute(text("ALTER TABLE invitations ALTER COLUMN token SET NOT NULL;"))
-                    await conn.commit()
-                
-                if not await column_exists('invitations', 'status'):
-                    logging.info("Adding invitations.status...")
-                    await conn.execute(text("ALTER TABLE invitations ADD COLUMN status TEXT DEFAULT 'pending';"))
-                    await conn.commit()
-                
-                if not await column_exists('invitations', 'invited_at'):
-                    logging.info("Adding invitations.invited_at...")
-                    await conn.execute(text("ALTER TABLE invitations ADD COLUMN invited_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;"))
-                    await conn.commit()
-
-                if not await column_exists('invitations', 'expires_at'):
-                    logging.info("Adding invitations.expires_at...")
-                    await conn.execute(text("ALTER TABLE invitations ADD COLUMN expires_at TIMESTAMP WITH TIME ZONE;"))
-                    await conn.commit()
-
-                if not await column_exists('invitations', 'accepted_at'):
-                    logging.info("Adding invitations.accepted_at...")
-                    await conn.execute(text("ALTER TABLE invitations ADD COLUMN accepted_at TIMESTAMP WITH TIME ZONE;"))
-                    await conn.commit()
-
-                # Trials (New stability columns)
-                if not await column_exists('trials', 'visit_schedule_template'):
-                    logging.info("Adding trials.visit_schedule_template...")
-                    await conn.execute(text("ALTER TABLE trials ADD COLUMN visit_schedule_template JSONB DEFAULT '{}';"))
-                    await conn.commit()
-
-                if not await column_exists('trials', 'budget_data'):
-                    logging.info("Adding trials.budget_data...")
-                    await conn.execute(text("ALTER TABLE trials ADD COLUMN budget_data JSONB DEFAULT '{}';"))
-                    await conn.commit()
-
-                # Patient Visits
-                if not await column_exists('patient_visits', 'cost_data'):
-                    logging.info("Adding patient_visits.cost_data...")
-                    await conn.execute(text("ALTER TABLE patient_visits ADD COLUMN cost_data JSONB DEFAULT '{}';"))
-                    await conn.commit()
-
-                # Trial Members
-                if not await column_exists('trial_members', 'settings'):
-                    logging.info("Adding trial_members.settings...")
-                    await conn.execute(text("ALTER TABLE trial_members ADD COLUMN settings JSONB DEFAULT '{}';"))
-                    await conn.commit()
-
-                # Self-healing: Check and update ENUM type if needed
-                try:
-                    # 1. Expand the ENUM with missing roles
-                    for role in ["superadmin", "editor", "viewer", "reader"]:
-                        try:
-                            await conn.execute(text(f"ALTER TYPE organization_member_type ADD VALUE IF NOT EXISTS '{role}'"))
-                            await conn.commit()
-                        except Exception as e:
-                            logging.warning(f"Failed to add role {role} (likely exists): {e}")
-
-                    # 2. Hard-force make name nullable in invitations table
-                    try:
-                        await conn.execute(text("ALTER TABLE invitations ALTER COLUMN name DROP NOT NULL"))
-                        await conn.commit()
-                    except Exception as e:
-                        logging.warning(f"Failed to force nullable name column: {e}")
-                except Exception as e:
-                    logging.error(f"Database self-healing failed: {e}")
-
-                # Tasks
-                if not await column_exists('tasks', 'category'):
-                    logging.info("Adding tasks.category...")
-                    await conn.execute(text("ALTER TABLE tasks ADD COLUMN category TEXT;"))
-                    await conn.commit()
-
-                # Trial Documents (RAG ingestion tracking)
-                if not await column_exists('trial_documents', 'ingestion_status'):
-                    logging.info("Adding trial_documents.ingestion_status...")
-                    await conn.execute(text(
-                        "ALTER TABLE trial_documents ADD COLUMN ingestion_status TEXT;"
-                    ))
-                    # Backfill: documents that already have chunks are 'ready'
-                    await conn.execute(text(
-                        "UPDATE trial_documents td "
-                        "SET ingestion_status = 'ready' "
-                        "WHERE EXISTS ("
-                        "  SELECT 1 FROM document_chunks_docling dcd "
-                        "  WHERE dcd.document_id = td.id"
-                        ");"
-                    ))
-                    await conn.commit()
-
-                # Chat Sessions (New columns and Foreign Key)
-                if not await column_exists('chat_sessions', 'trial_id'):
-                    logging.info("Adding chat_sessions.trial_id...")
-                    await conn.execute(text("ALTER TABLE chat_sessions ADD COLUMN trial_id UUID REFERENCES trials(id) ON DELETE SET NULL;"))
-                    await conn.commit()
-
-                if not await column_exists('chat_sessions', 'document_id'):
-                    logging.info("Adding chat_sessions.document_id with correct FK...")
-                    await conn.execute(text("ALTER TABLE chat_sessions ADD COLUMN document_id UUID;"))
-                    # Note: Table name is trial_documents, NOT documents
-                    try:
-                        await conn.execute(text("ALTER TABLE chat_sessions ADD CONSTRAINT fk_chat_sessions_document FOREIGN KEY (document_id) REFERENCES trial_documents(id) ON DELETE SET NULL;"))
-                    except Exception as e:
-                        logging.warning(f"Could not add FK to document_id (likely exists or table mapping error): {e}")
-                    await conn.commit()
-
-                if not await column_exists('chat_sessions', 'document_name'):
-                    logging.info("Adding chat_sessions.document_name...")
-                    await conn.execute(text("ALTER TABLE chat_sessions ADD COLUMN document_name TEXT;"))
-                    await conn.commit()
-
-            logging.info("Self-healing: Migration check completed.")
+
+            warmup = get_settings().db_pool_warmup_connections
+            if warmup > 0:
+                opened = await warm_up_pool(engine, warmup)
+                logging.info(f"DB pool warm-up: {opened}/{warmup} connection(s) ready.")
+        except Exception as e:
+            logging.error(f"DB pool warm-up failed: {e}")
+
+        # --- 3) Schema migrations (app/db/migrations) ---
+        # One version query when current; otherwise a single instance applies
+        # pending files under an advisory lock while the others keep starting.
+        try:
+            from app.config import get_settings
+            from app.db.migrate import run_migrations
+            from app.db.session import engine
+
+            if get_settings().db_migrations_on_startup:
+                await run_migrations(engine)
         except Exception as e:
-            logging.error(f"Self-healing migrations failed: {e}")
+            logging.error(f"Schema migrations failed: {e}")
+
+        # --- 4) Background RAG/ML warm-up (not awaited: readiness does not wait) ---
+        try:
+            from app.config import get_settings
+            from app.core.warmup import warm_up_rag_stack
+
+            if get_settings().rag_warmup_on_startup:
+                warmup_task = asyncio.create_task(warm_up_rag_stack())
+        except Exception as e:
+            logging.error(f"RAG warm-up scheduling failed: {e}")
 
         yield
 
     finally:
-        # --- 3) Shutdown cleanup ---
+        # --- 5) Shutdown cleanup ---
+        if warmup_task and not warmup_task.done():
+            # The import thread cannot be interrupted; give it a moment to finish
+            await asyncio.wait({warmup_task}, timeout=5)
+
+        try:
+            from app.core.tracing import shutdown_tracing
+            shutdown_tracing()
+        except Exception as e:
+            logging.error(f"Error flushing traces: {e}")
+
+        try:
+            from app.clients.rag_client import close_rag_client
+            await close_rag_client()
+        except Exception as e:
+            logging.error(f"Error closing RAG gRPC channels: {e}")
+
         if redis_client:
             try:
                 await redis_client.close()
@@ -306,7 +184,7 @@ if allow_all:
                 response.headers["Access-Control-Allow-Credentials"] = "true"
                 response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
                 response.headers["Access-Control-Allow-Headers"] = "Authorization, Content-Type, Accept, Origin, X-Requested-With, X-API-KEY, X-Job-ID, X-Document-ID"
-                response.headers["Access-Control-Expose-Headers"] = "Content-Length, X-Job-ID, X-Document-ID"
+                response.headers["Access-Control-Expose-Headers"] = f"Content-Length, X-Job-ID, X-Document-ID, {NEXT_CURSOR_HEADER}"
             
             return response
 
@@ -320,7 +198,7 @@ else:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["Authorization", "Content-Type", "Accept", "Origin", "X-Requested-With", "X-API-KEY", "X-Job-ID", "X-Document-ID"],
-        expose_headers=["Content-Length", "X-Job-ID", "X-Document-ID"],
+        expose_headers=["Content-Length", "X-Job-ID", "X-Document-ID", NEXT_CURSOR_HEADER],
         max_age=600,
     )
     logging.info(f"CORS initialized with allowed origins and dynamic regex for Themison domains.")
@@ -341,6 +219,36 @@ def health():
     }
 
 
+@app.get("/health/db-pool")
+def db_pool_health():
+    """Connection-pool occupancy and checkout wait statistics."""
+    from app.db.pool import get_pool_metrics
+    from app.db.session import engine
+
+    return get_pool_metrics(engine)
+
+
+@app.get("/health/reranker")
+def reranker_health():
+    """Remote rerank latency percentiles and circuit-breaker state."""
+    from app.services.reranking import get_rerank_latency_stats
+
+    return get_rerank_latency_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint (cache tiers, LLM, ingestion, DB pool)."""
+    from fastapi import HTTPException
+    from fastapi.responses import PlainTextResponse
+    from app.config import get_settings
+    from app.core.metrics import CONTENT_TYPE, generate_latest
+
+    if not get_settings().metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(generate_latest(), media_type=CONTENT_TYPE)
+
+
 @app.get("/debug-config")
 async def debug_config():
     """Comprehensive diagnostic endpoint for env vars, connection health, and DB stats."""
@@ -350,6 +258,8 @@ async def debug_config():
     from app.models.profiles import Profile
     from app.models.members import Member
     from app.models.organizations import Organization
+    from app.clients.rag_client import get_rag_client_metrics
+    from app.db.pool import get_pool_metrics
     
     # 1. Check ENUM roles in DB
     enum_labels = []
@@ -387,6 +297,8 @@ async def debug_config():
                 "organizations": o_count
             }
         },
+        "rag_client": get_rag_client_metrics(),
+        "db_pool": get_pool_metrics(engine),
         "config_details": {
             "VERSION": "4.0.3-GCS-CORS-FIX",
             "USE_GRPC": os.getenv("USE_GRPC_RAG", "false").lower() == "true",
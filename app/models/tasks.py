@@ -1,5 +1,5 @@
 # app/models/tasks.py
-from sqlalchemy import Column, String, DateTime, ForeignKey, text, text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -30,9 +30,21 @@ class Task(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     deleted_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        # Trial task boards filter by trial/status and always exclude soft-deleted rows
+        Index("ix_tasks_trial_status_deleted", "trial_id", "status", "deleted_at"),
+        # Keyset pagination order for list_tasks
+        Index(
+            "ix_tasks_trial_created_id",
+            "trial_id", created_at.desc(), id.desc(),
+            postgresql_where=deleted_at.is_(None),
+        ),
+    )
+
     # relationships
     # trial = relationship("Trial", back_populates="tasks")
-    # assigned_user = relationship("Member", back_populates="tasks")
+    # Eager-load explicitly (joinedload/selectinload); lazy loads are not allowed in async
+    assigned_user = relationship("Member", foreign_keys=[assigned_to], lazy="raise")
     # patient = relationship("Patient", back_populates="tasks")
     # visit = relationship("Visit", back_populates="tasks")
     # activity_type = relationship("ActivityType", back_populates="tasks")
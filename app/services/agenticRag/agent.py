@@ -10,7 +10,7 @@ from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, MessagesState, StateGraph
 from langgraph.prebuilt import ToolNode
 
-from app.core.openai import llm
+from app.core.openai import get_llm
 from app.services.agenticRag.tools import (
     documents_retrieval_generation_tool,
     generic_tool,
@@ -36,7 +36,7 @@ class RagAgent:
             generic_tool,
             documents_retrieval_generation_tool
         ]
-        self.llm_with_tools = llm.bind_tools(self.tools)
+        self.llm_with_tools = get_llm().bind_tools(self.tools)
         self.system_message = SystemMessage(
             content="""You are a helpful agent that uses tools to search documents and provide answers.
 
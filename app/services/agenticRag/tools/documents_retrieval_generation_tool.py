@@ -10,7 +10,7 @@ import psycopg2.extras
 from langchain.tools import tool
 
 from app.config import get_settings
-from app.core.openai import embedding_client, llm
+from app.core.openai import get_embedding_client, get_llm
 from app.services.utils.preprocessing import preprocess_text
 
 
@@ -135,7 +135,7 @@ Return ONLY valid JSON, no additional text before or after."""
         print(f"📄 Context: {len(retrieved_documents)} chunks, {len(context)} characters")
         print("🚀 Sending to Anthropic Claude...")
 
-        response = llm.invoke(prompt)
+        response = get_llm().invoke(prompt)
         content = response.content.strip()
 
         print("✅ ANTHROPIC RESPONSE RECEIVED:")
@@ -225,7 +225,7 @@ def documents_retrieval_generation_tool(
         processed_query = preprocess_query(query)
         print(f"🔧 Processed query: {processed_query}")
 
-        embedding = embedding_client.embed_query(processed_query)
+        embedding = get_embedding_client().embed_query(processed_query)
         print(f"🎯 Generated embedding vector length: {len(embedding)}")
         print(f"⏱️  Embedding generation took: {time.time() - t1:.2f}s")
 
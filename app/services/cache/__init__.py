@@ -1,6 +1,7 @@
 """
-Cache services for RAG pipeline.
+Cache services for the RAG pipeline and request authentication.
 """
+from .member_cache_service import MemberCache, get_member_cache
 from .rag_cache_service import RagCacheService
 
-__all__ = ["RagCacheService"]
+__all__ = ["MemberCache", "RagCacheService", "get_member_cache"]
@@ -0,0 +1,186 @@
+"""
+Member resolution cache for get_current_member.
+
+Every authenticated request resolves the Auth0 identity to a Member row.
+Resolved members are kept as column snapshots in a short-lived in-process
+LRU backed by Redis, so already-provisioned users skip the profile/member
+lookups (and the JIT provisioning checks) entirely.
+
+Cache Key Patterns:
+- Member:       member:{sha256(sub+email)[:16]}
+- Reverse idx:  member_keys:{member_id}  (set of member keys for invalidation)
+"""
+
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from redis.asyncio import Redis
+from sqlalchemy import DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import get_settings
+from app.models.members import Member
+
+logger = logging.getLogger(__name__)
+
+PREFIX_MEMBER = "member"
+PREFIX_MEMBER_KEYS = "member_keys"
+
+
+def member_to_snapshot(member: Member) -> Dict[str, Any]:
+    """Serialize the Member's column values to a JSON-safe dict."""
+    snapshot = {}
+    for column in Member.__table__.columns:
+        value = getattr(member, column.key)
+        if isinstance(value, (uuid.UUID, datetime)):
+            value = value.isoformat() if isinstance(value, datetime) else str(value)
+        snapshot[column.key] = value
+    return snapshot
+
+
+def member_from_snapshot(snapshot: Dict[str, Any]) -> Member:
+    """
+    Rebuild a detached Member from a snapshot.
+
+    The instance carries an identity key, so ``session.merge(m, load=False)``
+    attaches it without issuing a SELECT.
+    """
+    values = {}
+    for column in Member.__table__.columns:
+        value = snapshot.get(column.key)
+        if value is not None:
+            if isinstance(column.type, PG_UUID):
+                value = uuid.UUID(value)
+            elif isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+        values[column.key] = value
+
+    member = Member(**values)
+    make_transient_to_detached(member)
+    return member
+
+
+class MemberCache:
+    """
+    Two-tier (in-process LRU + Redis) cache of resolved members.
+
+    Only positive results are cached; unknown users always go through the
+    database so JIT provisioning still runs for them. Redis errors are
+    logged and treated as misses — authentication never fails on the cache.
+    """
+
+    def __init__(
+        self,
+        local_ttl_seconds: float,
+        local_max_entries: int,
+        redis_ttl_seconds: int,
+    ):
+        self.local_ttl_seconds = local_ttl_seconds
+        self.local_max_entries = local_max_entries
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    @staticmethod
+    def cache_key(auth0_sub: str, email: str) -> str:
+        digest = hashlib.sha256(f"{auth0_sub}:{email}".encode()).hexdigest()[:16]
+        return f"{PREFIX_MEMBER}:{digest}"
+
+    # --------------------------
+    # In-process tier
+    # --------------------------
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, snapshot = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return snapshot
+
+    def _put_local(self, key: str, snapshot: Dict[str, Any]) -> None:
+        if self.local_ttl_seconds <= 0:
+            return
+        self._local[key] = (time.monotonic() + self.local_ttl_seconds, snapshot)
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_entries:
+            self._local.popitem(last=False)
+
+    # --------------------------
+    # Public interface
+    # --------------------------
+    async def get(self, key: str, redis: Optional[Redis] = None) -> Optional[Member]:
+        """Return a detached Member for key, or None on a miss."""
+        snapshot = self._get_local(key)
+        if snapshot is None and redis is not None and self.redis_ttl_seconds > 0:
+            try:
+                cached = await redis.get(key)
+            except Exception as e:
+                logger.warning(f"[MEMBER_CACHE] Redis get failed: {e}")
+                cached = None
+            if cached:
+                snapshot = json.loads(cached)
+                self._put_local(key, snapshot)
+
+        if snapshot is None:
+            return None
+        return member_from_snapshot(snapshot)
+
+    async def set(self, key: str, member: Member, redis: Optional[Redis] = None) -> None:
+        """Cache a resolved member under key in both tiers."""
+        snapshot = member_to_snapshot(member)
+        self._put_local(key, snapshot)
+
+        if redis is None or self.redis_ttl_seconds <= 0:
+            return
+        index_key = f"{PREFIX_MEMBER_KEYS}:{snapshot['id']}"
+        try:
+            pipe = redis.pipeline()
+            pipe.set(key, json.dumps(snapshot), ex=self.redis_ttl_seconds)
+            pipe.sadd(index_key, key)
+            pipe.expire(index_key, self.redis_ttl_seconds)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[MEMBER_CACHE] Redis set failed: {e}")
+
+    async def invalidate_member(self, member_id: Any, redis: Optional[Redis] = None) -> None:
+        """Drop every cached entry that resolves to member_id."""
+        member_id = str(member_id)
+        for key in [k for k, (_, s) in self._local.items() if s.get("id") == member_id]:
+            del self._local[key]
+
+        if redis is None:
+            return
+        index_key = f"{PREFIX_MEMBER_KEYS}:{member_id}"
+        try:
+            keys = await redis.smembers(index_key)
+            await redis.delete(index_key, *keys)
+        except Exception as e:
+            logger.warning(f"[MEMBER_CACHE] Redis invalidation failed for {member_id}: {e}")
+
+    def clear(self) -> None:
+        self._local.clear()
+
+
+_member_cache: Optional[MemberCache] = None
+
+
+def get_member_cache() -> MemberCache:
+    """Return the process-wide member resolution cache."""
+    global _member_cache
+    if _member_cache is None:
+        settings = get_settings()
+        _member_cache = MemberCache(
+            local_ttl_seconds=settings.member_cache_local_ttl_seconds,
+            local_max_entries=settings.member_cache_local_max_entries,
+            redis_ttl_seconds=settings.member_cache_redis_ttl_seconds,
+        )
+    return _member_cache
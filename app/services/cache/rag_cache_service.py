@@ -5,11 +5,14 @@ Provides caching for embeddings, chunks, and LLM responses.
 
 import hashlib
 import json
+import time
 from typing import List, Optional
 from uuid import UUID
 
 from redis.asyncio import Redis
 
+from app.core.metrics import record_cache_lookup
+
 
 class RagCacheService:
     """
@@ -19,17 +22,20 @@ class RagCacheService:
     - Embeddings:  emb:{sha256(query)[:16]}
     - Chunks:      chunks:{sha256(query+doc_id)[:16]}
     - Responses:   resp:{sha256(query+doc_id+context_hash)[:16]}
+    - Rerank:      rerank:{sha256(query+model+top_k+chunk_ids)[:16]}
     """
 
     # TTL Configuration (in seconds)
     TTL_EMBEDDING = 86400       # 24 hours - embeddings are deterministic
     TTL_CHUNKS = 3600           # 1 hour - chunks may change on re-ingestion
     TTL_RESPONSE = 1800         # 30 minutes - LLM responses for freshness
+    TTL_RERANK = 3600           # 1 hour - scores are deterministic per (query, chunk set)
 
     # Key prefixes
     PREFIX_EMBEDDING = "emb"
     PREFIX_CHUNKS = "chunks"
     PREFIX_RESPONSE = "resp"
+    PREFIX_RERANK = "rerank"
     PREFIX_DOC_KEYS = "doc_keys"  # Set of keys per document for invalidation
 
     def __init__(self, redis: Redis):
@@ -53,13 +59,20 @@ class RagCacheService:
         )
         return hashlib.sha256(content.encode()).hexdigest()[:12]
 
+    async def _get(self, key: str, tier: str) -> Optional[bytes]:
+        """GET a key, recording hit/miss and latency for the tier."""
+        start = time.perf_counter()
+        cached = await self.redis.get(key)
+        record_cache_lookup(tier, bool(cached), time.perf_counter() - start)
+        return cached
+
     # --------------------------
     # Embedding cache
     # --------------------------
     async def get_embedding(self, query: str) -> Optional[List[float]]:
         """Retrieve cached embedding for query."""
         key = f"{self.PREFIX_EMBEDDING}:{self._hash_key(query)}"
-        cached = await self.redis.get(key)
+        cached = await self._get(key, "embedding")
         if cached:
             return json.loads(cached)
         return None
@@ -87,7 +100,7 @@ class RagCacheService:
     ) -> Optional[List[dict]]:
         """Retrieve cached chunks for query+document."""
         key = f"{self.PREFIX_CHUNKS}:{self._hash_key(query, str(document_id))}"
-        cached = await self.redis.get(key)
+        cached = await self._get(key, "chunks")
         if cached:
             return json.loads(cached)
         return None
@@ -120,7 +133,7 @@ class RagCacheService:
         """Retrieve cached LLM response."""
         context_hash = self._hash_context(chunks)
         key = f"{self.PREFIX_RESPONSE}:{self._hash_key(query, str(document_id), context_hash)}"
-        cached = await self.redis.get(key)
+        cached = await self._get(key, "response")
         if cached:
             return json.loads(cached)
         return None
@@ -143,6 +156,82 @@ class RagCacheService:
         # Track key for invalidation
         await self._track_document_key(document_id, key)
 
+    async def get_multi_response(
+        self,
+        query: str,
+        document_ids: List[UUID],
+        chunks: List[dict]
+    ) -> Optional[dict]:
+        """Retrieve cached LLM response for a multi-document query."""
+        scope = ",".join(sorted(str(d) for d in document_ids))
+        context_hash = self._hash_context(chunks)
+        key = f"{self.PREFIX_RESPONSE}:{self._hash_key(query, scope, context_hash)}"
+        cached = await self._get(key, "response")
+        if cached:
+            return json.loads(cached)
+        return None
+
+    async def set_multi_response(
+        self,
+        query: str,
+        document_ids: List[UUID],
+        chunks: List[dict],
+        response: dict
+    ) -> None:
+        """Cache LLM response for a multi-document query, tracked under every document."""
+        scope = ",".join(sorted(str(d) for d in document_ids))
+        context_hash = self._hash_context(chunks)
+        key = f"{self.PREFIX_RESPONSE}:{self._hash_key(query, scope, context_hash)}"
+        await self.redis.set(
+            key,
+            json.dumps(response),
+            ex=self.TTL_RESPONSE
+        )
+        for document_id in document_ids:
+            await self._track_document_key(document_id, key)
+
+    # --------------------------
+    # Rerank score cache
+    # --------------------------
+    def _rerank_key(
+        self,
+        query: str,
+        model: str,
+        top_k: int,
+        chunk_ids: List[str]
+    ) -> str:
+        """Build the rerank cache key; chunk order does not matter."""
+        ids = ",".join(sorted(chunk_ids))
+        return f"{self.PREFIX_RERANK}:{self._hash_key(query, model, str(top_k), ids)}"
+
+    async def get_rerank_scores(
+        self,
+        query: str,
+        model: str,
+        top_k: int,
+        chunk_ids: List[str]
+    ) -> Optional[List[list]]:
+        """Retrieve cached rerank results as [[chunk_id, score], ...] in ranked order."""
+        cached = await self._get(self._rerank_key(query, model, top_k, chunk_ids), "rerank")
+        if cached:
+            return json.loads(cached)
+        return None
+
+    async def set_rerank_scores(
+        self,
+        query: str,
+        model: str,
+        top_k: int,
+        chunk_ids: List[str],
+        ranked: List[list]
+    ) -> None:
+        """Cache rerank results as [[chunk_id, score], ...] in ranked order."""
+        await self.redis.set(
+            self._rerank_key(query, model, top_k, chunk_ids),
+            json.dumps(ranked),
+            ex=self.TTL_RERANK
+        )
+
     # --------------------------
     # Cache invalidation
     # --------------------------
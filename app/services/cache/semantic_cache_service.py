@@ -13,6 +13,7 @@ from uuid import UUID
 from sqlalchemy import delete, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.metrics import CACHE_REQUESTS, SEMANTIC_SIMILARITY, record_cache_lookup
 from app.models.semantic_cache import SemanticCacheResponse
 
 logger = logging.getLogger(__name__)
@@ -71,13 +72,17 @@ class SemanticCacheService:
 
         Uses pgvector cosine similarity with HNSW index for fast lookup.
         Returns highest similarity match above threshold, or None.
+
+        The nearest entry is fetched regardless of the threshold so its
+        similarity can be recorded (rag_semantic_cache_best_similarity),
+        which shows how many near-misses a lower threshold would turn into hits.
         """
         threshold = similarity_threshold or self.similarity_threshold
         search_start = time.perf_counter()
 
         query_vector = self._embedding_to_pg_vector(query_embedding)
 
-        # SQL: find best match above threshold, scoped to document
+        # SQL: nearest cached query for this document (threshold checked below)
         sql = text("""
             SELECT
                 id,
@@ -87,7 +92,6 @@ class SemanticCacheService:
                 1 - (query_embedding <=> (:v)::vector) AS similarity
             FROM semantic_cache_responses
             WHERE document_id = :doc_id
-              AND 1 - (query_embedding <=> (:v)::vector) >= :threshold
             ORDER BY query_embedding <=> (:v)::vector
             LIMIT 1
         """)
@@ -96,11 +100,15 @@ class SemanticCacheService:
             result = await self.db.execute(sql, {
                 "v": query_vector,
                 "doc_id": document_id,
-                "threshold": threshold
             })
             row = result.fetchone()
 
             search_ms = (time.perf_counter() - search_start) * 1000
+            if row is not None:
+                SEMANTIC_SIMILARITY.observe(float(row.similarity))
+                if row.similarity < threshold:
+                    row = None
+            record_cache_lookup("semantic", row is not None, search_ms / 1000)
 
             if row:
                 logger.info(
@@ -130,6 +138,7 @@ class SemanticCacheService:
                 await self.db.rollback()
             except Exception:
                 pass  # Ignore rollback errors
+            CACHE_REQUESTS.labels("semantic", "error").inc()
             logger.warning(f"[SEMANTIC_CACHE] Search error (table may not exist): {e}")
             return None
 
@@ -10,17 +10,24 @@ embedding, improving retrieval accuracy by 20-35%.
 """
 
 import logging
+from functools import lru_cache
 from typing import List, Optional
 
-from anthropic import AsyncAnthropic
 
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-# Initialize Anthropic client
-_anthropic_client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+@lru_cache(maxsize=1)
+def _get_anthropic_client():
+    """Anthropic client, built on first use (the SDK is slow to import)."""
+    from anthropic import AsyncAnthropic
+
+    return AsyncAnthropic(
+        api_key=settings.anthropic_api_key,
+        base_url=settings.anthropic_base_url or None,
+    )
 
 # Prompt template for generating contextual summaries
 # Based on Anthropic's recommended approach
@@ -68,7 +75,7 @@ class ContextualService:
             A 2-3 sentence contextual summary
         """
         try:
-            response = await _anthropic_client.messages.create(
+            response = await _get_anthropic_client().messages.create(
                 model=self.model,
                 max_tokens=self.max_tokens,
                 messages=[{
@@ -2,13 +2,15 @@
 Generic async CRUD service base class.
 """
 
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+from typing import Any, Collection, Dict, Generic, List, Optional, Tuple, Type, TypeVar
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import func, inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from app.models.base import Base
+from app.utils.pagination import DEFAULT_PAGE_SIZE, apply_keyset, split_page
 
 ModelType = TypeVar("ModelType", bound=Base)
 
@@ -22,6 +24,9 @@ class CRUDBase(Generic[ModelType]):
         crud = CRUDBase(MyModel, db)
         item = await crud.get(some_uuid)
         items = await crud.get_multi(filters={"organization_id": org_id})
+        page, next_cursor = await crud.get_page(
+            filters={"organization_id": org_id}, after=decode_cursor(cursor)
+        )
     """
 
     def __init__(self, model: Type[ModelType], db: AsyncSession) -> None:
@@ -56,6 +61,40 @@ class CRUDBase(Generic[ModelType]):
         result = await self.db.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Optional[List[Any]] = None,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        fields: Optional[Collection[str]] = None,
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Keyset-paginated listing over (order_by, id).
+
+        ``after`` is a decoded cursor from a previous page. ``fields`` limits
+        the columns loaded (the id and sort key are always included); unknown
+        names are ignored, like unknown filter keys.
+        """
+        stmt = select(self.model)
+        if filters:
+            for key, value in filters.items():
+                if hasattr(self.model, key):
+                    stmt = stmt.where(getattr(self.model, key) == value)
+        if fields:
+            columns = inspect(self.model).columns.keys()
+            keep = {f for f in fields if f in columns} | {"id", order_by}
+            stmt = stmt.options(load_only(*(getattr(self.model, f) for f in keep)))
+
+        sort_column = getattr(self.model, order_by)
+        stmt = apply_keyset(stmt, sort_column, self.model.id, after, limit, order_desc)
+        result = await self.db.execute(stmt)
+        return split_page(
+            result.scalars().all(), limit,
+            key=lambda obj: (getattr(obj, order_by), obj.id),
+        )
+
     async def create(self, obj_in: Dict[str, Any]) -> ModelType:
         db_obj = self.model(**obj_in)
         self.db.add(db_obj)
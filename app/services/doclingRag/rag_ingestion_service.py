@@ -1,5 +1,5 @@
+import asyncio
 import logging
-import httpx
 from typing import List, Optional, TYPE_CHECKING
 from uuid import UUID
 from datetime import datetime
@@ -12,13 +12,14 @@ from uuid import uuid4
 
 from app.models.chunks_docling import DocumentChunkDocling
 from app.services.doclingRag.interfaces.rag_ingestion_service import IRagIngestionService
-from app.core.openai import embedding_client
+from app.core.openai import get_embedding_client
 from app.config import get_settings
 from docling.chunking import HybridChunker
 from langchain_docling.loader import DoclingLoader, ExportType
 from app.services.utils.tokenizer import get_tokenizer
 
 if TYPE_CHECKING:
+    from app.services.storage.document_cache import DocumentCache
     from app.services.cache.rag_cache_service import RagCacheService
     from app.services.cache.semantic_cache_service import SemanticCacheService
     from app.services.contextual.contextual_service import ContextualService
@@ -37,10 +38,11 @@ class RagIngestionService(IRagIngestionService):
         db: AsyncSession,
         cache_service: Optional["RagCacheService"] = None,
         semantic_cache_service: Optional["SemanticCacheService"] = None,
-        contextual_service: Optional["ContextualService"] = None
+        contextual_service: Optional["ContextualService"] = None,
+        document_cache: Optional["DocumentCache"] = None,
     ):
         self.db = db
-        self.embedding_client = embedding_client
+        self.embedding_client = get_embedding_client()
         self.cache_service = cache_service
         self.semantic_cache_service = semantic_cache_service
         # Initialize contextual service if enabled
@@ -51,6 +53,10 @@ class RagIngestionService(IRagIngestionService):
             self.contextual_service = ContextualService()
         else:
             self.contextual_service = None
+        if document_cache is None:
+            from app.services.storage.document_cache import get_document_cache
+            document_cache = get_document_cache()
+        self.document_cache = document_cache
 
     # --------------------------
     # Private helper functions
@@ -101,11 +107,6 @@ class RagIngestionService(IRagIngestionService):
         await self.ensure_tables_exist()  # Make sure table exists
 
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(document_url)
-                resp.raise_for_status()
-                document = resp.content  # PDF bytes
-
             for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
                 citation_meta = self._extract_docling_citation_metadata(chunk.metadata)
 
@@ -127,7 +128,6 @@ class RagIngestionService(IRagIngestionService):
                 self.db.add(chunk_record)
 
             await self.db.commit()
-            return document
 
         except Exception as e:
             await self.db.rollback()
@@ -170,12 +170,14 @@ class RagIngestionService(IRagIngestionService):
                 print(f"Deleted {deleted_chunks} existing chunks for document {document_id}")
 
             tokenizer = get_tokenizer()
-            loader = DoclingLoader(
-                file_path=document_url,
-                export_type=ExportType.DOC_CHUNKS,
-                chunker=HybridChunker(tokenizer=tokenizer, chunk_size=chunk_size),
-            )
-            docs = loader.load()  # list of Document objects
+            # Parse a local copy from the shared document cache
+            async with self.document_cache.local_copy(document_url) as source_path:
+                loader = DoclingLoader(
+                    file_path=source_path,
+                    export_type=ExportType.DOC_CHUNKS,
+                    chunker=HybridChunker(tokenizer=tokenizer, chunk_size=chunk_size),
+                )
+                docs = await asyncio.to_thread(loader.load)  # list of Document objects
             texts = [doc.page_content for doc in docs]
 
             # Optional: Generate contextual summaries if enabled
@@ -196,7 +198,7 @@ class RagIngestionService(IRagIngestionService):
                 # Standard embedding without contextual enhancement
                 chunk_embeddings = await self.embedding_client.aembed_documents(texts)
 
-            document_record = await self._insert_docling_chunks(
+            await self._insert_docling_chunks(
                 document_id, document_url, docs, chunk_embeddings, contextual_summaries
             )
 
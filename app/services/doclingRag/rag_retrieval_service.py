@@ -9,7 +9,8 @@ from langchain_core.documents import Document
 
 from app.services.doclingRag.interfaces.rag_retrieval_service import IRagRetrievalService
 from app.services.utils.threading import run_in_thread  # your helper for async threading
-from app.config import get_settings
+from app.config import Settings, get_settings
+from app.core.tracing import start_span
 
 if TYPE_CHECKING:
     from app.services.cache.rag_cache_service import RagCacheService
@@ -17,6 +18,11 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Vector columns on document_chunks_docling a query embedding can be matched against.
+# Ingestion and the query/cache paths only use "embedding"; "embedding_large" is
+# for offline comparisons (benchmarks/retrieval_eval.py) with a matching client.
+EMBEDDING_COLUMNS = {"embedding", "embedding_large"}
+
 
 class RagRetrievalService(IRagRetrievalService):
     """
@@ -27,11 +33,22 @@ class RagRetrievalService(IRagRetrievalService):
         self,
         db: AsyncSession,
         embedding_client,
-        cache_service: Optional["RagCacheService"] = None
+        cache_service: Optional["RagCacheService"] = None,
+        config: Optional[Settings] = None,
+        embedding_column: str = "embedding",
     ):
+        if embedding_column not in EMBEDDING_COLUMNS:
+            raise ValueError(f"embedding_column must be one of {sorted(EMBEDDING_COLUMNS)}, got {embedding_column!r}")
         self.db = db
         self.embedding_client = embedding_client
-        self.cache_service = cache_service        
+        self.cache_service = cache_service
+        self._config = config
+        self._embedding_column = embedding_column
+
+    @property
+    def config(self) -> Settings:
+        """Per-instance settings (e.g. evaluation variants), else the app settings."""
+        return self._config or settings
 
     # --------------------------
     # Private helpers
@@ -52,7 +69,9 @@ class RagRetrievalService(IRagRetrievalService):
         # Try cache first
         if self.cache_service:
             cache_start = time.perf_counter()
-            cached = await self.cache_service.get_embedding(query_text)
+            with start_span("rag.cache_lookup", {"cache.name": "embedding"}) as span:
+                cached = await self.cache_service.get_embedding(query_text)
+                span.set_attribute("cache.hit", bool(cached))
             if cached:
                 timing_info["cache_hit"] = True
                 timing_info["embedding_ms"] = (time.perf_counter() - cache_start) * 1000
@@ -61,16 +80,19 @@ class RagRetrievalService(IRagRetrievalService):
 
         # Compute embedding
         embed_start = time.perf_counter()
-        embedding = await run_in_thread(
-            self.embedding_client.embed_query,
-            query_text
-        )
+        with start_span("rag.embedding", {"gen_ai.request.model": self.config.embedding_model}) as span:
+            embedding = await run_in_thread(
+                self.embedding_client.embed_query,
+                query_text
+            )
+            span.set_attribute("rag.embedding_dimensions", len(embedding))
         timing_info["embedding_ms"] = (time.perf_counter() - embed_start) * 1000
         logger.info(f"[CACHE] Embedding [MISS] - Generated via OpenAI API in {timing_info['embedding_ms']:.2f}ms")
 
         # Cache for future requests
         if self.cache_service:
-            await self.cache_service.set_embedding(query_text, embedding)
+            with start_span("rag.cache_write", {"cache.name": "embedding"}):
+                await self.cache_service.set_embedding(query_text, embedding)
             logger.info(f"[CACHE] Embedding stored in Redis (TTL: 24h)")
 
         return embedding, timing_info
@@ -105,27 +127,31 @@ class RagRetrievalService(IRagRetrievalService):
         query_vector = self._embedding_to_pg_vector(query_vector)
 
         # Query database (no JOIN needed - document_name passed from caller)
-        sql = text("""
+        sql = text(f"""
             SELECT
+                pc.id,
                 pc.content,
                 pc.page_number,
                 pc.chunk_metadata,
-                1 - (pc.embedding <=> (:v)::vector) AS similarity
+                1 - (pc.{self._embedding_column} <=> (:v)::vector) AS similarity
             FROM document_chunks_docling pc
             WHERE pc.document_id = :pid
-            ORDER BY pc.embedding <=> (:v)::vector
+            ORDER BY pc.{self._embedding_column} <=> (:v)::vector
             LIMIT :k
         """)
 
         db_start = time.perf_counter()
-        result = await self.db.execute(sql, {"v": query_vector, "k": top_k, "pid": document_id})
-        rows = result.fetchall()
+        with start_span("rag.vector_search", {"db.system": "postgresql", "rag.top_k": top_k}) as span:
+            result = await self.db.execute(sql, {"v": query_vector, "k": top_k, "pid": document_id})
+            rows = result.fetchall()
+            span.set_attribute("rag.chunk_count", len(rows))
         timing_info["db_search_ms"] = (time.perf_counter() - db_start) * 1000
         logger.info(f"[TIMING] Vector search (pgvector HNSW): {timing_info['db_search_ms']:.2f}ms, found {len(rows)} chunks")
 
         # Format results (use provided document_name)
         docs = [
             {
+                "id": str(row.id),
                 "page_content": row.content,
                 "score": float(row.similarity),
                 "metadata": {
@@ -168,8 +194,10 @@ class RagRetrievalService(IRagRetrievalService):
         """)
 
         db_start = time.perf_counter()
-        result = await self.db.execute(sql, {"query": query_text, "k": top_k, "pid": document_id})
-        rows = result.fetchall()
+        with start_span("rag.bm25", {"db.system": "postgresql", "rag.top_k": top_k}) as span:
+            result = await self.db.execute(sql, {"query": query_text, "k": top_k, "pid": document_id})
+            rows = result.fetchall()
+            span.set_attribute("rag.chunk_count", len(rows))
         bm25_time = (time.perf_counter() - db_start) * 1000
         logger.info(f"[TIMING] BM25 search (PostgreSQL GIN): {bm25_time:.2f}ms, found {len(rows)} chunks")
 
@@ -283,8 +311,14 @@ class RagRetrievalService(IRagRetrievalService):
         timing_info["hybrid_parallel_ms"] = (time.perf_counter() - hybrid_start) * 1000
 
         # Fuse results using RRF
-        rrf_k = settings.hybrid_search_rrf_k
-        fused_results = self._reciprocal_rank_fusion(vector_results, bm25_results, k=rrf_k)
+        rrf_k = self.config.hybrid_search_rrf_k
+        with start_span("rag.rrf", {"rag.rrf_k": rrf_k}) as span:
+            fused_results = self._reciprocal_rank_fusion(vector_results, bm25_results, k=rrf_k)
+            span.set_attributes({
+                "rag.vector_count": len(vector_results),
+                "rag.bm25_count": len(bm25_results),
+                "rag.chunk_count": len(fused_results),
+            })
 
         timing_info["vector_count"] = len(vector_results)
         timing_info["bm25_count"] = len(bm25_results)
@@ -297,6 +331,134 @@ class RagRetrievalService(IRagRetrievalService):
 
         return fused_results[:top_k], timing_info
 
+    # --------------------------
+    # Multi-document search
+    # --------------------------
+    @staticmethod
+    def _format_rows(rows, score_attr: str, names: Dict[UUID, str]) -> Dict[UUID, List[dict]]:
+        """Group multi-document result rows into per-document chunk lists."""
+        grouped: Dict[UUID, List[dict]] = {doc_id: [] for doc_id in names}
+        for row in rows:
+            grouped.setdefault(row.document_id, []).append({
+                "id": str(row.id),
+                "page_content": row.content,
+                "score": float(getattr(row, score_attr)),
+                "metadata": {
+                    "title": names.get(row.document_id, "Unknown"),
+                    "page": row.page_number,
+                    "docling": row.chunk_metadata,
+                },
+            })
+        return grouped
+
+    async def _search_similar_chunks_multi(
+        self,
+        query_vector: List[float],
+        names: Dict[UUID, str],
+        top_k: int,
+    ) -> Dict[UUID, List[dict]]:
+        """
+        Per-document top-k vector search for several documents in one round-trip.
+        The LATERAL join keeps one HNSW-ordered scan per document.
+        """
+        sql = text(f"""
+            SELECT
+                d.id AS document_id,
+                c.id,
+                c.content,
+                c.page_number,
+                c.chunk_metadata,
+                c.similarity
+            FROM unnest(CAST(:pids AS uuid[])) AS d(id)
+            CROSS JOIN LATERAL (
+                SELECT
+                    pc.id,
+                    pc.content,
+                    pc.page_number,
+                    pc.chunk_metadata,
+                    1 - (pc.{self._embedding_column} <=> (:v)::vector) AS similarity
+                FROM document_chunks_docling pc
+                WHERE pc.document_id = d.id
+                ORDER BY pc.{self._embedding_column} <=> (:v)::vector
+                LIMIT :k
+            ) c
+        """)
+        result = await self.db.execute(sql, {
+            "v": self._embedding_to_pg_vector(query_vector),
+            "k": top_k,
+            "pids": list(names.keys()),
+        })
+        return self._format_rows(result.fetchall(), "similarity", names)
+
+    async def _search_bm25_multi(
+        self,
+        query_text: str,
+        names: Dict[UUID, str],
+        top_k: int,
+    ) -> Dict[UUID, List[dict]]:
+        """Per-document top-k BM25 search for several documents in one round-trip."""
+        sql = text("""
+            SELECT
+                d.id AS document_id,
+                c.id,
+                c.content,
+                c.page_number,
+                c.chunk_metadata,
+                c.bm25_score
+            FROM unnest(CAST(:pids AS uuid[])) AS d(id)
+            CROSS JOIN LATERAL (
+                SELECT
+                    pc.id,
+                    pc.content,
+                    pc.page_number,
+                    pc.chunk_metadata,
+                    ts_rank(pc.content_tsv, plainto_tsquery('english', :query)) AS bm25_score
+                FROM document_chunks_docling pc
+                WHERE pc.document_id = d.id
+                  AND pc.content_tsv @@ plainto_tsquery('english', :query)
+                ORDER BY bm25_score DESC
+                LIMIT :k
+            ) c
+        """)
+        result = await self.db.execute(sql, {
+            "query": query_text,
+            "k": top_k,
+            "pids": list(names.keys()),
+        })
+        return self._format_rows(result.fetchall(), "bm25_score", names)
+
+    def _fuse_across_documents(
+        self,
+        per_document: Dict[UUID, List[dict]],
+        top_k: int,
+    ) -> List[dict]:
+        """
+        Merge per-document results into one global ranking.
+
+        Per-document RRF scores are not comparable across documents, so hybrid
+        results are re-fused with RRF over the global cosine and BM25 orders.
+        Vector-only results are ranked by cosine similarity directly.
+        """
+        all_chunks = [chunk for chunks in per_document.values() for chunk in chunks]
+
+        if not self.config.hybrid_search_enabled:
+            return sorted(all_chunks, key=lambda c: c.get("score", 0), reverse=True)[:top_k]
+
+        vector_ranked = sorted(
+            (dict(c, score=c["vector_score"]) for c in all_chunks if "vector_score" in c),
+            key=lambda c: c["score"],
+            reverse=True,
+        )
+        bm25_ranked = sorted(
+            (dict(c, score=c["bm25_score"]) for c in all_chunks if "bm25_score" in c),
+            key=lambda c: c["score"],
+            reverse=True,
+        )
+        fused = self._reciprocal_rank_fusion(
+            vector_ranked, bm25_ranked, k=self.config.hybrid_search_rrf_k
+        )
+        return fused[:top_k]
+
     # --------------------------
     # Public interface
     # --------------------------
@@ -319,19 +481,20 @@ class RagRetrievalService(IRagRetrievalService):
         """
         # Use config defaults if not provided
         if top_k is None:
-            top_k = settings.retrieval_top_k
+            top_k = self.config.retrieval_top_k
         if min_score is None:
-            min_score = settings.retrieval_min_score
+            min_score = self.config.retrieval_min_score
         retrieval_start = time.perf_counter()
         timing_info = {"chunk_cache_hit": False}
 
         # Try chunk cache first
         if self.cache_service:
-            cache_start = time.perf_counter()
-            cached_chunks = await self.cache_service.get_chunks(
-                query_text,
-                document_id
-            )
+            with start_span("rag.cache_lookup", {"cache.name": "chunks"}) as span:
+                cached_chunks = await self.cache_service.get_chunks(
+                    query_text,
+                    document_id
+                )
+                span.set_attribute("cache.hit", bool(cached_chunks))
             if cached_chunks:
                 timing_info["chunk_cache_hit"] = True
                 timing_info["retrieval_total_ms"] = (time.perf_counter() - retrieval_start) * 1000
@@ -339,7 +502,7 @@ class RagRetrievalService(IRagRetrievalService):
                 return cached_chunks, timing_info
 
         # Use hybrid search if enabled, otherwise vector-only
-        if settings.hybrid_search_enabled:
+        if self.config.hybrid_search_enabled:
             raw_chunks, search_timing = await self._search_hybrid(
                 query_text, document_id, document_name, top_k, precomputed_embedding
             )
@@ -351,7 +514,7 @@ class RagRetrievalService(IRagRetrievalService):
 
         # Filter by relevance (only for vector-only search, not hybrid)
         # RRF scores are much smaller (0.01-0.03) than cosine similarity (0.5-1.0)
-        if settings.hybrid_search_enabled:
+        if self.config.hybrid_search_enabled:
             # For hybrid search, RRF already ranks by relevance - just take top results
             filtered_chunks = raw_chunks
             logger.info(f"[CACHE] Chunks [MISS] - Hybrid search returned {len(raw_chunks)} chunks (RRF-ranked, no min_score filter)")
@@ -362,14 +525,124 @@ class RagRetrievalService(IRagRetrievalService):
 
         # Cache results
         if self.cache_service and filtered_chunks:
-            await self.cache_service.set_chunks(
-                query_text,
-                document_id,
-                filtered_chunks
-            )
+            with start_span("rag.cache_write", {"cache.name": "chunks"}):
+                await self.cache_service.set_chunks(
+                    query_text,
+                    document_id,
+                    filtered_chunks
+                )
             logger.info(f"[CACHE] Chunks stored in Redis (TTL: 1h)")
 
         timing_info["retrieval_total_ms"] = (time.perf_counter() - retrieval_start) * 1000
         logger.info(f"[TIMING] Retrieval total: {timing_info['retrieval_total_ms']:.2f}ms")
 
         return filtered_chunks, timing_info
+
+    async def retrieve_similar_chunks_multi(
+        self,
+        query_text: str,
+        documents: List[tuple[UUID, str]],
+        top_k: int = None,
+        min_score: float = None,
+        precomputed_embedding: Optional[List[float]] = None
+    ) -> tuple[List[dict], dict]:
+        """
+        Retrieve chunks across several documents (e.g. a trial's protocol,
+        amendments and ICF) and fuse them into one global ranking.
+        Returns (chunks, timing_info).
+
+        The query is embedded once. Per-document chunk cache entries are reused,
+        and all cache misses are searched together in one vector and one BM25
+        query. Fresh per-document results are written back to the chunk cache
+        so later single-document queries hit it too.
+
+        Args:
+            documents: (document_id, document_name) pairs.
+            precomputed_embedding: If provided, skip embedding generation.
+        """
+        if top_k is None:
+            top_k = self.config.retrieval_top_k
+        if min_score is None:
+            min_score = self.config.retrieval_min_score
+        retrieval_start = time.perf_counter()
+        timing_info = {
+            "document_count": len(documents),
+            "chunk_cache_hits": 0,
+            "chunk_cache_hit": False,
+        }
+
+        names: Dict[UUID, str] = dict(documents)
+        per_document: Dict[UUID, List[dict]] = {}
+
+        # 1. Per-document chunk cache
+        if self.cache_service:
+            with start_span("rag.cache_lookup", {"cache.name": "chunks"}) as span:
+                cached_lists = await asyncio.gather(*[
+                    self.cache_service.get_chunks(query_text, doc_id) for doc_id in names
+                ])
+                for doc_id, cached in zip(names, cached_lists):
+                    if cached:
+                        per_document[doc_id] = cached
+                span.set_attributes({
+                    "cache.hit": len(per_document) == len(names),
+                    "rag.document_count": len(names),
+                    "cache.hit_count": len(per_document),
+                })
+        timing_info["chunk_cache_hits"] = len(per_document)
+        timing_info["chunk_cache_hit"] = len(per_document) == len(names)
+
+        missing = {doc_id: name for doc_id, name in names.items() if doc_id not in per_document}
+
+        # 2. One batched search for every cache miss
+        if missing:
+            if precomputed_embedding is not None:
+                query_vector = precomputed_embedding
+                timing_info["embedding_ms"] = 0.0
+            else:
+                query_vector, embed_timing = await self.get_query_embedding(query_text)
+                timing_info.update(embed_timing)
+
+            db_start = time.perf_counter()
+            search_attributes = {"db.system": "postgresql", "rag.top_k": top_k, "rag.document_count": len(missing)}
+            with start_span("rag.vector_search", search_attributes) as span:
+                vector_results = await self._search_similar_chunks_multi(query_vector, missing, top_k)
+                span.set_attribute("rag.chunk_count", sum(len(c) for c in vector_results.values()))
+            bm25_results = {}
+            if self.config.hybrid_search_enabled:
+                with start_span("rag.bm25", search_attributes) as span:
+                    bm25_results = await self._search_bm25_multi(query_text, missing, top_k)
+                    span.set_attribute("rag.chunk_count", sum(len(c) for c in bm25_results.values()))
+            timing_info["db_search_ms"] = (time.perf_counter() - db_start) * 1000
+            logger.info(
+                f"[TIMING] Multi-document search over {len(missing)} documents: "
+                f"{timing_info['db_search_ms']:.2f}ms"
+            )
+
+            for doc_id in missing:
+                if self.config.hybrid_search_enabled:
+                    chunks = self._reciprocal_rank_fusion(
+                        vector_results.get(doc_id, []),
+                        bm25_results.get(doc_id, []),
+                        k=self.config.hybrid_search_rrf_k,
+                    )[:top_k]
+                else:
+                    chunks = [d for d in vector_results.get(doc_id, []) if d["score"] >= min_score]
+                per_document[doc_id] = chunks
+
+                if self.cache_service and chunks:
+                    with start_span("rag.cache_write", {"cache.name": "chunks"}):
+                        await self.cache_service.set_chunks(query_text, doc_id, chunks)
+
+        # 3. Global fusion
+        with start_span("rag.rrf", {"rag.document_count": len(names)}) as span:
+            fused = self._fuse_across_documents(per_document, top_k)
+            span.set_attribute("rag.chunk_count", len(fused))
+        timing_info["fused_count"] = len(fused)
+        timing_info["retrieval_total_ms"] = (time.perf_counter() - retrieval_start) * 1000
+        logger.info(
+            f"[TIMING] Multi-document retrieval: {len(names)} documents "
+            f"({timing_info['chunk_cache_hits']} cached) -> {len(fused)} chunks "
+            f"in {timing_info['retrieval_total_ms']:.2f}ms"
+        )
+
+        return fused, timing_info
@@ -0,0 +1,130 @@
+"""
+Pre-render highlighted pages for the sources cited in a RAG answer.
+
+Runs in the background after the answer is returned, writing into the same
+Redis keys PDFHighlightService reads, so the user's first click on a
+citation is a cache hit.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.models.documents import Document
+from app.services.highlighting.pdf_highlight_service import PDFHighlightService
+from app.services.storage.base import StorageService
+
+logger = logging.getLogger(__name__)
+
+
+class HighlightPrerenderService:
+    """
+    Resolves document URLs for cited sources and renders their highlighted
+    pages with bounded concurrency. Failures are logged, never raised.
+    """
+
+    def __init__(
+        self,
+        highlight_service: PDFHighlightService,
+        storage: StorageService,
+        session_factory,
+    ):
+        self.highlight_service = highlight_service
+        self.storage = storage
+        self.session_factory = session_factory
+        self.settings = get_settings()
+
+    async def _resolve_urls(self, document_ids: List[UUID]) -> Dict[UUID, str]:
+        """Return fetchable URLs (signed for GCS paths) keyed by document id."""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(Document.id, Document.document_url).where(Document.id.in_(document_ids))
+            )
+            rows = result.all()
+
+        urls: Dict[UUID, str] = {}
+        for row in rows:
+            if not row.document_url:
+                continue
+            if row.document_url.startswith(("http://", "https://")):
+                urls[row.id] = row.document_url
+            else:
+                signed = await self.storage.sign_url(
+                    self.settings.gcs_bucket_trial_documents,
+                    row.document_url,
+                )
+                urls[row.id] = signed.url
+        return urls
+
+    @staticmethod
+    def _source_field(source, name: str):
+        return source.get(name) if isinstance(source, dict) else getattr(source, name, None)
+
+    def _plan(
+        self,
+        documents: List[tuple[UUID, str]],
+        urls: Dict[UUID, str],
+        sources: list,
+    ) -> List[tuple[str, int, list]]:
+        """Map cited sources to unique (url, page, bboxes) render jobs."""
+        url_by_name = {name: urls[doc_id] for doc_id, name in documents if doc_id in urls}
+        single_url: Optional[str] = next(iter(urls.values())) if len(urls) == 1 else None
+
+        jobs: List[tuple[str, int, list]] = []
+        seen = set()
+        for source in sources:
+            page = self._source_field(source, "page")
+            bboxes = self._source_field(source, "bboxes") or []
+            url = url_by_name.get(self._source_field(source, "name")) or single_url
+            if not url or not page or not bboxes:
+                continue
+            key = PDFHighlightService.cache_key(url, page, bboxes)
+            if key in seen:
+                continue
+            seen.add(key)
+            jobs.append((url, page, bboxes))
+            if len(jobs) >= self.settings.highlight_prerender_max_sources:
+                break
+        return jobs
+
+    async def prerender_for_answer(
+        self,
+        documents: List[tuple[UUID, str]],
+        sources: list,
+    ) -> int:
+        """
+        Render highlighted pages for the answer's sources.
+
+        Args:
+            documents: (document_id, document_name) pairs the answer was drawn from.
+            sources: RagSource models or dicts from the structured response.
+
+        Returns: number of pages rendered (or already cached).
+        """
+        if not sources:
+            return 0
+
+        try:
+            urls = await self._resolve_urls([doc_id for doc_id, _ in documents])
+        except Exception as e:
+            logger.warning(f"[PRERENDER] Could not resolve document URLs: {e}")
+            return 0
+
+        jobs = self._plan(documents, urls, sources)
+        semaphore = asyncio.Semaphore(self.settings.highlight_prerender_concurrency)
+
+        async def render(url: str, page: int, bboxes: list) -> bool:
+            async with semaphore:
+                try:
+                    await self.highlight_service.get_highlighted_pdf(url, page, bboxes)
+                    return True
+                except Exception as e:
+                    logger.warning(f"[PRERENDER] Page {page} failed: {e}")
+                    return False
+
+        rendered = sum(await asyncio.gather(*[render(*job) for job in jobs]))
+        logger.info(f"[PRERENDER] Rendered {rendered}/{len(jobs)} cited pages")
+        return rendered
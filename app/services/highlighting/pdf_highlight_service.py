@@ -1,60 +1,132 @@
-import fitz, httpx, hashlib, json
+import httpx, hashlib, json, time
+from calendar import timegm
+from urllib.parse import parse_qsl, urlsplit
 
 from fastapi import HTTPException
 from app.services.highlighting.interfaces.pdf_highlight_service import IPDFHightlightService
+from app.services.highlighting.pdf_source_cache import (
+    PdfSourceCache,
+    get_pdf_source_cache,
+    normalize_document_url,
+)
+from app.services.utils.threading import run_in_thread
+
+
+def url_expires_at(url: str) -> float | None:
+    """Expiry of a signed URL (GCS V4/V2 or S3 style) as a Unix time, if it has one."""
+    params = {k.lower(): v for k, v in parse_qsl(urlsplit(url).query)}
+    try:
+        if "x-goog-date" in params or "x-amz-date" in params:
+            signed_at = params.get("x-goog-date") or params["x-amz-date"]
+            lifetime = params.get("x-goog-expires") or params["x-amz-expires"]
+            return timegm(time.strptime(signed_at, "%Y%m%dT%H%M%SZ")) + int(lifetime)
+        if "expires" in params:
+            return float(params["expires"])
+    except (KeyError, ValueError):
+        return 0.0  # Malformed signature parameters: treat as expired
+    return None
 
-class PDFHighlightService(IPDFHightlightService):
-    def __init__(self, redis):
-        self.redis = redis
-        
-
-    async def _get_pdf_from_url(self, url: str) -> fitz.Document:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            pdf_bytes = resp.content
-            # Open PDF from bytes
-            pdf_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            return pdf_doc
-        
 
-    async def get_highlighted_pdf(
-    self,
-    doc_url: str,
-    page: int,
-    bboxes: list[list[float]],
-    ) -> bytes:
-        
+class PDFHighlightService(IPDFHightlightService):
+    TTL_HIGHLIGHT = 3600
+    TTL_URL_CHECK = 300  # Longest a verified URL is trusted without re-checking
 
-        # 1️⃣ Build deterministic cache key
+    def __init__(self, redis, source_cache: PdfSourceCache | None = None):
+        self.redis = redis
+        self.source_cache = source_cache or get_pdf_source_cache()
+
+    @staticmethod
+    def cache_key(doc_url: str, page: int, bboxes: list[list[float]]) -> str:
+        """
+        Deterministic Redis key for a highlighted page.
+        Signed URLs are normalized so every signature of a blob shares entries.
+        """
+        # Coerce to floats so [[1, 2, 3, 4]] from the FE and [[1.0, ...]] from
+        # RagSource hash identically
+        normalized = [[float(x) for x in bbox] for bbox in bboxes if bbox]
         bboxes_hash = hashlib.sha1(
-            json.dumps(bboxes, sort_keys=True).encode()
+            json.dumps(normalized, sort_keys=True).encode()
         ).hexdigest()[:10]
+        url_hash = hashlib.sha1(normalize_document_url(doc_url).encode()).hexdigest()[:10]
+        return f"pdf_hl:{url_hash}:p{page}:{bboxes_hash}"
+
+    @staticmethod
+    async def _probe_url(url: str) -> int:
+        """
+        Status of a one-byte ranged GET. Signed URLs are method-specific, so
+        a GET-signed URL can't be checked with HEAD.
+        """
+        async with httpx.AsyncClient(follow_redirects=True) as client:
+            async with client.stream("GET", url, headers={"Range": "bytes=0-0"}) as resp:
+                return resp.status_code
+
+    async def verify_url(self, url: str) -> None:
+        """
+        Check that url itself grants access to the document.
+
+        Rendered pages and source bytes are cached under the URL without its
+        signature, so a cache hit alone says nothing about the caller's URL.
+        Successful checks are remembered per exact URL, at most until it
+        expires. Raises 403 for expired or rejected URLs.
+        """
+        expires_at = url_expires_at(url)
+        ttl = self.TTL_URL_CHECK
+        if expires_at is not None:
+            ttl = min(ttl, int(expires_at - time.time()))
+            if ttl <= 0:
+                raise HTTPException(status_code=403, detail="Document URL has expired")
+
+        check_key = f"pdf_hl_url:{hashlib.sha256(url.encode()).hexdigest()}"
+        if self.redis and await self.redis.get(check_key):
+            return
 
-        cache_key = (
-            f"pdf_hl:{hashlib.sha1(doc_url.encode()).hexdigest()[:10]}"
-            f":p{page}:{bboxes_hash}"
-        )
+        try:
+            status = await self._probe_url(url)
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"Could not reach document URL: {e}")
+        if status >= 400:
+            raise HTTPException(status_code=403, detail="Document URL was rejected by storage")
 
-        # 2️⃣ Redis cache
-        cached = await self.redis.get(cache_key)
-        if cached:
-            return cached
+        if self.redis:
+            await self.redis.set(check_key, b"1", ex=ttl)
 
-        # 3️⃣ Load PDF
-        doc_pdf = await self._get_pdf_from_url(doc_url)
+    async def _download_pdf(self, url: str) -> bytes:
+        async with httpx.AsyncClient() as client:
+            resp = await client.get(url)
+            resp.raise_for_status()
+            return resp.content
+
+    async def _get_pdf_bytes(self, url: str) -> bytes:
+        return await self.source_cache.get_or_fetch(url, self._download_pdf)
 
+    @staticmethod
+    def _render_highlighted_page(
+        pdf_bytes: bytes,
+        page: int,
+        bboxes: list[list[float]],
+    ) -> bytes:
+        """
+        Copy the requested page into a one-page PDF and highlight it.
+        Blocking PyMuPDF work; run off the event loop.
+        """
+        import fitz  # PyMuPDF; loaded on first render, not at startup
+
+        src = fitz.open(stream=pdf_bytes, filetype="pdf")
+        out = fitz.open()
         try:
-            if page < 1 or page > len(doc_pdf):
+            if page < 1 or page > len(src):
                 raise ValueError(f"Page {page} out of range")
+            if not bboxes:
+                raise ValueError("No bboxes provided for highlighting")
 
-            page_obj = doc_pdf[page - 1]
+            out.insert_pdf(src, from_page=page - 1, to_page=page - 1)
+            page_obj = out[0]
             page_height = page_obj.rect.height
 
-            if not bboxes:
-                raise ValueError("No bboxes provided for highlighting")
+            # Text blocks are the same for every bbox on the page
+            block_rects = [fitz.Rect(b[:4]) for b in page_obj.get_text("blocks")]
 
-            # 4️⃣ Highlight ALL bboxes
+            # Highlight ALL bboxes
             for bbox in bboxes:
                 if not bbox or len(bbox) != 4:
                     continue
@@ -77,12 +149,7 @@ class PDFHighlightService(IPDFHightlightService):
                     continue
 
                 # Smart highlight: expand to text blocks if overlapping
-                blocks = page_obj.get_text("blocks")
-                intersecting_blocks = [
-                    fitz.Rect(b[:4])
-                    for b in blocks
-                    if target_rect.intersects(fitz.Rect(b[:4]))
-                ]
+                intersecting_blocks = [r for r in block_rects if target_rect.intersects(r)]
 
                 if intersecting_blocks:
                     for block_rect in intersecting_blocks:
@@ -92,11 +159,46 @@ class PDFHighlightService(IPDFHightlightService):
                     annot = page_obj.add_highlight_annot(target_rect)
                     annot.update()
 
-            # 5️⃣ Serialize and cache
-            pdf_bytes = doc_pdf.tobytes(garbage=3, clean=True, deflate=True)
-            await self.redis.set(cache_key, pdf_bytes, ex=3600)
+            return out.tobytes(garbage=3, deflate=True)
+        finally:
+            out.close()
+            src.close()
+
+    async def get_highlighted_pdf(
+    self,
+    doc_url: str,
+    page: int,
+    bboxes: list[list[float]],
+    ) -> bytes:
+        """
+        Return a one-page PDF containing the requested page with highlights.
+        """
+        # 0️⃣ The caller's URL must be valid before anything cached is served
+        await self.verify_url(doc_url)
+
+        # 1️⃣ Build deterministic cache key
+        cache_key = self.cache_key(doc_url, page, bboxes)
+
+        # 2️⃣ Redis cache
+        if self.redis:
+            cached = await self.redis.get(cache_key)
+            if cached:
+                return cached
 
-            return pdf_bytes
+        try:
+            # 3️⃣ Load source PDF (memory/disk LRU, downloads on miss)
+            pdf_bytes = await self._get_pdf_bytes(doc_url)
+
+            # 4️⃣ Extract + highlight the single page in a worker thread
+            highlighted = await run_in_thread(
+                self._render_highlighted_page, pdf_bytes, page, bboxes
+            )
+
+            # 5️⃣ Cache
+            if self.redis:
+                await self.redis.set(cache_key, highlighted, ex=self.TTL_HIGHLIGHT)
+
+            return highlighted
 
         except Exception as e:
             import traceback
@@ -105,6 +207,3 @@ class PDFHighlightService(IPDFHightlightService):
                 status_code=500,
                 detail=f"Error generating highlighted PDF: {str(e)}"
             )
-
-        finally:
-            doc_pdf.close()
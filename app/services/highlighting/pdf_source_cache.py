@@ -0,0 +1,149 @@
+"""
+LRU cache of source PDF bytes for highlighting.
+
+Signed storage URLs change on every request, so entries are keyed by the
+URL with its signature parameters removed. Entries live in memory, backed by
+the shared on-disk document cache (see app/services/storage/document_cache.py)
+that ingestion reads from too. The disk tier revalidates each document with
+its origin, and a memory entry is only used while it matches the file the
+disk tier handed out.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import get_settings
+from app.services.storage.document_cache import (
+    DocumentCache,
+    get_document_cache,
+    normalize_document_url,
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class PdfSourceCache:
+    """
+    Size-bounded LRU of PDF bytes with an optional on-disk tier.
+
+    Concurrent misses for the same document share a single download. The disk
+    tier is a DocumentCache: pass the shared one, or a cache_dir for a private one.
+    With a disk tier documents are downloaded (and revalidated) by it;
+    ``fetch`` is only used without one.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int,
+        cache_dir: str = "",
+        max_disk_bytes: int = 0,
+        disk: Optional[DocumentCache] = None,
+    ):
+        self.max_memory_bytes = max_memory_bytes
+        self.disk = disk or (DocumentCache(cache_dir, max_disk_bytes) if cache_dir else None)
+        self._entries: "OrderedDict[str, Tuple[Any, bytes]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(normalize_document_url(url).encode()).hexdigest()
+
+    # --------------------------
+    # Memory tier
+    # --------------------------
+    def _get_memory(self, key: str, version: Any = None) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _put_memory(self, key: str, data: bytes, version: Any = None) -> None:
+        if key in self._entries:
+            self._memory_bytes -= len(self._entries.pop(key)[1])
+        if len(data) > self.max_memory_bytes:
+            return
+        self._entries[key] = (version, data)
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes and self._entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    @staticmethod
+    def _file_version(path: str) -> Tuple[int, int, int]:
+        stat = os.stat(path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    async def _read_disk(self, key: str, url: str) -> bytes:
+        async with self.disk.local_copy(url) as path:
+            version = self._file_version(path)
+            data = self._get_memory(key, version)
+            if data is not None:
+                logger.info("[PDF_CACHE] Source [HIT] memory")
+                return data
+            data = await asyncio.to_thread(Path(path).read_bytes)
+            self._put_memory(key, data, version)
+            return data
+
+    # --------------------------
+    # Public interface
+    # --------------------------
+    async def get_or_fetch(
+        self,
+        url: str,
+        fetch: Callable[[str], Awaitable[bytes]],
+    ) -> bytes:
+        """
+        Return current PDF bytes for url: through the disk tier when there
+        is one, else from memory or via fetch on a miss.
+        """
+        key = self._key(url)
+
+        if self.disk is None:
+            data = self._get_memory(key)
+            if data is not None:
+                logger.info("[PDF_CACHE] Source [HIT] memory")
+                return data
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            if self.disk is not None:
+                data = await self._read_disk(key, url)
+            else:
+                logger.info("[PDF_CACHE] Source [MISS] downloading")
+                data = await fetch(url)
+                self._put_memory(key, data)
+            future.set_result(data)
+            return data
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure is not logged as "never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+
+_pdf_source_cache: Optional[PdfSourceCache] = None
+
+
+def get_pdf_source_cache() -> PdfSourceCache:
+    """Return the process-wide source PDF cache."""
+    global _pdf_source_cache
+    if _pdf_source_cache is None:
+        _pdf_source_cache = PdfSourceCache(
+            max_memory_bytes=settings.pdf_source_cache_memory_mb * 1024 * 1024,
+            disk=get_document_cache(),
+        )
+    return _pdf_source_cache
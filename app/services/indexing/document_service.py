@@ -11,10 +11,9 @@ import requests
 from langchain_core.documents import Document
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 
 from app.contracts.document import DocumentResponse
-from app.core.openai import embedding_client
+from app.core.openai import get_embedding_client
 from app.core.storage import StorageProvider
 from app.db.session import engine
 from app.models.base import Base
@@ -24,19 +23,13 @@ from app.services.interfaces.document_service import IDocumentService
 from app.services.utils.chunking import chunk_text
 from app.services.utils.semantic_chunking import chunk_text_semantic
 from app.services.utils.preprocessing import preprocess_text
-
-from docling.chunking import HybridChunker
-from langchain_docling import DoclingLoader
-from transformers import AutoTokenizer
-from langchain_docling.loader import ExportType
+from app.services.utils.tokenizer import get_tokenizer
 
 # Import your utils
 # from .utils.chunking import chunk_documents
 
 LLM_MODEL_NAME = "gpt-4o-mini"
 
-TOKENIZER_MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2" 
-tokenizer = AutoTokenizer.from_pretrained(TOKENIZER_MODEL_ID)
 
 class DocumentService(IDocumentService):
     """
@@ -49,7 +42,7 @@ class DocumentService(IDocumentService):
     ):
         self.db = db
         self.storage_provider = storage_provider
-        self.embedding_client = embedding_client
+        self.embedding_client = get_embedding_client()
     
     async def parse_pdf(self, document_url: str) -> str:
         """
@@ -337,13 +330,15 @@ class DocumentService(IDocumentService):
         print("\n Ingesion starts here \n")
         print("****************************************")
         try:
-            
+            # Docling pulls in torch; import on first ingestion only
+            from docling.chunking import HybridChunker
+            from langchain_docling.loader import DoclingLoader, ExportType
 
             # 1. Load and chunk with Docling + HybridChunker
             loader = DoclingLoader(
                 file_path=document_url,
                 export_type=ExportType.DOC_CHUNKS,
-                chunker=HybridChunker(tokenizer=tokenizer, chunk_size=chunk_size),
+                chunker=HybridChunker(tokenizer=get_tokenizer(), chunk_size=chunk_size),
             )
             docs = loader.load()  # list of Document objects
 
@@ -7,9 +7,20 @@ from app.services.jobs.job_status_service import (
     JobProgress,
     JobStatusService,
 )
+from app.services.jobs.batch_job_service import BatchJobService, BatchProgress
+from app.services.jobs.ingestion_scheduler import (
+    EmbeddingBatcher,
+    IngestionScheduler,
+    get_ingestion_scheduler,
+)
 
 __all__ = [
     "JobStatus",
     "JobProgress",
     "JobStatusService",
+    "BatchJobService",
+    "BatchProgress",
+    "EmbeddingBatcher",
+    "IngestionScheduler",
+    "get_ingestion_scheduler",
 ]
@@ -0,0 +1,151 @@
+"""
+Batch job service: a parent job over one child job per document.
+
+Children are ordinary JobStatusService jobs (their own hash, events and
+status endpoints); the batch only records which children it owns, and its
+progress is aggregated from them on read.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel
+from redis.asyncio import Redis
+
+from app.services.jobs.job_status_service import JobProgress, JobStatus, JobStatusService
+
+logger = logging.getLogger(__name__)
+
+
+class BatchProgress(BaseModel):
+    """Aggregate state of a batch, derived from its child jobs."""
+    batch_id: str
+    status: str  # queued, processing, complete, partial (some failed), error (all failed)
+    total: int
+    queued: int = 0
+    processing: int = 0
+    complete: int = 0
+    failed: int = 0
+    progress_percent: int = 0
+    created_at: str
+    finished_at: Optional[str] = None
+    jobs: List[JobProgress] = []
+
+
+class BatchJobService:
+    """
+    Tracks batch uploads in Redis.
+
+    Key Pattern: batch:{batch_id} (hash: batch_id, job_ids JSON list, created_at, finished_at)
+    TTL: kept alive with the children while the batch runs, then TTL_COMPLETE.
+    """
+
+    PREFIX = "batch"
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self.jobs = JobStatusService(redis)
+
+    def _key(self, batch_id: str) -> str:
+        return f"{self.PREFIX}:{batch_id}"
+
+    async def create_batch(self, document_ids: List[UUID]) -> Tuple[str, List[str]]:
+        """
+        Create the batch and one queued child job per document.
+        Returns (batch_id, job_ids) with job_ids in document order.
+        """
+        batch_id = str(uuid4())
+        job_ids = await self.jobs.create_jobs(document_ids)
+
+        key = self._key(batch_id)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(key, mapping={
+            "batch_id": batch_id,
+            "job_ids": json.dumps(job_ids),
+            "created_at": datetime.utcnow().isoformat(),
+        })
+        pipe.expire(key, JobStatusService.TTL_ACTIVE)
+        await pipe.execute()
+
+        logger.info(f"Created batch {batch_id} with {len(job_ids)} jobs")
+        return batch_id, job_ids
+
+    async def _job_ids(self, batch_id: str) -> Optional[List[str]]:
+        raw = await self.redis.hget(self._key(batch_id), "job_ids")
+        return json.loads(raw) if raw else None
+
+    async def refresh(self, batch_id: str) -> None:
+        """
+        Extend the TTL of the batch and its children.
+        Children queued behind a long batch would otherwise expire before starting.
+        """
+        job_ids = await self._job_ids(batch_id) or []
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.expire(self._key(batch_id), JobStatusService.TTL_ACTIVE)
+        for job_id in job_ids:
+            pipe.expire(self.jobs._key(job_id), JobStatusService.TTL_ACTIVE)
+        await pipe.execute()
+
+    async def finish(self, batch_id: str) -> None:
+        """Record the end of the batch; its children already hold their results."""
+        key = self._key(batch_id)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(key, mapping={"finished_at": datetime.utcnow().isoformat()})
+        pipe.expire(key, JobStatusService.TTL_COMPLETE)
+        await pipe.execute()
+
+    async def get_batch(self, batch_id: str) -> Optional[BatchProgress]:
+        """
+        Get batch progress by ID, aggregated from its child jobs.
+        """
+        data = await self.redis.hgetall(self._key(batch_id))
+        if not data:
+            return None
+        fields = {
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in data.items()
+        }
+        job_ids = json.loads(fields["job_ids"])
+        jobs = [job for job in await self.jobs.get_jobs(job_ids) if job is not None]
+
+        counts = {status: 0 for status in JobStatus}
+        for job in jobs:
+            counts[job.status] += 1
+        total = len(job_ids)
+        done = counts[JobStatus.COMPLETE] + counts[JobStatus.ERROR]
+        # Expired children can only have finished; count them as done
+        missing = total - len(jobs)
+
+        if done + missing == total:
+            if counts[JobStatus.ERROR] + missing == 0:
+                status = "complete"
+            elif counts[JobStatus.COMPLETE] == 0:
+                status = "error"
+            else:
+                status = "partial"
+        elif counts[JobStatus.QUEUED] == total:
+            status = "queued"
+        else:
+            status = "processing"
+
+        # Failed and expired children contribute 100%: nothing is left to do for them
+        percent = sum(
+            100 if job.status == JobStatus.ERROR else job.progress_percent for job in jobs
+        ) + 100 * missing
+
+        return BatchProgress(
+            batch_id=batch_id,
+            status=status,
+            total=total,
+            queued=counts[JobStatus.QUEUED],
+            processing=counts[JobStatus.PROCESSING],
+            complete=counts[JobStatus.COMPLETE],
+            failed=counts[JobStatus.ERROR],
+            progress_percent=percent // total if total else 100,
+            created_at=fields.get("created_at", ""),
+            finished_at=fields.get("finished_at") or None,
+            jobs=jobs,
+        )
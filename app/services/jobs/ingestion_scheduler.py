@@ -0,0 +1,210 @@
+"""
+Shared scheduling for PDF ingestion.
+
+IngestionScheduler caps how many documents this process ingests at once and
+hands free slots to waiting groups round-robin, so a 200-document trial
+onboarding can't starve a single upload queued behind it, nor a stream of
+single uploads starve the onboarding.
+
+EmbeddingBatcher coalesces the embedding calls of documents ingested together
+into full-size requests, so many small documents share one round-trip instead
+of each sending a half-empty batch.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from functools import lru_cache
+from typing import Awaitable, Callable, Deque, Dict, List, Sequence, Set, Tuple
+
+from app.config import get_settings
+from app.core.metrics import INGESTION_EMBEDDING_BATCH_INPUTS, INGESTION_SLOTS_WAITING
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+Embed = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+class IngestionScheduler:
+    """
+    Bounded, fair concurrency for ingestion jobs.
+
+    Jobs are queued per group (a batch, or a single upload). Whenever a slot
+    frees up the next group in rotation starts its oldest job, so groups
+    progress evenly regardless of size: a newly queued upload waits for one
+    job per group ahead of it, not for whole batches, and joins the back of
+    the rotation so new groups can't keep bypassing old ones.
+    """
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max(1, max_concurrent)
+        self._groups: Dict[str, Deque[Tuple[Job, asyncio.Future]]] = {}
+        self._running = 0
+        self._tasks: Set[asyncio.Future] = set()  # Strong refs; the loop keeps only weak ones
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._groups.values())
+
+    async def run(self, group: str, jobs: Sequence[Job]) -> List[BaseException]:
+        """
+        Queue jobs under group and wait until all have finished.
+        Returns the exceptions raised by failed jobs; other jobs keep running.
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._groups.get(group)
+        if queue is None:
+            # A new group waits for its turn like everyone else
+            queue = deque()
+            self._groups[group] = queue
+        futures = []
+        for job in jobs:
+            future = loop.create_future()
+            queue.append((job, future))
+            futures.append(future)
+        INGESTION_SLOTS_WAITING.inc(len(futures))
+        self._fill()
+
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        return [r for r in results if isinstance(r, BaseException)]
+
+    def _fill(self) -> None:
+        while self._running < self.max_concurrent and self._groups:
+            # Take from the group at the front, then move it to the back
+            group = next(iter(self._groups))
+            queue = self._groups.pop(group)
+            job, future = queue.popleft()
+            if queue:
+                self._groups[group] = queue
+
+            INGESTION_SLOTS_WAITING.dec()
+            self._running += 1
+            task = asyncio.ensure_future(job())
+            self._tasks.add(task)
+            task.add_done_callback(lambda t, f=future: self._done(t, f))
+
+    def _done(self, task: asyncio.Future, future: asyncio.Future) -> None:
+        self._tasks.discard(task)
+        self._running -= 1
+        if not future.done():
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(None)
+        self._fill()
+
+
+@lru_cache(maxsize=None)
+def get_ingestion_scheduler() -> IngestionScheduler:
+    """Process-wide scheduler shared by single and batch uploads."""
+    return IngestionScheduler(get_settings().ingestion_max_concurrent_documents)
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embed() calls into requests of up to max_batch_size
+    inputs, with at most max_concurrency requests in flight.
+
+    A request that finds a free connection waits max_wait seconds for other
+    documents' chunks before sending a partial batch; while all connections
+    are busy, chunks simply accumulate into the next batch.
+    """
+
+    def __init__(
+        self,
+        embed: Embed,
+        max_batch_size: int,
+        max_wait: float,
+        max_concurrency: int,
+    ):
+        self._embed = embed
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._slots = asyncio.Semaphore(max(1, max_concurrency))
+        self._pending: Deque[Tuple[List[str], asyncio.Future]] = deque()
+        self._pending_inputs = 0
+        self._dispatcher = None
+        self._requests: Set[asyncio.Future] = set()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts; results are in input order."""
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        futures = []
+        for start in range(0, len(texts), self.max_batch_size):
+            part = texts[start:start + self.max_batch_size]
+            future = loop.create_future()
+            self._pending.append((part, future))
+            self._pending_inputs += len(part)
+            futures.append(future)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+        parts = await asyncio.gather(*futures)
+        return [vector for part in parts for vector in part]
+
+    async def _dispatch(self) -> None:
+        while self._pending:
+            await self._slots.acquire()
+            if self._pending_inputs < self.max_batch_size and self.max_wait > 0:
+                await asyncio.sleep(self.max_wait)
+
+            batch: List[Tuple[List[str], asyncio.Future]] = []
+            size = 0
+            while self._pending and size + len(self._pending[0][0]) <= self.max_batch_size:
+                part, future = self._pending.popleft()
+                batch.append((part, future))
+                size += len(part)
+            self._pending_inputs -= size
+            request = asyncio.ensure_future(self._send(batch))
+            self._requests.add(request)
+            request.add_done_callback(self._requests.discard)
+
+    async def _send(self, batch: List[Tuple[List[str], asyncio.Future]]) -> None:
+        try:
+            texts = [text for part, _ in batch for text in part]
+            INGESTION_EMBEDDING_BATCH_INPUTS.observe(len(texts))
+            try:
+                vectors = await self._embed(texts)
+            except Exception as e:
+                logger.warning(f"Embedding batch of {len(texts)} inputs failed: {e}")
+                if len(batch) == 1:
+                    _, future = batch[0]
+                    if not future.done():
+                        future.set_exception(e)
+                    return
+                # One document's input (or a transient error) must not fail the
+                # others it was coalesced with: retry each part on its own
+                for part, future in batch:
+                    await self._send_part(part, future)
+                return
+
+            offset = 0
+            for part, future in batch:
+                if not future.done():
+                    future.set_result(vectors[offset:offset + len(part)])
+                offset += len(part)
+        finally:
+            self._slots.release()
+
+    async def _send_part(self, part: List[str], future: asyncio.Future) -> None:
+        """Embed a single caller's part, settling its future either way."""
+        if future.done():
+            return
+        try:
+            vectors = await self._embed(part)
+        except Exception as e:
+            logger.warning(f"Embedding {len(part)} inputs failed: {e}")
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(vectors)
@@ -1,17 +1,29 @@
 """
 Job status service for tracking background tasks.
-Uses Redis for fast status updates and polling.
+
+Job state lives in a Redis hash; every write is one MULTI transaction of
+field updates plus a PUBLISH on the job's event channel, so updates never
+read-modify-write and subscribers (GET /upload/events/{job_id}) see each
+change as it happens.
 """
 
 import json
 import logging
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Dict, List, Optional, Union
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel
 from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from app.core.metrics import (
+    INGESTION_JOB_SECONDS,
+    INGESTION_JOBS,
+    INGESTION_JOBS_IN_PROGRESS,
+    INGESTION_STAGE_SECONDS,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -25,6 +37,9 @@ class JobStatus(str, Enum):
     ERROR = "error"
 
 
+TERMINAL_STATUSES = {JobStatus.COMPLETE.value, JobStatus.ERROR.value}
+
+
 class JobProgress(BaseModel):
     """Job progress data stored in Redis."""
     job_id: str
@@ -38,16 +53,27 @@ class JobProgress(BaseModel):
     created_at: str
     updated_at: str
 
+    @property
+    def is_finished(self) -> bool:
+        return self.status.value in TERMINAL_STATUSES
+
+
+def _decode(value: Union[bytes, str]) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
 
 class JobStatusService:
     """
     Service for tracking background job status in Redis.
 
-    Key Pattern: job:{job_id}
+    Key Pattern:     job:{job_id}         (hash, one field per JobProgress attribute)
+    Events:          job:{job_id}:events  (pub/sub, JSON of the changed fields)
+    Stage timings:   stage_started:{stage} fields, set once per stage (HSETNX)
     TTL: 1 hour after completion (allows client to retrieve final status)
     """
 
     PREFIX = "job"
+    STAGE_FIELD_PREFIX = "stage_started:"
     TTL_ACTIVE = 3600       # 1 hour for active jobs
     TTL_COMPLETE = 3600     # 1 hour after completion
 
@@ -58,42 +84,178 @@ class JobStatusService:
         """Generate Redis key for job."""
         return f"{self.PREFIX}:{job_id}"
 
+    @classmethod
+    def channel(cls, job_id: str) -> str:
+        """Pub/sub channel carrying the job's progress events."""
+        return f"{cls.PREFIX}:{job_id}:events"
+
+    # --------------------------
+    # Hash (de)serialisation
+    # --------------------------
+    @staticmethod
+    def _to_fields(**values) -> Dict[str, str]:
+        """Hash fields for the given JobProgress attributes (None clears to "")."""
+        fields = {}
+        for name, value in values.items():
+            if isinstance(value, Enum):
+                value = value.value
+            elif isinstance(value, dict):
+                value = json.dumps(value)
+            fields[name] = "" if value is None else str(value)
+        return fields
+
+    @classmethod
+    def _from_hash(cls, data: Dict) -> Optional[JobProgress]:
+        fields = {_decode(k): _decode(v) for k, v in data.items()}
+        if not fields.get("job_id"):
+            return None
+        return JobProgress(
+            job_id=fields["job_id"],
+            document_id=fields.get("document_id", ""),
+            status=fields.get("status", JobStatus.QUEUED.value),
+            progress_percent=int(fields.get("progress_percent") or 0),
+            current_stage=fields.get("current_stage", ""),
+            message=fields.get("message", ""),
+            result=json.loads(fields["result"]) if fields.get("result") else None,
+            error=fields.get("error") or None,
+            created_at=fields.get("created_at", ""),
+            updated_at=fields.get("updated_at", ""),
+        )
+
+    # --------------------------
+    # Metrics
+    # --------------------------
+    @staticmethod
+    def _seconds_between(start: str, end: datetime) -> float:
+        try:
+            return max(0.0, (end - datetime.fromisoformat(start)).total_seconds())
+        except ValueError:
+            return 0.0
+
+    def _record_finished(self, before: Dict, status: JobStatus, now: datetime) -> None:
+        """Observe stage and job durations from the pre-completion hash."""
+        fields = {_decode(k): _decode(v) for k, v in before.items()}
+        if fields.get("status") in TERMINAL_STATUSES:
+            return  # Already counted
+
+        stages = sorted(
+            (started, name[len(self.STAGE_FIELD_PREFIX):])
+            for name, started in fields.items()
+            if name.startswith(self.STAGE_FIELD_PREFIX)
+        )
+        for (started, stage), following in zip(stages, stages[1:] + [(now.isoformat(), None)]):
+            try:
+                ended = datetime.fromisoformat(following[0])
+            except ValueError:
+                continue
+            INGESTION_STAGE_SECONDS.labels(stage).observe(self._seconds_between(started, ended))
+
+        INGESTION_JOBS_IN_PROGRESS.dec()
+        INGESTION_JOBS.labels(status.value).inc()
+        INGESTION_JOB_SECONDS.labels(status.value).observe(
+            self._seconds_between(fields.get("created_at", ""), now)
+        )
+
+    # --------------------------
+    # Writes
+    # --------------------------
     async def create_job(self, document_id: UUID) -> str:
         """
         Create a new job and return job ID.
         """
-        job_id = str(uuid4())
-        now = datetime.utcnow().isoformat()
-
-        progress = JobProgress(
-            job_id=job_id,
-            document_id=str(document_id),
-            status=JobStatus.QUEUED,
-            progress_percent=0,
-            current_stage="queued",
-            message="Job queued for processing",
-            created_at=now,
-            updated_at=now,
-        )
+        return (await self.create_jobs([document_id]))[0]
 
-        await self.redis.set(
-            self._key(job_id),
-            progress.model_dump_json(),
-            ex=self.TTL_ACTIVE
-        )
+    async def create_jobs(self, document_ids: List[UUID]) -> List[str]:
+        """
+        Create one job per document in a single MULTI; returns job IDs in order.
+        """
+        now = datetime.utcnow().isoformat()
+        pipe = self.redis.pipeline(transaction=True)
+        job_ids = []
+        for document_id in document_ids:
+            progress = JobProgress(
+                job_id=str(uuid4()),
+                document_id=str(document_id),
+                status=JobStatus.QUEUED,
+                progress_percent=0,
+                current_stage="queued",
+                message="Job queued for processing",
+                created_at=now,
+                updated_at=now,
+            )
+            key = self._key(progress.job_id)
+            pipe.hset(key, mapping={
+                **self._to_fields(**progress.model_dump()),
+                f"{self.STAGE_FIELD_PREFIX}queued": now,
+            })
+            pipe.expire(key, self.TTL_ACTIVE)
+            pipe.publish(self.channel(progress.job_id), progress.model_dump_json())
+            job_ids.append(progress.job_id)
+        await pipe.execute()
 
-        logger.info(f"Created job {job_id} for document {document_id}")
-        return job_id
+        INGESTION_JOBS_IN_PROGRESS.inc(len(job_ids))
+        for job_id, document_id in zip(job_ids, document_ids):
+            logger.info(f"Created job {job_id} for document {document_id}")
+        return job_ids
 
-    async def get_job(self, job_id: str) -> Optional[JobProgress]:
+    async def _update(
+        self,
+        job_id: str,
+        values: dict,
+        ttl: int,
+        stage_started: Optional[str] = None,
+    ) -> Optional[Dict]:
         """
-        Get job status by ID.
+        Apply field updates and publish them in one MULTI.
+
+        The event carries only the changed fields; subscribers start from a
+        get_job() snapshot and merge. Returns the hash as it was before the
+        update, or None if the job does not exist (the stray write is undone).
         """
-        data = await self.redis.get(self._key(job_id))
-        if not data:
+        key = self._key(job_id)
+        for attempt in range(2):
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.hgetall(key)
+            pipe.hset(key, mapping=self._to_fields(**values))
+            if stage_started:
+                pipe.hsetnx(key, f"{self.STAGE_FIELD_PREFIX}{values['current_stage']}", stage_started)
+            pipe.expire(key, ttl)
+            pipe.publish(self.channel(job_id), json.dumps({"job_id": job_id, **values}))
+            try:
+                before = (await pipe.execute())[0]
+                break
+            except ResponseError as e:
+                if "WRONGTYPE" not in str(e) or attempt:
+                    raise
+                # Same legacy layout get_job falls back for: convert, then retry once
+                await self._convert_legacy(key)
+
+        if not before:
+            await self.redis.delete(key)
             return None
+        return before
+
+    async def _convert_legacy(self, key: str) -> None:
+        """Rewrite a job stored as a JSON string by a previous release as a hash."""
+        try:
+            legacy = await self.redis.get(key)
+        except ResponseError as e:
+            if "WRONGTYPE" not in str(e):
+                raise
+            return  # Already converted by a concurrent update
+        progress = None
+        if legacy:
+            try:
+                progress = JobProgress.model_validate_json(legacy)
+            except ValueError:
+                logger.warning(f"Dropping unreadable legacy job key {key}")
 
-        return JobProgress.model_validate_json(data)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(key)
+        if progress is not None:
+            pipe.hset(key, mapping=self._to_fields(**progress.model_dump()))
+            pipe.expire(key, self.TTL_ACTIVE)
+        await pipe.execute()
 
     async def update_progress(
         self,
@@ -105,22 +267,16 @@ class JobStatusService:
         """
         Update job progress during processing.
         """
-        job = await self.get_job(job_id)
-        if not job:
-            logger.warning(f"Job {job_id} not found for progress update")
-            return
-
-        job.status = JobStatus.PROCESSING
-        job.current_stage = stage
-        job.progress_percent = min(progress_percent, 99)  # Reserve 100 for complete
-        job.message = message
-        job.updated_at = datetime.utcnow().isoformat()
-
-        await self.redis.set(
-            self._key(job_id),
-            job.model_dump_json(),
-            ex=self.TTL_ACTIVE
+        now = datetime.utcnow().isoformat()
+        values = dict(
+            status=JobStatus.PROCESSING,
+            current_stage=stage,
+            progress_percent=min(progress_percent, 99),  # Reserve 100 for complete
+            message=message,
+            updated_at=now,
         )
+        if await self._update(job_id, values, self.TTL_ACTIVE, stage_started=now) is None:
+            logger.warning(f"Job {job_id} not found for progress update")
 
     async def complete_job(
         self,
@@ -130,24 +286,21 @@ class JobStatusService:
         """
         Mark job as complete with result.
         """
-        job = await self.get_job(job_id)
-        if not job:
+        now = datetime.utcnow()
+        values = dict(
+            status=JobStatus.COMPLETE,
+            progress_percent=100,
+            current_stage="complete",
+            message="Processing complete",
+            result=result,
+            updated_at=now.isoformat(),
+        )
+        before = await self._update(job_id, values, self.TTL_COMPLETE)
+        if before is None:
             logger.warning(f"Job {job_id} not found for completion")
             return
 
-        job.status = JobStatus.COMPLETE
-        job.progress_percent = 100
-        job.current_stage = "complete"
-        job.message = "Processing complete"
-        job.result = result
-        job.updated_at = datetime.utcnow().isoformat()
-
-        await self.redis.set(
-            self._key(job_id),
-            job.model_dump_json(),
-            ex=self.TTL_COMPLETE
-        )
-
+        self._record_finished(before, JobStatus.COMPLETE, now)
         logger.info(f"Job {job_id} completed successfully")
 
     async def fail_job(
@@ -158,21 +311,47 @@ class JobStatusService:
         """
         Mark job as failed with error.
         """
-        job = await self.get_job(job_id)
-        if not job:
+        now = datetime.utcnow()
+        values = dict(
+            status=JobStatus.ERROR,
+            current_stage="error",
+            message="Processing failed",
+            error=error,
+            updated_at=now.isoformat(),
+        )
+        before = await self._update(job_id, values, self.TTL_COMPLETE)
+        if before is None:
             logger.warning(f"Job {job_id} not found for failure")
             return
 
-        job.status = JobStatus.ERROR
-        job.current_stage = "error"
-        job.message = "Processing failed"
-        job.error = error
-        job.updated_at = datetime.utcnow().isoformat()
+        self._record_finished(before, JobStatus.ERROR, now)
+        logger.error(f"Job {job_id} failed: {error}")
 
-        await self.redis.set(
-            self._key(job_id),
-            job.model_dump_json(),
-            ex=self.TTL_COMPLETE
-        )
+    # --------------------------
+    # Reads
+    # --------------------------
+    async def get_job(self, job_id: str) -> Optional[JobProgress]:
+        """
+        Get job status by ID.
+        """
+        key = self._key(job_id)
+        try:
+            data = await self.redis.hgetall(key)
+        except ResponseError as e:
+            if "WRONGTYPE" not in str(e):
+                raise
+            # Written as a JSON string by a previous release; expires within TTL_COMPLETE
+            legacy = await self.redis.get(key)
+            return JobProgress.model_validate_json(legacy) if legacy else None
+        if not data:
+            return None
+        return self._from_hash(data)
 
-        logger.error(f"Job {job_id} failed: {error}")
+    async def get_jobs(self, job_ids: List[str]) -> List[Optional[JobProgress]]:
+        """
+        Get several jobs in one round-trip; None for jobs that don't exist.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.hgetall(self._key(job_id))
+        return [self._from_hash(data) if data else None for data in await pipe.execute()]
@@ -0,0 +1,90 @@
+"""
+Organization dashboard metrics.
+
+All counters are computed in one round-trip (a SELECT of scalar subqueries)
+and shared across requests via Redis. Routes that create or remove counted
+rows call invalidate_organization_metrics so the next dashboard load
+recomputes; the TTL only bounds staleness from writes made elsewhere.
+
+Cache Key Pattern:
+- Metrics: org_metrics:{organization_id}
+"""
+
+import json
+import logging
+from typing import Any, Optional
+
+from redis.asyncio import Redis
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.config import get_settings
+from app.contracts.organization import OrganizationMetrics
+from app.models.documents import Document
+from app.models.members import Member
+from app.models.patients import Patient
+from app.models.trials import Trial
+
+logger = logging.getLogger(__name__)
+
+PREFIX_ORG_METRICS = "org_metrics"
+
+
+def _cache_key(org_id: Any) -> str:
+    return f"{PREFIX_ORG_METRICS}:{org_id}"
+
+
+def metrics_query(org_id: Any) -> Select:
+    """Single SELECT returning every dashboard counter for an organization."""
+    org_trials = select(Trial.id).where(Trial.organization_id == org_id)
+
+    def count(model, *criteria):
+        return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+    return select(
+        count(Member, Member.organization_id == org_id).label("total_members"),
+        count(Trial, Trial.organization_id == org_id).label("total_trials"),
+        count(Trial, Trial.organization_id == org_id, Trial.status == "active").label("active_trials"),
+        count(Patient, Patient.organization_id == org_id).label("total_patients"),
+        count(Document, Document.trial_id.in_(org_trials)).label("total_documents"),
+    )
+
+
+async def invalidate_organization_metrics(org_id: Any, redis: Optional[Redis] = None) -> None:
+    """Drop cached metrics after a write that changes an organization's counters."""
+    if redis is None or org_id is None:
+        return
+    try:
+        await redis.delete(_cache_key(org_id))
+    except Exception as e:
+        logger.warning(f"[ORG_METRICS] Redis invalidation failed for {org_id}: {e}")
+
+
+async def fetch_organization_metrics(
+    org_id: Any,
+    db: AsyncSession,
+    redis: Optional[Redis] = None,
+) -> OrganizationMetrics:
+    """Return cached metrics for an organization, computing them on a miss."""
+    ttl = get_settings().org_metrics_cache_ttl_seconds
+    use_cache = redis is not None and ttl > 0
+
+    if use_cache:
+        try:
+            cached = await redis.get(_cache_key(org_id))
+            if cached:
+                return OrganizationMetrics(**json.loads(cached))
+        except Exception as e:
+            logger.warning(f"[ORG_METRICS] Redis read failed for {org_id}: {e}")
+
+    row = (await db.execute(metrics_query(org_id))).one()
+    metrics = OrganizationMetrics(**row._mapping)
+
+    if use_cache:
+        try:
+            await redis.set(_cache_key(org_id), metrics.model_dump_json(), ex=ttl)
+        except Exception as e:
+            logger.warning(f"[ORG_METRICS] Redis write failed for {org_id}: {e}")
+
+    return metrics
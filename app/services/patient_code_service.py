@@ -0,0 +1,159 @@
+"""
+Patient code allocation.
+
+Codes only need to be unique within an organization, so each organization
+draws ordinals from its own row in ``patient_code_counters``. Reserving
+ordinals is a single upsert that increments the row, so two callers can never
+be handed the same ordinal, and ordinals are reserved as they are handed out
+rather than in blocks held by each process. Ordinals are passed through a
+keyed Feistel permutation of the code space before formatting, so
+consecutive codes look unrelated (PAT-48213, PAT-07754, ...) while staying
+collision-free.
+
+Codes that already exist in the organization (legacy random codes, or codes
+issued under a different key or width) are skipped with one set-based lookup
+per batch rather than one query per candidate.
+"""
+
+import hashlib
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.patients import Patient
+
+logger = logging.getLogger(__name__)
+
+PATIENT_CODE_PREFIX = "PAT-"
+RESERVE_ORDINALS_SQL = """
+INSERT INTO patient_code_counters (organization_id, next_ordinal) VALUES (:org, :n)
+ON CONFLICT (organization_id)
+DO UPDATE SET next_ordinal = patient_code_counters.next_ordinal + EXCLUDED.next_ordinal
+RETURNING next_ordinal
+"""
+FEISTEL_ROUNDS = 4
+
+
+class PatientCodeSpaceExhausted(RuntimeError):
+    """Raised when every code of the configured width has been issued in an organization."""
+
+
+class CodeScrambler:
+    """
+    Keyed bijection on [0, space).
+
+    A balanced Feistel network permutes the smallest even-bit domain that
+    covers the space; cycle-walking maps outputs back into range, which
+    keeps the mapping one-to-one.
+    """
+
+    def __init__(self, space: int, key: int):
+        if space < 2:
+            raise ValueError("space must be at least 2")
+        self.space = space
+        bits = max(2, (space - 1).bit_length())
+        self.half_bits = (bits + 1) // 2
+        self.mask = (1 << self.half_bits) - 1
+        self._key = key.to_bytes(8, "big", signed=False)
+
+    def _round(self, value: int, round_no: int) -> int:
+        digest = hashlib.blake2b(
+            value.to_bytes(4, "big") + bytes([round_no]), key=self._key, digest_size=4
+        ).digest()
+        return int.from_bytes(digest, "big") & self.mask
+
+    def _permute(self, n: int) -> int:
+        left, right = n >> self.half_bits, n & self.mask
+        for r in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ self._round(right, r)
+        return (left << self.half_bits) | right
+
+    def scramble(self, n: int) -> int:
+        if not 0 <= n < self.space:
+            raise ValueError(f"ordinal {n} outside code space {self.space}")
+        n = self._permute(n)
+        while n >= self.space:
+            n = self._permute(n)
+        return n
+
+
+class PatientCodeAllocator:
+    """Hands out patient codes from per-organization counters."""
+
+    def __init__(self, digits: int, block_size: int, scramble_key: int):
+        self.digits = digits
+        self.block_size = max(1, block_size)
+        self.scrambler = CodeScrambler(10 ** digits, scramble_key)
+        # Free ordinals reserved while skipping taken codes, used before reserving more
+        self._spare: Dict[str, Deque[int]] = {}
+
+    def format(self, ordinal: int) -> str:
+        return f"{PATIENT_CODE_PREFIX}{self.scrambler.scramble(ordinal):0{self.digits}d}"
+
+    async def _reserve(self, db: AsyncSession, organization_id: Any, count: int) -> List[int]:
+        """
+        Increment the organization's counter by count and return the reserved
+        ordinals. Commits at once so the counter row is locked only briefly.
+        """
+        result = await db.execute(text(RESERVE_ORDINALS_SQL), {"org": organization_id, "n": count})
+        end = result.scalar_one()
+        await db.commit()
+        ordinals = [o for o in range(end - count, end) if o < self.scrambler.space]
+        if not ordinals:
+            raise PatientCodeSpaceExhausted(
+                f"All {self.scrambler.space} patient codes have been issued in this organization; "
+                "raise PATIENT_CODE_DIGITS"
+            )
+        return ordinals
+
+    async def _take(self, db: AsyncSession, organization_id: Any, count: int) -> List[int]:
+        spare = self._spare.get(str(organization_id))
+        ordinals = []
+        while spare and len(ordinals) < count:
+            ordinals.append(spare.popleft())
+        if len(ordinals) < count:
+            ordinals += await self._reserve(db, organization_id, count - len(ordinals))
+        return ordinals
+
+    async def allocate(self, db: AsyncSession, organization_id: Any) -> str:
+        """Return a code not yet used by any patient in the organization."""
+        batch = 1
+        while True:
+            ordinals = await self._take(db, organization_id, batch)
+            codes = [self.format(o) for o in ordinals]
+            taken = set(
+                (await db.execute(
+                    select(Patient.patient_code).where(
+                        Patient.organization_id == organization_id,
+                        Patient.patient_code.in_(codes),
+                    )
+                )).scalars().all()
+            )
+            free = [(o, c) for o, c in zip(ordinals, codes) if c not in taken]
+            if free:
+                # Unused free ordinals are handed out next instead of being wasted
+                if len(free) > 1:
+                    spare = self._spare.setdefault(str(organization_id), deque())
+                    spare.extendleft(o for o, _ in reversed(free[1:]))
+                return free[0][1]
+            logger.info(f"[PATIENT_CODE] {len(taken)} candidate(s) already in use, skipping")
+            batch = min(batch * 2, self.block_size)
+
+
+_allocator: Optional[PatientCodeAllocator] = None
+
+
+def get_patient_code_allocator() -> PatientCodeAllocator:
+    global _allocator
+    if _allocator is None:
+        settings = get_settings()
+        _allocator = PatientCodeAllocator(
+            digits=settings.patient_code_digits,
+            block_size=settings.patient_code_block_size,
+            scramble_key=settings.patient_code_scramble_key,
+        )
+    return _allocator
@@ -0,0 +1,325 @@
+"""
+Admission control for the RAG query path.
+
+Every /query execution holds a DB session and, on a cache miss, an LLM call
+for seconds at a time. QueryAdmission bounds that work in each process: at
+most query_max_concurrent queries run at once and at most
+query_max_concurrent_per_tenant of them for one organization. Further
+queries wait in a bounded FIFO queue. A query that finds the queue full, or
+waits longer than query_max_queue_wait_seconds, is rejected at once with a
+Retry-After hint instead of piling onto the pool.
+
+Request rates are limited across instances with token buckets in Redis, one
+per organization and one shared by all. A Lua script refills and takes
+tokens atomically against the Redis clock. Redis errors admit the request.
+
+Cache Key Pattern:
+- Buckets: query_rate:{tenant}, query_rate:global
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.metrics import QUERIES_IN_FLIGHT, QUERIES_WAITING, QUERY_ADMISSIONS, QUERY_QUEUE_SECONDS
+from app.models.documents import Document
+from app.models.trials import Trial
+
+logger = logging.getLogger(__name__)
+
+PREFIX_QUERY_RATE = "query_rate"
+GLOBAL_BUCKET = "global"
+DEFAULT_TENANT = "default"
+TENANT_CACHE_MAX_ENTRIES = 10000
+
+# KEYS: bucket keys. ARGV: rate and burst of each bucket, flattened.
+# Returns "0" after taking one token from every bucket, else the seconds
+# until all of them hold one (nothing is taken then). Redis >= 5 replicates
+# script effects, so reading TIME before writing is allowed.
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+  local rate = tonumber(ARGV[2 * i - 1])
+  local burst = tonumber(ARGV[2 * i])
+  local state = redis.call('HMGET', key, 'tokens', 'ts')
+  local tokens = tonumber(state[1]) or burst
+  local ts = tonumber(state[2]) or now
+  tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+  levels[i] = tokens
+  if tokens < 1 then
+    wait = math.max(wait, (1 - tokens) / rate)
+  end
+end
+if wait > 0 then
+  return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+  local rate = tonumber(ARGV[2 * i - 1])
+  local burst = tonumber(ARGV[2 * i])
+  redis.call('HSET', key, 'tokens', tostring(levels[i] - 1), 'ts', tostring(now))
+  redis.call('EXPIRE', key, math.ceil(burst / rate) + 1)
+end
+return '0'
+"""
+
+
+class AdmissionRejected(Exception):
+    """A query was not admitted; retry_after is a hint in seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Query not admitted: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Per-tenant and global token buckets in Redis, shared by all instances."""
+
+    def __init__(self, rate: float, burst: int, global_rate: float, global_burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.global_rate = global_rate
+        self.global_burst = max(1, global_burst)
+
+    def _buckets(self, tenant: str) -> List[Tuple[str, float, int]]:
+        buckets = []
+        if self.rate > 0:
+            buckets.append((f"{PREFIX_QUERY_RATE}:{tenant}", self.rate, self.burst))
+        if self.global_rate > 0:
+            buckets.append((f"{PREFIX_QUERY_RATE}:{GLOBAL_BUCKET}", self.global_rate, self.global_burst))
+        return buckets
+
+    async def acquire(self, redis: Optional[Redis], tenant: str) -> float:
+        """Take a token for tenant. Returns 0 if allowed, else seconds until one is available."""
+        buckets = self._buckets(tenant)
+        if redis is None or not buckets:
+            return 0.0
+
+        args = []
+        for _, rate, burst in buckets:
+            args += [rate, burst]
+        try:
+            wait = await redis.eval(TOKEN_BUCKET_SCRIPT, len(buckets), *[key for key, _, _ in buckets], *args)
+            return float(wait.decode() if isinstance(wait, bytes) else wait)
+        except Exception as e:
+            logger.warning(f"[ADMISSION] Rate limit check failed for {tenant}, admitting: {e}")
+            return 0.0
+
+
+class ConcurrencyLimiter:
+    """
+    Bounded, fair concurrency for queries in this process.
+
+    A query starts at once when both the global and its tenant's limit have
+    room. Otherwise it joins a FIFO queue; whenever a slot frees up the
+    oldest waiters whose tenant is under its limit start, so one busy
+    organization can't hold up the others queued behind it.
+    """
+
+    def __init__(self, max_concurrent: int, max_per_tenant: int, max_queue: int, max_wait: float):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_tenant = max(1, max_per_tenant)
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+        self._running = 0
+        self._tenants: Dict[str, int] = {}
+        self._waiters: Deque[Tuple[str, asyncio.Future]] = deque()
+        self._avg_seconds = 1.0  # Moving average of slot hold time, for Retry-After
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _has_room(self, tenant: str) -> bool:
+        return self._running < self.max_concurrent and self._tenants.get(tenant, 0) < self.max_per_tenant
+
+    def _start(self, tenant: str) -> None:
+        self._running += 1
+        self._tenants[tenant] = self._tenants.get(tenant, 0) + 1
+        QUERIES_IN_FLIGHT.inc()
+
+    def retry_after(self) -> float:
+        """Rough time until a newly queued query would start."""
+        return max(1.0, self._avg_seconds * (len(self._waiters) + 1) / self.max_concurrent)
+
+    async def acquire(self, tenant: str) -> None:
+        # Waiters left in the queue have no room, so a query that has room
+        # now doesn't overtake anyone who could run
+        if self._has_room(tenant):
+            self._start(tenant)
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise AdmissionRejected("queue_full", self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (tenant, future)
+        self._waiters.append(entry)
+        QUERIES_WAITING.inc()
+        try:
+            await asyncio.wait({future}, timeout=self.max_wait)
+        except asyncio.CancelledError:
+            if future.done():
+                self.release(tenant)  # Granted as the client went away
+            else:
+                self._abandon(entry)
+            raise
+        if not future.done():
+            self._abandon(entry)
+            raise AdmissionRejected("timeout", self.retry_after())
+
+    def _abandon(self, entry: Tuple[str, asyncio.Future]) -> None:
+        entry[1].cancel()
+        self._waiters.remove(entry)
+        QUERIES_WAITING.dec()
+
+    def release(self, tenant: str, held_seconds: Optional[float] = None) -> None:
+        self._running -= 1
+        self._tenants[tenant] -= 1
+        if not self._tenants[tenant]:
+            del self._tenants[tenant]
+        QUERIES_IN_FLIGHT.dec()
+        if held_seconds is not None:
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * held_seconds
+        self._fill()
+
+    def _fill(self) -> None:
+        if not self._waiters or self._running >= self.max_concurrent:
+            return
+        remaining = deque()
+        for entry in self._waiters:
+            tenant, future = entry
+            if self._has_room(tenant):
+                self._start(tenant)
+                future.set_result(None)
+                QUERIES_WAITING.dec()
+            else:
+                remaining.append(entry)
+        self._waiters = remaining
+
+
+class QueryAdmission:
+    """Rate limit, then concurrency limit, for one /query execution."""
+
+    def __init__(self, limiter: ConcurrencyLimiter, rate_limiter: RateLimiter):
+        self.limiter = limiter
+        self.rate_limiter = rate_limiter
+
+    @asynccontextmanager
+    async def admit(self, tenant: str, redis: Optional[Redis] = None) -> AsyncIterator[float]:
+        """
+        Hold a query slot for tenant for the duration of the block; yields
+        the time spent queued in ms. Raises AdmissionRejected instead of
+        waiting when the tenant is over its rate or the queue is full.
+        """
+        started = time.perf_counter()
+        try:
+            wait = await self.rate_limiter.acquire(redis, tenant)
+            if wait > 0:
+                raise AdmissionRejected("rate_limited", wait)
+            await self.limiter.acquire(tenant)
+        except AdmissionRejected as e:
+            QUERY_ADMISSIONS.labels(e.reason).inc()
+            logger.warning(f"[ADMISSION] Rejected query for {tenant}: {e.reason} (retry after {e.retry_after:.1f}s)")
+            raise
+
+        admitted = time.perf_counter()
+        QUERY_ADMISSIONS.labels("admitted").inc()
+        QUERY_QUEUE_SECONDS.observe(admitted - started)
+        try:
+            yield (admitted - started) * 1000
+        finally:
+            self.limiter.release(tenant, time.perf_counter() - admitted)
+
+
+@lru_cache(maxsize=None)
+def get_query_admission() -> QueryAdmission:
+    """Process-wide admission control for /query."""
+    settings = get_settings()
+    return QueryAdmission(
+        limiter=ConcurrencyLimiter(
+            max_concurrent=settings.query_max_concurrent,
+            max_per_tenant=settings.query_max_concurrent_per_tenant,
+            max_queue=settings.query_max_queue,
+            max_wait=settings.query_max_queue_wait_seconds,
+        ),
+        rate_limiter=RateLimiter(
+            rate=settings.query_rate_limit_per_second,
+            burst=settings.query_rate_limit_burst,
+            global_rate=settings.query_global_rate_limit_per_second,
+            global_burst=settings.query_global_rate_limit_burst,
+        ),
+    )
+
+
+# --------------------------
+# Tenant resolution
+# --------------------------
+_tenants: "OrderedDict[Tuple[str, UUID], str]" = OrderedDict()
+
+
+async def resolve_query_tenant(
+    db: AsyncSession,
+    trial_id: Optional[UUID] = None,
+    document_id: Optional[UUID] = None,
+) -> str:
+    """
+    Organization a query is billed to, from its trial or document.
+
+    Results are kept in process (a document's trial and a trial's
+    organization don't change). The lookup ends its transaction so the
+    connection goes back to the pool while the query waits for a slot.
+    Falls back to DEFAULT_TENANT when nothing matches or the lookup fails.
+    """
+    if trial_id is not None:
+        key = ("trial", trial_id)
+        stmt = select(Trial.organization_id).where(Trial.id == trial_id)
+    elif document_id is not None:
+        key = ("document", document_id)
+        stmt = (
+            select(Trial.organization_id)
+            .join(Document, Document.trial_id == Trial.id)
+            .where(Document.id == document_id)
+        )
+    else:
+        return DEFAULT_TENANT
+
+    tenant = _tenants.get(key)
+    if tenant is not None:
+        _tenants.move_to_end(key)
+        return tenant
+
+    try:
+        organization_id = (await db.execute(stmt)).scalar_one_or_none()
+    except Exception as e:
+        logger.warning(f"[ADMISSION] Tenant lookup failed for {key[0]} {key[1]}: {e}")
+        organization_id = None
+    finally:
+        try:
+            await db.rollback()
+        except Exception:
+            pass
+    if organization_id is None:
+        return DEFAULT_TENANT
+
+    tenant = str(organization_id)
+    _tenants[key] = tenant
+    if len(_tenants) > TENANT_CACHE_MAX_ENTRIES:
+        _tenants.popitem(last=False)
+    return tenant
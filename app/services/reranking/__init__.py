@@ -1,4 +1,16 @@
 """Reranking services for improving retrieval precision."""
-from .reranker_service import get_reranker, CohereReranker
+from .reranker_service import (
+    get_reranker,
+    get_rerank_latency_stats,
+    CohereReranker,
+    ResilientReranker,
+    CircuitBreaker,
+)
 
-__all__ = ["get_reranker", "CohereReranker"]
+__all__ = [
+    "get_reranker",
+    "get_rerank_latency_stats",
+    "CohereReranker",
+    "ResilientReranker",
+    "CircuitBreaker",
+]
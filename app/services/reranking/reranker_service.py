@@ -2,13 +2,20 @@
 Reranker service for improving retrieval precision.
 Uses cross-encoder models to re-score retrieved chunks.
 """
+import asyncio
+import hashlib
 import logging
+import time
 from abc import ABC, abstractmethod
-from typing import List, Optional, Protocol
+from typing import TYPE_CHECKING, List, Optional, Protocol
 
 import cohere
 
 from app.config import get_settings
+from app.services.utils.latency import LatencyTracker
+
+if TYPE_CHECKING:
+    from app.services.cache.rag_cache_service import RagCacheService
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -43,9 +50,17 @@ class CohereReranker(IReranker):
     Best for production use - fast and accurate.
     """
 
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        fallback_on_error: bool = True
+    ):
         self.api_key = api_key or settings.cohere_api_key
         self.model = model or settings.reranker_model
+        # When wrapped by ResilientReranker, errors must propagate so the
+        # circuit breaker can count them.
+        self.fallback_on_error = fallback_on_error
 
         if not self.api_key:
             raise ValueError("Cohere API key is required for CohereReranker")
@@ -93,6 +108,8 @@ class CohereReranker(IReranker):
 
         except Exception as e:
             logger.error(f"[RERANK] Cohere rerank failed: {e}")
+            if not self.fallback_on_error:
+                raise
             # Fallback: return original documents without reranking
             return documents[:top_k]
 
@@ -113,13 +130,228 @@ class NoOpReranker(IReranker):
         return documents[:top_k]
 
 
-def get_reranker() -> IReranker:
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after `failure_threshold` consecutive failures and stays open for
+    `reset_seconds`. After that a single trial call is let through
+    (half-open) while concurrent callers keep getting False; success closes
+    the breaker, failure re-opens it. A probe that never reports back (e.g.
+    a cancelled request) is given up on after another `reset_seconds`.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_started_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    @property
+    def half_open(self) -> bool:
+        return self.probe_started_at is not None
+
+    def allow(self) -> bool:
+        """Return True if a remote call may be attempted."""
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if self.probe_started_at is not None and now - self.probe_started_at < self.reset_seconds:
+            return False  # Trial call in flight
+        if now - self.opened_at >= self.reset_seconds:
+            self.probe_started_at = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.probe_started_at is not None:
+            # Trial call failed: open for another reset period
+            self.probe_started_at = None
+            self.opened_at = time.monotonic()
+        elif self.consecutive_failures >= self.failure_threshold and self.opened_at is None:
+            self.opened_at = time.monotonic()
+            logger.warning(
+                f"[RERANK] Circuit breaker OPEN after {self.consecutive_failures} consecutive failures "
+                f"(retry in {self.reset_seconds:.0f}s)"
+            )
+
+
+class ResilientReranker(IReranker):
+    """
+    Wraps a remote reranker with a score cache, a latency budget and a
+    circuit breaker. On timeout, error or open circuit the input (RRF)
+    order is returned unchanged, so reranking never adds more than the
+    budget to query latency.
+
+    `last_status` reports how the most recent call was served:
+    "cache_hit", "remote", "timeout", "error" or "circuit_open".
+    """
+
+    def __init__(
+        self,
+        inner: IReranker,
+        model_name: str,
+        cache_service: Optional["RagCacheService"] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        latency_tracker: Optional[LatencyTracker] = None,
+        timeout_ms: Optional[int] = None,
+    ):
+        self.inner = inner
+        self.model_name = model_name
+        self.cache_service = cache_service
+        self.breaker = breaker or CircuitBreaker(
+            settings.reranker_circuit_failure_threshold,
+            settings.reranker_circuit_reset_seconds,
+        )
+        self.latency_tracker = latency_tracker or LatencyTracker()
+        self.timeout_ms = timeout_ms if timeout_ms is not None else settings.reranker_timeout_ms
+        self.last_status: Optional[str] = None
+
+    @staticmethod
+    def _chunk_id(doc: dict) -> str:
+        """Stable chunk identity: DB id when present, otherwise a content hash."""
+        if doc.get("id"):
+            return str(doc["id"])
+        return hashlib.sha256(doc.get("page_content", "").encode()).hexdigest()[:16]
+
+    async def _get_cached(
+        self,
+        query: str,
+        documents: List[dict],
+        chunk_ids: List[str],
+        top_k: int
+    ) -> Optional[List[dict]]:
+        if not self.cache_service:
+            return None
+        try:
+            ranked = await self.cache_service.get_rerank_scores(
+                query, self.model_name, top_k, chunk_ids
+            )
+        except Exception as e:
+            logger.warning(f"[RERANK] Cache read failed: {e}")
+            return None
+        if not ranked:
+            return None
+
+        index_by_id = {cid: i for i, cid in enumerate(chunk_ids)}
+        reranked = []
+        for cid, score in ranked:
+            if cid not in index_by_id:
+                return None
+            doc = documents[index_by_id[cid]].copy()
+            doc["rerank_score"] = score
+            doc["original_index"] = index_by_id[cid]
+            reranked.append(doc)
+        return reranked
+
+    async def _set_cached(
+        self,
+        query: str,
+        chunk_ids: List[str],
+        top_k: int,
+        reranked: List[dict]
+    ) -> None:
+        if not self.cache_service:
+            return
+        ranked = [
+            [chunk_ids[doc["original_index"]], doc["rerank_score"]]
+            for doc in reranked
+            if "original_index" in doc and "rerank_score" in doc
+        ]
+        if len(ranked) != len(reranked):
+            return
+        try:
+            await self.cache_service.set_rerank_scores(
+                query, self.model_name, top_k, chunk_ids, ranked
+            )
+        except Exception as e:
+            logger.warning(f"[RERANK] Cache write failed: {e}")
+
+    async def rerank(
+        self,
+        query: str,
+        documents: List[dict],
+        top_k: int = 5
+    ) -> List[dict]:
+        if not documents:
+            self.last_status = None
+            return []
+
+        chunk_ids = [self._chunk_id(doc) for doc in documents]
+
+        cached = await self._get_cached(query, documents, chunk_ids, top_k)
+        if cached is not None:
+            self.last_status = "cache_hit"
+            logger.info(f"[RERANK] Cache [HIT] - {len(cached)} scores reused")
+            return cached
+
+        if not self.breaker.allow():
+            self.last_status = "circuit_open"
+            logger.info("[RERANK] Circuit open, keeping RRF order")
+            return documents[:top_k]
+
+        start = time.perf_counter()
+        try:
+            reranked = await asyncio.wait_for(
+                self.inner.rerank(query=query, documents=documents, top_k=top_k),
+                timeout=self.timeout_ms / 1000,
+            )
+        except asyncio.TimeoutError:
+            self.latency_tracker.record((time.perf_counter() - start) * 1000)
+            self.breaker.record_failure()
+            self.last_status = "timeout"
+            logger.warning(f"[RERANK] Exceeded {self.timeout_ms}ms budget, keeping RRF order")
+            return documents[:top_k]
+        except Exception as e:
+            self.latency_tracker.record((time.perf_counter() - start) * 1000)
+            self.breaker.record_failure()
+            self.last_status = "error"
+            logger.warning(f"[RERANK] Remote rerank failed ({e}), keeping RRF order")
+            return documents[:top_k]
+
+        self.latency_tracker.record((time.perf_counter() - start) * 1000)
+        self.breaker.record_success()
+        self.last_status = "remote"
+        await self._set_cached(query, chunk_ids, top_k, reranked)
+        return reranked
+
+
+# Process-wide breaker and latency window shared by every request's reranker
+_cohere_breaker: Optional[CircuitBreaker] = None
+_rerank_latency = LatencyTracker()
+
+
+def get_rerank_latency_stats() -> dict:
+    """Return p50/p95 latency of remote rerank calls plus breaker state (GET /health/reranker)."""
+    stats = _rerank_latency.snapshot()
+    stats["circuit_open"] = bool(_cohere_breaker and _cohere_breaker.is_open)
+    stats["circuit_half_open"] = bool(_cohere_breaker and _cohere_breaker.half_open)
+    return stats
+
+
+def get_reranker(cache_service: Optional["RagCacheService"] = None) -> IReranker:
     """
     Factory function to get the configured reranker.
 
+    Args:
+        cache_service: Optional cache used to reuse scores per (query, chunk set)
+
     Returns:
         IReranker: The configured reranker instance
     """
+    global _cohere_breaker
+
     if not settings.reranker_enabled:
         logger.info("[RERANK] Reranking disabled, using NoOpReranker")
         return NoOpReranker()
@@ -130,7 +362,18 @@ def get_reranker() -> IReranker:
         if not settings.cohere_api_key:
             logger.warning("[RERANK] Cohere API key not set, using NoOpReranker")
             return NoOpReranker()
-        return CohereReranker()
+        if _cohere_breaker is None:
+            _cohere_breaker = CircuitBreaker(
+                settings.reranker_circuit_failure_threshold,
+                settings.reranker_circuit_reset_seconds,
+            )
+        return ResilientReranker(
+            inner=CohereReranker(fallback_on_error=False),
+            model_name=settings.reranker_model,
+            cache_service=cache_service,
+            breaker=_cohere_breaker,
+            latency_tracker=_rerank_latency,
+        )
 
     # Add more providers here as needed (jina, bge, etc.)
 
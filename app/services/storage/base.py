@@ -2,8 +2,20 @@
 Abstract base class for storage services.
 """
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Optional
+
+from fastapi import UploadFile
+
+
+class SignedUrl(NamedTuple):
+    """A download URL and the wall-clock time (epoch seconds) it stops working."""
+
+    url: str
+    expires_at: float
 
 
 class StorageService(ABC):
@@ -21,6 +33,43 @@ class StorageService(ABC):
         """Store *file_data* and return ``{path, signed_url, file_size}``."""
         ...
 
+    def upload_stream(
+        self,
+        bucket_name: str,
+        stream: BinaryIO,
+        filename: str,
+        content_type: str = "application/octet-stream",
+        folder: Optional[str] = None,
+    ) -> dict:
+        """
+        Store the contents of a seekable file object, like ``upload_file``.
+        Blocking; backends override it to copy in chunks instead of reading
+        the whole stream into memory.
+        """
+        return self.upload_file(bucket_name, stream.read(), filename, content_type, folder)
+
+    async def save_upload(
+        self,
+        bucket_name: str,
+        file: UploadFile,
+        filename: Optional[str] = None,
+        folder: Optional[str] = None,
+    ) -> dict:
+        """
+        Store a multipart upload without buffering it in memory.
+        Starlette has already spooled the part to a temporary file; it is
+        streamed from there to storage in a worker thread.
+        """
+        await file.seek(0)
+        return await asyncio.to_thread(
+            self.upload_stream,
+            bucket_name,
+            file.file,
+            filename or file.filename or "upload",
+            file.content_type or "application/octet-stream",
+            folder,
+        )
+
     @abstractmethod
     def get_signed_url(
         self,
@@ -35,3 +84,29 @@ class StorageService(ABC):
     def delete_file(self, bucket_name: str, blob_path: str) -> None:
         """Delete the object identified by *blob_path*."""
         ...
+
+    def local_path(self, url: str) -> Optional[Path]:
+        """
+        The file on this host that *url* was served from, if this backend keeps
+        one; lets readers skip an HTTP round trip to themselves.
+        """
+        return None
+
+    # ------------------------------------------------------------------
+    # Async interface — use these from request handlers and async tasks
+    # ------------------------------------------------------------------
+
+    async def sign_url(
+        self,
+        bucket_name: str,
+        blob_path: str,
+        expiration_hours: int = 1,
+    ) -> SignedUrl:
+        """``get_signed_url`` in a worker thread, with the URL's expiry."""
+        expires_at = time.time() + expiration_hours * 3600
+        url = await asyncio.to_thread(self.get_signed_url, bucket_name, blob_path, expiration_hours)
+        return SignedUrl(url, expires_at)
+
+    async def delete_file_async(self, bucket_name: str, blob_path: str) -> None:
+        """``delete_file`` in a worker thread."""
+        await asyncio.to_thread(self.delete_file, bucket_name, blob_path)
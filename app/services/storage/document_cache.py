@@ -0,0 +1,296 @@
+"""
+Shared on-disk read-through cache of source documents.
+
+Ingestion and PDF highlighting both need the original protocol PDF. Without
+a cache each of them downloads it from storage (for GCS, through a freshly
+signed URL) every time. Entries are keyed by the document URL with its
+signature parameters removed, so every signed URL of a blob maps to one file,
+and the least recently used files are evicted once the directory exceeds its
+size bound. Documents held by the local storage backend are read in place.
+
+A blob can be overwritten under the same path (``/storage/upload`` keeps the
+client's file name), so the ETag / Last-Modified of each download is kept
+next to the file and every reuse is a conditional GET: a 304 serves the
+cached file, a 200 replaces it. That costs a round-trip without a body,
+instead of the whole download.
+
+Sizing: the directory defaults to the system temp dir, which on Cloud Run is
+an in-memory filesystem counted against the instance's memory limit. Keep
+``document_cache_max_mb`` well under the limit there, or point
+``document_cache_dir`` at a mounted volume; 0 disables caching (documents
+are downloaded to a temporary file and removed after use).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from uuid import uuid4
+
+import httpx
+
+from app.config import get_settings
+from app.core.metrics import CACHE_REQUESTS
+from app.services.storage.base import StorageService
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+META_SUFFIX = ".meta"  # Validators (ETag / Last-Modified) of the cached file
+
+Fetch = Callable[[str], Awaitable[bytes]]
+
+# Query parameters added by GCS (V2/V4) and S3-style URL signing
+_SIGNATURE_PARAMS = {
+    "googleaccessid", "expires", "signature",
+    "x-goog-algorithm", "x-goog-credential", "x-goog-date",
+    "x-goog-expires", "x-goog-signedheaders", "x-goog-signature",
+    "x-amz-algorithm", "x-amz-credential", "x-amz-date",
+    "x-amz-expires", "x-amz-signedheaders", "x-amz-signature",
+    "x-amz-security-token",
+}
+_SUFFIX = re.compile(r"\.[A-Za-z0-9]{1,8}$")
+
+
+def normalize_document_url(url: str) -> str:
+    """Strip signing parameters so every signed URL of a blob maps to one key."""
+    parts = urlsplit(url)
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in _SIGNATURE_PARAMS
+    ]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+class DocumentCache:
+    """
+    Size-bounded directory of downloaded documents with LRU eviction by mtime.
+
+    Concurrent misses (and revalidations) of the same document share one
+    request, and files handed out by ``local_copy`` are not evicted until
+    the caller is done. Entries filled through a caller's ``fetch`` have no
+    validators; they are reused as-is by callers that pass a fetch and
+    downloaded again otherwise.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int,
+        storage: Optional[StorageService] = None,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.storage = storage
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pins: Dict[str, int] = {}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path_for(self, url: str) -> str:
+        """Cache file for url; keeps the extension so parsers can detect the format."""
+        normalized = normalize_document_url(url)
+        match = _SUFFIX.search(urlsplit(normalized).path)
+        key = hashlib.sha256(normalized.encode()).hexdigest()
+        return os.path.join(self.cache_dir, key + (match.group(0).lower() if match else ""))
+
+    # --------------------------
+    # Filling and eviction
+    # --------------------------
+    @staticmethod
+    async def _download(url: str, dest: str, validators: Optional[dict] = None) -> Optional[dict]:
+        """
+        Stream url to dest without holding the document in memory.
+        With validators from an earlier download the request is conditional;
+        returns None when the server answers 304, else the new validators.
+        """
+        headers = {}
+        if validators and validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        elif validators and validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        async with httpx.AsyncClient(follow_redirects=True) as client:
+            async with client.stream("GET", url, headers=headers) as resp:
+                if resp.status_code == 304:
+                    return None
+                resp.raise_for_status()
+                with open(dest, "wb") as f:
+                    async for chunk in resp.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        await asyncio.to_thread(f.write, chunk)
+                return {
+                    "etag": resp.headers.get("etag"),
+                    "last_modified": resp.headers.get("last-modified"),
+                }
+
+    @staticmethod
+    def _write(dest: str, data: bytes) -> None:
+        with open(dest, "wb") as f:
+            f.write(data)
+
+    @staticmethod
+    def _read_meta(path: str) -> Optional[dict]:
+        try:
+            with open(path + META_SUFFIX) as f:
+                validators = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return validators if validators.get("etag") or validators.get("last_modified") else None
+
+    @staticmethod
+    def _write_meta(path: str, validators: Optional[dict]) -> None:
+        if validators and (validators.get("etag") or validators.get("last_modified")):
+            with open(path + META_SUFFIX, "w") as f:
+                json.dump(validators, f)
+        else:
+            DocumentCache._remove(path + META_SUFFIX)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    async def _fill(
+        self,
+        url: str,
+        path: str,
+        fetch: Optional[Fetch],
+        validators: Optional[dict] = None,
+    ) -> bool:
+        """Download url into path. Returns False if the cached file was still current."""
+        tmp_path = f"{path}.{uuid4().hex}.tmp"
+        try:
+            if fetch is None:
+                validators = await self._download(url, tmp_path, validators)
+                if validators is None:
+                    return False
+            else:
+                await asyncio.to_thread(self._write, tmp_path, await fetch(url))
+            # File first: stale validators next to a new file only cause a re-download
+            os.replace(tmp_path, path)
+            await asyncio.to_thread(self._write_meta, path, validators)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        await asyncio.to_thread(self._evict, frozenset(self._pins))
+        return True
+
+    def _evict(self, pinned: frozenset) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".tmp") or name.endswith(META_SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path in pinned:
+                continue
+            self._remove(path)
+            self._remove(path + META_SUFFIX)
+            total -= size
+
+    async def _ensure(self, url: str, fetch: Optional[Fetch]) -> str:
+        path = self.path_for(url)
+        inflight = self._inflight.get(path)
+        if inflight is not None:
+            await asyncio.shield(inflight)
+            return path
+
+        validators = None
+        if os.path.exists(path):
+            if fetch is not None:
+                os.utime(path)  # Hit: refresh recency for LRU eviction
+                CACHE_REQUESTS.labels("document", "hit").inc()
+                logger.info("[DOCUMENT_CACHE] [HIT] %s", path)
+                return path
+            validators = self._read_meta(path)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[path] = future
+        try:
+            replaced = await self._fill(url, path, fetch, validators)
+            if not replaced:
+                os.utime(path)
+                CACHE_REQUESTS.labels("document", "hit").inc()
+                logger.info("[DOCUMENT_CACHE] [HIT] %s (revalidated)", path)
+            else:
+                result = "stale" if validators else "miss"
+                CACHE_REQUESTS.labels("document", result).inc()
+                logger.info("[DOCUMENT_CACHE] [%s] downloaded to %s", result.upper(), path)
+            future.set_result(None)
+            return path
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure is not logged as "never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(path, None)
+
+    # --------------------------
+    # Public interface
+    # --------------------------
+    @asynccontextmanager
+    async def local_copy(self, url: str, fetch: Optional[Fetch] = None) -> AsyncIterator[str]:
+        """
+        Yield the path of a local file holding the current document at url,
+        downloading it on a miss (via fetch if given, else a streamed HTTP GET)
+        and revalidating it on a hit. The file is kept out of eviction until
+        the block exits.
+        """
+        local = self.storage.local_path(url) if self.storage else None
+        if local is not None:
+            yield str(local)
+            return
+
+        path = self.path_for(url)
+        self._pins[path] = self._pins.get(path, 0) + 1
+        try:
+            yield await self._ensure(url, fetch)
+        finally:
+            self._pins[path] -= 1
+            if not self._pins[path]:
+                del self._pins[path]
+                if self.max_bytes <= 0:  # Caching disabled: nothing outlives its user
+                    self._remove(path)
+                    self._remove(path + META_SUFFIX)
+
+    async def read(self, url: str, fetch: Optional[Fetch] = None) -> bytes:
+        """Return the document at url as bytes, through the cache."""
+        async with self.local_copy(url, fetch) as path:
+            return await asyncio.to_thread(Path(path).read_bytes)
+
+
+_document_cache: Optional[DocumentCache] = None
+
+
+def get_document_cache() -> DocumentCache:
+    """Return the process-wide document cache."""
+    global _document_cache
+    if _document_cache is None:
+        from app.dependencies.storage import get_storage_service
+
+        settings = get_settings()
+        _document_cache = DocumentCache(
+            cache_dir=settings.document_cache_dir or os.path.join(tempfile.gettempdir(), "themison-documents"),
+            max_bytes=settings.document_cache_max_mb * 1024 * 1024,
+            storage=get_storage_service(),
+        )
+    return _document_cache
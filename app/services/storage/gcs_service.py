@@ -2,9 +2,14 @@
 Google Cloud Storage service for file upload, download, and deletion.
 """
 
+import asyncio
 import logging
-from datetime import timedelta
-from typing import Optional
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Optional, Tuple
 
 import google.auth
 from google.cloud import storage as gcs
@@ -12,13 +17,30 @@ from google.oauth2 import service_account
 from google.auth.transport import requests as auth_requests
 
 from app.config import get_settings
-from app.services.storage.base import StorageService
+from app.core.metrics import STORAGE_SIGN_SECONDS, STORAGE_SIGNED_URLS
+from app.services.storage.base import SignedUrl, StorageService
 
 logger = logging.getLogger(__name__)
 
 
+def _expires_within(credentials, seconds: float) -> bool:
+    """True if credentials carry an expiry less than *seconds* away (google-auth uses naive UTC)."""
+    expiry = getattr(credentials, "expiry", None)
+    if expiry is None:
+        return False
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return expiry - timedelta(seconds=seconds) <= now
+
+
 class GCSStorageService(StorageService):
-    """Thin wrapper around google-cloud-storage for Themison file operations."""
+    """
+    Thin wrapper around google-cloud-storage for Themison file operations.
+
+    Credentials without a private key (Cloud Run) sign through the IAM
+    signBlob API. Those credentials are fetched once and refreshed in the
+    background ahead of expiry, and ``sign_url`` reuses signed URLs per
+    (bucket, blob) until shortly before they expire.
+    """
 
     def __init__(self) -> None:
         settings = get_settings()
@@ -34,6 +56,13 @@ class GCSStorageService(StorageService):
             # Relies on Application Default Credentials (e.g. GCE metadata, GOOGLE_APPLICATION_CREDENTIALS)
             self._client = gcs.Client(project=settings.gcs_project_id or None)
 
+        self._iam_signing = False  # Set once local signing fails for lack of a private key
+        self._signing_credentials = None
+        self._credentials_lock = threading.Lock()
+        self._credentials_refresh: Optional[asyncio.Future] = None
+        # Only touched on the event loop (see delete_file_async)
+        self._signed_urls: "OrderedDict[Tuple[str, str, int], SignedUrl]" = OrderedDict()
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -63,39 +92,117 @@ class GCSStorageService(StorageService):
             "file_size": len(file_data),
         }
 
+    def upload_stream(
+        self,
+        bucket_name: str,
+        stream: BinaryIO,
+        filename: str,
+        content_type: str = "application/octet-stream",
+        folder: Optional[str] = None,
+    ) -> dict:
+        """
+        Upload a seekable file object to GCS and return ``{path, signed_url, file_size}``.
+
+        Files above ``gcs_resumable_threshold_mb`` use a resumable upload sent in
+        ``gcs_upload_chunk_mb`` chunks, so only one chunk is in memory at a time
+        and a dropped connection retries the chunk rather than the whole file.
+        """
+        settings = get_settings()
+        blob_path = f"{folder}/{filename}" if folder else filename
+
+        start = stream.tell()
+        file_size = stream.seek(0, os.SEEK_END) - start
+        stream.seek(start)
+
+        bucket = self._client.bucket(bucket_name)
+        blob = bucket.blob(blob_path)
+        if file_size > settings.gcs_resumable_threshold_mb * 1024 * 1024:
+            blob.chunk_size = settings.gcs_upload_chunk_mb * 1024 * 1024  # Multiple of 256 KiB
+        blob.upload_from_file(stream, size=file_size, content_type=content_type)
+
+        signed_url = self.get_signed_url(bucket_name, blob_path)
+
+        return {
+            "path": blob_path,
+            "signed_url": signed_url,
+            "file_size": file_size,
+        }
+
     def get_signed_url(
         self,
         bucket_name: str,
         blob_path: str,
         expiration_hours: int = 1,
     ) -> str:
-        """Return a signed download URL valid for ``expiration_hours``."""
+        """
+        Return a signed download URL valid for ``expiration_hours``.
+        Blocking (signBlob is a network call); async callers use ``sign_url``.
+        """
         bucket = self._client.bucket(bucket_name)
         blob = bucket.blob(blob_path)
-
+        expiration = timedelta(hours=expiration_hours)
+
+        if not self._iam_signing:
+            try:
+                return blob.generate_signed_url(version="v4", expiration=expiration, method="GET")
+            except AttributeError:
+                # Cloud Run default credentials lack a private key;
+                # fall back to IAM signBlob API from now on
+                logger.info("GCS credentials cannot sign locally; signing via IAM signBlob")
+                self._iam_signing = True
+
+        credentials = self._get_signing_credentials()
+        return blob.generate_signed_url(
+            version="v4",
+            expiration=expiration,
+            method="GET",
+            service_account_email=credentials.service_account_email,
+            access_token=credentials.token,
+        )
+
+    async def sign_url(
+        self,
+        bucket_name: str,
+        blob_path: str,
+        expiration_hours: int = 1,
+    ) -> SignedUrl:
+        """
+        Signed URL for the blob, else signed in a worker thread. Cached per
+        requested TTL and reused only while it has at least
+        ``expiration_hours`` minus ``gcs_signed_url_reuse_seconds`` left, so
+        callers never get a URL much shorter-lived than they asked for.
+        """
+        settings = get_settings()
+        key = (bucket_name, blob_path, expiration_hours)
+        min_remaining = expiration_hours * 3600 - settings.gcs_signed_url_reuse_seconds
+        cached = self._signed_urls.get(key)
+        if cached is not None and cached.expires_at - time.time() >= min_remaining:
+            self._signed_urls.move_to_end(key)
+            STORAGE_SIGNED_URLS.labels("cached").inc()
+            return cached
+
+        started = time.perf_counter()
         try:
-            return blob.generate_signed_url(
-                version="v4",
-                expiration=timedelta(hours=expiration_hours),
-                method="GET",
-            )
-        except AttributeError:
-            # Cloud Run default credentials lack a private key;
-            # fall back to IAM signBlob API
-            credentials, _ = google.auth.default()
-            if hasattr(credentials, "refresh"):
-                credentials.refresh(auth_requests.Request())
-            signing_credentials = google.auth.compute_engine.IDTokenCredentials(
-                request=auth_requests.Request(),
-                target_audience="",
-            )
-            return blob.generate_signed_url(
-                version="v4",
-                expiration=timedelta(hours=expiration_hours),
-                method="GET",
-                service_account_email=credentials.service_account_email,
-                access_token=credentials.token,
-            )
+            signed = await super().sign_url(bucket_name, blob_path, expiration_hours)
+        except Exception:
+            STORAGE_SIGNED_URLS.labels("error").inc()
+            raise
+        STORAGE_SIGN_SECONDS.observe(time.perf_counter() - started)
+        STORAGE_SIGNED_URLS.labels("signed").inc()
+
+        if settings.gcs_signed_url_cache_size > 0:
+            self._signed_urls[key] = signed
+            self._signed_urls.move_to_end(key)
+            while len(self._signed_urls) > settings.gcs_signed_url_cache_size:
+                self._signed_urls.popitem(last=False)
+        self._refresh_credentials_ahead(settings.gcs_credentials_refresh_ahead_seconds)
+        return signed
+
+    async def delete_file_async(self, bucket_name: str, blob_path: str) -> None:
+        """Drop the blob's cached signed URLs on the loop, then delete it in a worker thread."""
+        for key in [k for k in self._signed_urls if k[:2] == (bucket_name, blob_path)]:
+            del self._signed_urls[key]
+        await super().delete_file_async(bucket_name, blob_path)
 
     def delete_file(self, bucket_name: str, blob_path: str) -> None:
         """Delete a blob from GCS. Silently ignores missing files."""
@@ -105,3 +212,39 @@ class GCSStorageService(StorageService):
             blob.delete()
         except Exception:
             logger.warning("Failed to delete %s/%s (may already be deleted)", bucket_name, blob_path)
+
+    # ------------------------------------------------------------------
+    # IAM signing credentials
+    # ------------------------------------------------------------------
+
+    def _get_signing_credentials(self, refresh_within: float = 0.0):
+        """
+        Application Default Credentials for signBlob. Refreshed (a metadata
+        server round trip) only when invalid or expiring within *refresh_within*
+        seconds, instead of on every signature.
+        """
+        with self._credentials_lock:
+            if self._signing_credentials is None:
+                self._signing_credentials, _ = google.auth.default()
+            credentials = self._signing_credentials
+            if not credentials.valid or _expires_within(credentials, refresh_within):
+                credentials.refresh(auth_requests.Request())
+            return credentials
+
+    def _refresh_credentials_ahead(self, refresh_within: float) -> None:
+        """Start a background refresh if the signing token expires within *refresh_within* seconds."""
+        credentials = self._signing_credentials
+        if credentials is None or not _expires_within(credentials, refresh_within):
+            return
+        if self._credentials_refresh is not None and not self._credentials_refresh.done():
+            return
+        self._credentials_refresh = asyncio.ensure_future(
+            asyncio.to_thread(self._get_signing_credentials, refresh_within)
+        )
+        self._credentials_refresh.add_done_callback(self._log_refresh_failure)
+
+    @staticmethod
+    def _log_refresh_failure(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            # The next signature refreshes synchronously once the token is invalid
+            logger.warning("Background refresh of GCS signing credentials failed: %s", future.exception())
@@ -6,15 +6,18 @@ Files are saved under ``./uploads/`` and served via the ``/local-files/`` HTTP e
 
 import logging
 import os
+import shutil
+import time
 from pathlib import Path
-from typing import Optional
-from urllib.parse import quote
+from typing import BinaryIO, Optional
+from urllib.parse import quote, unquote, urlsplit
 
-from app.services.storage.base import StorageService
+from app.services.storage.base import SignedUrl, StorageService
 
 logger = logging.getLogger(__name__)
 
 UPLOADS_ROOT = Path("uploads")
+COPY_BUFFER_SIZE = 1024 * 1024
 
 
 class LocalStorageService(StorageService):
@@ -46,6 +49,30 @@ class LocalStorageService(StorageService):
             "file_size": len(file_data),
         }
 
+    def upload_stream(
+        self,
+        bucket_name: str,
+        stream: BinaryIO,
+        filename: str,
+        content_type: str = "application/octet-stream",
+        folder: Optional[str] = None,
+    ) -> dict:
+        rel_path = f"{folder}/{filename}" if folder else filename
+        dest = UPLOADS_ROOT / rel_path
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with dest.open("wb") as out:
+            shutil.copyfileobj(stream, out, COPY_BUFFER_SIZE)
+            file_size = out.tell()
+
+        url = self._url_for(rel_path)
+        logger.info("Saved local file: %s -> %s", dest, url)
+
+        return {
+            "path": url,
+            "signed_url": url,
+            "file_size": file_size,
+        }
+
     def get_signed_url(
         self,
         bucket_name: str,
@@ -54,6 +81,25 @@ class LocalStorageService(StorageService):
     ) -> str:
         return self._url_for(blob_path)
 
+    async def sign_url(
+        self,
+        bucket_name: str,
+        blob_path: str,
+        expiration_hours: int = 1,
+    ) -> SignedUrl:
+        # Nothing to sign — no need for a worker thread
+        return SignedUrl(self._url_for(blob_path), time.time() + expiration_hours * 3600)
+
+    def local_path(self, url: str) -> Optional[Path]:
+        prefix = f"{self._base_url}/local-files/"
+        if not url.startswith(prefix):
+            return None
+        root = UPLOADS_ROOT.resolve()
+        target = (root / unquote(urlsplit(url).path[len(urlsplit(prefix).path):])).resolve()
+        if not target.is_relative_to(root) or not target.is_file():
+            return None
+        return target
+
     def delete_file(self, bucket_name: str, blob_path: str) -> None:
         # blob_path may be a full URL or a relative path
         if blob_path.startswith(("http://", "https://")):
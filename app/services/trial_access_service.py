@@ -0,0 +1,174 @@
+"""
+Request-scoped trial permission resolution.
+
+A member's accessible trials and trial roles are loaded with one query,
+kept for the rest of the request and briefly shared across requests via
+Redis, so trial-scoped routes answer access checks from memory.
+
+Cache Key Pattern:
+- Access:  trial_access:{member_id}
+"""
+
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+
+from fastapi import HTTPException
+from redis.asyncio import Redis
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.members import Member
+from app.models.roles import Role
+from app.models.trial_members import TrialMember
+from app.models.trials import Trial
+
+logger = logging.getLogger(__name__)
+
+ADMIN_ROLES = {"superadmin", "admin", "staff"}
+PREFIX_TRIAL_ACCESS = "trial_access"
+
+
+def _cache_key(member_id: Any) -> str:
+    return f"{PREFIX_TRIAL_ACCESS}:{member_id}"
+
+
+async def invalidate_trial_access(member_id: Any, redis: Optional[Redis] = None) -> None:
+    """Drop the shared access snapshot for a member after a membership change."""
+    if redis is None:
+        return
+    try:
+        await redis.delete(_cache_key(member_id))
+    except Exception as e:
+        logger.warning(f"[TRIAL_ACCESS] Redis invalidation failed for {member_id}: {e}")
+
+
+class TrialAccessResolver:
+    """
+    A member's trial permissions, resolved at most once per request.
+
+    The snapshot holds every trial in the member's organization and the
+    member's active trial roles. Grants read from Redis are trusted for the
+    short TTL; a denial from a cached snapshot is re-checked against the
+    database before it is returned, so newly created trials and memberships
+    are visible immediately.
+    """
+
+    def __init__(self, member: Member, db: AsyncSession, redis: Optional[Redis] = None):
+        self.member = member
+        self.db = db
+        self.redis = redis
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._from_cache = False
+
+    @property
+    def is_admin(self) -> bool:
+        return self.member.default_role in ADMIN_ROLES
+
+    # --------------------------
+    # Loading
+    # --------------------------
+    async def _load_from_db(self) -> Dict[str, Any]:
+        result = await self.db.execute(
+            select(Trial.id, TrialMember.id, Role.name)
+            .select_from(Trial)
+            .outerjoin(
+                TrialMember,
+                and_(
+                    TrialMember.trial_id == Trial.id,
+                    TrialMember.member_id == self.member.id,
+                    TrialMember.is_active == True,
+                ),
+            )
+            .outerjoin(Role, Role.id == TrialMember.role_id)
+            .where(Trial.organization_id == self.member.organization_id)
+        )
+
+        trials: Set[str] = set()
+        roles: Dict[str, Optional[str]] = {}
+        for trial_id, trial_member_id, role_name in result.all():
+            trials.add(str(trial_id))
+            if trial_member_id is not None and roles.get(str(trial_id)) is None:
+                roles[str(trial_id)] = role_name
+
+        return {
+            "organization_id": str(self.member.organization_id),
+            "trials": trials,
+            "roles": roles,
+        }
+
+    async def _load(self, fresh: bool = False) -> Dict[str, Any]:
+        if self._snapshot is not None and not (fresh and self._from_cache):
+            return self._snapshot
+
+        ttl = get_settings().trial_access_cache_ttl_seconds
+        key = _cache_key(self.member.id)
+
+        if not fresh and self.redis is not None and ttl > 0:
+            try:
+                cached = await self.redis.get(key)
+            except Exception as e:
+                logger.warning(f"[TRIAL_ACCESS] Redis get failed: {e}")
+                cached = None
+            if cached:
+                snapshot = json.loads(cached)
+                snapshot["trials"] = set(snapshot["trials"])
+                if snapshot.get("organization_id") == str(self.member.organization_id):
+                    self._snapshot, self._from_cache = snapshot, True
+                    return snapshot
+
+        snapshot = await self._load_from_db()
+        self._snapshot, self._from_cache = snapshot, False
+
+        if self.redis is not None and ttl > 0:
+            try:
+                payload = {**snapshot, "trials": sorted(snapshot["trials"])}
+                await self.redis.set(key, json.dumps(payload), ex=ttl)
+            except Exception as e:
+                logger.warning(f"[TRIAL_ACCESS] Redis set failed: {e}")
+        return snapshot
+
+    def _check(self, snapshot: Dict[str, Any], trial_id: str) -> Optional[int]:
+        """Return None if allowed, else the HTTP status to deny with."""
+        if trial_id not in snapshot["trials"]:
+            return 404
+        if self.is_admin or trial_id in snapshot["roles"]:
+            return None
+        return 403
+
+    # --------------------------
+    # Public interface
+    # --------------------------
+    async def can_access(self, trial_id: Any) -> bool:
+        return await self._denial(str(trial_id)) is None
+
+    async def _denial(self, trial_id: str) -> Optional[int]:
+        denial = self._check(await self._load(), trial_id)
+        if denial is not None and self._from_cache:
+            denial = self._check(await self._load(fresh=True), trial_id)
+        return denial
+
+    async def require(self, trial_id: Any) -> None:
+        """Raise 404 for trials outside the org, 403 for non-members."""
+        denial = await self._denial(str(trial_id))
+        if denial == 404:
+            raise HTTPException(status_code=404, detail="Trial not found")
+        if denial == 403:
+            raise HTTPException(status_code=403, detail="Not authorized for this trial")
+
+    async def role_for(self, trial_id: Any) -> Optional[str]:
+        """The member's active role name in the trial, if any."""
+        trial_id = str(trial_id)
+        role = (await self._load())["roles"].get(trial_id)
+        if role is None and self._from_cache:
+            role = (await self._load(fresh=True))["roles"].get(trial_id)
+        return role
+
+    async def accessible_trial_ids(self) -> Set[UUID]:
+        snapshot = await self._load()
+        return {
+            UUID(t) for t in snapshot["trials"]
+            if self.is_admin or t in snapshot["roles"]
+        }
@@ -0,0 +1,33 @@
+"""
+Rolling latency window with percentile snapshots.
+"""
+from collections import deque
+from typing import Deque
+
+
+class LatencyTracker:
+    """
+    Rolling window of latency samples with percentile snapshots.
+    Process-wide; cheap enough to record on every call.
+    """
+
+    def __init__(self, window: int = 500):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency_ms: float) -> None:
+        self._samples.append(latency_ms)
+
+    def percentile(self, pct: float) -> float:
+        """Nearest-rank percentile over the current window (0.0 when empty)."""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": len(self._samples),
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+        }
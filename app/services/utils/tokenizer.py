@@ -1,7 +1,11 @@
-from transformers import AutoTokenizer
+from functools import lru_cache
 
 TOKENIZER_MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
-_tokenizer = AutoTokenizer.from_pretrained(TOKENIZER_MODEL_ID)
 
+
+@lru_cache(maxsize=1)
 def get_tokenizer():
-    return _tokenizer
\ No newline at end of file
+    # transformers (and the model download) load on first use, not at import
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(TOKENIZER_MODEL_ID)
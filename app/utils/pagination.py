@@ -0,0 +1,128 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is the sort key of the last row of a page, serialized as
+URL-safe base64 JSON. Clients pass it back unchanged to fetch the next page.
+
+NULL sort keys follow Postgres' default placement (NULL sorts above every
+value: first when descending, last when ascending), so the usual
+``(col DESC, id DESC)`` indexes still serve the ORDER BY.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.sql import Select
+
+_RAW_TYPES = (str, int, float, bool, type(None))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(*values: Any) -> str:
+    """Serialize sort-key values (datetimes, UUIDs, scalars) into an opaque cursor."""
+    parts = []
+    for value in values:
+        if isinstance(value, datetime):
+            parts.append({"t": "dt", "v": value.isoformat()})
+        elif isinstance(value, date):
+            parts.append({"t": "d", "v": value.isoformat()})
+        elif isinstance(value, UUID):
+            parts.append({"t": "uuid", "v": str(value)})
+        else:
+            parts.append({"t": "raw", "v": value})
+    raw = json.dumps(parts, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], arity: Optional[int] = None) -> Optional[List[Any]]:
+    """
+    Inverse of encode_cursor. With ``arity``, the cursor must hold exactly
+    that many values.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        parts = json.loads(raw)
+        if not isinstance(parts, list) or not parts:
+            raise ValueError("expected a non-empty list")
+        if arity is not None and len(parts) != arity:
+            raise ValueError(f"expected {arity} values, got {len(parts)}")
+        values = []
+        for part in parts:
+            kind, value = part["t"], part["v"]
+            if kind in ("dt", "d", "uuid") and not isinstance(value, str):
+                raise ValueError(f"{kind} value must be a string")
+            if kind == "dt":
+                values.append(datetime.fromisoformat(value))
+            elif kind == "d":
+                values.append(date.fromisoformat(value))
+            elif kind == "uuid":
+                values.append(UUID(value))
+            elif kind == "raw" and isinstance(value, _RAW_TYPES):
+                values.append(value)
+            else:
+                raise ValueError(f"unsupported value type {kind!r}")
+        return values
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def apply_keyset(
+    stmt: Select,
+    sort_column: Any,
+    id_column: Any,
+    after: Optional[List[Any]],
+    limit: int,
+    descending: bool = True,
+) -> Select:
+    """
+    Order stmt by (sort_column, id_column), resume after a decoded cursor and
+    fetch one extra row so the caller can tell whether another page exists.
+
+    A nullable sort_column is ordered with NULLs above every value (see the
+    module docstring) and the cursor predicate pages through them too.
+    """
+    nullable = getattr(getattr(sort_column, "expression", sort_column), "nullable", True)
+    if after:
+        sort_value, id_value = after
+        if sort_value is None:
+            # Inside the NULL block: the rest of it, then (descending) every non-NULL row
+            rest = and_(sort_column.is_(None), id_column < id_value if descending else id_column > id_value)
+            predicate = or_(rest, sort_column.isnot(None)) if descending else rest
+        else:
+            key = tuple_(sort_column, id_column)
+            predicate = key < tuple_(*after) if descending else key > tuple_(*after)
+            if nullable and not descending:
+                predicate = or_(predicate, sort_column.is_(None))
+        stmt = stmt.where(predicate)
+    if descending:
+        sort_order = sort_column.desc().nulls_first() if nullable else sort_column.desc()
+        stmt = stmt.order_by(sort_order, id_column.desc())
+    else:
+        sort_order = sort_column.asc().nulls_last() if nullable else sort_column.asc()
+        stmt = stmt.order_by(sort_order, id_column.asc())
+    return stmt.limit(limit + 1)
+
+
+def split_page(
+    rows: Sequence[Any],
+    limit: int,
+    key: Callable[[Any], Tuple[Any, ...]],
+) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and return (page, next_cursor)."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
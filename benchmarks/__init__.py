@@ -0,0 +1,5 @@
+"""
+Offline RAG benchmark harness.
+
+See benchmarks/README.md. Nothing in app/ imports this package.
+"""
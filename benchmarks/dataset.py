@@ -0,0 +1,84 @@
+"""
+Loading synthetic protocols into the benchmark database.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+
+from benchmarks.fake_providers import fake_embedding
+from benchmarks.synthetic import Protocol, chunk_metadata
+
+
+@dataclass
+class LoadedDocument:
+    document_id: UUID
+    protocol: Protocol
+
+    def pdf_url(self, fake_url: str) -> str:
+        """Where the fake providers serve this protocol's PDF."""
+        return f"{fake_url}/protocols/{self.protocol.pages}/{self.protocol.seed}.pdf"
+
+
+async def insert_documents(engine, documents: List[LoadedDocument], fake_url: str) -> None:
+    """Create the trial_documents rows the chunks (and upload jobs) hang off."""
+    async with engine.begin() as conn:
+        for doc in documents:
+            await conn.execute(
+                text(
+                    "INSERT INTO trial_documents (id, document_name, document_type, document_url, status, mime_type) "
+                    "VALUES (:id, :name, 'protocol', :url, 'active', 'application/pdf')"
+                ),
+                {"id": doc.document_id, "name": doc.protocol.title, "url": doc.pdf_url(fake_url)},
+            )
+
+
+async def seed_chunks(
+    engine,
+    documents: List[LoadedDocument],
+    dimensions: int,
+    large_dimensions: Optional[int] = None,
+) -> None:
+    """
+    Write one chunk per paragraph with fake embeddings, skipping Docling.
+    large_dimensions also fills embedding_large, for embedding-column comparisons.
+    """
+    insert = text(
+        "INSERT INTO document_chunks_docling "
+        "(id, document_id, content, page_number, chunk_metadata, embedding, embedding_large) "
+        "VALUES (:id, :document_id, :content, :page, CAST(:metadata AS jsonb), "
+        "CAST(:embedding AS vector), CAST(:embedding_large AS vector))"
+    )
+    async with engine.begin() as conn:
+        for doc in documents:
+            rows = [
+                {
+                    "id": uuid4(),
+                    "document_id": doc.document_id,
+                    "content": paragraph.text,
+                    "page": paragraph.page,
+                    "metadata": json.dumps(chunk_metadata(doc.protocol, paragraph, i)),
+                    "embedding": json.dumps(fake_embedding(paragraph.text, dimensions)),
+                    "embedding_large": (
+                        json.dumps(fake_embedding(paragraph.text, large_dimensions)) if large_dimensions else None
+                    ),
+                }
+                for i, paragraph in enumerate(doc.protocol.paragraphs)
+            ]
+            await conn.execute(insert, rows)
+            await conn.execute(
+                text("UPDATE trial_documents SET ingestion_status = 'ready' WHERE id = :id"),
+                {"id": doc.document_id},
+            )
+
+
+async def delete_documents(engine, documents: List[LoadedDocument]) -> None:
+    """Remove benchmark documents; chunks and cache rows cascade."""
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("DELETE FROM trial_documents WHERE id = ANY(:ids)"),
+            {"ids": [doc.document_id for doc in documents]},
+        )
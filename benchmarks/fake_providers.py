@@ -0,0 +1,243 @@
+"""
+Deterministic stand-ins for the OpenAI embeddings and Anthropic Messages APIs.
+
+Point the backend at it with OPENAI_BASE_URL=http://host:port/v1 and
+ANTHROPIC_BASE_URL=http://host:port. It also serves the synthetic protocol
+PDFs used by upload-mode runs:
+
+    python -m benchmarks.fake_providers --port 8765 --llm-base-ms 800
+
+Embeddings are hashed bag-of-words vectors, so texts that share words are
+close in cosine space and retrieval behaves roughly like the real thing.
+Latency is base + per-item cost, scaled by seeded log-normal jitter.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Sequence, Union
+
+from fastapi import FastAPI, HTTPException, Request, Response
+
+from benchmarks.synthetic import generate_protocol, render_pdf
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+CONTEXT_HEADER_RE = re.compile(r"^\[(?P<title>.+?)\|p(?P<page>\d+)\|bbox:(?P<bbox>.*)\]$")
+
+
+@dataclass
+class LatencyProfile:
+    """Simulated service time: base_ms + per_item_ms * items, times jitter."""
+    base_ms: float = 0.0
+    per_item_ms: float = 0.0
+    jitter: float = 0.0  # Sigma of the log-normal multiplier (0 = fixed latency)
+
+    def sample(self, items: int, rng: random.Random) -> float:
+        seconds = (self.base_ms + self.per_item_ms * items) / 1000
+        if self.jitter > 0:
+            seconds *= rng.lognormvariate(0.0, self.jitter)
+        return seconds
+
+
+@dataclass
+class FakeProviderConfig:
+    embedding: LatencyProfile
+    llm: LatencyProfile  # per_item_ms is charged per output token
+    dimensions: int = 1536
+    seed: int = 0
+
+
+def fake_embedding(text: Union[str, Sequence[int]], dimensions: int) -> List[float]:
+    """Unit-length hashed bag-of-words vector; identical input gives identical output."""
+    if isinstance(text, str):
+        tokens = TOKEN_RE.findall(text.lower())
+    else:
+        # langchain sends tiktoken ids when it checks the context length
+        tokens = [str(t) for t in text]
+
+    vector = [0.0] * dimensions
+    for token in tokens:
+        digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        vector[value % dimensions] += 1.0 if (value >> 63) else -1.0
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        vector[0] = 1.0
+        return vector
+    return [v / norm for v in vector]
+
+
+def _embedding_inputs(raw) -> list:
+    """Normalise the four input shapes the OpenAI API accepts to a list of items."""
+    if isinstance(raw, str):
+        return [raw]
+    if raw and isinstance(raw[0], int):
+        return [raw]
+    return list(raw)
+
+
+def _encode(vector: List[float], encoding_format: str):
+    if encoding_format == "base64":
+        return base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode()
+    return vector
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def fake_answer(user_message: str, max_sources: int = 3) -> str:
+    """A JSON answer in the SYSTEM_PROMPT format, citing the first context chunks."""
+    lines = user_message.splitlines()
+    question = user_message.rsplit("QUESTION:", 1)[-1].strip()
+    sources = []
+    for i, line in enumerate(lines[:-1]):
+        match = CONTEXT_HEADER_RE.match(line)
+        if not match:
+            continue
+        try:
+            bbox = json.loads(match["bbox"].replace("(", "[").replace(")", "]"))
+        except ValueError:
+            bbox = None
+        if bbox and not isinstance(bbox[0], list):
+            bbox = [bbox]
+        sources.append({
+            "name": match["title"],
+            "page": int(match["page"]),
+            "section": None,
+            "exactText": lines[i + 1][:160],
+            "bboxes": bbox or [],
+            "relevance": "high",
+        })
+        if len(sources) == max_sources:
+            break
+
+    citations = " ".join(f"({s['name']}, p. {s['page']})" for s in sources)
+    excerpt = " ".join(s["exactText"] for s in sources)[:600]
+    return json.dumps({
+        "response": f"**{question}**\n\n{excerpt} {citations}".strip(),
+        "sources": sources,
+    })
+
+
+def create_app(config: FakeProviderConfig) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI/Anthropic providers")
+    rng = random.Random(config.seed)
+
+    @app.get("/healthz")
+    def healthz():
+        return {"status": "ok"}
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        inputs = _embedding_inputs(body.get("input", []))
+        dimensions = body.get("dimensions") or config.dimensions
+        encoding_format = body.get("encoding_format") or "float"
+
+        await asyncio.sleep(config.embedding.sample(len(inputs), rng))
+        prompt_tokens = sum(
+            _estimate_tokens(item) if isinstance(item, str) else len(item) for item in inputs
+        )
+        return {
+            "object": "list",
+            "data": [
+                {
+                    "object": "embedding",
+                    "index": i,
+                    "embedding": _encode(fake_embedding(item, dimensions), encoding_format),
+                }
+                for i, item in enumerate(inputs)
+            ],
+            "model": body.get("model", "text-embedding-3-small"),
+            "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+        }
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        if body.get("stream"):
+            raise HTTPException(status_code=400, detail="Streaming is not simulated")
+
+        content = body["messages"][-1]["content"]
+        if isinstance(content, list):
+            content = "".join(block.get("text", "") for block in content)
+        system = body.get("system") or ""
+        if isinstance(system, list):
+            system = "".join(block.get("text", "") for block in system)
+
+        text = fake_answer(content)
+        output_tokens = min(_estimate_tokens(text), body.get("max_tokens", 4096))
+        await asyncio.sleep(config.llm.sample(output_tokens, rng))
+        return {
+            "id": f"msg_fake_{hashlib.sha1(content.encode()).hexdigest()[:16]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "fake"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": _estimate_tokens(system + content),
+                "output_tokens": output_tokens,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 0,
+            },
+        }
+
+    @app.get("/protocols/{pages}/{seed}.pdf")
+    def protocol_pdf(pages: int, seed: int):
+        if not 1 <= pages <= 1000:
+            raise HTTPException(status_code=400, detail="pages must be 1..1000")
+        return Response(content=_protocol_pdf(pages, seed), media_type="application/pdf")
+
+    return app
+
+
+@lru_cache(maxsize=64)
+def _protocol_pdf(pages: int, seed: int) -> bytes:
+    return render_pdf(generate_protocol(pages, seed))
+
+
+def add_latency_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--embedding-base-ms", type=float, default=25.0)
+    parser.add_argument("--embedding-per-input-ms", type=float, default=0.5)
+    parser.add_argument("--llm-base-ms", type=float, default=400.0)
+    parser.add_argument("--llm-per-token-ms", type=float, default=4.0)
+    parser.add_argument("--jitter", type=float, default=0.25, help="log-normal sigma")
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeProviderConfig:
+    return FakeProviderConfig(
+        embedding=LatencyProfile(args.embedding_base_ms, args.embedding_per_input_ms, args.jitter),
+        llm=LatencyProfile(args.llm_base_ms, args.llm_per_token_ms, args.jitter),
+        dimensions=args.dimensions,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+
+    print(f"fake providers on http://{args.host}:{args.port}", flush=True)
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
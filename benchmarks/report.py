@@ -0,0 +1,95 @@
+"""
+Latency summaries for benchmark runs.
+
+Per-stage numbers come from the backend's own spans (TRACING_EXPORTER=json,
+see app/core/tracing.py), so the breakdown matches what production tracing
+would show rather than what the client can infer from the outside.
+"""
+
+import json
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (numpy's default method)."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: Sequence[float]) -> dict:
+    """count/mean/p50/p95/p99/max of a list of millisecond durations."""
+    summary = {"count": len(values), "mean": sum(values) / len(values) if values else math.nan}
+    for pct in PERCENTILES:
+        summary[f"p{pct}"] = percentile(values, pct)
+    summary["max"] = max(values) if values else math.nan
+    return summary
+
+
+def _span_attributes(span: dict) -> dict:
+    attributes = {}
+    for attribute in span.get("attributes", []):
+        value = attribute.get("value", {})
+        attributes[attribute["key"]] = next(iter(value.values()), None) if value else None
+    return attributes
+
+
+def iter_spans(lines: Iterable[str]) -> Iterable[dict]:
+    """Spans from OTLP/JSON lines as written by JsonFileExporter."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        request = json.loads(line)
+        for resource_spans in request.get("resourceSpans", []):
+            for scope_spans in resource_spans.get("scopeSpans", []):
+                yield from scope_spans.get("spans", [])
+
+
+def stage_durations(
+    lines: Iterable[str],
+    since_ns: int = 0,
+    split_by: Optional[Dict[str, str]] = None,
+) -> Dict[str, List[float]]:
+    """
+    Millisecond durations grouped by span name.
+
+    split_by maps a span name to an attribute whose value is appended to the
+    name, e.g. {"rag.cache_lookup": "cache.name"} gives rag.cache_lookup[semantic].
+    Spans that started before since_ns (warm-up traffic) are skipped.
+    """
+    split_by = split_by or {}
+    durations: Dict[str, List[float]] = defaultdict(list)
+    for span in iter_spans(lines):
+        start = int(span["startTimeUnixNano"])
+        if start < since_ns:
+            continue
+        name = span["name"]
+        if name in split_by:
+            value = _span_attributes(span).get(split_by[name])
+            if value is not None:
+                name = f"{name}[{value}]"
+        durations[name].append((int(span["endTimeUnixNano"]) - start) / 1e6)
+    return dict(durations)
+
+
+def format_table(rows: Dict[str, dict], title: str) -> str:
+    """Fixed-width table of summarize() results, one row per key."""
+    header = f"{'stage':<34}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"
+    out = [title, header, "-" * len(header)]
+    for name in sorted(rows):
+        s = rows[name]
+        out.append(
+            f"{name:<34}{s['count']:>7}{s['p50']:>10.1f}{s['p95']:>10.1f}{s['p99']:>10.1f}{s['max']:>10.1f}"
+        )
+    return "\n".join(out)
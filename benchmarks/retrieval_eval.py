@@ -0,0 +1,440 @@
+"""
+Retrieval quality and latency across configuration variants.
+
+A golden set is a JSON file of questions with the pages (or chunk ids) that
+should be retrieved for them:
+
+    {"name": "protocols-v1", "queries": [
+        {"document_id": "...", "document_name": "...", "question": "...",
+         "expected_pages": [12, 13], "expected_chunk_ids": []}]}
+
+Each variant is the current settings plus overrides. Every golden query runs
+through RagRetrievalService (and the reranker, if the variant enables it)
+against the configured database. Caches are not used, so every run measures
+cold retrieval.
+
+    python -m benchmarks.retrieval_eval --golden golden.json \\
+        --variant "vector-only:hybrid_search_enabled=false" \\
+        --variant "rrf-20:hybrid_search_rrf_k=20" \\
+        --variant "large:embedding_column=embedding_large"
+
+    # Self-contained: seed synthetic protocols, use fake embeddings
+    python -m benchmarks.retrieval_eval --synthetic --sizes 5,40,150
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from uuid import UUID, uuid4
+
+from pydantic import TypeAdapter
+
+from app.config import Settings, get_settings
+from benchmarks.report import summarize
+
+DEFAULT_KS = (1, 5, 10)
+LARGE_EMBEDDING_DIMENSIONS = 2000  # embedding_large column width
+DEFAULT_VARIANTS = [
+    "baseline",
+    "vector-only:hybrid_search_enabled=false",
+    "rrf-k-20:hybrid_search_rrf_k=20",
+    "top-k-10:retrieval_top_k=10",
+]
+
+
+# --------------------------
+# Golden sets
+# --------------------------
+@dataclass
+class GoldenQuery:
+    document_id: UUID
+    document_name: str
+    question: str
+    expected_pages: List[int] = field(default_factory=list)
+    expected_chunk_ids: List[str] = field(default_factory=list)
+
+    def relevant_items(self) -> set:
+        """What counts as a hit; chunk ids take precedence over pages when given."""
+        if self.expected_chunk_ids:
+            return {f"chunk:{c}" for c in self.expected_chunk_ids}
+        return {f"page:{p}" for p in self.expected_pages}
+
+    def item_for(self, chunk: dict) -> str:
+        if self.expected_chunk_ids:
+            return f"chunk:{chunk.get('id')}"
+        return f"page:{chunk.get('metadata', {}).get('page')}"
+
+
+@dataclass
+class GoldenSet:
+    name: str
+    queries: List[GoldenQuery]
+
+    @classmethod
+    def load(cls, path: str) -> "GoldenSet":
+        data = json.loads(Path(path).read_text())
+        queries = [
+            GoldenQuery(
+                document_id=UUID(q["document_id"]),
+                document_name=q["document_name"],
+                question=q["question"],
+                expected_pages=[int(p) for p in q.get("expected_pages", [])],
+                expected_chunk_ids=[str(c) for c in q.get("expected_chunk_ids", [])],
+            )
+            for q in data["queries"]
+        ]
+        unjudged = [q.question for q in queries if not q.relevant_items()]
+        if unjudged:
+            raise ValueError(f"{len(unjudged)} golden queries have no expected pages or chunks: {unjudged[:3]}")
+        return cls(name=data.get("name", Path(path).stem), queries=queries)
+
+    def save(self, path: str) -> None:
+        queries = [dict(asdict(q), document_id=str(q.document_id)) for q in self.queries]
+        Path(path).write_text(json.dumps({"name": self.name, "queries": queries}, indent=2))
+
+
+# --------------------------
+# Metrics
+# --------------------------
+def ranked_hits(items: Sequence[str], relevant: set) -> List[bool]:
+    """Hit flags by rank; a relevant item only counts the first time it appears."""
+    seen = set()
+    hits = []
+    for item in items:
+        hit = item in relevant and item not in seen
+        if hit:
+            seen.add(item)
+        hits.append(hit)
+    return hits
+
+
+def recall_at_k(hits: Sequence[bool], relevant_count: int, k: int) -> float:
+    return sum(hits[:k]) / relevant_count if relevant_count else 0.0
+
+
+def reciprocal_rank(hits: Sequence[bool]) -> float:
+    for rank, hit in enumerate(hits, start=1):
+        if hit:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(hits: Sequence[bool], relevant_count: int, k: int) -> float:
+    """Binary-gain nDCG@k."""
+    dcg = sum(1.0 / math.log2(rank + 1) for rank, hit in enumerate(hits[:k], start=1) if hit)
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(k, relevant_count) + 1))
+    return dcg / ideal if ideal else 0.0
+
+
+# --------------------------
+# Variants
+# --------------------------
+@dataclass
+class Variant:
+    name: str
+    overrides: Dict[str, Any] = field(default_factory=dict)
+    embedding_column: str = "embedding"  # Not a setting: production only queries "embedding"
+
+    @classmethod
+    def parse(cls, spec: str) -> "Variant":
+        """'name' or 'name:field=value,field=value' over Settings fields (plus embedding_column)."""
+        from app.services.doclingRag.rag_retrieval_service import EMBEDDING_COLUMNS
+
+        name, _, assignments = spec.partition(":")
+        overrides = {}
+        embedding_column = "embedding"
+        for assignment in filter(None, (a.strip() for a in assignments.split(","))):
+            key, sep, value = assignment.partition("=")
+            key = key.strip()
+            if sep and key == "embedding_column" and value.strip() in EMBEDDING_COLUMNS:
+                embedding_column = value.strip()
+                continue
+            if not sep or key not in Settings.model_fields:
+                raise ValueError(f"Invalid override {assignment!r} in variant {name!r}")
+            overrides[key] = TypeAdapter(Settings.model_fields[key].annotation).validate_python(value.strip())
+        return cls(name=name.strip(), overrides=overrides, embedding_column=embedding_column)
+
+    def apply(self, base: Settings) -> Settings:
+        return base.model_copy(update=self.overrides)
+
+
+def build_reranker(config: Settings):
+    """The variant's reranker, or None when reranking is off."""
+    if not config.reranker_enabled:
+        return None
+    if config.reranker_provider.lower() != "cohere" or not config.cohere_api_key:
+        raise ValueError("Reranker variants need reranker_provider=cohere and COHERE_API_KEY")
+    from app.services.reranking.reranker_service import CohereReranker
+
+    return CohereReranker(api_key=config.cohere_api_key, model=config.reranker_model, fallback_on_error=False)
+
+
+def openai_embedder(config: Settings, embedding_column: str):
+    """Embedding client matching the variant's vector column."""
+    from app.core.openai import get_embedding_client, get_embedding_client_large
+
+    if embedding_column == "embedding_large":
+        return get_embedding_client_large()
+    return get_embedding_client()
+
+
+class FakeEmbeddings:
+    """In-process twin of the fake embeddings endpoint, for synthetic runs."""
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+
+    def embed_query(self, text: str) -> List[float]:
+        from benchmarks.fake_providers import fake_embedding
+
+        return fake_embedding(text, self.dimensions)
+
+
+def fake_embedder(config: Settings, embedding_column: str) -> FakeEmbeddings:
+    if embedding_column == "embedding_large":
+        return FakeEmbeddings(LARGE_EMBEDDING_DIMENSIONS)
+    return FakeEmbeddings(config.embedding_dimensions)
+
+
+# --------------------------
+# Evaluation
+# --------------------------
+@dataclass
+class VariantResult:
+    variant: Variant
+    ks: Sequence[int]
+    recall: Dict[int, float] = field(default_factory=dict)
+    mrr: float = 0.0
+    ndcg: float = 0.0  # at max(ks)
+    latency_ms: dict = field(default_factory=dict)  # retrieval (+ rerank), embedding excluded
+    embedding_ms: dict = field(default_factory=dict)
+    errors: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "variant": self.variant.name,
+            "overrides": self.variant.overrides,
+            "embedding_column": self.variant.embedding_column,
+            "recall": {f"@{k}": v for k, v in self.recall.items()},
+            "mrr": self.mrr,
+            f"ndcg@{max(self.ks)}": self.ndcg,
+            "latency_ms": self.latency_ms,
+            "embedding_ms": self.embedding_ms,
+            "errors": self.errors,
+        }
+
+
+async def evaluate_variant(
+    golden: GoldenSet,
+    variant: Variant,
+    session_factory,
+    embedder_for: Callable[[Settings, str], Any],
+    base_settings: Settings,
+    ks: Sequence[int] = DEFAULT_KS,
+    repeats: int = 1,
+    embedding_cache: Optional[Dict[tuple, tuple]] = None,
+) -> VariantResult:
+    """
+    Score one variant. Embeddings are computed once per (column, question)
+    and shared through embedding_cache, so latency compares retrieval only.
+    """
+    from app.services.doclingRag.rag_retrieval_service import RagRetrievalService
+
+    config = variant.apply(base_settings)
+    embedder = embedder_for(config, variant.embedding_column)
+    reranker = build_reranker(config)
+    embedding_cache = {} if embedding_cache is None else embedding_cache
+    result = VariantResult(variant=variant, ks=ks)
+    recalls: Dict[int, List[float]] = {k: [] for k in ks}
+    rrs, ndcgs, latencies, embedding_times = [], [], [], []
+
+    for query in golden.queries:
+        key = (variant.embedding_column, query.question)
+        if key not in embedding_cache:
+            start = time.perf_counter()
+            embedding = await asyncio.to_thread(embedder.embed_query, query.question)
+            embedding_cache[key] = (embedding, (time.perf_counter() - start) * 1000)
+        embedding, embedding_ms = embedding_cache[key]
+        embedding_times.append(embedding_ms)
+
+        chunks = None
+        for _ in range(max(1, repeats)):
+            start = time.perf_counter()
+            try:
+                async with session_factory() as db:
+                    service = RagRetrievalService(
+                        db=db, embedding_client=embedder, config=config,
+                        embedding_column=variant.embedding_column,
+                    )
+                    chunks, _ = await service.retrieve_similar_chunks(
+                        query.question, query.document_id, query.document_name,
+                        precomputed_embedding=embedding,
+                    )
+                if reranker is not None:
+                    chunks = await reranker.rerank(query.question, chunks, top_k=config.reranker_top_k)
+            except Exception as e:
+                print(f"[{variant.name}] {query.question[:60]!r}: {e}", file=sys.stderr)
+                result.errors += 1
+                chunks = None
+                break
+            latencies.append((time.perf_counter() - start) * 1000)
+        if chunks is None:
+            continue
+
+        relevant = query.relevant_items()
+        hits = ranked_hits([query.item_for(c) for c in chunks], relevant)
+        for k in ks:
+            recalls[k].append(recall_at_k(hits, len(relevant), k))
+        rrs.append(reciprocal_rank(hits))
+        ndcgs.append(ndcg_at_k(hits, len(relevant), max(ks)))
+
+    # Failed queries score zero rather than dropping out of the average
+    scored = len(golden.queries)
+    result.recall = {k: sum(v) / scored for k, v in recalls.items()}
+    result.mrr = sum(rrs) / scored
+    result.ndcg = sum(ndcgs) / scored
+    result.latency_ms = summarize(latencies)
+    result.embedding_ms = summarize(embedding_times)
+    return result
+
+
+def recommend(results: List[VariantResult], k: int, tolerance: float) -> Optional[VariantResult]:
+    """Fastest variant (p50) whose recall@k is within `tolerance` of the first (baseline) variant."""
+    if not results:
+        return None
+    floor = results[0].recall[k] - tolerance
+    eligible = [r for r in results if r.errors == 0 and r.recall[k] >= floor]
+    return min(eligible, key=lambda r: r.latency_ms["p50"], default=None)
+
+
+def format_comparison(results: List[VariantResult], recommended: Optional[VariantResult]) -> str:
+    ks = results[0].ks
+    header = f"{'variant':<24}" + "".join(f"{'R@' + str(k):>8}" for k in ks)
+    header += f"{'MRR':>8}{'nDCG@' + str(max(ks)):>9}{'p50 ms':>9}{'p95 ms':>9}{'dR@' + str(max(ks)):>8}"
+    lines = [header, "-" * len(header)]
+    baseline = results[0].recall[max(ks)]
+    for r in results:
+        marker = " *" if r is recommended else ""
+        lines.append(
+            f"{r.variant.name:<24}"
+            + "".join(f"{r.recall[k]:>8.3f}" for k in ks)
+            + f"{r.mrr:>8.3f}{r.ndcg:>9.3f}{r.latency_ms['p50']:>9.1f}{r.latency_ms['p95']:>9.1f}"
+            + f"{r.recall[max(ks)] - baseline:>+8.3f}{marker}"
+        )
+        if r.errors:
+            lines.append(f"{'':<24}{r.errors} queries failed")
+    if recommended is not None:
+        lines.append(f"\n* fastest variant without recall@{max(ks)} loss vs {results[0].variant.name}: "
+                     f"{recommended.variant.name}")
+    return "\n".join(lines)
+
+
+# --------------------------
+# Entry point
+# --------------------------
+async def _synthetic_golden(engine, args) -> tuple:
+    from benchmarks.dataset import LoadedDocument, insert_documents, seed_chunks
+    from benchmarks.synthetic import generate_protocol, golden_queries
+
+    documents = [
+        LoadedDocument(uuid4(), generate_protocol(pages, seed=args.seed * 1000 + i))
+        for pages in args.sizes
+        for i in range(args.docs_per_size)
+    ]
+    await insert_documents(engine, documents, fake_url="http://127.0.0.1:8765")
+    await seed_chunks(engine, documents, args.dimensions, large_dimensions=LARGE_EMBEDDING_DIMENSIONS)
+    queries = [
+        GoldenQuery(doc.document_id, doc.protocol.title, question, expected_pages=pages)
+        for doc in documents
+        for question, pages in golden_queries(doc.protocol, args.queries_per_document, args.seed)
+    ]
+    return GoldenSet(name=f"synthetic-{args.seed}", queries=queries), documents
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    base_settings = get_settings()
+    if args.synthetic:
+        base_settings = base_settings.model_copy(update={"embedding_dimensions": args.dimensions})
+    engine = create_async_engine(args.database_url or base_settings.database_url)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    variants = [Variant.parse(spec) for spec in (args.variant or DEFAULT_VARIANTS)]
+    if variants[0].overrides or variants[0].embedding_column != "embedding":
+        variants.insert(0, Variant("baseline"))
+
+    documents = []
+    try:
+        if args.synthetic:
+            golden, documents = await _synthetic_golden(engine, args)
+            embedder_for = fake_embedder
+        else:
+            golden = GoldenSet.load(args.golden)
+            embedder_for = openai_embedder
+        if args.save_golden:
+            golden.save(args.save_golden)
+
+        print(f"Golden set {golden.name!r}: {len(golden.queries)} queries, {len(variants)} variants", flush=True)
+        embedding_cache: Dict[tuple, tuple] = {}
+        results = []
+        for variant in variants:
+            results.append(await evaluate_variant(
+                golden, variant, session_factory, embedder_for, base_settings,
+                ks=args.k, repeats=args.repeats, embedding_cache=embedding_cache,
+            ))
+    finally:
+        if documents and not args.keep_data:
+            from benchmarks.dataset import delete_documents
+
+            await delete_documents(engine, documents)
+        await engine.dispose()
+
+    recommended = recommend(results, max(args.k), args.recall_tolerance)
+    print()
+    print(format_comparison(results, recommended))
+    return {
+        "golden_set": golden.name,
+        "queries": len(golden.queries),
+        "results": [r.as_dict() for r in results],
+        "recommended": recommended.variant.name if recommended else None,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Retrieval quality/latency regression suite")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--golden", help="golden set JSON file")
+    source.add_argument("--synthetic", action="store_true", help="seed synthetic protocols and derive a golden set")
+    parser.add_argument("--variant", action="append",
+                        help="'name:field=value,...' (repeatable); compared against the current settings")
+    parser.add_argument("--k", type=lambda s: [int(p) for p in s.split(",")], default=list(DEFAULT_KS))
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per query (metrics use the last)")
+    parser.add_argument("--recall-tolerance", type=float, default=0.0,
+                        help="allowed recall@max(k) drop when recommending a faster variant")
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL")
+    parser.add_argument("--output", help="write the comparison as JSON")
+    parser.add_argument("--save-golden", help="write the golden set used (handy with --synthetic)")
+    parser.add_argument("--sizes", type=lambda s: [int(p) for p in s.split(",")], default=[5, 40, 150])
+    parser.add_argument("--docs-per-size", type=int, default=2)
+    parser.add_argument("--queries-per-document", type=int, default=15)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep-data", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    report = asyncio.run(run(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Deterministic synthetic clinical trial protocols.
+
+The same (pages, seed) always yields the same text, so the PDF served to
+/upload/upload-pdf, the chunks seeded straight into pgvector and the query
+mix all line up across runs.
+"""
+
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792  # US Letter, points
+MARGIN = 56
+PARAGRAPHS_PER_PAGE = 4
+
+DRUGS = ["zelotinib", "amravastat", "korimab", "tefluridine", "obrexacept", "vanoprazole"]
+CONDITIONS = [
+    "moderate-to-severe plaque psoriasis", "type 2 diabetes mellitus", "relapsed multiple myeloma",
+    "chronic heart failure", "non-small cell lung cancer", "major depressive disorder",
+]
+ENDPOINTS = [
+    "change from baseline in HbA1c", "progression-free survival", "PASI 75 response rate",
+    "overall response rate", "time to first hospitalisation", "MADRS total score",
+]
+ASSESSMENTS = [
+    "vital signs", "12-lead ECG", "haematology panel", "serum chemistry", "urinalysis",
+    "pregnancy test", "physical examination", "pharmacokinetic sampling", "quality-of-life questionnaire",
+]
+SECTIONS = [
+    "Synopsis", "Study Objectives", "Study Design", "Inclusion Criteria", "Exclusion Criteria",
+    "Investigational Product and Dosing", "Schedule of Assessments", "Adverse Event Reporting",
+    "Concomitant Medications", "Statistical Considerations", "Data Management", "Ethics and Consent",
+]
+
+QUESTION_PREFIXES = ["", "According to the protocol, ", "Can you tell me: ", "Quick check - "]
+
+
+@dataclass
+class Paragraph:
+    section: str
+    text: str
+    page: int
+    bbox: Tuple[float, float, float, float]  # (l, t, r, b), PDF points from the top-left
+
+
+@dataclass
+class Fact:
+    question: str  # Generic; usually answered on many pages
+    answer: str
+    probe: str  # Specific to one sentence, used for golden retrieval sets
+    sentence: str
+
+
+@dataclass
+class Protocol:
+    title: str
+    drug: str
+    condition: str
+    pages: int
+    seed: int
+    paragraphs: List[Paragraph] = field(default_factory=list)
+    facts: List[Fact] = field(default_factory=list)
+
+
+def _sentence(rng: random.Random, section: str, drug: str, condition: str) -> Tuple[str, Fact]:
+    """One fact-bearing sentence for a section, plus the questions it answers."""
+    day = rng.choice([1, 8, 15, 29, 57, 85, 113, 169])
+    dose = rng.choice([5, 10, 25, 50, 100, 200, 400])
+    age = rng.choice([18, 21, 40, 65])
+    window = rng.choice([2, 3, 7, 14])
+    assessment = rng.choice(ASSESSMENTS)
+    endpoint = rng.choice(ENDPOINTS)
+    templates = [
+        (f"The primary endpoint is the {endpoint} at Week {day // 7 + 1}.",
+         "What is the primary endpoint of the study?", endpoint,
+         f"At which week is the {endpoint} assessed as primary endpoint?"),
+        (f"Participants receive {dose} mg of {drug} orally once daily starting on Day {day}.",
+         f"What dose of {drug} do participants receive?", f"{dose} mg",
+         f"Which {drug} dose is started on Day {day}?"),
+        (f"Eligible participants are at least {age} years old with a confirmed diagnosis of {condition}.",
+         "What is the minimum age for inclusion?", f"{age} years",
+         f"Are participants aged {age} years with {condition} eligible?"),
+        (f"A {assessment} is performed at screening and on Day {day} with a visit window of +/- {window} days.",
+         f"When is the {assessment} performed?", f"Day {day}",
+         f"What is the visit window for the {assessment} on Day {day}?"),
+        (f"Serious adverse events must be reported to the sponsor within {window * 12} hours of awareness.",
+         "How quickly must serious adverse events be reported?", f"{window * 12} hours",
+         f"Who receives serious adverse event reports within {window * 12} hours?"),
+        (f"Participants who received a live vaccine within {window * 4} weeks before Day 1 are excluded.",
+         "Which vaccination history excludes participants?", f"{window * 4} weeks",
+         f"Is a live vaccine {window * 4} weeks before Day 1 exclusionary?"),
+        (f"The sample size of {dose * 3} participants provides 90% power for the {endpoint}.",
+         "What is the planned sample size?", f"{dose * 3} participants",
+         f"What power do {dose * 3} participants provide for the {endpoint}?"),
+    ]
+    text, question, answer, probe = rng.choice(templates)
+    sentence = f"{section}: {text}"
+    return sentence, Fact(question=question, answer=answer, probe=probe, sentence=sentence)
+
+
+def generate_protocol(pages: int, seed: int) -> Protocol:
+    """Build a protocol of `pages` pages; identical for identical arguments."""
+    rng = random.Random(f"{pages}:{seed}")
+    drug = rng.choice(DRUGS)
+    condition = rng.choice(CONDITIONS)
+    protocol = Protocol(
+        title=f"Protocol {drug.upper()}-{seed:03d}-P{pages}: {drug} in {condition}",
+        drug=drug,
+        condition=condition,
+        pages=pages,
+        seed=seed,
+    )
+
+    line_height = (PAGE_HEIGHT - 2 * MARGIN) / PARAGRAPHS_PER_PAGE
+    for page in range(1, pages + 1):
+        section = SECTIONS[(page - 1) * len(SECTIONS) // pages]
+        for slot in range(PARAGRAPHS_PER_PAGE):
+            sentences = []
+            for _ in range(rng.randint(3, 5)):
+                sentence, fact = _sentence(rng, section, drug, condition)
+                sentences.append(sentence)
+                protocol.facts.append(fact)
+            top = MARGIN + slot * line_height
+            protocol.paragraphs.append(Paragraph(
+                section=section,
+                text=" ".join(sentences),
+                page=page,
+                bbox=(MARGIN, top, PAGE_WIDTH - MARGIN, top + line_height - 8),
+            ))
+    return protocol
+
+
+def render_pdf(protocol: Protocol) -> bytes:
+    """Render the protocol with PyMuPDF (only needed for upload-mode runs)."""
+    import fitz
+
+    doc = fitz.open()
+    for page_number in range(1, protocol.pages + 1):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        page.insert_text((MARGIN, MARGIN - 16), protocol.title, fontsize=9)
+        for paragraph in protocol.paragraphs:
+            if paragraph.page == page_number:
+                page.insert_textbox(fitz.Rect(*paragraph.bbox), paragraph.text, fontsize=9)
+    try:
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def chunk_metadata(protocol: Protocol, paragraph: Paragraph, index: int) -> dict:
+    """Docling-shaped chunk_metadata, as written by RagIngestionService."""
+    l, t, r, b = paragraph.bbox
+    return {
+        "dl_meta": {
+            "headings": [paragraph.section],
+            "doc_items": [{
+                "prov": [{
+                    "page_no": paragraph.page,
+                    # Docling reports BOTTOMLEFT coordinates
+                    "bbox": {"l": l, "t": PAGE_HEIGHT - t, "r": r, "b": PAGE_HEIGHT - b,
+                             "coord_origin": "BOTTOMLEFT"},
+                }],
+            }],
+            "origin": {"filename": f"{_slug(protocol.title)}.pdf"},
+        },
+        "chunk_index": index,
+    }
+
+
+def query_pool(protocols: List[Protocol], size: int, seed: int) -> List[Tuple[Protocol, str]]:
+    """
+    Distinct (protocol, question) pairs drawn from the protocols' facts.
+    Rephrasings of one question are near-duplicates for the semantic cache.
+    """
+    rng = random.Random(seed)
+    candidates = sorted(
+        {
+            (p.seed, p.pages, prefix + question[0].lower() + question[1:] if prefix else question)
+            for p in protocols
+            for question in {f.question for f in p.facts}
+            for prefix in QUESTION_PREFIXES
+        },
+    )
+    by_key = {(p.seed, p.pages): p for p in protocols}
+    rng.shuffle(candidates)
+    return [(by_key[(s, n)], q) for s, n, q in candidates[:size]]
+
+
+def golden_queries(
+    protocol: Protocol, count: int, seed: int, max_pages: int = 3
+) -> List[Tuple[str, List[int]]]:
+    """
+    (probe question, expected pages) pairs for a golden retrieval set.
+    Expected pages are every page holding a sentence the probe was written for;
+    probes that match more than max_pages pages are too vague and skipped.
+    """
+    rng = random.Random(f"golden:{protocol.pages}:{protocol.seed}:{seed}")
+    probes: Dict[str, Set[str]] = {}
+    for fact in protocol.facts:
+        probes.setdefault(fact.probe, set()).add(fact.sentence)
+    golden = []
+    for probe, sentences in sorted(probes.items()):
+        pages = sorted({p.page for p in protocol.paragraphs if any(s in p.text for s in sentences)})
+        if len(pages) <= max_pages:
+            golden.append((probe, pages))
+    return rng.sample(golden, min(count, len(golden)))
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:60]
@@ -0,0 +1,188 @@
+"""
+Server memory and event-loop lag while /storage/upload receives concurrent large files.
+
+    python -m benchmarks.upload_memory --size-mb 200 --concurrency 8
+
+The app runs in-process under uvicorn (lifespan off, auth stubbed, local
+storage in a temp dir). Each client streams its file from disk, so RSS
+growth above the idle baseline is what the server needed to accept the
+uploads. `--mode buffered` adds a route that reads each upload into memory
+and writes it on the event loop, which is how uploads used to be stored,
+for comparison.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Optional
+from uuid import uuid4
+
+import httpx
+import uvicorn
+
+from benchmarks.report import format_table, summarize
+
+MIB = 1024 * 1024
+BUFFERED_PATH = "/benchmark/buffered-upload"
+TICK_SECONDS = 0.01
+
+
+def _rss_bytes() -> int:
+    """Current RSS on Linux; peak RSS elsewhere (close enough for one-mode runs)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class LoopMonitor:
+    """Samples RSS and how late a TICK_SECONDS sleep wakes up."""
+
+    def __init__(self):
+        self.lag_ms: List[float] = []
+        self.peak_rss = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(TICK_SECONDS)
+            self.lag_ms.append(max(0.0, (time.perf_counter() - started - TICK_SECONDS) * 1000))
+            self.peak_rss = max(self.peak_rss, _rss_bytes())
+
+    def __enter__(self) -> "LoopMonitor":
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._task.cancel()
+
+
+def _install_routes(app) -> None:
+    """Stub auth, store locally and add the buffered comparison route."""
+    from fastapi import File, UploadFile
+
+    from app.dependencies.auth import get_current_member
+    from app.dependencies.storage import get_storage_service
+    from app.services.storage.local_service import LocalStorageService
+
+    storage = LocalStorageService()
+    app.dependency_overrides[get_current_member] = lambda: SimpleNamespace(id=uuid4())
+    app.dependency_overrides[get_storage_service] = lambda: storage
+
+    async def buffered_upload(file: UploadFile = File(...), folder: Optional[str] = None):
+        data = await file.read()
+        return storage.upload_file("benchmark", data, file.filename, file.content_type, folder)
+
+    app.add_api_route(BUFFERED_PATH, buffered_upload, methods=["POST"])
+
+
+async def _upload(client: httpx.AsyncClient, path: str, source: Path, folder: str) -> None:
+    with open(source, "rb") as f:
+        response = await client.post(
+            path,
+            params={"bucket": "benchmark", "folder": folder},
+            files={"file": ("protocol.pdf", f, "application/pdf")},
+        )
+    response.raise_for_status()
+
+
+async def run_mode(client: httpx.AsyncClient, mode: str, source: Path, args: argparse.Namespace) -> dict:
+    path = BUFFERED_PATH if mode == "buffered" else "/storage/upload"
+    baseline = _rss_bytes()
+    started = time.perf_counter()
+    with LoopMonitor() as monitor:
+        await asyncio.gather(*(
+            _upload(client, path, source, f"{mode}/{i}") for i in range(args.concurrency)
+        ))
+    wall = time.perf_counter() - started
+    total_mb = args.size_mb * args.concurrency
+    return {
+        "wall_seconds": wall,
+        "throughput_mb_per_second": total_mb / wall if wall else 0.0,
+        "rss_growth_mb": max(0, monitor.peak_rss - baseline) / MIB,
+        "loop_lag_ms": summarize(monitor.lag_ms),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="upload-memory-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    os.chdir(workdir)  # Local storage writes under ./uploads
+
+    source = workdir / "source.pdf"
+    with open(source, "wb") as f:
+        block = os.urandom(MIB)
+        for _ in range(args.size_mb):
+            f.write(block)
+
+    from app.main import app
+
+    _install_routes(app)
+    server = uvicorn.Server(uvicorn.Config(
+        app, host="127.0.0.1", port=args.port, lifespan="off", log_level="warning",
+    ))
+    serving = asyncio.ensure_future(server.serve())
+    while not server.started:
+        if serving.done():
+            serving.result()
+        await asyncio.sleep(0.05)
+
+    report = {"size_mb": args.size_mb, "concurrency": args.concurrency, "workdir": str(workdir), "modes": {}}
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.port}", timeout=args.request_timeout,
+        ) as client:
+            modes = ("streaming", "buffered") if args.mode == "both" else (args.mode,)
+            for mode in modes:
+                print(f"{mode}: {args.concurrency} x {args.size_mb} MB", flush=True)
+                report["modes"][mode] = await run_mode(client, mode, source, args)
+    finally:
+        server.should_exit = True
+        await serving
+    return report
+
+
+def print_report(report: dict) -> None:
+    modes = report["modes"]
+    print()
+    print(format_table({name: m["loop_lag_ms"] for name, m in modes.items()}, "Event-loop lag (ms)"))
+    print()
+    for name, m in modes.items():
+        print(f"{name}: peak RSS +{m['rss_growth_mb']:.0f} MB, "
+              f"{m['throughput_mb_per_second']:.0f} MB/s over {m['wall_seconds']:.1f}s")
+    print(f"\nFiles: {report['workdir']}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Memory benchmark for concurrent large uploads")
+    parser.add_argument("--size-mb", type=int, default=100, help="size of each uploaded file")
+    parser.add_argument("--concurrency", type=int, default=8, help="simultaneous uploads")
+    parser.add_argument("--mode", choices=("streaming", "buffered", "both"), default="both",
+                        help="buffered: read into memory and write on the event loop, for comparison")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--request-timeout", type=float, default=600.0)
+    parser.add_argument("--workdir", help="where uploads are written (default: a temp dir)")
+    parser.add_argument("--output", help="also write the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,9 @@ Pytest fixtures for backend unit tests.
 All dependencies are mocked — no database or external services required.
 """
 
+import asyncio
 import os
+import time
 from datetime import datetime, timezone
 from typing import Generator
 from unittest.mock import AsyncMock, MagicMock
@@ -20,7 +22,8 @@ from app.main import app
 from app.dependencies.auth import get_current_member
 from app.dependencies.db import get_db
 from app.dependencies.storage import get_storage_service
-from app.dependencies.trial_access import get_trial_with_access
+from app.dependencies.trial_access import get_trial_with_access, require_trial_access
+from app.services.storage.base import SignedUrl
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -59,6 +62,142 @@ def make_rows_result(rows=None):
     return result
 
 
+class InMemoryRedis:
+    """
+    Just enough of redis.asyncio.Redis for hash-backed job state: strings,
+    hashes, MULTI pipelines and pub/sub. Values come back as bytes, like the
+    real client (decode_responses=False). TTLs are recorded, never enforced.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.published = []  # (channel, message)
+        self._subscribers = {}  # channel -> set of queues
+
+    @staticmethod
+    def _b(value):
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    async def get(self, key):
+        value = self.data.get(key)
+        if isinstance(value, dict):
+            from redis.exceptions import ResponseError
+            raise ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = self._b(value)
+        if ex:
+            self.ttls[key] = ex
+        return True
+
+    async def hgetall(self, key):
+        value = self.data.get(key, {})
+        if not isinstance(value, dict):
+            from redis.exceptions import ResponseError
+            raise ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return dict(value)
+
+    async def hget(self, key, field):
+        return (await self.hgetall(key)).get(self._b(field))
+
+    async def hset(self, key, mapping):
+        fields = self.data.setdefault(key, {})
+        added = sum(1 for k in mapping if self._b(k) not in fields)
+        fields.update({self._b(k): self._b(v) for k, v in mapping.items()})
+        return added
+
+    async def hsetnx(self, key, field, value):
+        fields = self.data.setdefault(key, {})
+        if self._b(field) in fields:
+            return 0
+        fields[self._b(field)] = self._b(value)
+        return 1
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    async def expire(self, key, seconds):
+        if key not in self.data:
+            return False
+        self.ttls[key] = seconds
+        return True
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+        queues = self._subscribers.get(channel, set())
+        for queue in queues:
+            queue.put_nowait({"type": "message", "channel": self._b(channel), "data": self._b(message)})
+        return len(queues)
+
+    def pipeline(self, transaction=True):
+        return _InMemoryPipeline(self)
+
+    def pubsub(self):
+        return _InMemoryPubSub(self)
+
+
+class _InMemoryPipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._calls = []
+
+    def __getattr__(self, name):
+        command = getattr(self._redis, name)
+
+        def buffer(*args, **kwargs):
+            self._calls.append((command, args, kwargs))
+            return self
+        return buffer
+
+    async def execute(self):
+        calls, self._calls = self._calls, []
+        return [await command(*args, **kwargs) for command, args, kwargs in calls]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _InMemoryPubSub:
+    def __init__(self, redis):
+        self._redis = redis
+        self._queue = asyncio.Queue()
+        self.channels = set()
+        self.closed = False
+
+    async def subscribe(self, *channels):
+        for channel in channels:
+            self._redis._subscribers.setdefault(channel, set()).add(self._queue)
+            self.channels.add(channel)
+
+    async def unsubscribe(self, *channels):
+        for channel in channels or list(self.channels):
+            self._redis._subscribers.get(channel, set()).discard(self._queue)
+            self.channels.discard(channel)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def memory_redis():
+    """In-process Redis double (see InMemoryRedis)."""
+    return InMemoryRedis()
+
+
 # ---------------------------------------------------------------------------
 # Mock Member fixtures
 # ---------------------------------------------------------------------------
@@ -133,7 +272,13 @@ def mock_storage():
         "path": "uploads/test/file.pdf",
         "file_size": 1024,
     })
+    storage.save_upload = AsyncMock(return_value={
+        "path": "uploads/test/file.pdf",
+        "file_size": 1024,
+    })
     storage.delete_file = MagicMock()
+    storage.delete_file_async = AsyncMock()
+    storage.sign_url = AsyncMock(return_value=SignedUrl("https://signed.example/file.pdf", time.time() + 3600))
     return storage
 
 
@@ -192,6 +337,7 @@ def trial_client(mock_member, mock_db, mock_trial) -> Generator[TestClient, None
     app.dependency_overrides[get_current_member] = lambda: mock_member
     app.dependency_overrides[get_db] = lambda: mock_db
     app.dependency_overrides[get_trial_with_access] = lambda: mock_trial
+    app.dependency_overrides[require_trial_access] = lambda: MagicMock()
     with TestClient(app, raise_server_exceptions=False) as c:
         yield c
     app.dependency_overrides.clear()
@@ -214,6 +360,7 @@ def trial_storage_client(mock_member, mock_db, mock_trial, mock_storage) -> Gene
     app.dependency_overrides[get_current_member] = lambda: mock_member
     app.dependency_overrides[get_db] = lambda: mock_db
     app.dependency_overrides[get_trial_with_access] = lambda: mock_trial
+    app.dependency_overrides[require_trial_access] = lambda: MagicMock()
     app.dependency_overrides[get_storage_service] = lambda: mock_storage
     with TestClient(app, raise_server_exceptions=False) as c:
         yield c
@@ -0,0 +1,125 @@
+"""
+Tests for Auth0 token verification (JWKS key map, single-flight refresh, verified-token cache).
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.core import auth0
+
+DOMAIN = "tenant.auth0.test"
+AUDIENCE = "https://api.themison.test"
+
+
+@pytest.fixture(scope="module")
+def signing_key():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public = jwk.construct(pem, algorithm="RS256").public_key().to_dict()
+    jwks = {"keys": [{**public, "kid": "k1", "use": "sig"}]}
+    return pem, jwks
+
+
+@pytest.fixture(autouse=True)
+def reset_auth0_state():
+    auth0._jwks_keys = {}
+    auth0._jwks_cache_time = 0.0
+    auth0._jwks_lock = asyncio.Lock()
+    auth0._verified_tokens.clear()
+    with patch("app.core.auth0.get_settings") as mock_settings:
+        mock_settings.return_value = MagicMock(
+            auth0_domain=DOMAIN, auth0_audience=AUDIENCE, auth0_token_cache_max_entries=100
+        )
+        yield
+
+
+def _token(pem, kid="k1", exp_in=300):
+    claims = {
+        "sub": "auth0|u1",
+        "email": "admin@test.com",
+        "aud": AUDIENCE,
+        "iss": f"https://{DOMAIN}/",
+        "exp": int(time.time()) + exp_in,
+    }
+    return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": kid})
+
+
+class TestVerifyAuth0Token:
+    """Tests for verify_auth0_token."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_token_served_from_cache(self, signing_key):
+        pem, jwks = signing_key
+        token = _token(pem)
+
+        with patch("app.core.auth0._fetch_jwks", AsyncMock(return_value=jwks)) as fetch, \
+             patch("app.core.auth0.jwt.decode", wraps=jwt.decode) as decode:
+            first = await auth0.verify_auth0_token(token)
+            second = await auth0.verify_auth0_token(token)
+
+        assert first["sub"] == second["sub"] == "auth0|u1"
+        fetch.assert_awaited_once()
+        decode.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_expired_cache_entry_is_reverified(self, signing_key):
+        pem, jwks = signing_key
+        token = _token(pem)
+        auth0._verified_tokens[auth0._token_digest(token)] = (time.time() - 1, {"sub": "stale"})
+
+        with patch("app.core.auth0._fetch_jwks", AsyncMock(return_value=jwks)):
+            payload = await auth0.verify_auth0_token(token)
+
+        assert payload["sub"] == "auth0|u1"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_refresh_is_single_flight(self, signing_key):
+        pem, jwks = signing_key
+
+        async def slow_fetch(domain):
+            await asyncio.sleep(0.01)
+            return jwks
+
+        fetch = AsyncMock(side_effect=slow_fetch)
+        with patch("app.core.auth0._fetch_jwks", fetch):
+            results = await asyncio.gather(*[
+                auth0.verify_auth0_token(_token(pem, exp_in=300 + i)) for i in range(5)
+            ])
+
+        assert len(results) == 5
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refreshes_once(self, signing_key):
+        pem, jwks = signing_key
+
+        with patch("app.core.auth0._fetch_jwks", AsyncMock(return_value=jwks)) as fetch:
+            await auth0.verify_auth0_token(_token(pem))
+            with pytest.raises(ValueError, match="kid=rotated"):
+                await auth0.verify_auth0_token(_token(pem, kid="rotated"))
+
+        # Forced refresh is throttled right after the initial fetch
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_wrong_audience_rejected(self, signing_key):
+        pem, jwks = signing_key
+        token = jwt.encode(
+            {"sub": "x", "aud": "other", "iss": f"https://{DOMAIN}/", "exp": int(time.time()) + 60},
+            pem, algorithm="RS256", headers={"kid": "k1"},
+        )
+
+        with patch("app.core.auth0._fetch_jwks", AsyncMock(return_value=jwks)):
+            with pytest.raises(ValueError, match="verification failed"):
+                await auth0.verify_auth0_token(token)
+
+        assert not auth0._verified_tokens
@@ -0,0 +1,382 @@
+"""
+Tests for batch uploads: the ingestion scheduler, the shared embedding
+batcher, batch job aggregation and the /upload/upload-batch endpoints.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.api.routes.upload import UploadDocumentRequest, _run_batch_ingestion_task
+from app.services.jobs.batch_job_service import BatchJobService
+from app.services.jobs.ingestion_scheduler import EmbeddingBatcher, IngestionScheduler
+from app.services.jobs.job_status_service import JobStatusService
+
+
+# =============================================================================
+# IngestionScheduler
+# =============================================================================
+
+class TestIngestionScheduler:
+
+    @pytest.mark.asyncio
+    async def test_bounds_concurrency(self):
+        scheduler = IngestionScheduler(max_concurrent=2)
+        active, peak = 0, 0
+
+        async def job():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        await scheduler.run("batch", [job] * 6)
+
+        assert peak == 2
+        assert scheduler.running == 0
+        assert scheduler.waiting == 0
+
+    @pytest.mark.asyncio
+    async def test_groups_take_turns(self):
+        """A single upload queued behind a large batch waits for one of its jobs, not all."""
+        scheduler = IngestionScheduler(max_concurrent=1)
+        started = []
+
+        def job(name):
+            async def run():
+                started.append(name)
+                await asyncio.sleep(0)
+            return run
+
+        big = asyncio.create_task(scheduler.run("big", [job(f"big-{i}") for i in range(4)]))
+        await asyncio.sleep(0)
+        small = asyncio.create_task(scheduler.run("small", [job("small")]))
+        await asyncio.gather(big, small)
+
+        assert started[:3] == ["big-0", "big-1", "small"]
+
+    @pytest.mark.asyncio
+    async def test_stream_of_new_groups_does_not_starve_a_batch(self):
+        scheduler = IngestionScheduler(max_concurrent=1)
+        started, singles = [], []
+
+        def job(name):
+            async def run():
+                started.append(name)
+                # Another single upload arrives while each job runs
+                if len(singles) < 6:
+                    singles.append(asyncio.ensure_future(scheduler.run(f"single-{len(singles)}", [job("single")])))
+                await asyncio.sleep(0)
+            return run
+
+        await scheduler.run("big", [job(f"big-{i}") for i in range(3)])
+        await asyncio.gather(*singles)
+
+        # The batch alternates with the singles instead of waiting for all of them
+        assert started.index("big-2") <= 4
+        assert len(started) == 3 + len(singles)
+
+    @pytest.mark.asyncio
+    async def test_failures_are_returned_not_raised(self):
+        scheduler = IngestionScheduler(max_concurrent=2)
+        done = []
+
+        async def ok():
+            done.append(True)
+
+        async def boom():
+            raise RuntimeError("boom")
+
+        errors = await scheduler.run("batch", [ok, boom, ok])
+
+        assert len(done) == 2
+        assert [str(e) for e in errors] == ["boom"]
+        assert scheduler.running == 0
+
+
+# =============================================================================
+# EmbeddingBatcher
+# =============================================================================
+
+def _fake_embed(calls):
+    async def embed(texts):
+        calls.append(list(texts))
+        await asyncio.sleep(0)
+        return [[float(len(t))] for t in texts]
+    return embed
+
+
+class TestEmbeddingBatcher:
+
+    @pytest.mark.asyncio
+    async def test_coalesces_documents_into_one_request(self):
+        calls = []
+        batcher = EmbeddingBatcher(_fake_embed(calls), max_batch_size=100, max_wait=0.01, max_concurrency=1)
+
+        a, b = await asyncio.gather(batcher.embed(["a", "bb"]), batcher.embed(["ccc"]))
+
+        assert calls == [["a", "bb", "ccc"]]
+        assert a == [[1.0], [2.0]]
+        assert b == [[3.0]]
+
+    @pytest.mark.asyncio
+    async def test_splits_at_max_batch_size_and_keeps_order(self):
+        calls = []
+        batcher = EmbeddingBatcher(_fake_embed(calls), max_batch_size=2, max_wait=0, max_concurrency=2)
+        texts = ["a" * n for n in range(1, 6)]
+
+        vectors = await batcher.embed(texts)
+
+        assert vectors == [[float(n)] for n in range(1, 6)]
+        assert all(len(call) <= 2 for call in calls)
+        assert sum(len(call) for call in calls) == 5
+
+    @pytest.mark.asyncio
+    async def test_error_fails_only_that_batch(self):
+        async def embed(texts):
+            if "bad" in texts:
+                raise RuntimeError("rate limited")
+            return [[0.0] for _ in texts]
+
+        batcher = EmbeddingBatcher(embed, max_batch_size=1, max_wait=0, max_concurrency=1)
+
+        good, bad = await asyncio.gather(
+            batcher.embed(["ok"]), batcher.embed(["bad"]), return_exceptions=True
+        )
+
+        assert good == [[0.0]]
+        assert isinstance(bad, RuntimeError)
+
+    @pytest.mark.asyncio
+    async def test_failed_combined_request_retries_each_document(self):
+        calls = []
+
+        async def embed(texts):
+            calls.append(list(texts))
+            if "bad" in texts:
+                raise RuntimeError("invalid input")
+            return [[0.0] for _ in texts]
+
+        batcher = EmbeddingBatcher(embed, max_batch_size=100, max_wait=0.01, max_concurrency=1)
+
+        good, bad = await asyncio.gather(
+            batcher.embed(["ok", "fine"]), batcher.embed(["bad"]), return_exceptions=True
+        )
+
+        assert good == [[0.0], [0.0]]
+        assert isinstance(bad, RuntimeError)
+        assert calls == [["ok", "fine", "bad"], ["ok", "fine"], ["bad"]]
+
+    @pytest.mark.asyncio
+    async def test_empty_input(self):
+        batcher = EmbeddingBatcher(_fake_embed([]), max_batch_size=10, max_wait=0, max_concurrency=1)
+        assert await batcher.embed([]) == []
+
+
+# =============================================================================
+# BatchJobService
+# =============================================================================
+
+class TestBatchJobService:
+
+    @pytest.mark.asyncio
+    async def test_create_batch_creates_child_jobs(self, memory_redis):
+        service = BatchJobService(memory_redis)
+        document_ids = [uuid4(), uuid4()]
+
+        batch_id, job_ids = await service.create_batch(document_ids)
+
+        jobs = await service.jobs.get_jobs(job_ids)
+        assert [job.document_id for job in jobs] == [str(d) for d in document_ids]
+        batch = await service.get_batch(batch_id)
+        assert batch.status == "queued"
+        assert batch.total == 2
+        assert batch.queued == 2
+        assert batch.progress_percent == 0
+
+    @pytest.mark.asyncio
+    async def test_aggregates_child_progress(self, memory_redis):
+        service = BatchJobService(memory_redis)
+        batch_id, (a, b, c) = await service.create_batch([uuid4(), uuid4(), uuid4()])
+
+        await service.jobs.update_progress(a, "embedding", 60)
+        await service.jobs.complete_job(b, {"chunks_count": 1})
+        batch = await service.get_batch(batch_id)
+
+        assert batch.status == "processing"
+        assert (batch.queued, batch.processing, batch.complete) == (1, 1, 1)
+        assert batch.progress_percent == (0 + 60 + 100) // 3
+
+        await service.jobs.fail_job(a, "bad pdf")
+        await service.jobs.complete_job(c, {"chunks_count": 2})
+        batch = await service.get_batch(batch_id)
+
+        assert batch.status == "partial"
+        assert batch.failed == 1
+        assert batch.progress_percent == 100
+
+    @pytest.mark.asyncio
+    async def test_refresh_extends_child_ttls(self, memory_redis):
+        service = BatchJobService(memory_redis)
+        batch_id, job_ids = await service.create_batch([uuid4()])
+        memory_redis.ttls.clear()
+
+        await service.refresh(batch_id)
+
+        assert memory_redis.ttls == {
+            f"batch:{batch_id}": JobStatusService.TTL_ACTIVE,
+            f"job:{job_ids[0]}": JobStatusService.TTL_ACTIVE,
+        }
+
+    @pytest.mark.asyncio
+    async def test_missing_batch(self, memory_redis):
+        assert await BatchJobService(memory_redis).get_batch("nope") is None
+
+
+# =============================================================================
+# Batch ingestion task
+# =============================================================================
+
+class TestBatchIngestionTask:
+
+    @pytest.mark.asyncio
+    async def test_runs_every_document_with_shared_embedder(self, memory_redis):
+        service = BatchJobService(memory_redis)
+        docs = [
+            UploadDocumentRequest(document_url=f"https://example.com/{i}.pdf", document_id=uuid4())
+            for i in range(3)
+        ]
+        batch_id, job_ids = await service.create_batch([d.document_id for d in docs])
+
+        with patch("app.api.routes.upload._run_ingestion_task", new_callable=AsyncMock) as run, \
+             patch("app.api.routes.upload.get_ingestion_scheduler", return_value=IngestionScheduler(2)):
+            await _run_batch_ingestion_task(
+                batch_id=batch_id,
+                items=list(zip(job_ids, docs)),
+                redis_client=memory_redis,
+                use_grpc=False,
+                grpc_address="localhost:50051",
+            )
+
+        assert sorted(c.kwargs["job_id"] for c in run.call_args_list) == sorted(job_ids)
+        embedders = {c.kwargs["embed"] for c in run.call_args_list}
+        assert len(embedders) == 1 and None not in embedders
+        assert (await service.get_batch(batch_id)).finished_at is not None
+
+    @pytest.mark.asyncio
+    async def test_grpc_path_has_no_local_embedder(self, memory_redis):
+        service = BatchJobService(memory_redis)
+        doc = UploadDocumentRequest(document_url="https://example.com/a.pdf", document_id=uuid4())
+        batch_id, job_ids = await service.create_batch([doc.document_id])
+
+        with patch("app.api.routes.upload._run_ingestion_task", new_callable=AsyncMock) as run, \
+             patch("app.api.routes.upload.get_ingestion_scheduler", return_value=IngestionScheduler(2)):
+            await _run_batch_ingestion_task(
+                batch_id=batch_id,
+                items=list(zip(job_ids, [doc])),
+                redis_client=memory_redis,
+                use_grpc=True,
+                grpc_address="localhost:50051",
+            )
+
+        assert run.call_args.kwargs["embed"] is None
+
+
+# =============================================================================
+# Endpoints
+# =============================================================================
+
+@pytest.fixture
+def upload_settings():
+    settings = MagicMock()
+    settings.upload_api_key = "test-key"
+    settings.use_grpc_rag = False
+    settings.rag_service_address = "localhost:50051"
+    settings.batch_upload_max_documents = 3
+    with patch("app.api.routes.upload.get_settings", return_value=settings):
+        yield settings
+
+
+def _batch(*urls):
+    return {"documents": [{"document_url": url, "document_id": str(uuid4())} for url in urls]}
+
+
+class TestBatchUploadEndpoint:
+
+    @pytest.mark.asyncio
+    async def test_queues_batch(self, async_client: AsyncClient, memory_redis, upload_settings):
+        body = _batch("https://example.com/a.pdf", "https://example.com/b.PDF?token=x")
+
+        with patch.object(app.state, "redis_client", memory_redis, create=True), \
+             patch("app.api.routes.upload._set_ingestion_statuses", new_callable=AsyncMock) as set_status, \
+             patch("app.api.routes.upload._run_batch_ingestion_task", new_callable=AsyncMock) as task:
+            response = await async_client.post(
+                "/upload/upload-batch", json=body, headers={"X-API-KEY": "test-key"}
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "queued"
+        assert [j["document_id"] for j in data["jobs"]] == [d["document_id"] for d in body["documents"]]
+        set_status.assert_awaited_once()
+        assert set_status.call_args.args[1] == "queued"
+        assert task.call_args.kwargs["batch_id"] == data["batch_id"]
+
+        with patch.object(app.state, "redis_client", memory_redis, create=True):
+            status = await async_client.get(f"/upload/batch/{data['batch_id']}")
+        assert status.status_code == 200
+        assert status.json()["total"] == 2
+        assert status.json()["queued"] == 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_api_key(self, async_client: AsyncClient, upload_settings):
+        response = await async_client.post(
+            "/upload/upload-batch", json=_batch("https://example.com/a.pdf"), headers={"X-API-KEY": "wrong"}
+        )
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_rejects_non_pdf(self, async_client: AsyncClient, upload_settings):
+        response = await async_client.post(
+            "/upload/upload-batch",
+            json=_batch("https://example.com/a.pdf", "https://example.com/b.docx"),
+            headers={"X-API-KEY": "test-key"},
+        )
+        assert response.status_code == 400
+        assert "b.docx" in response.json()["detail"]
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_batch(self, async_client: AsyncClient, upload_settings):
+        response = await async_client.post(
+            "/upload/upload-batch",
+            json=_batch(*[f"https://example.com/{i}.pdf" for i in range(4)]),
+            headers={"X-API-KEY": "test-key"},
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_rejects_duplicate_documents(self, async_client: AsyncClient, upload_settings):
+        body = _batch("https://example.com/a.pdf", "https://example.com/b.pdf")
+        body["documents"][1]["document_id"] = body["documents"][0]["document_id"]
+
+        response = await async_client.post(
+            "/upload/upload-batch", json=body, headers={"X-API-KEY": "test-key"}
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_rejects_empty_batch(self, async_client: AsyncClient, upload_settings):
+        response = await async_client.post(
+            "/upload/upload-batch", json={"documents": []}, headers={"X-API-KEY": "test-key"}
+        )
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_unknown_batch_returns_404(self, async_client: AsyncClient, memory_redis):
+        with patch.object(app.state, "redis_client", memory_redis, create=True):
+            response = await async_client.get("/upload/batch/unknown")
+        assert response.status_code == 404
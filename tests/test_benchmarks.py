@@ -0,0 +1,177 @@
+"""
+Tests for the offline benchmark harness (fake providers, synthetic data, reporting).
+"""
+import json
+import math
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from app.config import get_settings
+from app.core.tracing import BackgroundExportProcessor, JsonFileExporter, Tracer
+from benchmarks.fake_providers import (
+    FakeProviderConfig,
+    LatencyProfile,
+    create_app,
+    fake_answer,
+    fake_embedding,
+)
+from benchmarks.report import percentile, stage_durations
+from benchmarks.retrieval_eval import (
+    GoldenQuery,
+    GoldenSet,
+    Variant,
+    evaluate_variant,
+    fake_embedder,
+    ndcg_at_k,
+    ranked_hits,
+    recall_at_k,
+    reciprocal_rank,
+)
+from benchmarks.synthetic import generate_protocol, golden_queries
+from tests.conftest import make_rows_result
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+class TestFakeProviders:
+    """The fakes must be deterministic and speak the real wire formats."""
+
+    def test_embedding_is_deterministic_and_normalised(self):
+        a = fake_embedding("Participants receive 50 mg of korimab", 1536)
+        assert a == fake_embedding("Participants receive 50 mg of korimab", 1536)
+        assert abs(_cosine(a, a) - 1.0) < 1e-9
+
+    def test_related_text_scores_higher(self):
+        chunk = fake_embedding("Serious adverse events must be reported within 24 hours", 256)
+        related = fake_embedding("How quickly must serious adverse events be reported?", 256)
+        unrelated = fake_embedding("What is the planned sample size?", 256)
+        assert _cosine(chunk, related) > _cosine(chunk, unrelated)
+
+    @pytest.mark.asyncio
+    async def test_endpoints(self):
+        config = FakeProviderConfig(LatencyProfile(), LatencyProfile(), dimensions=8)
+        transport = httpx.ASGITransport(app=create_app(config))
+        async with httpx.AsyncClient(transport=transport, base_url="http://fake") as client:
+            embeddings = await client.post("/v1/embeddings", json={"input": ["a b", [1, 2]]})
+            message = await client.post("/v1/messages", json={
+                "model": "m",
+                "max_tokens": 100,
+                "messages": [{"role": "user", "content": "CONTEXT:\n[Doc|p2|bbox:[1, 2, 3, 4]]\ntext\n\nQUESTION: q"}],
+            })
+
+        data = embeddings.json()["data"]
+        assert [len(d["embedding"]) for d in data] == [8, 8]
+        body = message.json()
+        assert body["usage"]["output_tokens"] > 0
+        answer = json.loads(body["content"][0]["text"])
+        assert answer["sources"][0]["page"] == 2
+        assert answer["sources"][0]["bboxes"] == [[1, 2, 3, 4]]
+
+    def test_answer_without_context(self):
+        assert json.loads(fake_answer("QUESTION: anything"))["sources"] == []
+
+
+class TestSynthetic:
+    def test_protocol_is_reproducible(self):
+        first = generate_protocol(6, seed=3)
+        second = generate_protocol(6, seed=3)
+        assert [p.text for p in first.paragraphs] == [p.text for p in second.paragraphs]
+        assert {p.page for p in first.paragraphs} == set(range(1, 7))
+
+
+class TestReport:
+    def test_percentile_interpolates(self):
+        values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+        assert percentile(values, 50) == 5.5
+        assert percentile(values, 99) == pytest.approx(9.91)
+        assert percentile([4.0], 95) == 4.0
+
+    def test_stage_durations_from_json_exporter(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        processor = BackgroundExportProcessor(JsonFileExporter(str(path), "bench"))
+        tracer = Tracer(processor)
+        with tracer.start_span("rag.query"):
+            with tracer.start_span("rag.cache_lookup", {"cache.name": "semantic"}):
+                pass
+            with tracer.start_span("rag.llm"):
+                pass
+        processor.shutdown()
+
+        with open(path) as f:
+            stages = stage_durations(f, split_by={"rag.cache_lookup": "cache.name"})
+        assert set(stages) == {"rag.query", "rag.cache_lookup[semantic]", "rag.llm"}
+        assert all(len(v) == 1 and v[0] >= 0 for v in stages.values())
+
+
+class TestRetrievalMetrics:
+    """recall@k, MRR and nDCG over page-level judgements."""
+
+    def test_duplicate_pages_count_once(self):
+        hits = ranked_hits(["page:3", "page:7", "page:3", "page:9"], {"page:3", "page:9"})
+        assert hits == [True, False, False, True]
+        assert recall_at_k(hits, 2, 1) == 0.5
+        assert recall_at_k(hits, 2, 4) == 1.0
+        assert reciprocal_rank(hits) == 1.0
+
+    def test_ndcg(self):
+        assert ndcg_at_k([True, True], 2, 10) == pytest.approx(1.0)
+        assert ndcg_at_k([False, True], 1, 10) == pytest.approx(1 / math.log2(3))
+        assert ndcg_at_k([False, False], 1, 10) == 0.0
+
+    def test_variant_overrides_are_typed(self):
+        variant = Variant.parse("vec:hybrid_search_enabled=false, retrieval_top_k=10")
+        config = variant.apply(get_settings())
+        assert config.hybrid_search_enabled is False
+        assert config.retrieval_top_k == 10
+        with pytest.raises(ValueError):
+            Variant.parse("bad:not_a_setting=1")
+
+    def test_embedding_column_variant(self):
+        variant = Variant.parse("large:embedding_column=embedding_large,retrieval_top_k=10")
+
+        assert variant.embedding_column == "embedding_large"
+        assert variant.overrides == {"retrieval_top_k": 10}
+        assert fake_embedder(get_settings(), variant.embedding_column).dimensions == 2000
+        with pytest.raises(ValueError):
+            Variant.parse("bad:embedding_column=embedding; DROP")
+
+    @pytest.mark.asyncio
+    async def test_evaluate_variant(self):
+        rows = [
+            MagicMock(id=f"c{page}", content="x", page_number=page, chunk_metadata={}, similarity=0.9)
+            for page in (4, 2, 9)
+        ]
+        result = make_rows_result()
+        result.fetchall.return_value = rows
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+
+        @asynccontextmanager
+        async def session_factory():
+            yield db
+
+        golden = GoldenSet("g", [GoldenQuery(uuid4(), "Doc", "q", expected_pages=[2, 9])])
+        scored = await evaluate_variant(
+            golden, Variant("vec", {"hybrid_search_enabled": False}), session_factory,
+            fake_embedder, get_settings(), ks=(1, 3),
+        )
+
+        assert scored.recall == {1: 0.0, 3: 1.0}
+        assert scored.mrr == 0.5
+        assert scored.latency_ms["count"] == 1
+        sql = str(db.execute.call_args[0][0])
+        assert "pc.embedding <=>" in sql
+
+
+class TestSyntheticGolden:
+    def test_golden_pages_contain_the_probed_fact(self):
+        protocol = generate_protocol(20, seed=1)
+        for probe, pages in golden_queries(protocol, 5, seed=0):
+            assert 1 <= len(pages) <= 3
+            assert all(1 <= p <= 20 for p in pages)
@@ -0,0 +1,127 @@
+"""
+Tests for config-driven engine options and connection-pool instrumentation.
+"""
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.db.pool import InstrumentedQueuePool, PoolMetrics, get_pool_metrics, pool_metrics
+from app.db.session import engine_options
+
+
+def _settings(**overrides):
+    values = dict(
+        db_pool_size=5,
+        db_max_overflow=2,
+        db_pool_timeout_seconds=3.0,
+        db_pool_recycle_seconds=900,
+        db_pool_pre_ping=False,
+        db_pgbouncer_mode=False,
+        db_command_timeout_seconds=60.0,
+        db_statement_timeout_ms=60000,
+    )
+    values.update(overrides)
+    return MagicMock(**values)
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    pool_metrics.reset()
+    yield
+    pool_metrics.reset()
+
+
+def _pool(size=1, overflow=0, timeout=0.05):
+    return InstrumentedQueuePool(creator=MagicMock, pool_size=size, max_overflow=overflow, timeout=timeout)
+
+
+class TestEngineOptions:
+    """Tests for engine_options."""
+
+    def test_pool_settings_come_from_config(self):
+        opts = engine_options(_settings())
+        assert opts["poolclass"] is InstrumentedQueuePool
+        assert (opts["pool_size"], opts["max_overflow"], opts["pool_timeout"]) == (5, 2, 3.0)
+        assert opts["pool_pre_ping"] is False
+        assert "statement_cache_size" not in opts["connect_args"]
+
+    def test_pgbouncer_mode_disables_statement_cache(self):
+        args = engine_options(_settings(db_pgbouncer_mode=True))["connect_args"]
+        assert args["statement_cache_size"] == 0
+        assert args["prepared_statement_cache_size"] == 0
+        name_func = args["prepared_statement_name_func"]
+        assert name_func() != name_func()
+
+
+class TestInstrumentedQueuePool:
+    """Tests for InstrumentedQueuePool / get_pool_metrics."""
+
+    @pytest.mark.asyncio
+    async def test_checkout_recorded(self):
+        pool = _pool()
+        conn = await greenlet_spawn(pool.connect)
+        await greenlet_spawn(conn.close)
+
+        snap = pool_metrics.snapshot()
+        assert snap["checkouts"] == 1
+        assert snap["connections_opened"] == 1
+
+    @pytest.mark.asyncio
+    async def test_burst_wait_and_timeout_visible(self):
+        pool = _pool(timeout=0.5)
+        held = await greenlet_spawn(pool.connect)
+        pool_metrics.reset()  # Only the contended checkout below
+
+        async def release_later():
+            await asyncio.sleep(0.05)
+            await greenlet_spawn(held.close)
+
+        waiter = greenlet_spawn(pool.connect)
+        second, _ = await asyncio.gather(waiter, release_later())
+        snap = pool_metrics.snapshot()
+        assert snap["checkouts_waited"] == 1
+        assert snap["wait_ms_max"] >= 40
+
+        pool._timeout = 0.01
+        with pytest.raises(exc.TimeoutError):
+            await greenlet_spawn(pool.connect)
+        assert pool_metrics.snapshot()["checkout_timeouts"] == 1
+        await greenlet_spawn(second.close)
+
+    @pytest.mark.asyncio
+    async def test_connection_setup_is_not_counted_as_waiting(self):
+        def slow_connect():
+            time.sleep(0.05)
+            return MagicMock()
+
+        pool = InstrumentedQueuePool(creator=slow_connect, pool_size=1, max_overflow=0, timeout=0.5)
+        conn = await greenlet_spawn(pool.connect)
+        await greenlet_spawn(conn.close)
+
+        snap = pool_metrics.snapshot()
+        assert snap["connections_opened"] == 1
+        assert snap["checkouts_waited"] == 0
+        assert pool._connect_seconds == {}
+
+    def test_get_pool_metrics_reports_occupancy(self):
+        engine = MagicMock()
+        engine.sync_engine.pool = _pool(size=3, overflow=4)
+
+        stats = get_pool_metrics(engine)
+
+        assert stats["size"] == 3
+        assert stats["checked_out"] == 0
+        assert stats["max_overflow"] == 4
+        assert get_pool_metrics(None) == {"status": "unavailable"}
+
+    def test_metrics_percentiles(self):
+        metrics = PoolMetrics()
+        for ms in range(100):
+            metrics.record_checkout(float(ms))
+        snap = metrics.snapshot()
+        assert snap["wait_ms_p95_recent"] == 94.0
+        assert snap["wait_ms_avg"] == 49.5
@@ -0,0 +1,67 @@
+"""
+Cold-start import budget for app.main.
+
+Runs ``python -X importtime -c "import app.main"`` in a fresh interpreter and
+fails if the RAG/ML stack is imported eagerly again or if the total import
+time exceeds the budget (IMPORT_TIME_BUDGET_SECONDS, default 3s; importing
+everything eagerly took ~5s).
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.core.warmup import HEAVY_MODULES
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "3.0"))
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+PROBE = (
+    "import json, sys, app.main; "
+    f"print(json.dumps([m for m in {list(HEAVY_MODULES)!r} if m in sys.modules]))"
+)
+
+
+def _run_probe():
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=REPO_ROOT,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if proc.returncode != 0:
+        pytest.skip(f"app.main does not import in this environment: {proc.stderr[-500:]}")
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2)) / 1e6
+    loaded_heavy = json.loads(proc.stdout.strip().splitlines()[-1])
+    return cumulative, loaded_heavy
+
+
+@pytest.fixture(scope="module")
+def probe():
+    return _run_probe()
+
+
+class TestImportTime:
+    """Startup import benchmark."""
+
+    def test_heavy_modules_are_lazy(self, probe):
+        _, loaded_heavy = probe
+        assert loaded_heavy == []
+
+    def test_app_main_within_budget(self, probe):
+        cumulative, _ = probe
+        slowest = sorted(cumulative.items(), key=lambda kv: kv[1], reverse=True)[:10]
+        assert cumulative["app.main"] < BUDGET_SECONDS, f"slowest imports: {slowest}"
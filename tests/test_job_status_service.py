@@ -1,8 +1,9 @@
 """
 Tests for job status service.
 """
+import json
+
 import pytest
-from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
 from app.services.jobs.job_status_service import (
@@ -16,59 +17,59 @@ class TestJobStatusService:
     """Tests for JobStatusService."""
 
     @pytest.fixture
-    def mock_redis(self):
-        """Create mock Redis client."""
-        redis = MagicMock()
-        redis.set = AsyncMock()
-        redis.get = AsyncMock()
-        return redis
+    def job_service(self, memory_redis):
+        """Create JobStatusService with an in-memory Redis."""
+        return JobStatusService(memory_redis)
 
-    @pytest.fixture
-    def job_service(self, mock_redis):
-        """Create JobStatusService with mock Redis."""
-        return JobStatusService(mock_redis)
+    @staticmethod
+    def _stored(redis, job_id):
+        return {k.decode(): v.decode() for k, v in redis.data[f"job:{job_id}"].items()}
+
+    @staticmethod
+    def _events(redis, job_id):
+        return [json.loads(m) for c, m in redis.published if c == f"job:{job_id}:events"]
 
     @pytest.mark.asyncio
-    async def test_create_job_returns_job_id(self, job_service, mock_redis):
+    async def test_create_job_returns_job_id(self, job_service, memory_redis):
         """Test that create_job returns a job ID."""
         document_id = uuid4()
         job_id = await job_service.create_job(document_id)
 
         assert job_id is not None
         assert len(job_id) == 36  # UUID length
-        mock_redis.set.assert_called_once()
+        assert f"job:{job_id}" in memory_redis.data
 
     @pytest.mark.asyncio
-    async def test_create_job_stores_initial_state(self, job_service, mock_redis):
-        """Test that create_job stores correct initial state."""
+    async def test_create_job_stores_initial_state(self, job_service, memory_redis):
+        """Test that create_job stores correct initial state as a hash."""
         document_id = uuid4()
-        await job_service.create_job(document_id)
-
-        # Check the stored data
-        call_args = mock_redis.set.call_args
-        stored_data = call_args[0][1]  # Second positional arg is the value
+        job_id = await job_service.create_job(document_id)
 
-        assert "queued" in stored_data
-        assert str(document_id) in stored_data
+        stored = self._stored(memory_redis, job_id)
+        assert stored["status"] == "queued"
+        assert stored["document_id"] == str(document_id)
+        assert "stage_started:queued" in stored
+        assert memory_redis.ttls[f"job:{job_id}"] == JobStatusService.TTL_ACTIVE
+        assert self._events(memory_redis, job_id)[0]["status"] == "queued"
 
     @pytest.mark.asyncio
-    async def test_get_job_returns_job_progress(self, job_service, mock_redis):
+    async def test_get_job_returns_job_progress(self, job_service, memory_redis):
         """Test that get_job returns JobProgress."""
         job_id = str(uuid4())
         document_id = str(uuid4())
 
-        mock_redis.get.return_value = f'''{{
-            "job_id": "{job_id}",
-            "document_id": "{document_id}",
+        await memory_redis.hset(f"job:{job_id}", mapping={
+            "job_id": job_id,
+            "document_id": document_id,
             "status": "processing",
-            "progress_percent": 50,
+            "progress_percent": "50",
             "current_stage": "embedding",
             "message": "Processing...",
-            "result": null,
-            "error": null,
+            "result": "",
+            "error": "",
             "created_at": "2024-01-01T00:00:00",
-            "updated_at": "2024-01-01T00:00:00"
-        }}'''
+            "updated_at": "2024-01-01T00:00:00",
+        })
 
         job = await job_service.get_job(job_id)
 
@@ -76,35 +77,63 @@ class TestJobStatusService:
         assert job.job_id == job_id
         assert job.status == JobStatus.PROCESSING
         assert job.progress_percent == 50
+        assert job.result is None
+        assert job.error is None
 
     @pytest.mark.asyncio
-    async def test_get_job_returns_none_for_missing_job(self, job_service, mock_redis):
-        """Test that get_job returns None for non-existent job."""
-        mock_redis.get.return_value = None
+    async def test_get_job_reads_legacy_json_keys(self, job_service, memory_redis):
+        """Jobs written as JSON strings before the hash layout are still readable."""
+        job_id = str(uuid4())
+        await memory_redis.set(f"job:{job_id}", JobProgress(
+            job_id=job_id,
+            document_id="doc-id",
+            status=JobStatus.COMPLETE,
+            progress_percent=100,
+            result={"chunks_count": 3},
+            created_at="2024-01-01T00:00:00",
+            updated_at="2024-01-01T00:00:00",
+        ).model_dump_json())
 
-        job = await job_service.get_job("non-existent")
+        job = await job_service.get_job(job_id)
 
-        assert job is None
+        assert job.status == JobStatus.COMPLETE
+        assert job.result == {"chunks_count": 3}
 
     @pytest.mark.asyncio
-    async def test_update_progress_updates_state(self, job_service, mock_redis):
-        """Test that update_progress updates job state."""
+    async def test_updates_convert_legacy_json_keys(self, job_service, memory_redis):
+        """Progress written to a pre-hash JSON key converts it instead of failing with WRONGTYPE."""
         job_id = str(uuid4())
-        document_id = str(uuid4())
+        await memory_redis.set(f"job:{job_id}", JobProgress(
+            job_id=job_id,
+            document_id="doc-id",
+            status=JobStatus.PROCESSING,
+            progress_percent=10,
+            created_at="2024-01-01T00:00:00",
+            updated_at="2024-01-01T00:00:00",
+        ).model_dump_json())
 
-        # Mock get_job to return existing job
-        mock_redis.get.return_value = f'''{{
-            "job_id": "{job_id}",
-            "document_id": "{document_id}",
-            "status": "queued",
-            "progress_percent": 0,
-            "current_stage": "queued",
-            "message": "",
-            "result": null,
-            "error": null,
-            "created_at": "2024-01-01T00:00:00",
-            "updated_at": "2024-01-01T00:00:00"
-        }}'''
+        await job_service.update_progress(job_id, "embedding", 60)
+        await job_service.complete_job(job_id, {"chunks_count": 3})
+
+        job = await job_service.get_job(job_id)
+        assert isinstance(memory_redis.data[f"job:{job_id}"], dict)
+        assert job.document_id == "doc-id"
+        assert job.created_at == "2024-01-01T00:00:00"
+        assert job.status == JobStatus.COMPLETE
+        assert job.result == {"chunks_count": 3}
+
+    @pytest.mark.asyncio
+    async def test_get_job_returns_none_for_missing_job(self, job_service):
+        """Test that get_job returns None for non-existent job."""
+        job = await job_service.get_job("non-existent")
+
+        assert job is None
+
+    @pytest.mark.asyncio
+    async def test_update_progress_updates_state(self, job_service, memory_redis):
+        """Test that update_progress updates only the progress fields."""
+        document_id = uuid4()
+        job_id = await job_service.create_job(document_id)
 
         await job_service.update_progress(
             job_id=job_id,
@@ -113,71 +142,83 @@ class TestJobStatusService:
             message="Generating embeddings..."
         )
 
-        # Verify set was called with updated data
-        mock_redis.set.assert_called_once()
-        call_args = mock_redis.set.call_args
-        stored_data = call_args[0][1]
+        stored = self._stored(memory_redis, job_id)
+        assert stored["status"] == "processing"
+        assert stored["current_stage"] == "embedding"
+        assert stored["progress_percent"] == "60"
+        assert stored["document_id"] == str(document_id)
+        assert "stage_started:embedding" in stored
 
-        assert "embedding" in stored_data
-        assert "60" in stored_data
+        event = self._events(memory_redis, job_id)[-1]
+        assert event == {
+            "job_id": job_id,
+            "status": "processing",
+            "current_stage": "embedding",
+            "progress_percent": 60,
+            "message": "Generating embeddings...",
+            "updated_at": stored["updated_at"],
+        }
 
     @pytest.mark.asyncio
-    async def test_complete_job_sets_complete_status(self, job_service, mock_redis):
-        """Test that complete_job sets status to complete."""
-        job_id = str(uuid4())
-        document_id = str(uuid4())
+    async def test_update_progress_caps_at_99(self, job_service, memory_redis):
+        job_id = await job_service.create_job(uuid4())
 
-        mock_redis.get.return_value = f'''{{
-            "job_id": "{job_id}",
-            "document_id": "{document_id}",
-            "status": "processing",
-            "progress_percent": 85,
-            "current_stage": "storing",
-            "message": "",
-            "result": null,
-            "error": null,
-            "created_at": "2024-01-01T00:00:00",
-            "updated_at": "2024-01-01T00:00:00"
-        }}'''
+        await job_service.update_progress(job_id, "storing", 100)
+
+        assert self._stored(memory_redis, job_id)["progress_percent"] == "99"
+
+    @pytest.mark.asyncio
+    async def test_stage_start_is_kept_across_updates(self, job_service, memory_redis):
+        """Repeated updates within a stage keep the stage's first start time."""
+        job_id = await job_service.create_job(uuid4())
+        await job_service.update_progress(job_id, "embedding", 50)
+        first = self._stored(memory_redis, job_id)["stage_started:embedding"]
+
+        await job_service.update_progress(job_id, "embedding", 70)
+
+        assert self._stored(memory_redis, job_id)["stage_started:embedding"] == first
+
+    @pytest.mark.asyncio
+    async def test_update_progress_ignores_missing_job(self, job_service, memory_redis):
+        await job_service.update_progress("missing", "embedding", 50)
+
+        assert "job:missing" not in memory_redis.data
+
+    @pytest.mark.asyncio
+    async def test_complete_job_sets_complete_status(self, job_service, memory_redis):
+        """Test that complete_job sets status to complete."""
+        job_id = await job_service.create_job(uuid4())
+        await job_service.update_progress(job_id, "storing", 85)
 
         result = {"success": True, "chunks_count": 42}
         await job_service.complete_job(job_id, result)
 
-        mock_redis.set.assert_called_once()
-        call_args = mock_redis.set.call_args
-        stored_data = call_args[0][1]
-
-        assert "complete" in stored_data
-        assert "100" in stored_data
-        assert "42" in stored_data
+        job = await job_service.get_job(job_id)
+        assert job.status == JobStatus.COMPLETE
+        assert job.progress_percent == 100
+        assert job.result == result
+        assert memory_redis.ttls[f"job:{job_id}"] == JobStatusService.TTL_COMPLETE
+        assert self._events(memory_redis, job_id)[-1]["result"] == result
 
     @pytest.mark.asyncio
-    async def test_fail_job_sets_error_status(self, job_service, mock_redis):
+    async def test_fail_job_sets_error_status(self, job_service, memory_redis):
         """Test that fail_job sets status to error."""
-        job_id = str(uuid4())
-        document_id = str(uuid4())
-
-        mock_redis.get.return_value = f'''{{
-            "job_id": "{job_id}",
-            "document_id": "{document_id}",
-            "status": "processing",
-            "progress_percent": 45,
-            "current_stage": "embedding",
-            "message": "",
-            "result": null,
-            "error": null,
-            "created_at": "2024-01-01T00:00:00",
-            "updated_at": "2024-01-01T00:00:00"
-        }}'''
+        job_id = await job_service.create_job(uuid4())
+        await job_service.update_progress(job_id, "embedding", 45)
 
         await job_service.fail_job(job_id, "Something went wrong")
 
-        mock_redis.set.assert_called_once()
-        call_args = mock_redis.set.call_args
-        stored_data = call_args[0][1]
+        job = await job_service.get_job(job_id)
+        assert job.status == JobStatus.ERROR
+        assert job.error == "Something went wrong"
+        assert job.progress_percent == 45  # Left where it failed
+        assert self._events(memory_redis, job_id)[-1]["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_complete_job_ignores_missing_job(self, job_service, memory_redis):
+        await job_service.complete_job("missing", {"success": True})
 
-        assert "error" in stored_data
-        assert "Something went wrong" in stored_data
+        assert "job:missing" not in memory_redis.data
 
 
 class TestJobProgress:
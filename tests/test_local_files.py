@@ -0,0 +1,100 @@
+"""
+Tests for the /local-files endpoint: ranges, ETags and conditional requests.
+"""
+from email.utils import formatdate
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import local_files
+from app.main import app
+
+CONTENT = b"%PDF-1.7 " + bytes(range(256)) * 8
+
+
+@pytest.fixture
+def files_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_files, "UPLOADS_ROOT", tmp_path)
+    (tmp_path / "trials").mkdir()
+    (tmp_path / "trials" / "protocol.pdf").write_bytes(CONTENT)
+    with TestClient(app) as client:
+        yield client
+
+
+URL = "/local-files/trials/protocol.pdf"
+
+
+class TestLocalFiles:
+
+    def test_full_response_has_validators(self, files_client):
+        resp = files_client.get(URL)
+
+        assert resp.status_code == 200
+        assert resp.content == CONTENT
+        assert resp.headers["etag"]
+        assert resp.headers["last-modified"]
+        assert resp.headers["accept-ranges"] == "bytes"
+        assert resp.headers["cache-control"] == "no-cache"
+
+    def test_range_request(self, files_client):
+        resp = files_client.get(URL, headers={"Range": "bytes=0-8"})
+
+        assert resp.status_code == 206
+        assert resp.content == CONTENT[:9]
+        assert resp.headers["content-range"] == f"bytes 0-8/{len(CONTENT)}"
+
+    def test_unsatisfiable_range(self, files_client):
+        resp = files_client.get(URL, headers={"Range": f"bytes={len(CONTENT) + 10}-"})
+        assert resp.status_code == 416
+
+    def test_if_none_match_returns_304(self, files_client):
+        etag = files_client.get(URL).headers["etag"]
+
+        resp = files_client.get(URL, headers={"If-None-Match": f'"other", W/{etag}'})
+
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["etag"] == etag
+
+    def test_if_none_match_takes_precedence_over_if_modified_since(self, files_client):
+        resp = files_client.get(URL, headers={
+            "If-None-Match": '"stale"',
+            "If-Modified-Since": formatdate(usegmt=True),
+        })
+        assert resp.status_code == 200
+
+    def test_if_modified_since(self, files_client):
+        last_modified = files_client.get(URL).headers["last-modified"]
+
+        assert files_client.get(URL, headers={"If-Modified-Since": last_modified}).status_code == 304
+        assert files_client.get(URL, headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}).status_code == 200
+        assert files_client.get(URL, headers={"If-Modified-Since": "not a date"}).status_code == 200
+
+    def test_if_match_mismatch_returns_412(self, files_client):
+        etag = files_client.get(URL).headers["etag"]
+
+        assert files_client.get(URL, headers={"If-Match": '"other"'}).status_code == 412
+        assert files_client.get(URL, headers={"If-Match": f"W/{etag}"}).status_code == 412  # Strong comparison
+        assert files_client.get(URL, headers={"If-Match": etag}).status_code == 200
+
+    def test_if_unmodified_since(self, files_client):
+        old = "Thu, 01 Jan 1970 00:00:00 GMT"
+        assert files_client.get(URL, headers={"If-Unmodified-Since": old}).status_code == 412
+
+    def test_if_range_with_stale_etag_sends_whole_file(self, files_client):
+        resp = files_client.get(URL, headers={"Range": "bytes=0-8", "If-Range": '"stale"'})
+
+        assert resp.status_code == 200
+        assert resp.content == CONTENT
+
+    def test_head(self, files_client):
+        resp = files_client.head(URL)
+
+        assert resp.status_code == 200
+        assert resp.content == b""
+        assert int(resp.headers["content-length"]) == len(CONTENT)
+
+    def test_missing_and_traversal(self, files_client):
+        assert files_client.get("/local-files/trials/missing.pdf").status_code == 404
+        assert files_client.get("/local-files/trials").status_code == 404
+        assert files_client.get("/local-files/..%2F..%2Fetc%2Fpasswd").status_code in (403, 404)
@@ -0,0 +1,111 @@
+"""
+Tests for the member resolution cache used by get_current_member.
+"""
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.dependencies.auth import get_current_member
+from app.models.members import Member
+from app.services.cache.member_cache_service import (
+    MemberCache,
+    member_from_snapshot,
+    member_to_snapshot,
+)
+from tests.conftest import NOW, TEST_MEMBER_ID, TEST_ORG_ID, TEST_PROFILE_ID, make_scalars_result
+
+USER = {"id": "auth0|u1", "email": "admin@test.com", "auth0_sub": "auth0|u1"}
+
+
+def _member() -> Member:
+    return Member(
+        id=TEST_MEMBER_ID,
+        name="Test Admin",
+        email="admin@test.com",
+        organization_id=TEST_ORG_ID,
+        profile_id=TEST_PROFILE_ID,
+        default_role="admin",
+        invited_by=None,
+        created_at=NOW,
+        updated_at=NOW,
+        onboarding_completed=True,
+        is_active=True,
+    )
+
+
+def _request(redis=None):
+    request = MagicMock()
+    request.app.state.redis_client = redis
+    return request
+
+
+class TestMemberCache:
+    """Tests for MemberCache."""
+
+    def test_snapshot_round_trip(self):
+        snapshot = member_to_snapshot(_member())
+        json.dumps(snapshot)  # Must be JSON-safe for Redis
+
+        restored = member_from_snapshot(snapshot)
+
+        assert restored.id == TEST_MEMBER_ID
+        assert restored.organization_id == TEST_ORG_ID
+        assert restored.created_at == NOW
+        assert restored.default_role == "admin"
+
+    @pytest.mark.asyncio
+    async def test_local_hit_and_invalidate(self):
+        cache = MemberCache(local_ttl_seconds=60, local_max_entries=10, redis_ttl_seconds=0)
+        key = cache.cache_key("auth0|u1", "admin@test.com")
+
+        await cache.set(key, _member())
+        assert (await cache.get(key)).id == TEST_MEMBER_ID
+
+        await cache.invalidate_member(TEST_MEMBER_ID)
+        assert await cache.get(key) is None
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_fills_local(self):
+        redis = MagicMock()
+        redis.get = AsyncMock(return_value=json.dumps(member_to_snapshot(_member())).encode())
+        cache = MemberCache(local_ttl_seconds=60, local_max_entries=10, redis_ttl_seconds=60)
+        key = cache.cache_key("auth0|u1", "admin@test.com")
+
+        await cache.get(key, redis)
+        await cache.get(key, redis)
+
+        redis.get.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_are_misses(self):
+        redis = MagicMock()
+        redis.get = AsyncMock(side_effect=ConnectionError("down"))
+        cache = MemberCache(local_ttl_seconds=0, local_max_entries=10, redis_ttl_seconds=60)
+
+        assert await cache.get(cache.cache_key("s", "e"), redis) is None
+
+
+class TestGetCurrentMemberCaching:
+    """Tests for get_current_member with the member cache."""
+
+    @pytest.mark.asyncio
+    async def test_second_call_skips_database(self):
+        cache = MemberCache(local_ttl_seconds=60, local_max_entries=10, redis_ttl_seconds=0)
+        profile = MagicMock(id=TEST_PROFILE_ID)
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[
+            make_scalars_result(first=profile),
+            make_scalars_result(first=_member()),
+        ])
+        db.merge = AsyncMock(side_effect=lambda m, load: m)
+
+        with patch("app.dependencies.auth.get_settings") as mock_settings, \
+             patch("app.dependencies.auth.get_member_cache", return_value=cache):
+            mock_settings.return_value = MagicMock(auth_disabled=False)
+            first = await get_current_member(_request(), USER, db)
+            second = await get_current_member(_request(), USER, db)
+
+        assert db.execute.await_count == 2
+        assert first.id == second.id == TEST_MEMBER_ID
+        db.merge.assert_awaited_once()
+        assert db.merge.call_args.kwargs["load"] is False
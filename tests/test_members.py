@@ -4,7 +4,7 @@ Unit tests for member endpoints — /api/members
 
 import pytest
 from datetime import datetime, timezone
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import UUID
 
 from fastapi.testclient import TestClient
@@ -184,9 +184,12 @@ class TestDeleteMember:
             make_scalars_result(first=mock_target_member),
         ]
 
-        response = authed_client.delete(f"/api/members/{TARGET_MEMBER_ID}")
+        with patch("app.api.routes.api.members.invalidate_organization_metrics", new_callable=AsyncMock) as invalidate:
+            response = authed_client.delete(f"/api/members/{TARGET_MEMBER_ID}")
 
         assert response.status_code == 204
+        invalidate.assert_awaited_once()
+        assert invalidate.call_args.args[0] == TEST_ORG_ID
 
     def test_delete_member_not_found(self, authed_client: TestClient, mock_db):
         """DELETE /{id} returns 404 when member does not exist."""
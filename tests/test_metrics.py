@@ -0,0 +1,148 @@
+"""
+Tests for the Prometheus metrics registry and the instrumented services.
+"""
+import json
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.core.metrics import (
+    CACHE_REQUESTS,
+    INGESTION_JOBS,
+    INGESTION_JOBS_IN_PROGRESS,
+    INGESTION_STAGE_SECONDS,
+    SEMANTIC_SIMILARITY,
+    Counter,
+    Histogram,
+    Registry,
+)
+from app.services.cache.rag_cache_service import RagCacheService
+from app.services.cache.semantic_cache_service import SemanticCacheService
+from app.services.jobs.job_status_service import JobStatusService
+
+
+def _count(histogram, *labels):
+    return sum(histogram.labels(*labels).counts)
+
+
+class TestExposition:
+    """Tests for the text exposition format."""
+
+    def test_counter_and_histogram(self):
+        registry = Registry()
+        requests = Counter("cache_requests", "Lookups.", ("tier", "result"), registry=registry)
+        latency = Histogram("lookup_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry)
+
+        requests.labels("embedding", "hit").inc()
+        requests.labels("embedding", "hit").inc(2)
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5)
+
+        text = registry.generate_latest()
+        assert "# TYPE cache_requests counter" in text
+        assert 'cache_requests_total{tier="embedding",result="hit"} 3' in text
+        assert 'lookup_seconds_bucket{le="0.1"} 1' in text
+        assert 'lookup_seconds_bucket{le="1"} 2' in text
+        assert 'lookup_seconds_bucket{le="+Inf"} 3' in text
+        assert "lookup_seconds_sum 5.55" in text
+        assert "lookup_seconds_count 3" in text
+
+    def test_label_values_are_escaped(self):
+        registry = Registry()
+        counter = Counter("c", "Help.", ("name",), registry=registry)
+        counter.labels('a"b\\c').inc()
+        assert 'c_total{name="a\\"b\\\\c"} 1' in registry.generate_latest()
+
+    def test_wrong_label_count_rejected(self):
+        counter = Counter("c", "Help.", ("tier",), registry=Registry())
+        with pytest.raises(ValueError):
+            counter.labels("a", "b")
+
+    def test_failing_collector_is_skipped(self):
+        registry = Registry()
+
+        def broken():
+            raise RuntimeError("down")
+
+        registry.register_collector(broken)
+        Counter("ok", "Help.", registry=registry)
+        assert "ok_total 0" in registry.generate_latest()
+
+
+class TestCacheMetrics:
+    """Cache services record hits and misses per tier."""
+
+    @pytest.mark.asyncio
+    async def test_redis_tiers(self):
+        redis = MagicMock()
+        redis.get = AsyncMock(side_effect=[json.dumps([0.1]), None])
+        cache = RagCacheService(redis)
+        hits = CACHE_REQUESTS.labels("embedding", "hit").value
+        misses = CACHE_REQUESTS.labels("chunks", "miss").value
+
+        await cache.get_embedding("q")
+        await cache.get_chunks("q", uuid4())
+
+        assert CACHE_REQUESTS.labels("embedding", "hit").value == hits + 1
+        assert CACHE_REQUESTS.labels("chunks", "miss").value == misses + 1
+
+    @pytest.mark.asyncio
+    async def test_semantic_near_miss_records_similarity(self):
+        row = MagicMock(similarity=0.87, query_text="q", response_data={}, context_hash="h", id=uuid4())
+        result = MagicMock()
+        result.fetchone.return_value = row
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+        service = SemanticCacheService(db, similarity_threshold=0.90)
+        observed = sum(SEMANTIC_SIMILARITY.labels().counts)
+        misses = CACHE_REQUESTS.labels("semantic", "miss").value
+
+        assert await service.get_similar_response([0.1], uuid4()) is None
+
+        assert sum(SEMANTIC_SIMILARITY.labels().counts) == observed + 1
+        assert CACHE_REQUESTS.labels("semantic", "miss").value == misses + 1
+        # Threshold is applied in Python, so the query no longer binds it
+        assert "threshold" not in db.execute.call_args[0][1]
+
+
+class TestJobMetrics:
+    """JobStatusService records queue depth and stage durations."""
+
+    @pytest.mark.asyncio
+    async def test_job_lifecycle(self, memory_redis):
+        service = JobStatusService(memory_redis)
+        in_progress = INGESTION_JOBS_IN_PROGRESS.labels().value
+        completed = INGESTION_JOBS.labels("complete").value
+        failed = INGESTION_JOBS.labels("error").value
+        queued = _count(INGESTION_STAGE_SECONDS, "queued")
+        parsing = _count(INGESTION_STAGE_SECONDS, "parsing")
+
+        job_id = await service.create_job(uuid4())
+        assert INGESTION_JOBS_IN_PROGRESS.labels().value == in_progress + 1
+
+        await service.update_progress(job_id, "parsing", 10)
+        await service.update_progress(job_id, "parsing", 20)
+        await service.complete_job(job_id, {})
+
+        assert INGESTION_JOBS_IN_PROGRESS.labels().value == in_progress
+        assert INGESTION_JOBS.labels("complete").value == completed + 1
+        assert _count(INGESTION_STAGE_SECONDS, "queued") == queued + 1
+        assert _count(INGESTION_STAGE_SECONDS, "parsing") == parsing + 1
+
+        # A repeated terminal write is not counted twice
+        await service.fail_job(job_id, "late failure")
+        assert INGESTION_JOBS_IN_PROGRESS.labels().value == in_progress
+        assert INGESTION_JOBS.labels("error").value == failed
+
+
+class TestMetricsEndpoint:
+    """Tests for GET /metrics."""
+
+    def test_scrape(self, client):
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE rag_cache_requests counter" in response.text
+        assert "# TYPE rag_llm_request_seconds histogram" in response.text
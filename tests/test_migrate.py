@@ -0,0 +1,204 @@
+"""
+Tests for the versioned schema migration runner.
+"""
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.db.migrate import (
+    MIGRATION_COMMAND_TIMEOUT_SECONDS,
+    MIGRATIONS_DIR,
+    Migration,
+    load_migrations,
+    run_migrations,
+)
+
+
+class FakeConnection:
+    """AsyncConnection stand-in answering the runner's bookkeeping queries."""
+
+    def __init__(self, applied=(), table_exists=True, lock=True, checksums=None):
+        self.applied = set(applied)
+        self.checksums = {m.version: m.checksum for m in MIGRATIONS}
+        self.checksums.update(checksums or {})
+        self.table_exists = table_exists
+        self.lock = lock
+        self.sql = []
+        self.driver = MagicMock()
+        self.driver.execute = AsyncMock()
+        self.driver.fetch = AsyncMock(return_value=[])
+        self.driver.transaction = MagicMock(side_effect=self._transaction)
+        self.transactions = 0
+
+    @asynccontextmanager
+    async def _transaction(self):
+        self.transactions += 1
+        yield
+
+    async def execution_options(self, **kwargs):
+        return self
+
+    async def get_raw_connection(self):
+        return MagicMock(driver_connection=self.driver)
+
+    async def execute(self, stmt, params=None):
+        sql = str(stmt).strip()
+        self.sql.append(sql)
+        result = MagicMock()
+        if "to_regclass" in sql:
+            result.scalar.return_value = "schema_migrations" if self.table_exists else None
+        elif "pg_try_advisory_lock" in sql:
+            result.scalar.return_value = self.lock
+        elif sql.startswith("SELECT version"):
+            result.all.return_value = [(v, self.checksums[v]) for v in self.applied]
+        return result
+
+
+def _engine(conn):
+    engine = MagicMock()
+
+    @asynccontextmanager
+    async def connect():
+        yield conn
+
+    engine.connect = connect
+    return engine
+
+
+MIGRATIONS = [
+    Migration(1, "baseline", "CREATE TABLE a (id int);"),
+    Migration(2, "index", "-- migrate:no-transaction\nCREATE INDEX CONCURRENTLY i ON a (id);\n-- note\nSELECT 1;"),
+]
+
+
+class TestLoadMigrations:
+    """Tests for load_migrations / Migration."""
+
+    def test_bundled_migrations_are_ordered_and_unique(self):
+        migrations = load_migrations()
+        versions = [m.version for m in migrations]
+        assert versions == sorted(versions) == list(range(1, len(versions) + 1))
+        assert migrations[0].name == "baseline"
+
+    def test_concurrent_index_files_run_outside_transaction(self):
+        for m in load_migrations():
+            if "CONCURRENTLY" in m.sql:
+                assert not m.transactional, m.name
+
+    def test_duplicate_version_rejected(self, tmp_path):
+        (tmp_path / "0001_a.sql").write_text("SELECT 1;")
+        (tmp_path / "001_b.sql").write_text("SELECT 1;")
+        with pytest.raises(ValueError):
+            load_migrations(tmp_path)
+
+    def test_statement_split(self):
+        assert MIGRATIONS[1].statements() == ["CREATE INDEX CONCURRENTLY i ON a (id)", "SELECT 1"]
+
+    def test_concurrent_indexes_by_name(self):
+        migration = Migration(3, "x", "-- migrate:no-transaction\n"
+                              "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_b\n  ON b (id);\n"
+                              "DROP INDEX CONCURRENTLY IF EXISTS ix_old;")
+        assert migration.concurrent_indexes() == {
+            "ix_b": "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_b\n  ON b (id)",
+        }
+
+    def test_migrations_dir_exists(self):
+        assert MIGRATIONS_DIR.is_dir()
+
+
+class TestRunMigrations:
+    """Tests for run_migrations."""
+
+    @pytest.mark.asyncio
+    async def test_current_schema_is_a_single_query(self):
+        conn = FakeConnection(applied={1, 2})
+
+        assert await run_migrations(_engine(conn), MIGRATIONS) == []
+
+        assert len(conn.sql) == 2  # to_regclass + applied versions
+        assert not any("advisory" in s for s in conn.sql)
+        conn.driver.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_applies_pending_under_lock(self):
+        conn = FakeConnection(applied={1})
+
+        assert await run_migrations(_engine(conn), MIGRATIONS) == [2]
+
+        executed = [c.args[0] for c in conn.driver.execute.call_args_list]
+        assert executed[:2] == ["CREATE INDEX CONCURRENTLY i ON a (id)", "SELECT 1"]
+        assert "INSERT INTO schema_migrations" in executed[2]
+        assert conn.transactions == 0
+        assert "pg_advisory_unlock" in conn.sql[-1]
+
+    @pytest.mark.asyncio
+    async def test_runs_without_timeouts_and_resets_them(self):
+        conn = FakeConnection(applied={1})
+
+        await run_migrations(_engine(conn), MIGRATIONS)
+
+        assert "SET statement_timeout = 0" in conn.sql
+        assert conn.sql.index("SET statement_timeout = 0") < conn.sql.index("RESET statement_timeout")
+        ddl = conn.driver.execute.call_args_list[0]
+        assert ddl.kwargs["timeout"] == MIGRATION_COMMAND_TIMEOUT_SECONDS
+
+    @pytest.mark.asyncio
+    async def test_invalid_index_is_rebuilt_before_recording(self):
+        conn = FakeConnection(applied={1})
+        conn.driver.fetch.side_effect = [[("i",), ("unrelated",)], [("unrelated",)]]
+
+        assert await run_migrations(_engine(conn), MIGRATIONS) == [2]
+
+        executed = [c.args[0] for c in conn.driver.execute.call_args_list]
+        assert executed[2:4] == ['DROP INDEX CONCURRENTLY IF EXISTS "i"', "CREATE INDEX CONCURRENTLY i ON a (id)"]
+        assert "INSERT INTO schema_migrations" in executed[4]
+
+    @pytest.mark.asyncio
+    async def test_index_still_invalid_is_not_recorded(self):
+        conn = FakeConnection(applied={1})
+        conn.driver.fetch.return_value = [("i",)]
+
+        with pytest.raises(RuntimeError, match="still invalid"):
+            await run_migrations(_engine(conn), MIGRATIONS)
+
+        executed = [c.args[0] for c in conn.driver.execute.call_args_list]
+        assert not any("INSERT INTO schema_migrations" in sql for sql in executed)
+        assert "pg_advisory_unlock" in conn.sql[-1]
+
+    @pytest.mark.asyncio
+    async def test_modified_applied_migration_fails(self):
+        conn = FakeConnection(applied={1, 2}, checksums={1: "edited"})
+
+        with pytest.raises(RuntimeError, match="0001_baseline"):
+            await run_migrations(_engine(conn), MIGRATIONS)
+
+        conn.driver.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_fresh_database_runs_everything(self):
+        conn = FakeConnection(table_exists=False)
+
+        assert await run_migrations(_engine(conn), MIGRATIONS) == [1, 2]
+
+        assert conn.transactions == 1
+        assert any("CREATE TABLE IF NOT EXISTS schema_migrations" in s for s in conn.sql)
+
+    @pytest.mark.asyncio
+    async def test_skips_when_another_instance_holds_lock(self):
+        conn = FakeConnection(table_exists=False, lock=False)
+
+        assert await run_migrations(_engine(conn), MIGRATIONS) == []
+
+        conn.driver.execute.assert_not_called()
+        assert not any("pg_advisory_unlock" in s for s in conn.sql)
+
+    @pytest.mark.asyncio
+    async def test_lock_released_on_failure(self):
+        conn = FakeConnection(table_exists=False)
+        conn.driver.execute.side_effect = RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await run_migrations(_engine(conn), MIGRATIONS)
+
+        assert "pg_advisory_unlock" in conn.sql[-1]
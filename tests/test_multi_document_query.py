@@ -0,0 +1,165 @@
+"""
+Tests for trial-wide (multi-document) retrieval and the /query multi-document mode.
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID
+
+from app.services.doclingRag.rag_retrieval_service import RagRetrievalService
+from tests.conftest import make_rows_result
+
+DOC_A = UUID("00000000-0000-0000-0000-00000000000a")
+DOC_B = UUID("00000000-0000-0000-0000-00000000000b")
+
+
+def _chunk(chunk_id: str, title: str, vector_score=None, bm25_score=None) -> dict:
+    chunk = {"id": chunk_id, "page_content": f"content {chunk_id}", "metadata": {"title": title, "page": 1}}
+    if vector_score is not None:
+        chunk["vector_score"] = vector_score
+    if bm25_score is not None:
+        chunk["bm25_score"] = bm25_score
+    return chunk
+
+
+class TestRetrieveSimilarChunksMulti:
+    """Tests for RagRetrievalService.retrieve_similar_chunks_multi."""
+
+    @pytest.fixture
+    def mock_cache(self):
+        cache = MagicMock()
+        cache.get_chunks = AsyncMock(return_value=None)
+        cache.set_chunks = AsyncMock()
+        cache.get_embedding = AsyncMock(return_value=None)
+        cache.set_embedding = AsyncMock()
+        return cache
+
+    def test_fusion_ranks_globally(self):
+        service = RagRetrievalService(db=MagicMock(), embedding_client=MagicMock())
+        per_document = {
+            DOC_A: [_chunk("a1", "A", vector_score=0.60)],
+            DOC_B: [_chunk("b1", "B", vector_score=0.90, bm25_score=0.5), _chunk("b2", "B", vector_score=0.70)],
+        }
+
+        with patch("app.services.doclingRag.rag_retrieval_service.settings") as mock_settings:
+            mock_settings.hybrid_search_enabled = True
+            mock_settings.hybrid_search_rrf_k = 60
+            fused = service._fuse_across_documents(per_document, top_k=10)
+
+        assert [c["id"] for c in fused] == ["b1", "b2", "a1"]
+
+    @pytest.mark.asyncio
+    async def test_all_cached_skips_database(self, mock_cache):
+        mock_cache.get_chunks.side_effect = [
+            [_chunk("a1", "A", vector_score=0.8)],
+            [_chunk("b1", "B", vector_score=0.9)],
+        ]
+        db = MagicMock()
+        db.execute = AsyncMock()
+        service = RagRetrievalService(db=db, embedding_client=MagicMock(), cache_service=mock_cache)
+
+        chunks, timing = await service.retrieve_similar_chunks_multi(
+            "q", [(DOC_A, "A"), (DOC_B, "B")], precomputed_embedding=[0.1, 0.2]
+        )
+
+        db.execute.assert_not_called()
+        assert timing["chunk_cache_hit"] is True
+        assert {c["id"] for c in chunks} == {"a1", "b1"}
+
+    @pytest.mark.asyncio
+    async def test_cache_misses_share_one_search(self, mock_cache):
+        mock_cache.get_chunks.side_effect = [[_chunk("a1", "A", vector_score=0.8)], None]
+        row = MagicMock(
+            document_id=DOC_B, id="b1", content="content b1", page_number=3,
+            chunk_metadata={}, similarity=0.7, bm25_score=0.2,
+        )
+        result = make_rows_result()
+        result.fetchall.return_value = [row]
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+        service = RagRetrievalService(db=db, embedding_client=MagicMock(), cache_service=mock_cache)
+
+        chunks, timing = await service.retrieve_similar_chunks_multi(
+            "q", [(DOC_A, "A"), (DOC_B, "B")], precomputed_embedding=[0.1, 0.2]
+        )
+
+        # One vector query and (with hybrid search) one BM25 query for all misses
+        assert db.execute.await_count <= 2
+        assert timing["chunk_cache_hits"] == 1
+        mock_cache.set_chunks.assert_awaited_once()
+        assert mock_cache.set_chunks.call_args[0][1] == DOC_B
+        assert {c["id"] for c in chunks} == {"a1", "b1"}
+
+
+class TestQueryRouteMultiDocument:
+    """Tests for /query request validation in multi-document mode."""
+
+    def test_requires_document_or_trial(self, authed_client):
+        with patch("app.api.routes.query.get_settings") as mock_settings:
+            mock_settings.return_value = MagicMock(upload_api_key="k")
+            response = authed_client.post(
+                "/query", json={"query": "q"}, headers={"X-API-KEY": "k"}
+            )
+        assert response.status_code == 422
+
+    def test_trial_without_documents_returns_404(self, authed_client, mock_db):
+        mock_db.execute.return_value = make_rows_result([])
+        with patch("app.api.routes.query.get_settings") as mock_settings:
+            mock_settings.return_value = MagicMock(upload_api_key="k")
+            response = authed_client.post(
+                "/query",
+                json={"query": "q", "trial_id": str(DOC_A)},
+                headers={"X-API-KEY": "k"},
+            )
+        assert response.status_code == 404
+
+    def test_trial_query_uses_multi_generation(self, authed_client, mock_db):
+        rows = [MagicMock(id=DOC_A, document_name="Protocol"), MagicMock(id=DOC_B, document_name="ICF")]
+        mock_db.execute.return_value = make_rows_result(rows)
+        answer = {"result": {"response": "ok", "sources": []}, "timing": {}}
+        with patch("app.api.routes.query.get_settings") as mock_settings, \
+             patch("app.api.routes.query.get_embedding_client") as mock_embedding_client, \
+             patch("app.api.routes.query.RagGenerationService") as mock_gen_cls:
+            mock_settings.return_value = MagicMock(upload_api_key="k")
+            mock_gen_cls.return_value.generate_answer_multi = AsyncMock(return_value=answer)
+            response = authed_client.post(
+                "/query",
+                json={"query": "q", "trial_id": str(DOC_A)},
+                headers={"X-API-KEY": "k"},
+            )
+
+        assert response.status_code == 200
+        documents = mock_gen_cls.return_value.generate_answer_multi.call_args.kwargs["documents"]
+        assert documents == [(DOC_A, "Protocol"), (DOC_B, "ICF")]
+        mock_embedding_client.assert_called_once()
+
+
+class TestRetrievalConfig:
+    """Per-instance settings let evaluation variants run side by side."""
+
+    @pytest.mark.asyncio
+    async def test_config_override_and_embedding_column(self):
+        from app.config import get_settings
+
+        result = make_rows_result()
+        result.fetchall.return_value = []
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+        config = get_settings().model_copy(update={"hybrid_search_enabled": False})
+        service = RagRetrievalService(
+            db=db, embedding_client=MagicMock(), config=config, embedding_column="embedding_large",
+        )
+
+        await service.retrieve_similar_chunks("q", DOC_A, "A", precomputed_embedding=[0.1])
+
+        # Vector-only: a single query, against the large column
+        assert db.execute.await_count == 1
+        assert "pc.embedding_large <=>" in str(db.execute.call_args[0][0])
+
+    def test_unknown_embedding_column_rejected(self):
+        with pytest.raises(ValueError):
+            RagRetrievalService(db=MagicMock(), embedding_client=MagicMock(), embedding_column="embedding; DROP")
+
+    def test_embedding_column_is_not_an_app_setting(self):
+        from app.config import Settings
+
+        assert "retrieval_embedding_column" not in Settings.model_fields
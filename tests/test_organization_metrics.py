@@ -0,0 +1,92 @@
+"""
+Tests for the cached, single-query organization metrics service.
+"""
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.dialects import postgresql
+
+from app.services.organization_metrics_service import (
+    fetch_organization_metrics,
+    invalidate_organization_metrics,
+    metrics_query,
+)
+from tests.conftest import TEST_ORG_ID
+
+COUNTS = {
+    "total_members": 3,
+    "total_trials": 4,
+    "active_trials": 1,
+    "total_patients": 9,
+    "total_documents": 12,
+}
+
+
+@pytest.fixture(autouse=True)
+def metrics_settings():
+    with patch("app.services.organization_metrics_service.get_settings") as mock_settings:
+        mock_settings.return_value = MagicMock(org_metrics_cache_ttl_seconds=60)
+        yield
+
+
+def _db():
+    db = MagicMock()
+    row = MagicMock(_mapping=COUNTS)
+    db.execute = AsyncMock(return_value=MagicMock(one=MagicMock(return_value=row)))
+    return db
+
+
+def _redis(cached=None):
+    redis = MagicMock()
+    redis.get = AsyncMock(return_value=cached)
+    redis.set = AsyncMock()
+    redis.delete = AsyncMock()
+    return redis
+
+
+class TestOrganizationMetrics:
+    """Tests for fetch_organization_metrics / invalidate_organization_metrics."""
+
+    def test_single_statement(self):
+        sql = str(metrics_query(TEST_ORG_ID).compile(dialect=postgresql.dialect()))
+        assert sql.count("count(*)") == 5
+        assert sql.startswith("SELECT (SELECT count(*)")
+
+    @pytest.mark.asyncio
+    async def test_miss_computes_and_caches(self):
+        db, redis = _db(), _redis()
+
+        metrics = await fetch_organization_metrics(TEST_ORG_ID, db, redis)
+
+        assert metrics.total_documents == 12
+        assert db.execute.await_count == 1
+        key, payload = redis.set.call_args[0]
+        assert key == f"org_metrics:{TEST_ORG_ID}"
+        assert json.loads(payload) == COUNTS
+        assert redis.set.call_args.kwargs["ex"] == 60
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_database(self):
+        db, redis = _db(), _redis(json.dumps(COUNTS).encode())
+
+        metrics = await fetch_organization_metrics(TEST_ORG_ID, db, redis)
+
+        assert metrics.total_patients == 9
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_fall_back_to_database(self):
+        db, redis = _db(), _redis()
+        redis.get.side_effect = ConnectionError("down")
+        redis.set.side_effect = ConnectionError("down")
+
+        metrics = await fetch_organization_metrics(TEST_ORG_ID, db, redis)
+
+        assert metrics.total_members == 3
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self):
+        redis = _redis()
+        await invalidate_organization_metrics(TEST_ORG_ID, redis)
+        redis.delete.assert_awaited_once_with(f"org_metrics:{TEST_ORG_ID}")
+        await invalidate_organization_metrics(TEST_ORG_ID, None)
@@ -57,15 +57,17 @@ class TestUpdateMyOrg:
 class TestGetMetrics:
 
     def test_get_metrics(self, authed_client, mock_db):
-        mock_db.execute = AsyncMock(side_effect=[
-            MagicMock(scalar_one=MagicMock(return_value=10)),   # members
-            MagicMock(scalar_one=MagicMock(return_value=5)),    # trials
-            MagicMock(scalar_one=MagicMock(return_value=2)),    # active_trials
-            MagicMock(scalar_one=MagicMock(return_value=20)),   # patients
-            MagicMock(scalar_one=MagicMock(return_value=15)),   # documents
-        ])
+        row = MagicMock(_mapping={
+            "total_members": 10,
+            "total_trials": 5,
+            "active_trials": 2,
+            "total_patients": 20,
+            "total_documents": 15,
+        })
+        mock_db.execute = AsyncMock(return_value=MagicMock(one=MagicMock(return_value=row)))
         resp = authed_client.get("/api/organizations/me/metrics")
         assert resp.status_code == 200
+        assert mock_db.execute.await_count == 1
         data = resp.json()
         assert data["total_members"] == 10
         assert data["total_trials"] == 5
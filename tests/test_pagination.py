@@ -0,0 +1,201 @@
+"""
+Tests for keyset pagination and sparse fieldsets on list endpoints.
+"""
+
+import base64
+import json
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.patients import Patient
+from app.models.tasks import Task
+from app.services.crud import CRUDBase
+from app.utils.pagination import apply_keyset, decode_cursor, encode_cursor
+from tests.conftest import NOW, TEST_MEMBER_ID, TEST_ORG_ID, TEST_TRIAL_ID, make_rows_result, make_scalars_result
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _rows(n: int):
+    return [
+        SimpleNamespace(
+            id=UUID(int=i + 1), organization_id=TEST_ORG_ID, name=f"Row {i}", description=None,
+            permission_level="edit", created_by=None, created_at=NOW - timedelta(minutes=i), updated_at=NOW,
+        )
+        for i in range(n)
+    ]
+
+
+class TestCursor:
+    """Tests for encode_cursor / decode_cursor."""
+
+    def test_round_trip(self):
+        values = [NOW, NOW.date(), TEST_MEMBER_ID, 7, "x"]
+        assert decode_cursor(encode_cursor(*values)) == values
+
+    def test_malformed(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_null_sort_key_round_trips(self):
+        assert decode_cursor(encode_cursor(None, TEST_MEMBER_ID)) == [None, TEST_MEMBER_ID]
+
+    @pytest.mark.parametrize("parts", [
+        [],
+        {"t": "raw", "v": 1},
+        [{"t": "raw", "v": [1, 2]}],
+        [{"t": "dt", "v": 5}],
+        [{"t": "bogus", "v": "x"}],
+        [{"t": "raw"}],
+    ])
+    def test_rejects_wrong_shapes_and_types(self, parts):
+        cursor = base64.urlsafe_b64encode(json.dumps(parts).encode()).decode()
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+    def test_arity(self):
+        cursor = encode_cursor(NOW, TEST_MEMBER_ID, 3)
+        assert len(decode_cursor(cursor)) == 3
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, arity=2)
+
+
+class TestApplyKeyset:
+    """NULL-aware ordering and cursor predicates."""
+
+    def test_nullable_descending_after_value_skips_null_block(self):
+        sql = _sql(apply_keyset(select(Task), Task.created_at, Task.id, [NOW, TEST_MEMBER_ID], 10))
+
+        assert "(tasks.created_at, tasks.id) <" in sql
+        assert "IS NULL" not in sql  # NULLs sort first when descending: already returned
+        assert "ORDER BY tasks.created_at DESC NULLS FIRST, tasks.id DESC" in sql
+
+    def test_nullable_descending_inside_null_block(self):
+        sql = _sql(apply_keyset(select(Task), Task.created_at, Task.id, [None, TEST_MEMBER_ID], 10))
+
+        assert "tasks.created_at IS NULL AND tasks.id <" in sql
+        assert "OR tasks.created_at IS NOT NULL" in sql
+
+    def test_nullable_ascending_reaches_null_block(self):
+        after_value = _sql(apply_keyset(select(Task), Task.created_at, Task.id, [NOW, TEST_MEMBER_ID], 10,
+                                        descending=False))
+        inside_nulls = _sql(apply_keyset(select(Task), Task.created_at, Task.id, [None, TEST_MEMBER_ID], 10,
+                                         descending=False))
+
+        assert "(tasks.created_at, tasks.id) >" in after_value and "OR tasks.created_at IS NULL" in after_value
+        assert "tasks.created_at IS NULL AND tasks.id >" in inside_nulls
+        assert "IS NOT NULL" not in inside_nulls
+        assert "ORDER BY tasks.created_at ASC NULLS LAST, tasks.id ASC" in after_value
+
+    def test_non_nullable_column_keeps_plain_order(self):
+        sql = _sql(apply_keyset(select(Task), Task.id, Task.id, None, 10))
+
+        assert "ORDER BY tasks.id DESC, tasks.id DESC" in sql
+
+
+class TestCRUDGetPage:
+    """Tests for CRUDBase.get_page."""
+
+    @pytest.mark.asyncio
+    async def test_first_page(self):
+        db = MagicMock()
+        rows = _rows(3)
+        db.execute = AsyncMock(return_value=make_scalars_result(all_items=rows))
+
+        items, cursor = await CRUDBase(Patient, db).get_page({"organization_id": TEST_ORG_ID}, limit=2)
+
+        assert items == rows[:2]
+        assert decode_cursor(cursor) == [rows[1].created_at, rows[1].id]
+        sql = _sql(db.execute.call_args[0][0])
+        assert "ORDER BY patients.created_at DESC NULLS FIRST, patients.id DESC" in sql
+        assert "LIMIT" in sql
+
+    @pytest.mark.asyncio
+    async def test_after_and_fields(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=make_scalars_result(all_items=[]))
+
+        items, cursor = await CRUDBase(Patient, db).get_page(
+            after=[NOW, TEST_MEMBER_ID], fields={"patient_code", "bogus"},
+        )
+
+        assert items == [] and cursor is None
+        sql = _sql(db.execute.call_args[0][0])
+        assert "(patients.created_at, patients.id) <" in sql
+        assert "patients.patient_code" in sql
+        assert "patients.first_name" not in sql
+
+
+class TestListEndpoints:
+    """Cursor header, sparse fields and deferred heavy columns on list routes."""
+
+    def test_next_cursor_header(self, authed_client, mock_db):
+        rows = _rows(3)
+        mock_db.execute.return_value = make_scalars_result(all_items=rows)
+
+        resp = authed_client.get("/api/roles/?limit=2")
+
+        assert resp.status_code == 200
+        assert len(resp.json()) == 2
+        assert decode_cursor(resp.headers["X-Next-Cursor"])[1] == rows[1].id
+
+    def test_next_cursor_exposed_to_browsers(self, authed_client, mock_db):
+        mock_db.execute.return_value = make_scalars_result(all_items=_rows(3))
+
+        resp = authed_client.get("/api/roles/?limit=2", headers={"Origin": "http://localhost:3000"})
+
+        assert resp.headers["access-control-allow-origin"] == "http://localhost:3000"
+        exposed = {h.strip().lower() for h in resp.headers["access-control-expose-headers"].split(",")}
+        assert "x-next-cursor" in exposed
+        assert "X-Next-Cursor" in resp.headers
+
+    def test_sparse_fields(self, authed_client, mock_db):
+        mock_db.execute.return_value = make_scalars_result(all_items=_rows(2))
+
+        resp = authed_client.get("/api/roles/?fields=id,name")
+
+        assert resp.status_code == 200
+        assert resp.json()[0] == {"id": str(UUID(int=1)), "name": "Row 0"}
+
+    def test_invalid_cursor(self, authed_client):
+        resp = authed_client.get("/api/roles/?cursor=not-a-cursor")
+        assert resp.status_code == 400
+
+    @pytest.mark.parametrize("values", [(NOW,), (NOW, TEST_MEMBER_ID, 1), (NOW, "not-a-uuid")])
+    def test_cursor_with_wrong_arity_or_id_type(self, authed_client, values):
+        resp = authed_client.get(f"/api/roles/?cursor={encode_cursor(*values)}")
+        assert resp.status_code == 400
+
+    def test_limit_bounds(self, authed_client):
+        assert authed_client.get("/api/roles/?limit=0").status_code == 422
+        assert authed_client.get("/api/roles/?limit=501").status_code == 422
+
+    def test_heavy_columns_deferred_unless_requested(self, authed_client, mock_db):
+        mock_db.execute.return_value = make_rows_result([])
+
+        authed_client.get(f"/api/trial-patients/?trial_id={TEST_TRIAL_ID}&fields=id,status")
+        sparse = _sql(mock_db.execute.call_args[0][0])
+        authed_client.get(f"/api/trial-patients/?trial_id={TEST_TRIAL_ID}")
+        full = _sql(mock_db.execute.call_args[0][0])
+
+        assert "trial_patients.cost_data" not in sparse
+        assert "trial_patients.cost_data" in full
+        assert "ORDER BY trial_patients.created_at DESC NULLS FIRST, trial_patients.id DESC" in full
+
+    def test_messages_paginate_chronologically(self, authed_client, mock_db):
+        session = MagicMock(user_id=TEST_MEMBER_ID)
+        mock_db.execute.side_effect = [make_scalars_result(first=session), make_scalars_result(all_items=[])]
+
+        resp = authed_client.get(f"/api/chat-messages/?session_id={UUID(int=9)}")
+
+        assert resp.status_code == 200
+        sql = _sql(mock_db.execute.call_args[0][0])
+        assert "ORDER BY chat_messages.created_at ASC NULLS LAST, chat_messages.id ASC" in sql
@@ -0,0 +1,158 @@
+"""
+Tests for counter-backed patient code allocation, including a load test.
+"""
+import asyncio
+import pytest
+
+from app.services.patient_code_service import (
+    CodeScrambler,
+    PatientCodeAllocator,
+    PatientCodeSpaceExhausted,
+)
+from tests.conftest import TEST_ORG_ID
+
+LOAD_TEST_CODES = 10000
+
+
+class FakeCounterDB:
+    """Stands in for Postgres: per-organization counters plus existing org codes."""
+
+    def __init__(self, taken=(), start=0):
+        self.start = start
+        self.counters = {}
+        self.taken = set(taken)
+        self.reserve_calls = 0
+        self.lookup_calls = 0
+        self.commits = 0
+
+    async def execute(self, stmt, params=None):
+        await asyncio.sleep(0)  # yield like a real round-trip
+        if params is not None:  # INSERT INTO patient_code_counters ... RETURNING next_ordinal
+            self.reserve_calls += 1
+            end = self.counters.get(params["org"], self.start) + params["n"]
+            self.counters[params["org"]] = end
+            return _Result(rows=[end])
+        # SELECT patient_code ... WHERE organization_id = :org AND patient_code IN (:codes)
+        self.lookup_calls += 1
+        codes = stmt.whereclause.clauses[1].right.value
+        return _Result(rows=[c for c in codes if c in self.taken])
+
+    async def commit(self):
+        self.commits += 1
+
+
+class _Result:
+    def __init__(self, rows=()):
+        self._rows = list(rows)
+
+    def all(self):
+        return self._rows
+
+    def scalars(self):
+        return self
+
+    def scalar_one(self):
+        (value,) = self._rows
+        return value
+
+
+class TestCodeScrambler:
+    """Tests for CodeScrambler."""
+
+    def test_is_a_bijection_on_the_code_space(self):
+        scrambler = CodeScrambler(100_000, key=42)
+        outputs = {scrambler.scramble(n) for n in range(100_000)}
+        assert len(outputs) == 100_000
+        assert min(outputs) == 0 and max(outputs) == 99_999
+
+    def test_consecutive_ordinals_look_random(self):
+        scrambler = CodeScrambler(100_000, key=42)
+        codes = [scrambler.scramble(n) for n in range(50)]
+        assert codes != sorted(codes)
+        assert len({b - a for a, b in zip(codes, codes[1:])}) > 40
+
+    def test_key_changes_permutation(self):
+        a = [CodeScrambler(100_000, key=1).scramble(n) for n in range(20)]
+        b = [CodeScrambler(100_000, key=2).scramble(n) for n in range(20)]
+        assert a != b
+
+    def test_rejects_out_of_range(self):
+        with pytest.raises(ValueError):
+            CodeScrambler(100, key=1).scramble(100)
+
+
+class TestPatientCodeAllocator:
+    """Tests for PatientCodeAllocator."""
+
+    @pytest.mark.asyncio
+    async def test_format(self):
+        db = FakeCounterDB()
+        code = await PatientCodeAllocator(5, 10, 7).allocate(db, TEST_ORG_ID)
+        assert code.startswith("PAT-") and len(code) == 9 and code[4:].isdigit()
+
+    @pytest.mark.asyncio
+    async def test_organizations_have_separate_code_spaces(self):
+        db = FakeCounterDB()
+        allocator = PatientCodeAllocator(5, 20, 7)
+
+        first = [await allocator.allocate(db, TEST_ORG_ID) for _ in range(3)]
+        other = [await allocator.allocate(db, "other-org") for _ in range(3)]
+
+        assert first == other == [allocator.format(n) for n in range(3)]
+        assert db.counters == {TEST_ORG_ID: 3, "other-org": 3}
+        assert db.commits == db.reserve_calls == 6  # Reservations are committed at once
+
+    @pytest.mark.asyncio
+    async def test_only_issued_ordinals_are_reserved(self):
+        db = FakeCounterDB()
+        allocator = PatientCodeAllocator(5, 20, 7)
+
+        for _ in range(40):
+            await allocator.allocate(db, TEST_ORG_ID)
+
+        # With no taken codes each reservation is used in full: the counter matches
+        # the codes issued and no spare candidates are left over
+        assert db.counters[TEST_ORG_ID] == 40
+        assert not allocator._spare
+
+    @pytest.mark.asyncio
+    async def test_skips_codes_already_in_org(self):
+        allocator = PatientCodeAllocator(5, 20, 7)
+        taken = {allocator.format(n) for n in range(5)}
+        db = FakeCounterDB(taken=taken)
+
+        code = await allocator.allocate(db, TEST_ORG_ID)
+
+        assert code not in taken
+        assert code == allocator.format(5)
+        assert db.lookup_calls <= 3  # batch doubles: 1, 2, 4 candidates
+        # The other free candidate of the last batch is issued next
+        assert await allocator.allocate(db, TEST_ORG_ID) == allocator.format(6)
+        assert db.counters[TEST_ORG_ID] == 7
+
+    @pytest.mark.asyncio
+    async def test_exhaustion(self):
+        db = FakeCounterDB(start=100)
+        allocator = PatientCodeAllocator(2, 10, 7)
+        with pytest.raises(PatientCodeSpaceExhausted):
+            await allocator.allocate(db, TEST_ORG_ID)
+
+    @pytest.mark.asyncio
+    async def test_load_concurrent_allocation_is_unique(self):
+        """Many concurrent requests on a crowded code space: no duplicates, bounded round-trips."""
+        allocator = PatientCodeAllocator(5, 50, 7)
+        # 60% of the space already issued by the legacy random generator
+        legacy = {allocator.format(n) for n in range(100_000) if n % 5 < 3}
+        db = FakeCounterDB(taken=legacy)
+
+        codes = await asyncio.gather(
+            *(allocator.allocate(db, TEST_ORG_ID) for _ in range(LOAD_TEST_CODES))
+        )
+
+        assert len(set(codes)) == LOAD_TEST_CODES
+        assert not set(codes) & legacy
+        # Round-trips stay proportional to codes issued, not to how full the space is
+        assert db.reserve_calls <= LOAD_TEST_CODES * 3
+        assert db.lookup_calls <= LOAD_TEST_CODES * 3
+        # Spare candidates are reused, so ordinals reserved stay close to those needed
+        assert db.counters[TEST_ORG_ID] <= 1.5 * LOAD_TEST_CODES * 5 / 2
@@ -90,7 +90,7 @@ class TestUploadPatientDocument:
         data = resp.json()
         assert data["document_name"] == "Test Doc"
         assert data["status"] == "active"
-        mock_storage.upload_file.assert_called_once()
+        mock_storage.save_upload.assert_awaited_once()
 
 
 class TestUpdatePatientDocument:
@@ -132,7 +132,7 @@ class TestDeletePatientDocument:
         ])
         resp = storage_client.delete(f"/api/patient-documents/{DOC_ID}")
         assert resp.status_code == 204
-        mock_storage.delete_file.assert_called_once()
+        mock_storage.delete_file_async.assert_awaited_once()
 
     def test_delete_document_not_found(self, storage_client, mock_db):
         mock_db.execute = AsyncMock(
@@ -3,15 +3,17 @@ Tests for patient endpoints — /api/patients.
 """
 
 from datetime import datetime, timezone
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import UUID
 
 import pytest
 
+from app.services.patient_code_service import PatientCodeAllocator
 from tests.conftest import (
     NOW,
     TEST_MEMBER_ID,
     TEST_ORG_ID,
+    make_rows_result,
     make_scalars_result,
 )
 
@@ -70,12 +72,14 @@ class TestGeneratePatientCode:
 
     def test_generate_patient_code(self, authed_client, mock_db):
         """GET /api/patients/generate-code returns a PAT-XXXXX code."""
-        # scalar_one() returns 0 => code is unique on first try
-        result = MagicMock()
-        result.scalar_one.return_value = 0
+        # Counter reservation returns next_ordinal 1; none of the codes taken in the org
+        result = make_rows_result([])
+        result.scalar_one.return_value = 1
         mock_db.execute.return_value = result
+        allocator = PatientCodeAllocator(digits=5, block_size=20, scramble_key=1)
 
-        response = authed_client.get("/api/patients/generate-code")
+        with patch("app.api.routes.api.patients.get_patient_code_allocator", return_value=allocator):
+            response = authed_client.get("/api/patients/generate-code")
 
         assert response.status_code == 200
         data = response.json()
@@ -0,0 +1,230 @@
+"""
+Tests for PDFHighlightService, the source PDF cache and highlight pre-rendering.
+"""
+import time
+from functools import partial
+
+import fitz
+import httpx
+import pytest
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from app.services.highlighting.highlight_prerender_service import HighlightPrerenderService
+from app.services.highlighting.pdf_highlight_service import PDFHighlightService
+from app.services.highlighting.pdf_source_cache import PdfSourceCache, normalize_document_url
+from app.services.storage import document_cache
+from app.services.storage.base import SignedUrl
+from tests.conftest import make_rows_result
+
+SIGNED_URL = (
+    "https://storage.googleapis.com/bucket/trial/protocol.pdf"
+    "?X-Goog-Algorithm=GOOG4-RSA-SHA256&X-Goog-Credential=abc"
+    f"&X-Goog-Date={time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}&X-Goog-Expires=3600"
+    "&X-Goog-SignedHeaders=host&X-Goog-Signature=deadbeef"
+)
+EXPIRED_URL = SIGNED_URL.replace("X-Goog-Expires=3600", "X-Goog-Expires=0")
+
+
+def _make_pdf(pages: int = 3) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {i + 1} inclusion criteria")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture
+def mock_redis():
+    redis = MagicMock()
+    redis.get = AsyncMock(return_value=None)
+    redis.set = AsyncMock()
+    return redis
+
+
+class TestPdfSourceCache:
+    """Tests for PdfSourceCache."""
+
+    def test_normalize_strips_signature(self):
+        assert normalize_document_url(SIGNED_URL) == "https://storage.googleapis.com/bucket/trial/protocol.pdf"
+
+    def test_normalize_keeps_other_params(self):
+        assert normalize_document_url("http://h/f.pdf?v=2&Signature=x") == "http://h/f.pdf?v=2"
+
+    @pytest.mark.asyncio
+    async def test_signed_urls_share_entry(self):
+        cache = PdfSourceCache(max_memory_bytes=1024 * 1024)
+        fetch = AsyncMock(return_value=b"%PDF")
+
+        await cache.get_or_fetch(SIGNED_URL, fetch)
+        await cache.get_or_fetch(SIGNED_URL.replace("deadbeef", "cafebabe"), fetch)
+
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_memory_lru_evicts_oldest(self):
+        cache = PdfSourceCache(max_memory_bytes=10)
+        fetch = AsyncMock(side_effect=[b"aaaaaa", b"bbbbbb", b"aaaaaa"])
+
+        await cache.get_or_fetch("http://h/a.pdf", fetch)
+        await cache.get_or_fetch("http://h/b.pdf", fetch)
+        await cache.get_or_fetch("http://h/a.pdf", fetch)
+
+        assert fetch.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_memory_eviction(self, tmp_path):
+        cache = PdfSourceCache(max_memory_bytes=0, cache_dir=str(tmp_path), max_disk_bytes=1024)
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=b"%PDF-disk", headers={"ETag": '"v1"'})
+
+        client = partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+        with patch.object(document_cache.httpx, "AsyncClient", client):
+            await cache.get_or_fetch("http://h/a.pdf", AsyncMock())
+            data = await cache.get_or_fetch("http://h/a.pdf", AsyncMock())
+
+        assert data == b"%PDF-disk"
+        assert len(requests) == 2  # Download, then a bodiless revalidation
+
+    @pytest.mark.asyncio
+    async def test_memory_entry_dropped_when_document_changes(self, tmp_path):
+        cache = PdfSourceCache(max_memory_bytes=1024, cache_dir=str(tmp_path), max_disk_bytes=1024)
+        versions = iter([(b"%PDF-old", '"v1"'), (b"%PDF-new", '"v2"')])
+
+        def handler(request):
+            content, etag = next(versions)
+            return httpx.Response(200, content=content, headers={"ETag": etag})
+
+        client = partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+        with patch.object(document_cache.httpx, "AsyncClient", client):
+            assert await cache.get_or_fetch("http://h/a.pdf", AsyncMock()) == b"%PDF-old"
+            assert await cache.get_or_fetch("http://h/a.pdf", AsyncMock()) == b"%PDF-new"
+
+
+class TestPDFHighlightService:
+    """Tests for PDFHighlightService."""
+
+    @pytest.mark.asyncio
+    async def test_returns_single_highlighted_page(self, mock_redis):
+        source_cache = PdfSourceCache(max_memory_bytes=10 * 1024 * 1024)
+        service = PDFHighlightService(mock_redis, source_cache=source_cache)
+        service._probe_url = AsyncMock(return_value=206)
+        service._download_pdf = AsyncMock(return_value=_make_pdf(3))
+
+        result = await service.get_highlighted_pdf(SIGNED_URL, 2, [[60, 700, 300, 780]])
+
+        out = fitz.open(stream=result, filetype="pdf")
+        assert len(out) == 1
+        assert "Page 2" in out[0].get_text()
+        assert len(list(out[0].annots())) >= 1
+        out.close()
+        # The verified URL and the rendered page
+        assert mock_redis.set.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_skips_download(self, mock_redis):
+        mock_redis.get.side_effect = lambda key: None if key.startswith("pdf_hl_url:") else b"%PDF-cached"
+        service = PDFHighlightService(mock_redis, source_cache=PdfSourceCache(1024))
+        service._probe_url = AsyncMock(return_value=206)
+        service._download_pdf = AsyncMock()
+
+        result = await service.get_highlighted_pdf(SIGNED_URL, 1, [[0, 0, 10, 10]])
+
+        assert result == b"%PDF-cached"
+        service._download_pdf.assert_not_called()
+        service._probe_url.assert_awaited_once_with(SIGNED_URL)
+
+    @pytest.mark.asyncio
+    async def test_rejected_url_gets_no_cached_page(self, mock_redis):
+        mock_redis.get.side_effect = lambda key: None if key.startswith("pdf_hl_url:") else b"%PDF-cached"
+        service = PDFHighlightService(mock_redis, source_cache=PdfSourceCache(1024))
+        service._probe_url = AsyncMock(return_value=403)
+
+        with pytest.raises(HTTPException) as exc:
+            await service.get_highlighted_pdf(SIGNED_URL.replace("deadbeef", "forged"), 1, [[0, 0, 10, 10]])
+
+        assert exc.value.status_code == 403
+        mock_redis.set.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_expired_url_rejected_without_probe(self, mock_redis):
+        service = PDFHighlightService(mock_redis, source_cache=PdfSourceCache(1024))
+        service._probe_url = AsyncMock(return_value=206)
+
+        with pytest.raises(HTTPException) as exc:
+            await service.get_highlighted_pdf(EXPIRED_URL, 1, [[0, 0, 10, 10]])
+
+        assert exc.value.status_code == 403
+        service._probe_url.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_verified_url_is_remembered(self, memory_redis):
+        service = PDFHighlightService(memory_redis, source_cache=PdfSourceCache(1024))
+        service._probe_url = AsyncMock(return_value=206)
+
+        await service.verify_url(SIGNED_URL)
+        await service.verify_url(SIGNED_URL)
+
+        service._probe_url.assert_awaited_once()
+
+    def test_cache_key_ignores_signature(self):
+        other = SIGNED_URL.replace("deadbeef", "cafebabe")
+        assert PDFHighlightService.cache_key(SIGNED_URL, 1, [[1, 2, 3, 4]]) == \
+            PDFHighlightService.cache_key(other, 1, [[1, 2, 3, 4]])
+
+
+class TestHighlightPrerenderService:
+    """Tests for HighlightPrerenderService."""
+
+    @staticmethod
+    def _session_factory(rows):
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=make_rows_result(rows))
+        factory = MagicMock()
+        factory.return_value.__aenter__ = AsyncMock(return_value=session)
+        factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        return factory
+
+    @pytest.mark.asyncio
+    async def test_renders_unique_cited_pages(self):
+        doc_id = uuid4()
+        storage = MagicMock()
+        storage.sign_url = AsyncMock(return_value=SignedUrl(SIGNED_URL, time.time() + 3600))
+        highlight = MagicMock()
+        highlight.get_highlighted_pdf = AsyncMock(return_value=b"%PDF")
+        service = HighlightPrerenderService(
+            highlight, storage, self._session_factory([MagicMock(id=doc_id, document_url="trials/x/protocol.pdf")])
+        )
+        sources = [
+            {"name": "Protocol", "page": 3, "bboxes": [[1.0, 2.0, 3.0, 4.0]]},
+            {"name": "Protocol", "page": 3, "bboxes": [[1, 2, 3, 4]]},  # duplicate
+            {"name": "Protocol", "page": 5, "bboxes": []},  # nothing to highlight
+        ]
+
+        rendered = await service.prerender_for_answer([(doc_id, "Protocol")], sources)
+
+        assert rendered == 1
+        highlight.get_highlighted_pdf.assert_awaited_once_with(SIGNED_URL, 3, [[1.0, 2.0, 3.0, 4.0]])
+
+    @pytest.mark.asyncio
+    async def test_render_errors_are_swallowed(self):
+        doc_id = uuid4()
+        highlight = MagicMock()
+        highlight.get_highlighted_pdf = AsyncMock(side_effect=RuntimeError("boom"))
+        service = HighlightPrerenderService(
+            highlight, MagicMock(), self._session_factory([MagicMock(id=doc_id, document_url="http://h/a.pdf")])
+        )
+
+        rendered = await service.prerender_for_answer(
+            [(doc_id, "A")], [{"name": "A", "page": 1, "bboxes": [[0, 0, 1, 1]]}]
+        )
+
+        assert rendered == 0
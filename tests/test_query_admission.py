@@ -0,0 +1,232 @@
+"""
+Tests for /query admission control: concurrency limits, the wait queue and
+the Redis token-bucket rate limiter.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID
+
+import pytest
+
+from app.services import query_admission_service
+from app.services.query_admission_service import (
+    DEFAULT_TENANT,
+    AdmissionRejected,
+    ConcurrencyLimiter,
+    QueryAdmission,
+    RateLimiter,
+    resolve_query_tenant,
+)
+
+DOC_A = UUID("00000000-0000-0000-0000-00000000000a")
+ORG = UUID("00000000-0000-0000-0000-0000000000f1")
+
+
+def _limiter(max_concurrent=2, max_per_tenant=2, max_queue=10, max_wait=5.0) -> ConcurrencyLimiter:
+    return ConcurrencyLimiter(max_concurrent, max_per_tenant, max_queue, max_wait)
+
+
+class TestConcurrencyLimiter:
+
+    @pytest.mark.asyncio
+    async def test_waiters_start_in_order_as_slots_free(self):
+        limiter = _limiter(max_concurrent=1)
+        await limiter.acquire("a")
+        started = []
+
+        async def query(name):
+            await limiter.acquire("a")
+            started.append(name)
+
+        tasks = [asyncio.ensure_future(query(n)) for n in ("first", "second")]
+        await asyncio.sleep(0)
+        assert limiter.waiting == 2 and not started
+
+        limiter.release("a")
+        await asyncio.sleep(0.01)
+        assert started == ["first"]
+        limiter.release("a")
+        await asyncio.gather(*tasks)
+        assert started == ["first", "second"]
+        assert limiter.running == 1
+
+    @pytest.mark.asyncio
+    async def test_tenant_limit_does_not_block_other_tenants(self):
+        limiter = _limiter(max_concurrent=3, max_per_tenant=1)
+        await limiter.acquire("busy")
+        blocked = asyncio.ensure_future(limiter.acquire("busy"))
+        await asyncio.sleep(0)
+
+        await asyncio.wait_for(limiter.acquire("other"), timeout=1)
+
+        assert not blocked.done()
+        assert limiter.running == 2
+        limiter.release("busy")
+        await asyncio.wait_for(blocked, timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_immediately(self):
+        limiter = _limiter(max_concurrent=1, max_queue=1)
+        await limiter.acquire("a")
+        waiting = asyncio.ensure_future(limiter.acquire("a"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            await limiter.acquire("b")
+
+        assert exc.value.reason == "queue_full"
+        assert exc.value.retry_after >= 1
+        waiting.cancel()
+
+    @pytest.mark.asyncio
+    async def test_wait_timeout_leaves_queue(self):
+        limiter = _limiter(max_concurrent=1, max_wait=0.01)
+        await limiter.acquire("a")
+
+        with pytest.raises(AdmissionRejected) as exc:
+            await limiter.acquire("a")
+
+        assert exc.value.reason == "timeout"
+        assert limiter.waiting == 0
+        limiter.release("a")
+        assert limiter.running == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_gives_up_its_place(self):
+        limiter = _limiter(max_concurrent=1)
+        await limiter.acquire("a")
+        waiter = asyncio.ensure_future(limiter.acquire("a"))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert limiter.waiting == 0
+        limiter.release("a")
+        assert limiter.running == 0
+
+
+class TestRateLimiter:
+
+    @pytest.mark.asyncio
+    async def test_takes_from_tenant_and_global_buckets(self):
+        redis = MagicMock()
+        redis.eval = AsyncMock(return_value=b"0")
+        limiter = RateLimiter(rate=2.0, burst=10, global_rate=5.0, global_burst=50)
+
+        assert await limiter.acquire(redis, "org") == 0
+
+        args = redis.eval.call_args[0]
+        assert args[1:] == (2, "query_rate:org", "query_rate:global", 2.0, 10, 5.0, 50)
+
+    @pytest.mark.asyncio
+    async def test_returns_wait_when_empty(self):
+        redis = MagicMock()
+        redis.eval = AsyncMock(return_value=b"2.5")
+        limiter = RateLimiter(rate=1.0, burst=1, global_rate=0, global_burst=1)
+
+        assert await limiter.acquire(redis, "org") == 2.5
+        assert redis.eval.call_args[0][1:] == (1, "query_rate:org", 1.0, 1)
+
+    @pytest.mark.asyncio
+    async def test_disabled_and_redis_errors_admit(self):
+        redis = MagicMock()
+        redis.eval = AsyncMock(side_effect=ConnectionError("down"))
+
+        assert await RateLimiter(0, 1, 0, 1).acquire(redis, "org") == 0
+        redis.eval.assert_not_called()
+        assert await RateLimiter(1.0, 1, 0, 1).acquire(redis, "org") == 0
+        assert await RateLimiter(1.0, 1, 0, 1).acquire(None, "org") == 0
+
+
+class TestQueryAdmission:
+
+    @pytest.mark.asyncio
+    async def test_reports_queue_time_and_releases(self):
+        admission = QueryAdmission(_limiter(max_concurrent=1), RateLimiter(0, 1, 0, 1))
+        await admission.limiter.acquire("org")
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, admission.limiter.release, "org")
+
+        async with admission.admit("org") as queue_ms:
+            assert queue_ms >= 40
+            assert admission.limiter.running == 1
+        assert admission.limiter.running == 0
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_does_not_take_a_slot(self):
+        rate_limiter = RateLimiter(1.0, 1, 0, 1)
+        rate_limiter.acquire = AsyncMock(return_value=3.0)
+        admission = QueryAdmission(_limiter(), rate_limiter)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            async with admission.admit("org"):
+                pass
+
+        assert exc.value.reason == "rate_limited"
+        assert admission.limiter.running == 0
+
+
+class TestResolveQueryTenant:
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        query_admission_service._tenants.clear()
+        yield
+        query_admission_service._tenants.clear()
+
+    @pytest.mark.asyncio
+    async def test_looks_up_organization_once(self, mock_db):
+        mock_db.execute.return_value.scalar_one_or_none.return_value = ORG
+
+        assert await resolve_query_tenant(mock_db, document_id=DOC_A) == str(ORG)
+        assert await resolve_query_tenant(mock_db, document_id=DOC_A) == str(ORG)
+
+        assert mock_db.execute.await_count == 1
+        mock_db.rollback.assert_awaited_once()  # Connection returned before queueing
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_default(self, mock_db):
+        mock_db.execute.side_effect = RuntimeError("db down")
+
+        assert await resolve_query_tenant(mock_db, trial_id=DOC_A) == DEFAULT_TENANT
+        assert await resolve_query_tenant(mock_db) == DEFAULT_TENANT
+        assert not query_admission_service._tenants
+
+
+class TestQueryRouteAdmission:
+
+    def test_rejection_returns_429_with_retry_after(self, authed_client):
+        rate_limiter = RateLimiter(1.0, 1, 0, 1)
+        rate_limiter.acquire = AsyncMock(return_value=2.2)
+        admission = QueryAdmission(_limiter(), rate_limiter)
+        with patch("app.api.routes.query.get_settings") as mock_settings, \
+             patch("app.api.routes.query.get_query_admission", return_value=admission):
+            mock_settings.return_value = MagicMock(upload_api_key="k")
+            response = authed_client.post(
+                "/query",
+                json={"query": "q", "document_id": str(DOC_A), "document_name": "Protocol"},
+                headers={"X-API-KEY": "k"},
+            )
+
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "3"
+
+    def test_queue_time_reported_in_timing(self, authed_client):
+        answer = {"result": {"response": "ok", "sources": []}, "timing": {}}
+        admission = QueryAdmission(_limiter(), RateLimiter(0, 1, 0, 1))
+        with patch("app.api.routes.query.get_settings") as mock_settings, \
+             patch("app.api.routes.query.get_query_admission", return_value=admission), \
+             patch("app.api.routes.query._query_via_local", AsyncMock(return_value=answer)), \
+             patch("app.api.routes.query._log_timing") as log_timing:
+            mock_settings.return_value = MagicMock(upload_api_key="k", use_grpc_rag=False)
+            response = authed_client.post(
+                "/query",
+                json={"query": "q", "document_id": str(DOC_A), "document_name": "Protocol"},
+                headers={"X-API-KEY": "k"},
+            )
+
+        assert response.status_code == 200
+        assert "admission_queue_ms" in log_timing.call_args[0][0]
+        assert admission.limiter.running == 0
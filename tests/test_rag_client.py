@@ -15,7 +15,11 @@ class TestRagClient:
     def client(self):
         """Create a RAG client with mocked channel."""
         with patch("app.clients.rag_client.get_settings") as mock_settings:
-            mock_settings.return_value = MagicMock(rag_service_address="localhost:50051")
+            mock_settings.return_value = MagicMock(
+                rag_service_address="localhost:50051",
+                rag_service_timeout=600.0,
+                rag_service_channel_pool_size=1,
+            )
             return RagClient()
 
     @pytest.mark.asyncio
@@ -27,7 +31,7 @@ class TestRagClient:
             await client._ensure_connected()
 
             mock_channel.assert_called_once()
-            assert client._channel is not None
+            assert client._channels
 
     @pytest.mark.asyncio
     async def test_ensure_connected_reuses_channel(self, client):
@@ -45,14 +49,56 @@ class TestRagClient:
     async def test_close_channel(self, client):
         """Test closing the gRPC channel."""
         mock_channel = AsyncMock()
-        client._channel = mock_channel
-        client._stub = MagicMock()
+        client._channels = [mock_channel]
+        client._stubs = [MagicMock()]
 
         await client.close()
 
         mock_channel.close.assert_called_once()
-        assert client._channel is None
-        assert client._stub is None
+        assert client._channels == []
+        assert client._stubs == []
+
+    @pytest.mark.asyncio
+    async def test_pool_spreads_calls_round_robin(self):
+        """Test that RPCs rotate across the channel pool."""
+        with patch("app.clients.rag_client.get_settings") as mock_settings:
+            mock_settings.return_value = MagicMock(rag_service_address="localhost:50051")
+            client = RagClient(timeout=5.0, pool_size=2)
+
+        with patch("app.clients.rag_client.aio.insecure_channel") as mock_channel, \
+             patch("app.clients.rag_client.get_settings") as mock_settings:
+            mock_settings.return_value = MagicMock(
+                rag_service_keepalive_time_ms=30000, rag_service_keepalive_timeout_ms=10000
+            )
+            mock_channel.side_effect = [MagicMock(), MagicMock()]
+            await client._ensure_connected()
+
+            target, = mock_channel.call_args[0]
+            options = dict(mock_channel.call_args[1]["options"])
+
+        assert mock_channel.call_count == 2
+        assert target == "dns:///localhost:50051"
+        assert options["grpc.keepalive_time_ms"] == 30000
+        assert "round_robin" in options["grpc.service_config"]
+        assert client._stub() is not client._stub()
+
+    @pytest.mark.asyncio
+    async def test_rpc_metrics_and_deadline(self, client):
+        """Test that unary RPCs use the per-operation deadline and record metrics."""
+        stub = MagicMock()
+        stub.InvalidateDocument = AsyncMock(return_value=MagicMock(
+            success=True, chunks_deleted=1, cache_entries_deleted=2
+        ))
+        client._channels = [MagicMock()]
+        client._stubs = [stub]
+        client.deadlines["InvalidateDocument"] = 7.0
+
+        await client.invalidate_document(uuid4())
+
+        assert stub.InvalidateDocument.call_args[1]["timeout"] == 7.0
+        metrics = client.get_metrics()
+        assert metrics["rpcs"]["InvalidateDocument"]["calls"] == 1
+        assert metrics["rpcs"]["InvalidateDocument"]["errors"] == 0
 
     @pytest.mark.asyncio
     async def test_close_when_not_connected(self, client):
@@ -14,6 +14,17 @@ docling = pytest.importorskip("docling", reason="docling package not installed")
 from langchain_core.documents import Document
 
 
+@pytest.fixture
+def cached_document(tmp_path, sample_pdf_bytes):
+    """A document cache already holding https://example.com/test.pdf."""
+    from app.services.storage.document_cache import DocumentCache
+
+    cache = DocumentCache(str(tmp_path), max_bytes=1024 * 1024)
+    with open(cache.path_for("https://example.com/test.pdf"), "wb") as f:
+        f.write(sample_pdf_bytes)
+    return cache
+
+
 class TestRagIngestionServiceIngestPdf:
     """Test the ingest_pdf method of RagIngestionService."""
 
@@ -27,6 +38,7 @@ class TestRagIngestionServiceIngestPdf:
         mock_docling_documents,
         mock_embedding_vectors,
         sample_pdf_bytes,
+        cached_document,
     ):
         """Create a RagIngestionService with all dependencies mocked."""
         from app.services.doclingRag.rag_ingestion_service import RagIngestionService
@@ -35,6 +47,7 @@ class TestRagIngestionServiceIngestPdf:
             db=mock_db_session,
             cache_service=mock_rag_cache_service,
             semantic_cache_service=mock_semantic_cache_service,
+            document_cache=cached_document,
         )
         # Replace the embedding client
         service.embedding_client = mock_embedding_client
@@ -285,6 +298,24 @@ class TestRagIngestionServiceIngestPdf:
             mocks["db"].rollback.assert_called()
 
 
+    @pytest.mark.asyncio
+    async def test_ingest_pdf_parses_cached_copy(self, service_with_mocks, cached_document):
+        """Docling parses the local copy from the document cache, not the URL."""
+        mocks = service_with_mocks
+        mocks["service"].ensure_tables_exist = AsyncMock()
+
+        with patch("app.services.doclingRag.rag_ingestion_service.DoclingLoader") as mock_loader_cls:
+            mock_loader_cls.return_value.load.return_value = mocks["documents"]
+
+            await mocks["service"].ingest_pdf(
+                document_url="https://example.com/test.pdf?X-Goog-Signature=abc",
+                document_id=uuid4(),
+            )
+
+        file_path = mock_loader_cls.call_args.kwargs["file_path"]
+        assert file_path == cached_document.path_for("https://example.com/test.pdf")
+
+
 class TestRagIngestionServiceHelpers:
     """Test helper methods of RagIngestionService."""
 
@@ -356,7 +387,7 @@ class TestRagIngestionServiceWithoutCaches:
 
     @pytest.mark.asyncio
     async def test_ingest_pdf_without_redis_cache(
-        self, mock_db_session, mock_embedding_client, mock_docling_documents, sample_pdf_bytes
+        self, mock_db_session, mock_embedding_client, mock_docling_documents, sample_pdf_bytes, cached_document
     ):
         """Test ingest_pdf works without Redis cache service."""
         from app.services.doclingRag.rag_ingestion_service import RagIngestionService
@@ -366,6 +397,7 @@ class TestRagIngestionServiceWithoutCaches:
             db=mock_db_session,
             cache_service=None,
             semantic_cache_service=None,
+            document_cache=cached_document,
         )
         service.embedding_client = mock_embedding_client
         service.ensure_tables_exist = AsyncMock()
@@ -0,0 +1,160 @@
+"""
+Tests for the resilient reranker wrapper (cache, latency budget, circuit breaker).
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.reranking.reranker_service import (
+    CircuitBreaker,
+    LatencyTracker,
+    ResilientReranker,
+)
+
+
+def _docs(n: int = 4) -> list:
+    return [{"id": f"c{i}", "page_content": f"chunk {i}"} for i in range(n)]
+
+
+def _reranked(docs: list, order: list) -> list:
+    out = []
+    for rank, idx in enumerate(order):
+        d = docs[idx].copy()
+        d["rerank_score"] = 1.0 - rank * 0.1
+        d["original_index"] = idx
+        out.append(d)
+    return out
+
+
+class TestResilientReranker:
+    """Tests for ResilientReranker."""
+
+    @pytest.fixture
+    def mock_cache(self):
+        cache = MagicMock()
+        cache.get_rerank_scores = AsyncMock(return_value=None)
+        cache.set_rerank_scores = AsyncMock()
+        return cache
+
+    @pytest.mark.asyncio
+    async def test_remote_result_is_cached(self, mock_cache):
+        docs = _docs()
+        inner = MagicMock()
+        inner.rerank = AsyncMock(return_value=_reranked(docs, [2, 0]))
+        reranker = ResilientReranker(inner, "m", cache_service=mock_cache, timeout_ms=500)
+
+        result = await reranker.rerank("q", docs, top_k=2)
+
+        assert [d["id"] for d in result] == ["c2", "c0"]
+        assert reranker.last_status == "remote"
+        ranked = mock_cache.set_rerank_scores.call_args[0][4]
+        assert ranked == [["c2", 1.0], ["c0", 0.9]]
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_remote(self, mock_cache):
+        docs = _docs()
+        mock_cache.get_rerank_scores.return_value = [["c3", 0.8], ["c1", 0.5]]
+        inner = MagicMock()
+        inner.rerank = AsyncMock()
+        reranker = ResilientReranker(inner, "m", cache_service=mock_cache)
+
+        result = await reranker.rerank("q", docs, top_k=2)
+
+        inner.rerank.assert_not_called()
+        assert [d["id"] for d in result] == ["c3", "c1"]
+        assert result[0]["rerank_score"] == 0.8
+        assert reranker.last_status == "cache_hit"
+
+    @pytest.mark.asyncio
+    async def test_timeout_falls_back_to_input_order(self):
+        docs = _docs()
+
+        async def slow(**kwargs):
+            await asyncio.sleep(1)
+            return []
+
+        inner = MagicMock()
+        inner.rerank = slow
+        tracker = LatencyTracker()
+        reranker = ResilientReranker(inner, "m", timeout_ms=10, latency_tracker=tracker)
+
+        result = await reranker.rerank("q", docs, top_k=3)
+
+        assert [d["id"] for d in result] == ["c0", "c1", "c2"]
+        assert reranker.last_status == "timeout"
+        assert tracker.snapshot()["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_circuit_opens_after_repeated_failures(self):
+        docs = _docs()
+        inner = MagicMock()
+        inner.rerank = AsyncMock(side_effect=RuntimeError("boom"))
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+        reranker = ResilientReranker(inner, "m", breaker=breaker)
+
+        await reranker.rerank("q", docs, top_k=2)
+        await reranker.rerank("q", docs, top_k=2)
+        assert breaker.is_open
+
+        result = await reranker.rerank("q", docs, top_k=2)
+        assert reranker.last_status == "circuit_open"
+        assert inner.rerank.await_count == 2
+        assert [d["id"] for d in result] == ["c0", "c1"]
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker state transitions."""
+
+    def test_half_open_after_reset(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+        breaker.record_failure()
+        assert breaker.is_open
+        assert breaker.allow() is True
+        breaker.record_failure()
+        assert breaker.is_open
+
+    def test_half_open_lets_one_probe_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+        with patch("app.services.reranking.reranker_service.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("app.services.reranking.reranker_service.time.monotonic", return_value=131.0):
+            assert [breaker.allow() for _ in range(3)] == [True, False, False]
+            assert breaker.half_open
+            breaker.record_failure()
+            assert breaker.allow() is False
+        with patch("app.services.reranking.reranker_service.time.monotonic", return_value=162.0):
+            assert breaker.allow() is True
+            breaker.record_success()
+        assert not breaker.is_open and not breaker.half_open
+
+    def test_lost_probe_is_given_up_on(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+        with patch("app.services.reranking.reranker_service.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("app.services.reranking.reranker_service.time.monotonic", return_value=131.0):
+            assert breaker.allow() is True
+        with patch("app.services.reranking.reranker_service.time.monotonic", return_value=162.0):
+            assert breaker.allow() is True
+
+    def test_success_closes(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+        breaker.record_failure()
+        breaker.record_success()
+        assert breaker.consecutive_failures == 0
+        assert breaker.allow() is True
+
+
+def test_latency_tracker_percentiles():
+    tracker = LatencyTracker()
+    for ms in range(1, 101):
+        tracker.record(float(ms))
+    snap = tracker.snapshot()
+    assert snap["p50_ms"] == 50.0
+    assert snap["p95_ms"] == 95.0
+
+
+def test_latency_stats_served_on_health_endpoint(client):
+    response = client.get("/health/reranker")
+
+    assert response.status_code == 200
+    assert {"count", "p50_ms", "p95_ms", "circuit_open", "circuit_half_open"} <= response.json().keys()
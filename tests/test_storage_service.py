@@ -0,0 +1,349 @@
+"""
+Tests for streaming uploads in the storage services.
+"""
+import asyncio
+import io
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from functools import partial
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from app.services.storage import document_cache, gcs_service, local_service
+from app.services.storage.base import SignedUrl
+from app.services.storage.document_cache import DocumentCache
+from app.services.storage.gcs_service import GCSStorageService
+from app.services.storage.local_service import LocalStorageService
+
+
+def _upload(data: bytes, filename="protocol.pdf") -> UploadFile:
+    """An UploadFile backed by a spooled temp file, as Starlette builds them."""
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024)
+    spooled.write(data)
+    return UploadFile(
+        file=spooled,
+        filename=filename,
+        headers=Headers({"content-type": "application/pdf"}),
+    )
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_service, "UPLOADS_ROOT", tmp_path)
+    return LocalStorageService()
+
+
+@pytest.fixture
+def gcs_storage():
+    with patch.object(gcs_service.gcs, "Client"):
+        service = GCSStorageService()
+    service.get_signed_url = MagicMock(return_value="https://signed")
+    return service
+
+
+@pytest.fixture
+def gcs_signing():
+    """A GCS service whose client credentials have no private key (Cloud Run)."""
+    with patch.object(gcs_service.gcs, "Client"):
+        service = GCSStorageService()
+    blob = service._client.bucket.return_value.blob.return_value
+
+    def generate_signed_url(**kwargs):
+        if "access_token" not in kwargs:
+            raise AttributeError("you need a private key to sign credentials")
+        return f"https://signed?token={kwargs['access_token']}"
+
+    blob.generate_signed_url.side_effect = generate_signed_url
+    return service
+
+
+def _adc_credentials(expires_in: timedelta):
+    credentials = MagicMock(valid=True, token="t0", service_account_email="sa@example.iam")
+    credentials.expiry = datetime.utcnow() + expires_in
+    return credentials
+
+
+class TestLocalStorageStreaming:
+
+    def test_upload_stream_copies_in_chunks(self, local_storage, tmp_path, monkeypatch):
+        monkeypatch.setattr(local_service, "COPY_BUFFER_SIZE", 4)
+        data = b"0123456789" * 3
+        stream = io.BytesIO(data)
+        reads = []
+        original_read = stream.read
+        stream.read = lambda n=-1: reads.append(n) or original_read(n)
+
+        result = local_storage.upload_stream("bucket", stream, "a.pdf", folder="trials/1")
+
+        assert (tmp_path / "trials/1/a.pdf").read_bytes() == data
+        assert result["file_size"] == len(data)
+        assert result["path"].endswith("/local-files/trials/1/a.pdf")
+        assert -1 not in reads and set(reads) == {4}
+
+    @pytest.mark.asyncio
+    async def test_save_upload_rewinds_and_uses_filename(self, local_storage, tmp_path):
+        upload = _upload(b"%PDF-1.7 " + b"x" * 4096)
+        await upload.read(10)  # A partly consumed upload is stored from the start
+
+        result = await local_storage.save_upload("bucket", upload, folder="patients/p")
+
+        assert (tmp_path / "patients/p/protocol.pdf").read_bytes().startswith(b"%PDF-1.7")
+        assert result["file_size"] == 4105
+
+    @pytest.mark.asyncio
+    async def test_save_upload_runs_off_the_event_loop(self, local_storage):
+        with patch("app.services.storage.base.asyncio.to_thread") as to_thread:
+            to_thread.return_value = {"path": "p", "file_size": 1}
+            upload = _upload(b"data")
+
+            await local_storage.save_upload("bucket", upload, filename="renamed.pdf")
+
+        func, bucket, stream, filename, content_type, folder = to_thread.call_args.args
+        assert func == local_storage.upload_stream
+        assert stream is upload.file
+        assert (filename, content_type) == ("renamed.pdf", "application/pdf")
+
+
+class TestGCSStreaming:
+
+    def test_small_file_single_request(self, gcs_storage):
+        blob = gcs_storage._client.bucket.return_value.blob.return_value
+        blob.chunk_size = None
+        stream = io.BytesIO(b"x" * 1024)
+
+        result = gcs_storage.upload_stream("bucket", stream, "a.pdf", "application/pdf", "trials/1")
+
+        blob.upload_from_file.assert_called_once_with(stream, size=1024, content_type="application/pdf")
+        assert blob.chunk_size is None
+        assert result == {"path": "trials/1/a.pdf", "signed_url": "https://signed", "file_size": 1024}
+
+    def test_large_file_uses_chunked_resumable_upload(self, gcs_storage):
+        blob = gcs_storage._client.bucket.return_value.blob.return_value
+        blob.chunk_size = None
+        settings = MagicMock(gcs_resumable_threshold_mb=1, gcs_upload_chunk_mb=2)
+        stream = io.BytesIO(b"x" * (3 * 1024 * 1024))
+
+        with patch("app.services.storage.gcs_service.get_settings", return_value=settings):
+            result = gcs_storage.upload_stream("bucket", stream, "big.pdf")
+
+        assert blob.chunk_size == 2 * 1024 * 1024
+        assert blob.upload_from_file.call_args.kwargs["size"] == 3 * 1024 * 1024
+        assert result["file_size"] == 3 * 1024 * 1024
+
+
+class TestLocalSigning:
+
+    @pytest.mark.asyncio
+    async def test_sign_url_does_not_use_a_thread(self, local_storage):
+        with patch("app.services.storage.base.asyncio.to_thread") as to_thread:
+            signed = await local_storage.sign_url("bucket", "trials/1/a b.pdf")
+
+        to_thread.assert_not_called()
+        assert signed.url.endswith("/local-files/trials/1/a%20b.pdf")
+        assert signed.expires_at > time.time()
+
+
+class TestGCSSignedUrlCache:
+
+    @pytest.mark.asyncio
+    async def test_reuses_signed_url_per_blob_and_ttl(self, gcs_storage):
+        first = await gcs_storage.sign_url("bucket", "trials/1/a.pdf")
+        again = await gcs_storage.sign_url("bucket", "trials/1/a.pdf")
+        longer = await gcs_storage.sign_url("bucket", "trials/1/a.pdf", expiration_hours=2)
+        other = await gcs_storage.sign_url("bucket", "trials/1/b.pdf")
+
+        assert again == first
+        assert longer.expires_at >= first.expires_at + 3000
+        assert other.url == "https://signed"
+        assert gcs_storage.get_signed_url.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_resigns_once_older_than_reuse_window(self, gcs_storage):
+        key = ("bucket", "trials/1/a.pdf", 1)
+        # Signed for an hour 20 minutes ago: still valid but too short for a 1h request
+        gcs_storage._signed_urls[key] = SignedUrl("https://old", time.time() + 2400)
+
+        signed = await gcs_storage.sign_url("bucket", "trials/1/a.pdf")
+
+        assert signed.url == "https://signed"
+        assert signed.expires_at > time.time() + 3000
+        assert gcs_storage._signed_urls[key] == signed
+
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self, gcs_storage):
+        settings = MagicMock(gcs_signed_url_cache_size=2, gcs_signed_url_reuse_seconds=600,
+                             gcs_credentials_refresh_ahead_seconds=600)
+        with patch("app.services.storage.gcs_service.get_settings", return_value=settings):
+            for name in ("a", "b", "c"):
+                await gcs_storage.sign_url("bucket", name)
+
+        assert list(gcs_storage._signed_urls) == [("bucket", "b", 1), ("bucket", "c", 1)]
+
+    @pytest.mark.asyncio
+    async def test_delete_evicts_cached_urls_on_the_loop(self, gcs_storage):
+        await gcs_storage.sign_url("bucket", "a.pdf")
+        await gcs_storage.sign_url("bucket", "a.pdf", expiration_hours=2)
+        await gcs_storage.sign_url("bucket", "b.pdf")
+
+        with patch("app.services.storage.base.asyncio.to_thread") as to_thread:
+            await gcs_storage.delete_file_async("bucket", "a.pdf")
+            # Evicted before the worker thread starts
+            assert list(gcs_storage._signed_urls) == [("bucket", "b.pdf", 1)]
+
+        to_thread.assert_awaited_once_with(gcs_storage.delete_file, "bucket", "a.pdf")
+
+
+class TestGCSIamSigning:
+
+    def test_credentials_are_fetched_once_and_not_refreshed_while_valid(self, gcs_signing):
+        credentials = _adc_credentials(timedelta(hours=1))
+        with patch.object(gcs_service.google.auth, "default", return_value=(credentials, "p")) as default:
+            urls = [gcs_signing.get_signed_url("bucket", f"{i}.pdf") for i in range(3)]
+
+        assert urls == ["https://signed?token=t0"] * 3
+        default.assert_called_once()
+        credentials.refresh.assert_not_called()
+        # Local signing is not retried once it has failed
+        blob = gcs_signing._client.bucket.return_value.blob.return_value
+        assert blob.generate_signed_url.call_count == 4
+
+    def test_invalid_credentials_are_refreshed_before_signing(self, gcs_signing):
+        credentials = _adc_credentials(timedelta(hours=1))
+        credentials.valid = False
+        with patch.object(gcs_service.google.auth, "default", return_value=(credentials, "p")):
+            gcs_signing.get_signed_url("bucket", "a.pdf")
+
+        credentials.refresh.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_refreshes_in_background_ahead_of_expiry(self, gcs_signing):
+        credentials = _adc_credentials(timedelta(minutes=5))
+        with patch.object(gcs_service.google.auth, "default", return_value=(credentials, "p")):
+            signed = await gcs_signing.sign_url("bucket", "a.pdf")
+            assert signed.url == "https://signed?token=t0"
+            await asyncio.wait_for(gcs_signing._credentials_refresh, 1)
+
+        credentials.refresh.assert_called_once()
+
+
+class TestDocumentCache:
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return DocumentCache(str(tmp_path / "documents"), max_bytes=1024)
+
+    @pytest.mark.asyncio
+    async def test_signed_urls_share_one_download(self, cache):
+        fetch = AsyncMock(return_value=b"%PDF-1")
+        signed = "https://storage.googleapis.com/b/trials/1/a.pdf?X-Goog-Signature=one"
+
+        async with cache.local_copy(signed, fetch) as path:
+            assert open(path, "rb").read() == b"%PDF-1"
+            assert path.endswith(".pdf")
+        data = await cache.read(signed.replace("one", "two"), fetch)
+
+        assert data == b"%PDF-1"
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_a_download(self, cache):
+        async def slow_fetch(url):
+            await asyncio.sleep(0.01)
+            return b"%PDF"
+
+        fetch = AsyncMock(side_effect=slow_fetch)
+        results = await asyncio.gather(*(cache.read("http://h/a.pdf", fetch) for _ in range(3)))
+
+        assert results == [b"%PDF"] * 3
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_streams_http_download(self, cache):
+        def handler(request):
+            return httpx.Response(200, content=b"%PDF-streamed")
+
+        client = partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+        with patch.object(document_cache.httpx, "AsyncClient", client):
+            assert await cache.read("http://h/a.pdf") == b"%PDF-streamed"
+
+    @pytest.mark.asyncio
+    async def test_overwritten_blob_is_downloaded_again(self, cache):
+        blob = {"content": b"%PDF-v1", "etag": '"1"'}
+        conditional = []
+
+        def handler(request):
+            conditional.append(request.headers.get("if-none-match"))
+            if request.headers.get("if-none-match") == blob["etag"]:
+                return httpx.Response(304)
+            return httpx.Response(200, content=blob["content"], headers={"ETag": blob["etag"]})
+
+        client = partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+        with patch.object(document_cache.httpx, "AsyncClient", client):
+            assert await cache.read("http://h/a.pdf?X-Goog-Signature=one") == b"%PDF-v1"
+            assert await cache.read("http://h/a.pdf?X-Goog-Signature=two") == b"%PDF-v1"
+            blob.update(content=b"%PDF-v2", etag='"2"')  # Re-uploaded under the same name
+            assert await cache.read("http://h/a.pdf") == b"%PDF-v2"
+
+        assert conditional == [None, '"1"', '"1"']
+
+    @pytest.mark.asyncio
+    async def test_disabled_cache_removes_files_after_use(self, tmp_path):
+        cache = DocumentCache(str(tmp_path / "documents"), max_bytes=0)
+        fetch = AsyncMock(return_value=b"%PDF")
+
+        async with cache.local_copy("http://h/a.pdf", fetch) as path:
+            assert open(path, "rb").read() == b"%PDF"
+        assert await cache.read("http://h/a.pdf", fetch) == b"%PDF"
+
+        assert fetch.await_count == 2
+        assert os.listdir(cache.cache_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_failed_download_is_retried_and_leaves_no_partial_file(self, cache):
+        fetch = AsyncMock(side_effect=[RuntimeError("403"), b"%PDF"])
+
+        with pytest.raises(RuntimeError):
+            await cache.read("http://h/a.pdf", fetch)
+        assert os.listdir(cache.cache_dir) == []
+
+        assert await cache.read("http://h/a.pdf", fetch) == b"%PDF"
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_but_not_files_in_use(self, cache):
+        fetch = AsyncMock(return_value=b"x" * 400)
+        await cache.read("http://h/a.pdf", fetch)
+        os.utime(cache.path_for("http://h/a.pdf"), (0, 0))  # Oldest
+
+        async with cache.local_copy("http://h/a.pdf", fetch):
+            await cache.read("http://h/b.pdf", fetch)
+            await cache.read("http://h/c.pdf", fetch)  # Over budget, but a.pdf is pinned
+            assert os.path.exists(cache.path_for("http://h/a.pdf"))
+        await cache.read("http://h/d.pdf", fetch)
+
+        assert not os.path.exists(cache.path_for("http://h/a.pdf"))
+        assert os.path.exists(cache.path_for("http://h/d.pdf"))
+
+    @pytest.mark.asyncio
+    async def test_local_storage_documents_are_read_in_place(self, tmp_path, local_storage):
+        (tmp_path / "trials").mkdir()
+        (tmp_path / "trials" / "a b.pdf").write_bytes(b"%PDF-local")
+        cache = DocumentCache(str(tmp_path / "documents"), max_bytes=1024, storage=local_storage)
+        fetch = AsyncMock()
+
+        async with cache.local_copy("http://localhost:8000/local-files/trials/a%20b.pdf", fetch) as path:
+            assert path == str((tmp_path / "trials" / "a b.pdf").resolve())
+        fetch.assert_not_called()
+        assert os.listdir(cache.cache_dir) == []
+
+    def test_local_path_rejects_traversal_and_other_hosts(self, tmp_path, local_storage):
+        (tmp_path.parent / "secret.pdf").write_bytes(b"x")
+
+        assert local_storage.local_path("http://localhost:8000/local-files/../secret.pdf") is None
+        assert local_storage.local_path("http://localhost:8000/local-files/%2E%2E/secret.pdf") is None
+        assert local_storage.local_path("https://storage.googleapis.com/b/secret.pdf") is None
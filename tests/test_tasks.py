@@ -0,0 +1,114 @@
+"""
+Tests for task endpoints — GET / (eager-loaded assignees, keyset pagination).
+"""
+
+from datetime import timedelta
+from unittest.mock import MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.utils.pagination import decode_cursor, encode_cursor
+from tests.conftest import NOW, TEST_MEMBER_ID, TEST_TRIAL_ID, make_scalars_result
+
+# A full page at the maximum limit plus the look-ahead row. Mocked session:
+# this guards the query count (eager-loaded assignees), not Postgres plans.
+MAX_PAGE_TASKS = 501
+
+
+def _make_task(i: int, assignee=None):
+    t = MagicMock()
+    t.id = UUID(int=i + 1)
+    t.trial_id = TEST_TRIAL_ID
+    t.title = f"Task {i}"
+    t.description = None
+    t.status = "todo"
+    t.priority = "medium"
+    t.category = None
+    t.due_date = None
+    t.assigned_to = assignee.id if assignee else None
+    t.assigned_user = assignee
+    t.patient_id = None
+    t.visit_id = None
+    t.activity_type_id = None
+    t.created_at = NOW - timedelta(minutes=i)
+    t.updated_at = NOW
+    return t
+
+
+@pytest.fixture
+def many_tasks():
+    """One max-size page of tasks spread over a handful of assignees."""
+    assignees = []
+    for n in range(5):
+        m = MagicMock()
+        m.id = uuid4()
+        m.name = f"Assignee {n}"
+        assignees.append(m)
+    return [_make_task(i, assignees[i % 5] if i % 7 else None) for i in range(MAX_PAGE_TASKS)]
+
+
+class TestListTasks:
+    """Tests for GET /api/tasks/."""
+
+    def test_assignees_loaded_in_one_query(self, authed_client, mock_db, many_tasks):
+        """Regression guard for the per-task Member lookup (N+1)."""
+        mock_db.execute.return_value = make_scalars_result(all_items=many_tasks)
+
+        resp = authed_client.get(f"/api/tasks/?trial_id={TEST_TRIAL_ID}&limit=500")
+
+        assert resp.status_code == 200
+        data = resp.json()
+        assert len(data) == 500
+        assert data[1]["assigned_user"]["full_name"] == "Assignee 1"
+        assert data[0]["assigned_user"] is None
+        assert mock_db.execute.await_count == 1
+        mock_db.get.assert_not_called()
+
+    def test_query_joins_assignee_and_scopes_org(self, authed_client, mock_db):
+        authed_client.get("/api/tasks/")
+
+        stmt = mock_db.execute.call_args[0][0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "LEFT OUTER JOIN members" in sql
+        assert "trials.organization_id" in sql
+        assert "ORDER BY tasks.created_at DESC NULLS FIRST, tasks.id DESC" in sql
+
+    def test_next_cursor_header(self, authed_client, mock_db, many_tasks):
+        mock_db.execute.return_value = make_scalars_result(all_items=many_tasks[:3])
+
+        resp = authed_client.get("/api/tasks/?limit=2")
+
+        assert len(resp.json()) == 2
+        created_at, task_id = decode_cursor(resp.headers["X-Next-Cursor"])
+        assert task_id == many_tasks[1].id
+        assert created_at == many_tasks[1].created_at
+
+    def test_cursor_readable_cross_origin(self, authed_client, mock_db, many_tasks):
+        mock_db.execute.return_value = make_scalars_result(all_items=many_tasks[:3])
+
+        resp = authed_client.get("/api/tasks/?limit=2", headers={"Origin": "http://localhost:3000"})
+
+        assert "X-Next-Cursor" in resp.headers
+        assert "x-next-cursor" in resp.headers["access-control-expose-headers"].lower()
+
+    def test_last_page_has_no_cursor(self, authed_client, mock_db, many_tasks):
+        mock_db.execute.return_value = make_scalars_result(all_items=many_tasks[:2])
+
+        resp = authed_client.get("/api/tasks/?limit=2")
+
+        assert "X-Next-Cursor" not in resp.headers
+
+    def test_cursor_filters_query(self, authed_client, mock_db):
+        cursor = encode_cursor(NOW, TEST_MEMBER_ID)
+
+        resp = authed_client.get(f"/api/tasks/?cursor={cursor}")
+
+        assert resp.status_code == 200
+        sql = str(mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "(tasks.created_at, tasks.id) <" in sql
+
+    def test_invalid_cursor(self, authed_client):
+        resp = authed_client.get("/api/tasks/?cursor=not-a-cursor")
+        assert resp.status_code == 400
@@ -0,0 +1,202 @@
+"""
+Tests for RAG pipeline tracing (spans, OTLP/JSON export, pipeline instrumentation).
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID
+
+import pytest
+
+from app.core.tracing import (
+    NOOP_SPAN,
+    STATUS_ERROR,
+    BackgroundExportProcessor,
+    JsonFileExporter,
+    Tracer,
+    build_tracer,
+    current_span,
+    set_tracer,
+    start_span,
+    to_otlp_json,
+)
+from tests.conftest import make_rows_result
+
+DOC = UUID("00000000-0000-0000-0000-00000000000a")
+
+
+class ListExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, spans):
+        self.traces.append(spans)
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def exporter():
+    exporter = ListExporter()
+    processor = BackgroundExportProcessor(exporter)
+    set_tracer(Tracer(processor))
+    yield exporter
+    processor.shutdown()
+    set_tracer(Tracer())
+
+
+def _flush():
+    from app.core.tracing import get_tracer
+
+    get_tracer().processor.flush()
+
+
+class TestTracer:
+    """Tests for span creation and export."""
+
+    def test_disabled_tracer_yields_noop(self):
+        set_tracer(Tracer())
+        with start_span("rag.query") as span:
+            span.set_attribute("rag.chunk_count", 3)
+            assert span is NOOP_SPAN
+            assert current_span() is NOOP_SPAN
+
+    def test_nested_spans_exported_with_root(self, exporter):
+        with start_span("rag.query", {"rag.mode": "local"}) as root:
+            with start_span("rag.vector_search", {"rag.top_k": 20}) as child:
+                assert current_span() is child
+                child.set_attribute("rag.chunk_count", 7)
+            assert current_span() is root
+        _flush()
+
+        [trace] = exporter.traces
+        by_name = {s.name: s for s in trace}
+        assert by_name["rag.vector_search"].parent_span_id == root.span_id
+        assert by_name["rag.vector_search"].trace_id == root.trace_id
+        assert by_name["rag.vector_search"].attributes == {"rag.top_k": 20, "rag.chunk_count": 7}
+        assert root.end_ns >= by_name["rag.vector_search"].end_ns
+
+    @pytest.mark.asyncio
+    async def test_concurrent_children_share_parent(self, exporter):
+        async def search(name):
+            with start_span(name):
+                await asyncio.sleep(0)
+
+        with start_span("rag.retrieve") as root:
+            await asyncio.gather(search("rag.vector_search"), search("rag.bm25"))
+        _flush()
+
+        [trace] = exporter.traces
+        children = [s for s in trace if s is not root]
+        assert {s.name for s in children} == {"rag.vector_search", "rag.bm25"}
+        assert all(s.parent_span_id == root.span_id for s in children)
+
+    def test_exception_marks_span_as_error(self, exporter):
+        with pytest.raises(RuntimeError):
+            with start_span("rag.llm"):
+                raise RuntimeError("overloaded")
+        _flush()
+
+        [[span]] = exporter.traces
+        assert span.status_code == STATUS_ERROR
+        assert span.attributes["exception.type"] == "RuntimeError"
+
+    def test_unsampled_trace_records_nothing(self, exporter):
+        set_tracer(Tracer(BackgroundExportProcessor(exporter), sample_rate=0.0))
+        with start_span("rag.query") as root:
+            with start_span("rag.embedding") as child:
+                assert root is NOOP_SPAN and child is NOOP_SPAN
+        assert exporter.traces == []
+
+    def test_unknown_exporter_disables_tracing(self):
+        settings = MagicMock(tracing_exporter="zipkin")
+        assert not build_tracer(settings).enabled
+
+
+class TestOtlpJson:
+    """Tests for the OTLP/JSON encoding and file exporter."""
+
+    def test_attribute_types(self, exporter):
+        with start_span("rag.llm", {"gen_ai.usage.input_tokens": 120, "cache.hit": False, "score": 0.5, "model": "m"}):
+            pass
+        _flush()
+
+        payload = to_otlp_json(exporter.traces[0], "svc")
+        resource = payload["resourceSpans"][0]
+        assert resource["resource"]["attributes"][0] == {"key": "service.name", "value": {"stringValue": "svc"}}
+        span = resource["scopeSpans"][0]["spans"][0]
+        values = {a["key"]: a["value"] for a in span["attributes"]}
+        assert values["gen_ai.usage.input_tokens"] == {"intValue": "120"}
+        assert values["cache.hit"] == {"boolValue": False}
+        assert values["score"] == {"doubleValue": 0.5}
+        assert len(span["traceId"]) == 32 and len(span["spanId"]) == 16
+        assert "parentSpanId" not in span
+
+    def test_json_file_exporter_writes_one_line_per_trace(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        processor = BackgroundExportProcessor(JsonFileExporter(str(path), "svc"))
+        set_tracer(Tracer(processor))
+        try:
+            for _ in range(2):
+                with start_span("rag.query"):
+                    with start_span("rag.embedding"):
+                        pass
+            processor.flush()
+        finally:
+            processor.shutdown()
+            set_tracer(Tracer())
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 2
+        spans = json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert [s["name"] for s in spans] == ["rag.embedding", "rag.query"]
+
+
+class TestPipelineSpans:
+    """The generation pipeline emits one span per stage."""
+
+    @pytest.mark.asyncio
+    async def test_generate_answer_stages(self, exporter):
+        from app.services.doclingRag.rag_generation_service import RagGenerationService
+        from app.services.doclingRag.rag_retrieval_service import RagRetrievalService
+
+        row = MagicMock(id="c1", content="text", page_number=2, chunk_metadata={}, similarity=0.9, bm25_score=0.3)
+        result = make_rows_result()
+        result.fetchall.return_value = [row]
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+        cache = MagicMock()
+        for name in ("get_embedding", "get_chunks", "get_response"):
+            setattr(cache, name, AsyncMock(return_value=None))
+        for name in ("set_embedding", "set_chunks", "set_response"):
+            setattr(cache, name, AsyncMock())
+        embedder = MagicMock()
+        embedder.embed_query.return_value = [0.1, 0.2]
+        llm = MagicMock()
+        llm.messages.create = AsyncMock(return_value=SimpleNamespace(
+            content=[SimpleNamespace(text='{"response": "ok", "sources": []}')],
+            usage=SimpleNamespace(input_tokens=321, output_tokens=12, cache_read_input_tokens=0),
+        ))
+
+        retrieval = RagRetrievalService(db=db, embedding_client=embedder, cache_service=cache)
+        service = RagGenerationService(retrieval, cache_service=cache, reranker=False)
+        with patch("app.services.doclingRag.rag_generation_service._get_anthropic_client", return_value=llm):
+            with start_span("rag.query"):
+                answer = await service.generate_answer("q", DOC, "Protocol")
+        _flush()
+
+        assert answer["result"].response == "ok"
+        [trace] = exporter.traces
+        by_id = {s.span_id: s for s in trace}
+        names = [s.name for s in trace]
+        for stage in ("rag.embedding", "rag.retrieve", "rag.vector_search", "rag.bm25",
+                      "rag.rrf", "rag.compression", "rag.llm", "rag.cache_lookup", "rag.cache_write"):
+            assert stage in names, stage
+        vector = next(s for s in trace if s.name == "rag.vector_search")
+        assert by_id[vector.parent_span_id].name == "rag.retrieve"
+        llm_span = next(s for s in trace if s.name == "rag.llm")
+        assert llm_span.attributes["gen_ai.usage.input_tokens"] == 321
+        lookups = {s.attributes["cache.name"]: s.attributes["cache.hit"] for s in trace if s.name == "rag.cache_lookup"}
+        assert lookups == {"embedding": False, "chunks": False, "response": False}
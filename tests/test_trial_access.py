@@ -0,0 +1,95 @@
+"""
+Tests for the request-scoped TrialAccessResolver.
+"""
+import json
+import pytest
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID
+
+from app.services.trial_access_service import TrialAccessResolver
+from tests.conftest import TEST_ORG_ID, TEST_TRIAL_ID, make_rows_result
+
+OTHER_TRIAL_ID = UUID("eeeeeeee-eeee-eeee-eeee-eeeeeeeeeeee")
+FOREIGN_TRIAL_ID = UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
+TM_ID = UUID("12121212-1212-1212-1212-121212121212")
+
+
+@pytest.fixture(autouse=True)
+def access_settings():
+    with patch("app.services.trial_access_service.get_settings") as mock_settings:
+        mock_settings.return_value = MagicMock(trial_access_cache_ttl_seconds=30)
+        yield
+
+
+def _db(*rows_per_call):
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[make_rows_result(rows) for rows in rows_per_call])
+    return db
+
+
+# (trial_id, trial_member_id, role_name): member of TEST_TRIAL as PI, not of OTHER_TRIAL
+ROWS = [(TEST_TRIAL_ID, TM_ID, "PI"), (OTHER_TRIAL_ID, None, None)]
+
+
+class TestTrialAccessResolver:
+    """Tests for TrialAccessResolver."""
+
+    @pytest.mark.asyncio
+    async def test_checks_share_one_query(self, mock_staff_member):
+        mock_staff_member.default_role = "editor"
+        db = _db(ROWS)
+        access = TrialAccessResolver(mock_staff_member, db)
+
+        assert await access.can_access(TEST_TRIAL_ID) is True
+        assert await access.can_access(OTHER_TRIAL_ID) is False
+        assert await access.role_for(str(TEST_TRIAL_ID)) == "PI"
+        assert await access.accessible_trial_ids() == {TEST_TRIAL_ID}
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_require_status_codes(self, mock_staff_member):
+        mock_staff_member.default_role = "editor"
+        access = TrialAccessResolver(mock_staff_member, _db(ROWS))
+
+        with pytest.raises(HTTPException) as forbidden:
+            await access.require(OTHER_TRIAL_ID)
+        with pytest.raises(HTTPException) as missing:
+            await access.require(FOREIGN_TRIAL_ID)
+
+        assert forbidden.value.status_code == 403
+        assert missing.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_admin_sees_all_org_trials(self, mock_member):
+        access = TrialAccessResolver(mock_member, _db(ROWS))
+
+        await access.require(OTHER_TRIAL_ID)
+        assert await access.accessible_trial_ids() == {TEST_TRIAL_ID, OTHER_TRIAL_ID}
+
+    @pytest.mark.asyncio
+    async def test_redis_snapshot_skips_database(self, mock_member):
+        snapshot = {"organization_id": str(TEST_ORG_ID), "trials": [str(TEST_TRIAL_ID)], "roles": {}}
+        redis = MagicMock()
+        redis.get = AsyncMock(return_value=json.dumps(snapshot).encode())
+        db = _db()
+        access = TrialAccessResolver(mock_member, db, redis)
+
+        assert await access.can_access(TEST_TRIAL_ID) is True
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cached_denial_is_rechecked(self, mock_member):
+        # Snapshot predates OTHER_TRIAL being created
+        snapshot = {"organization_id": str(TEST_ORG_ID), "trials": [str(TEST_TRIAL_ID)], "roles": {}}
+        redis = MagicMock()
+        redis.get = AsyncMock(return_value=json.dumps(snapshot).encode())
+        redis.set = AsyncMock()
+        db = _db(ROWS)
+        access = TrialAccessResolver(mock_member, db, redis)
+
+        await access.require(OTHER_TRIAL_ID)
+
+        assert db.execute.await_count == 1
+        stored = json.loads(redis.set.call_args[0][1])
+        assert str(OTHER_TRIAL_ID) in stored["trials"]
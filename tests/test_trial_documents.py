@@ -117,7 +117,7 @@ class TestUploadTrialDocument:
         data = resp.json()
         assert data["document_name"] == "protocol.pdf"
         assert data["status"] == "active"
-        mock_storage.upload_file.assert_called_once()
+        mock_storage.save_upload.assert_awaited_once()
 
     def test_upload_document_trial_not_found(self, storage_client, mock_db):
         mock_db.execute = AsyncMock(
@@ -174,7 +174,7 @@ class TestDeleteTrialDocument:
         ])
         resp = storage_client.delete(f"/api/trial-documents/{DOC_ID}")
         assert resp.status_code == 204
-        mock_storage.delete_file.assert_called_once()
+        mock_storage.delete_file_async.assert_awaited_once()
 
     def test_delete_document_not_found(self, storage_client, mock_db):
         mock_db.execute = AsyncMock(
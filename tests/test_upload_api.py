@@ -12,12 +12,13 @@ docling = pytest.importorskip("docling", reason="docling package not installed")
 
 from datetime import datetime
 from uuid import UUID
-from unittest.mock import MagicMock, AsyncMock, patch
+from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 
 from app.main import app
 from app.dependencies.rag import get_rag_ingestion_service
+from tests.conftest import InMemoryRedis
 
 
 class TestUploadAuthentication:
@@ -56,9 +57,7 @@ class TestUploadAuthentication:
             pytest.skip("UPLOAD_API_KEY not configured")
 
         # Mock Redis for job status
-        mock_redis = MagicMock()
-        mock_redis.set = AsyncMock()
-        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis = InMemoryRedis()
 
         with patch.object(app.state, "redis_client", mock_redis):
             response = client.post(
@@ -164,9 +163,7 @@ class TestUploadJobResponse:
         if not api_key:
             pytest.skip("UPLOAD_API_KEY not configured")
 
-        mock_redis = MagicMock()
-        mock_redis.set = AsyncMock()
-        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis = InMemoryRedis()
 
         with patch.object(app.state, "redis_client", mock_redis):
             response = client.post(
@@ -195,9 +192,7 @@ class TestUploadJobResponse:
 
         test_uuid = "11111111-2222-3333-4444-555555555555"
 
-        mock_redis = MagicMock()
-        mock_redis.set = AsyncMock()
-        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis = InMemoryRedis()
 
         with patch.object(app.state, "redis_client", mock_redis):
             response = client.post(
@@ -218,9 +213,7 @@ class TestUploadJobResponse:
         if not api_key:
             pytest.skip("UPLOAD_API_KEY not configured")
 
-        mock_redis = MagicMock()
-        mock_redis.set = AsyncMock()
-        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis = InMemoryRedis()
 
         with patch.object(app.state, "redis_client", mock_redis):
             response = client.post(
@@ -241,9 +234,7 @@ class TestUploadJobResponse:
         if not api_key:
             pytest.skip("UPLOAD_API_KEY not configured")
 
-        mock_redis = MagicMock()
-        mock_redis.set = AsyncMock()
-        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis = InMemoryRedis()
 
         with patch.object(app.state, "redis_client", mock_redis):
             response = client.post(
@@ -10,6 +10,7 @@ Tests cover:
 - Error handling
 """
 
+import asyncio
 import pytest
 import json
 from datetime import datetime
@@ -28,6 +29,7 @@ from app.api.routes.upload import (
     _ingest_via_local,
 )
 from app.services.jobs.job_status_service import JobStatusService, JobStatus
+from tests.conftest import InMemoryRedis
 
 
 # =============================================================================
@@ -46,15 +48,17 @@ def valid_upload_request():
 
 @pytest.fixture
 def mock_redis():
-    """Mock Redis client."""
-    redis = MagicMock()
-    redis.set = AsyncMock()
-    redis.get = AsyncMock(return_value=None)
-    redis.delete = AsyncMock()
-    redis.sadd = AsyncMock()
-    redis.smembers = AsyncMock(return_value=set())
-    redis.expire = AsyncMock()
-    return redis
+    """In-memory Redis client."""
+    return InMemoryRedis()
+
+
+async def _store_job(redis, job_data: dict) -> None:
+    """Write a job hash the way JobStatusService does."""
+    await redis.hset(f"job:{job_data['job_id']}", mapping=JobStatusService._to_fields(**job_data))
+
+
+def _stored(redis, job_id: str) -> dict:
+    return {k.decode(): v.decode() for k, v in redis.data[f"job:{job_id}"].items()}
 
 
 @pytest.fixture
@@ -428,7 +432,7 @@ class TestJobStatusEndpoint:
             "created_at": "2024-01-01T00:00:00",
             "updated_at": "2024-01-01T00:00:00",
         }
-        mock_redis.get = AsyncMock(return_value=json.dumps(job_data))
+        await _store_job(mock_redis, job_data)
 
         with patch.object(app.state, "redis_client", mock_redis):
             response = await async_client.get(f"/upload/status/{job_id}")
@@ -442,8 +446,6 @@ class TestJobStatusEndpoint:
     @pytest.mark.asyncio
     async def test_status_unknown_job_returns_404(self, async_client: AsyncClient, mock_redis):
         """Status endpoint returns 404 for unknown job."""
-        mock_redis.get = AsyncMock(return_value=None)
-
         with patch.object(app.state, "redis_client", mock_redis):
             response = await async_client.get("/upload/status/unknown-job-id")
 
@@ -470,7 +472,7 @@ class TestJobStatusEndpoint:
             "created_at": "2024-01-01T00:00:00",
             "updated_at": "2024-01-01T00:00:00",
         }
-        mock_redis.get = AsyncMock(return_value=json.dumps(job_data))
+        await _store_job(mock_redis, job_data)
 
         with patch.object(app.state, "redis_client", mock_redis):
             response = await async_client.get(f"/upload/status/{job_id}")
@@ -496,7 +498,7 @@ class TestJobStatusEndpoint:
             "created_at": "2024-01-01T00:00:00",
             "updated_at": "2024-01-01T00:00:00",
         }
-        mock_redis.get = AsyncMock(return_value=json.dumps(job_data))
+        await _store_job(mock_redis, job_data)
 
         with patch.object(app.state, "redis_client", mock_redis):
             response = await async_client.get(f"/upload/status/{job_id}")
@@ -506,6 +508,83 @@ class TestJobStatusEndpoint:
         assert "404" in data["error"]
 
 
+# =============================================================================
+# Job Events (SSE) Tests
+# =============================================================================
+
+def _sse_events(body: str) -> list:
+    """Decode the `data:` payloads of an SSE body."""
+    return [
+        json.loads(line[len("data: "):])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+class TestJobEventsEndpoint:
+    """Test the /upload/events/{job_id} SSE stream."""
+
+    @pytest.mark.asyncio
+    async def test_unknown_job_returns_404(self, async_client: AsyncClient, mock_redis):
+        with patch.object(app.state, "redis_client", mock_redis):
+            response = await async_client.get("/upload/events/unknown-job-id")
+
+        assert response.status_code == 404
+        assert not mock_redis._subscribers.get("job:unknown-job-id:events")
+
+    @pytest.mark.asyncio
+    async def test_finished_job_sends_snapshot_and_closes(self, async_client: AsyncClient, mock_redis):
+        job_service = JobStatusService(mock_redis)
+        job_id = await job_service.create_job(uuid4())
+        await job_service.complete_job(job_id, {"chunks_count": 7})
+
+        with patch.object(app.state, "redis_client", mock_redis):
+            response = await async_client.get(f"/upload/events/{job_id}")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _sse_events(response.text)
+        assert len(events) == 1
+        assert events[0]["status"] == "complete"
+        assert events[0]["result"] == {"chunks_count": 7}
+
+    @pytest.mark.asyncio
+    async def test_streams_updates_until_complete(self, async_client: AsyncClient, mock_redis):
+        job_service = JobStatusService(mock_redis)
+        job_id = await job_service.create_job(uuid4())
+        channel = JobStatusService.channel(job_id)
+
+        async def run_job():
+            while not mock_redis._subscribers.get(channel):
+                await asyncio.sleep(0.01)
+            await job_service.update_progress(job_id, "embedding", 50, "Embedding...")
+            await job_service.complete_job(job_id, {"chunks_count": 3})
+
+        worker = asyncio.create_task(run_job())
+        with patch.object(app.state, "redis_client", mock_redis):
+            response = await async_client.get(f"/upload/events/{job_id}")
+        await worker
+
+        events = _sse_events(response.text)
+        assert [e["status"] for e in events] == ["queued", "processing", "complete"]
+        assert events[1]["progress_percent"] == 50
+        assert events[2]["result"] == {"chunks_count": 3}
+        assert not mock_redis._subscribers[channel]  # Unsubscribed on close
+
+    @pytest.mark.asyncio
+    async def test_idle_stream_sends_keepalive(self, async_client: AsyncClient, mock_redis):
+        job_service = JobStatusService(mock_redis)
+        job_id = await job_service.create_job(uuid4())
+        settings = MagicMock(job_events_keepalive_seconds=0.01, job_events_max_seconds=0.05)
+
+        with patch.object(app.state, "redis_client", mock_redis), \
+             patch("app.api.routes.upload.get_settings", return_value=settings):
+            response = await async_client.get(f"/upload/events/{job_id}")
+
+        assert ": keepalive" in response.text
+        assert len(_sse_events(response.text)) == 1
+
+
 # =============================================================================
 # Job Service Integration Tests
 # =============================================================================
@@ -522,12 +601,9 @@ class TestJobServiceIntegration:
         job_id = await job_service.create_job(document_id)
 
         assert job_id is not None
-        mock_redis.set.assert_called_once()
 
         # Verify stored data
-        call_args = mock_redis.set.call_args
-        stored_json = call_args[0][1]
-        stored_data = json.loads(stored_json)
+        stored_data = _stored(mock_redis, job_id)
 
         assert stored_data["job_id"] == job_id
         assert stored_data["document_id"] == str(document_id)
@@ -550,7 +626,7 @@ class TestJobServiceIntegration:
             "created_at": "2024-01-01T00:00:00",
             "updated_at": "2024-01-01T00:00:00",
         }
-        mock_redis.get = AsyncMock(return_value=json.dumps(initial_job))
+        await _store_job(mock_redis, initial_job)
 
         job_service = JobStatusService(mock_redis)
 
@@ -562,13 +638,10 @@ class TestJobServiceIntegration:
         )
 
         # Verify update was stored
-        assert mock_redis.set.called
-        call_args = mock_redis.set.call_args
-        stored_json = call_args[0][1]
-        stored_data = json.loads(stored_json)
+        stored_data = _stored(mock_redis, job_id)
 
         assert stored_data["status"] == "processing"
-        assert stored_data["progress_percent"] == 60
+        assert stored_data["progress_percent"] == "60"
         assert stored_data["current_stage"] == "embedding"
 
     @pytest.mark.asyncio
@@ -587,20 +660,18 @@ class TestJobServiceIntegration:
             "created_at": "2024-01-01T00:00:00",
             "updated_at": "2024-01-01T00:00:00",
         }
-        mock_redis.get = AsyncMock(return_value=json.dumps(initial_job))
+        await _store_job(mock_redis, initial_job)
 
         job_service = JobStatusService(mock_redis)
         result = {"success": True, "chunks_count": 42}
 
         await job_service.complete_job(job_id, result)
 
-        call_args = mock_redis.set.call_args
-        stored_json = call_args[0][1]
-        stored_data = json.loads(stored_json)
+        stored_data = _stored(mock_redis, job_id)
 
         assert stored_data["status"] == "complete"
-        assert stored_data["progress_percent"] == 100
-        assert stored_data["result"]["chunks_count"] == 42
+        assert stored_data["progress_percent"] == "100"
+        assert json.loads(stored_data["result"])["chunks_count"] == 42
 
     @pytest.mark.asyncio
     async def test_failure_stored_with_error(self, mock_redis):
@@ -618,15 +689,13 @@ class TestJobServiceIntegration:
             "created_at": "2024-01-01T00:00:00",
             "updated_at": "2024-01-01T00:00:00",
         }
-        mock_redis.get = AsyncMock(return_value=json.dumps(initial_job))
+        await _store_job(mock_redis, initial_job)
 
         job_service = JobStatusService(mock_redis)
 
         await job_service.fail_job(job_id, "Connection timeout")
 
-        call_args = mock_redis.set.call_args
-        stored_json = call_args[0][1]
-        stored_data = json.loads(stored_json)
+        stored_data = _stored(mock_redis, job_id)
 
         assert stored_data["status"] == "error"
         assert "Connection timeout" in stored_data["error"]
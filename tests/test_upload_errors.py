@@ -7,12 +7,13 @@ These tests verify the background task error handling behavior.
 """
 
 import pytest
-from unittest.mock import MagicMock, AsyncMock, patch
+from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 
 from app.main import app
 from app.services.jobs.job_status_service import JobStatusService, JobStatus
+from tests.conftest import InMemoryRedis
 
 
 class TestUploadValidationErrors:
@@ -69,19 +70,7 @@ class TestBackgroundTaskErrorCapture:
     @pytest.mark.asyncio
     async def test_job_failure_captured_in_status(self):
         """Test that job failure is captured in Redis job status."""
-        mock_redis = MagicMock()
-        stored_data = {}
-
-        async def mock_set(key, value, ex=None):
-            stored_data[key] = value
-
-        async def mock_get(key):
-            return stored_data.get(key)
-
-        mock_redis.set = mock_set
-        mock_redis.get = mock_get
-
-        job_service = JobStatusService(mock_redis)
+        job_service = JobStatusService(InMemoryRedis())
 
         # Create a job
         job_id = await job_service.create_job("00000000-0000-0000-0000-000000000001")
@@ -97,19 +86,7 @@ class TestBackgroundTaskErrorCapture:
     @pytest.mark.asyncio
     async def test_job_progress_updates_captured(self):
         """Test that progress updates are captured during processing."""
-        mock_redis = MagicMock()
-        stored_data = {}
-
-        async def mock_set(key, value, ex=None):
-            stored_data[key] = value
-
-        async def mock_get(key):
-            return stored_data.get(key)
-
-        mock_redis.set = mock_set
-        mock_redis.get = mock_get
-
-        job_service = JobStatusService(mock_redis)
+        job_service = JobStatusService(InMemoryRedis())
 
         # Create a job
         job_id = await job_service.create_job("00000000-0000-0000-0000-000000000001")
@@ -131,19 +108,7 @@ class TestBackgroundTaskErrorCapture:
     @pytest.mark.asyncio
     async def test_job_completion_captured(self):
         """Test that job completion is captured with result."""
-        mock_redis = MagicMock()
-        stored_data = {}
-
-        async def mock_set(key, value, ex=None):
-            stored_data[key] = value
-
-        async def mock_get(key):
-            return stored_data.get(key)
-
-        mock_redis.set = mock_set
-        mock_redis.get = mock_get
-
-        job_service = JobStatusService(mock_redis)
+        job_service = JobStatusService(InMemoryRedis())
 
         # Create a job
         job_id = await job_service.create_job("00000000-0000-0000-0000-000000000001")
@@ -169,8 +134,7 @@ class TestStatusEndpointErrorResponses:
     @pytest.mark.asyncio
     async def test_status_unknown_job_returns_404(self, async_client):
         """Test that status endpoint returns 404 for unknown job."""
-        mock_redis = MagicMock()
-        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis = InMemoryRedis()
 
         with patch.object(app.state, "redis_client", mock_redis):
             response = await async_client.get("/upload/status/unknown-job-id")
@@ -194,9 +158,8 @@ class TestStatusEndpointErrorResponses:
             "updated_at": "2024-01-01T00:00:00"
         }
 
-        import json
-        mock_redis = MagicMock()
-        mock_redis.get = AsyncMock(return_value=json.dumps(job_data))
+        mock_redis = InMemoryRedis()
+        await mock_redis.hset("job:test-job-id", mapping=JobStatusService._to_fields(**job_data))
 
         with patch.object(app.state, "redis_client", mock_redis):
             response = await async_client.get("/upload/status/test-job-id")
@@ -215,9 +178,7 @@ class TestUploadEndpointReturnsQuickly:
         if not api_key:
             pytest.skip("UPLOAD_API_KEY not configured")
 
-        mock_redis = MagicMock()
-        mock_redis.set = AsyncMock()
-        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis = InMemoryRedis()
 
         with patch.object(app.state, "redis_client", mock_redis):
             response = client.post(